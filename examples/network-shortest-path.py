@@ -8,8 +8,8 @@ network = Network.from_obj(compas.get_data('grid_irregular.obj'))
 weight = dict(((u, v), network.edge_length(u, v)) for u, v in network.edges())
 weight.update({(v, u): weight[(u, v)] for u, v in network.edges()})
 
-start = 21
-end = 22
+start = 20
+end = 30
 
 path = network_dijkstra_path(network.adjacency, weight, start, end)
 
@@ -11,6 +11,24 @@ com
 Package for communicating with external software.
 
 
+diana
+=====
+
+.. currentmodule:: compas.com.diana.dat
+
+:mod:`compas.com.diana.dat`
+
+Reading and writing DIANA analysis models.
+
+.. autosummary::
+    :toctree: generated/
+
+    DianaReader
+    DianaWriter
+    mesh_from_diana
+    mesh_to_diana
+
+
 mlab
 ====
 
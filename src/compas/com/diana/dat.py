@@ -1,116 +1,715 @@
-def mesh_from_diana(cls, filepath, dva=None, dfa=None, dea=None, **kwargs):
-    with open(filepath, 'rb') as fh:
-        in_coords = False
-        in_elements = False
-        coords = []
+from __future__ import print_function
+
+from numpy import arange
+from numpy import argsort
+from numpy import asarray
+from numpy import column_stack
+from numpy import concatenate
+from numpy import cumsum
+from numpy import diff
+from numpy import float64
+from numpy import flatnonzero
+from numpy import full
+from numpy import insert
+from numpy import int64
+from numpy import repeat
+from numpy import searchsorted
+from numpy import unique
+from numpy import where
+from numpy import zeros
+
+from compas.exceptions import BRGInputError
+
+from compas.files.obj import _ArrayBuffer
+from compas.files.obj import _fromstring
+
+
+__author__     = 'Tom Van Mele'
+__copyright__  = 'Copyright 2016, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'vanmelet@ethz.ch'
+
+
+__all__ = [
+    'ELEMENT_TYPES',
+    'DianaReader',
+    'DianaWriter',
+    'mesh_from_diana',
+    'mesh_to_diana',
+]
+
+
+#: The DIANA element types of the faces of a mesh, per number of vertices.
+ELEMENT_TYPES = {
+    3: 'T15SH',
+    4: 'Q20SH',
+    6: 'CT30S',
+    8: 'CQ40S',
+}
+
+# DIANA only looks at the first six characters of a keyword
+_SECTIONS = {
+    'COORDI': 'COORDINATES',
+    'ELEMEN': 'ELEMENTS',
+    'MATERI': 'MATERIALS',
+    'GEOMET': 'GEOMETRY',
+    'DATA'  : 'DATA',
+    'SUPPOR': 'SUPPORTS',
+    'END'   : 'END',
+}
+
+_ASSIGNMENTS = {
+    'MATERI': 'materials',
+    'GEOMET': 'geometries',
+    'DATA'  : 'data',
+}
+
+
+class DianaReader(object):
+    """Read the nodes, elements, materials and supports of a DIANA *dat* file.
+
+    The file is read in chunks of lines. The lines of the coordinates and
+    elements sections are collected per chunk and converted to NumPy arrays
+    in bulk. Other sections are skipped.
+
+    Parameters:
+        filepath (str): Path to the file.
+        chunksize (int): Optional. The approximate number of bytes per chunk.
+            Default is ``2 ** 20``.
+
+    Attributes:
+        header (list): The lines before the first section.
+        nodes (array): The node numbers. Shape ``(n, )``.
+        xyz (array): The node coordinates. Shape ``(n, 3)``.
+        elements (array): The element numbers. Shape ``(e, )``.
+        types (list): The names of the element types.
+        element_types (array): The index in ``types`` of the type of every element.
+        connectivity (array): The node numbers of all elements, one after the other.
+        offsets (array): The offsets of the elements in ``connectivity``.
+            Shape ``(e + 1, )``.
+        element_materials (array): The material number of every element,
+            or zero. Shape ``(e, )``.
+        element_geometries (array): The geometry number of every element,
+            or zero. Shape ``(e, )``.
+        element_data (array): The data number of every element, or zero.
+            Shape ``(e, )``.
+        materials (dict): The properties of the materials, per material number.
+        geometries (dict): The properties of the geometries, per geometry number.
+        data (dict): The properties of the data sets, per data number.
+        supports (list): The supports, as tuples of an array of node numbers,
+            the kind of support (``'TR'`` or ``'RO'``) and the constrained directions.
+
+    Note:
+        Element nodes and supported nodes are referenced by node number,
+        not by index in the coordinates array.
+
+    Examples:
+
+        .. code-block:: python
+
+            reader = DianaReader('model.dat')
+            print(reader.xyz.shape, len(reader.elements))
+
+    """
+    def __init__(self, filepath, chunksize=2 ** 20):
+        self.filepath           = filepath
+        self.chunksize          = chunksize
+        self.header             = []
+        self.nodes              = None
+        self.xyz                = None
+        self.elements           = None
+        self.types              = []
+        self.element_types      = None
+        self.connectivity       = None
+        self.offsets            = None
+        self.element_materials  = None
+        self.element_geometries = None
+        self.element_data       = None
+        self.materials          = {}
+        self.geometries         = {}
+        self.data               = {}
+        self.supports           = []
+        self._dimension         = 3
+        self._type_index        = {}
+        self._assignments       = []
+        self._property          = None
+        self._number            = None
+        self.read()
+
+    def _chunks(self):
+        with open(self.filepath, 'r') as fh:
+            while True:
+                lines = fh.readlines(self.chunksize)
+                if not lines:
+                    break
+                yield lines
+
+    def read(self):
+        self._nodes        = _ArrayBuffer(int64)
+        self._xyz          = _ArrayBuffer(float64, 3)
+        self._elements     = _ArrayBuffer(int64)
+        self._etypes       = _ArrayBuffer(int64)
+        self._sizes        = _ArrayBuffer(int64)
+        self._connectivity = _ArrayBuffer(int64)
+        section = None
+        for lines in self._chunks():
+            block = []
+            for line in lines:
+                if ':' in line:
+                    # comment
+                    line = line.split(':', 1)[0]
+                line = line.strip()
+                if not line:
+                    continue
+                if line[0] == "'":
+                    self._section(section, block)
+                    block = []
+                    section = self._start(line)
+                    if section == 'END':
+                        break
+                    continue
+                block.append(line)
+            else:
+                self._section(section, block)
+                continue
+            break
+        self.post()
+
+    def _start(self, line):
+        name, _, options = line[1:].partition("'")
+        name = _SECTIONS.get(name.strip().upper()[:6], name.strip().upper())
+        if name == 'COORDINATES':
+            for option in options.split():
+                key, _, value = option.partition('=')
+                if key.upper()[:2] == 'DI' and value:
+                    self._dimension = int(value)
+        self._property = None
+        self._number = None
+        return name
+
+    def _section(self, section, lines):
+        if not lines:
+            return
+        if section is None:
+            self.header.extend(lines)
+        elif section == 'COORDINATES':
+            self._read_coordinates(lines)
+        elif section == 'ELEMENTS':
+            self._read_elements(lines)
+        elif section == 'MATERIALS':
+            self._read_properties(lines, self.materials)
+        elif section == 'GEOMETRY':
+            self._read_properties(lines, self.geometries)
+        elif section == 'DATA':
+            self._read_properties(lines, self.data)
+        elif section == 'SUPPORTS':
+            self._read_supports(lines)
+
+    def _read_coordinates(self, lines):
+        width = 1 + self._dimension
+        values = _fromstring(' '.join(lines), float64)
+        if values.shape[0] != width * len(lines):
+            raise BRGInputError('Every node should have a number and {0} coordinates: {1}'.format(self._dimension, self.filepath))
+        values = values.reshape((-1, width))
+        xyz = zeros((values.shape[0], 3), dtype=float64)
+        xyz[:, :min(3, self._dimension)] = values[:, 1:4]
+        self._nodes.extend(values[:, 0].astype(int64))
+        self._xyz.extend(xyz)
+
+    def _read_elements(self, lines):
         elements = []
-        for line in fh:
-            line = line.strip()
-            if line == "'COORDINATES'":
-                in_coords = True
-                in_elements = False
+        etypes = []
+        sizes = []
+        nodes = []
+        type_index = self._type_index
+        for line in lines:
+            if line[0].isdigit():
+                parts = line.split(None, 2)
+                if len(parts) < 3:
+                    continue
+                number, etype, rest = parts
+                if etype not in type_index:
+                    type_index[etype] = len(self.types)
+                    self.types.append(etype)
+                elements.append(number)
+                etypes.append(type_index[etype])
+                sizes.append(len(rest.split()))
+                nodes.append(rest)
+            else:
+                self._read_assignment(line)
+        if not elements:
+            return
+        connectivity = _fromstring(' '.join(nodes), int64)
+        if connectivity.shape[0] != sum(sizes):
+            raise BRGInputError('Element nodes should be node numbers: {0}'.format(self.filepath))
+        self._elements.extend(_fromstring(' '.join(elements), int64))
+        self._etypes.extend(asarray(etypes, dtype=int64))
+        self._sizes.extend(asarray(sizes, dtype=int64))
+        self._connectivity.extend(connectivity)
+
+    def _read_assignment(self, line):
+        # MATERIALS
+        # / 1-10 20 / 1
+        # or
+        # MATERIALS 1
+        if line[0] == '/':
+            if self._property is None:
+                return
+            parts = line.split('/')
+            if len(parts) < 3 or not parts[2].split():
+                raise BRGInputError('Invalid assignment: {0}'.format(line))
+            self._assignments.append((self._property, _ranges(parts[1]), int(parts[2].split()[0])))
+            return
+        parts = line.split()
+        self._property = _ASSIGNMENTS.get(parts[0].upper()[:6])
+        if self._property is not None and len(parts) > 1:
+            self._assignments.append((self._property, None, int(parts[1])))
+
+    def _read_properties(self, lines, properties):
+        # 1 NAME   MASONRY
+        #   YOUNG  3.0E+09
+        for line in lines:
+            parts = line.split()
+            if parts[0].isdigit():
+                self._number = int(parts[0])
+                properties[self._number] = {}
+                parts = parts[1:]
+            if self._number is None or not parts:
                 continue
-            if line == "'ELEMENTS'":
-                in_elements = True
-                in_coords = False
+            values = [_value(part) for part in parts[1:]]
+            properties[self._number][parts[0].upper()] = values[0] if len(values) == 1 else values
+
+    def _read_supports(self, lines):
+        # / 1-4 / TR 1 2
+        for line in lines:
+            parts = line.split('/')
+            if len(parts) < 3:
                 continue
-            if line == "'GROUPS'":
-                break
-            if line == "'LOADS'":
-                break
-            if in_coords:
-                parts = line.split()
-                if len(parts) != 4:
-                    continue
-                # key = parts[0]
-                x = float(parts[1])
-                y = float(parts[2])
-                z = float(parts[3])
-                coords.append((x, y, z))
-            if in_elements:
-                parts = line.split()
-                if len(parts) < 8:
-                    continue
-                # key = parts[0]
-                # etype = parts[1]
-                vertices = [int(k) - 1 for k in parts[2:]]
-                elements.append(vertices)
-    return cls.from_vertices_and_faces(coords, elements, dva=dva, dfa=dfa, dea=dea, **kwargs)
-
-
-def mesh_to_diana(mesh):
-    # for u, v in mesh.edges():
-    #     split_edge(mesh, u, v, t=0.5, allow_boundary=True)
-
-    key_index = dict((key, index + 1) for index, key in mesh.vertices_enum())
-
-    with open('../../data/thelord/versions/10x8/moreinfo.dat', 'wb+') as fh:
-        fh.write("'COORDI' DI=3\n")
-        for key, attr in mesh.vertices_iter(True):
-            fh.write("{0:<5}".format(key_index[key]))
-            fh.write("{0:>20.9e}  {1:>20.9e}  {2:>20.9e}\n".format(attr['x'], attr['y'], attr['z']))
-
-        fh.write("'MATERI'\n")
-        # name
-        fh.write("{0:<5}".format(1))
-        fh.write("{0:<7}".format('NAME'))
-        fh.write("{0}\n".format('MASONRY'))
-        # young
-        fh.write("{0:<5}".format(''))
-        fh.write("{0:<7}".format('YOUNG'))
-        fh.write("{0:.9e}\n".format(3e+9))
-        # poison
-        fh.write("{0:<5}".format(''))
-        fh.write("{0:<7}".format('POISON'))
-        fh.write("{0:.9e}\n".format(2e-1))
-        # densit
-        fh.write("{0:<5}".format(''))
-        fh.write("{0:<7}".format('DENSIT'))
-        fh.write("{0:.9e}\n".format(1.9e+3))
-
-        fh.write("'GEOMET'\n")
-        # name
-        fh.write("{0:<5}".format(1))
-        fh.write("{0:<7}".format('NAME'))
-        fh.write("{0}\n".format('SHELLS'))
-        # thick
-        fh.write("{0:<5}".format(''))
-        fh.write("{0:<7}".format('THICK'))
-        fh.write("{0:.9e}\n".format(0.1))
-
-        fh.write("'DATA'\n")
-        # name
-        fh.write("{0:<5}".format(1))
-        fh.write("{0:<7}".format('NAME'))
-        fh.write("{0}\n".format('VAULT'))
-        # ninteg
-        fh.write("{0:<5}".format(''))
-        fh.write("{0:<7}".format('NINTEG'))
-        fh.write("{0} {1}\n".format(6, 5))
-
-        fh.write("'ELEMEN'\n")
-        fh.write("CONNEC\n")
-        count = 1
-        for fkey in mesh.faces():
-            vertices = mesh.face_vertices(fkey, ordered=True)
-            v1 = key_index[vertices[0]]
-            v2 = key_index[vertices[1]]
-            v3 = key_index[vertices[2]]
-            v4 = key_index[vertices[3]]
-            v5 = key_index[vertices[4]]
-            v6 = key_index[vertices[5]]
-            fh.write("{0:<5}".format(count))
-            fh.write("{0:<7}".format('CT30S'))
-            fh.write("{0}  {1}  {2}  {3}  {4}  {5}\n".format(v1, v2, v3, v4, v5, v6))
-            count += 1
-        fh.write("MATERI 1\n")
-        fh.write("GEOMET 1\n")
-        fh.write("DATA 1\n")
-
-        fh.write("'GROUPS'\n")
-        fh.write("'SUPPOR'\n")
-        fh.write("'LOADS'\n")
-
-        fh.write("'DIRECTIONS'\n")
-
-        fh.write("'END'\n")
+            directions = parts[2].split()
+            if not directions:
+                continue
+            kind = directions[0].upper()
+            self.supports.append((_ranges(parts[1]), kind, tuple(int(d) for d in directions[1:])))
+
+    def post(self):
+        self.nodes = self._nodes.array()
+        self.xyz = self._xyz.array()
+        self.elements = self._elements.array()
+        self.element_types = self._etypes.array()
+        self.connectivity = self._connectivity.array()
+        sizes = self._sizes.array()
+        self.offsets = zeros(sizes.shape[0] + 1, dtype=int64)
+        cumsum(sizes, out=self.offsets[1:])
+        e = self.elements.shape[0]
+        self.element_materials = zeros(e, dtype=int64)
+        self.element_geometries = zeros(e, dtype=int64)
+        self.element_data = zeros(e, dtype=int64)
+        for name, numbers, value in self._assignments:
+            column = getattr(self, 'element_' + name)
+            if numbers is None:
+                column[:] = value
+                continue
+            i = _lookup(self.elements, numbers)
+            column[i[i >= 0]] = value
+        del self._nodes, self._xyz, self._elements, self._etypes, self._sizes, self._connectivity
+        self._assignments = []
+
+
+class DianaWriter(object):
+    """Write nodes, elements, materials and supports to a DIANA *dat* file.
+
+    The records of the nodes and elements are formatted with a single string
+    operation per chunk. The sections are written in the order in which the
+    methods are called. The ``'END'`` keyword is written when the writer is closed.
+
+    Parameters:
+        filepath (str): Path to the file.
+        precision (str): Optional. The precision of the coordinates.
+            Default is ``'9e'``.
+        chunksize (int): Optional. The number of records per chunk.
+            Default is ``10000``.
+
+    Note:
+        DIANA expects the sections in the order coordinates, elements,
+        materials, geometry, data and supports.
+
+    Examples:
+
+        .. code-block:: python
+
+            with DianaWriter('model.dat') as writer:
+                writer.write_coordinates(xyz)
+                writer.write_elements(faces + 1, types='Q20SH', materials=1)
+                writer.write_materials({1: {'YOUNG': 3e9, 'POISON': 0.2}})
+
+    """
+    def __init__(self, filepath, precision=None, chunksize=10000):
+        self.filepath  = filepath
+        self.precision = precision if precision is not None else '9e'
+        self.chunksize = chunksize
+        self.fh        = None
+        self.open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        self.fh = open(self.filepath, 'w')
+
+    def close(self):
+        if self.fh is None:
+            return
+        self.fh.write("'END'\n")
+        self.fh.close()
+        self.fh = None
+
+    def write_coordinates(self, xyz, numbers=None):
+        """Write the coordinates section.
+
+        Parameters:
+            xyz (array): The node coordinates. Shape ``(n, 3)``.
+            numbers (array): Optional. The node numbers. Default is ``None``,
+                in which case the nodes are numbered from ``1`` to ``n``.
+        """
+        xyz = asarray(xyz, dtype=float64).reshape((-1, 3))
+        if numbers is None:
+            numbers = arange(1, xyz.shape[0] + 1)
+        # the node numbers are exact as floats
+        values = column_stack((asarray(numbers, dtype=float64), xyz))
+        f = '%20.' + self.precision
+        template = '%-8d {0} {0} {0}\n'.format(f)
+        self.fh.write("'COORDINATES' DI=3\n")
+        for start in range(0, values.shape[0], self.chunksize):
+            block = values[start:start + self.chunksize]
+            self.fh.write((template * block.shape[0]) % tuple(block.ravel().tolist()))
+
+    def write_elements(self, connectivity, offsets=None, types=None, numbers=None, materials=None, geometries=None, data=None):
+        """Write the elements section.
+
+        Parameters:
+            connectivity (array): The node numbers of the elements. An integer
+                array of shape ``(e, k)``, or, if ``offsets`` is provided,
+                a flat array with the node numbers of all elements.
+            offsets (array): Optional. The offsets of the elements in the flat
+                array of node numbers. Default is ``None``.
+            types (str, list): The element type of all elements, or of every element.
+            numbers (array): Optional. The element numbers. Default is ``None``,
+                in which case the elements are numbered from ``1`` to ``e``.
+            materials (int, array): Optional. The material number of all elements,
+                or of every element. Zero means no material. Default is ``None``.
+            geometries (int, array): Optional. The geometry number of all elements,
+                or of every element. Default is ``None``.
+            data (int, array): Optional. The data number of all elements,
+                or of every element. Default is ``None``.
+
+        Raises:
+            BRGInputError: If no element types are provided.
+        """
+        if types is None:
+            raise BRGInputError('The element types are required.')
+        connectivity = asarray(connectivity, dtype=int64)
+        if offsets is None:
+            offsets = arange(0, connectivity.size + 1, connectivity.shape[1] if connectivity.ndim == 2 else 1)
+        offsets = asarray(offsets, dtype=int64)
+        connectivity = connectivity.ravel()
+        e = offsets.shape[0] - 1
+        if numbers is None:
+            numbers = arange(1, e + 1)
+        numbers = asarray(numbers, dtype=int64)
+        if isinstance(types, basestring):
+            names = [types]
+            codes = zeros(e, dtype=int64)
+        else:
+            names, codes = unique(asarray(types), return_inverse=True)
+            names = names.tolist()
+        sizes = diff(offsets)
+        templates = {}
+        self.fh.write("'ELEMENTS'\nCONNECTIVITY\n")
+        for start in range(0, e, self.chunksize):
+            stop = min(start + self.chunksize, e)
+            nodes = connectivity[offsets[start]:offsets[stop]]
+            keys = list(zip(codes[start:stop].tolist(), sizes[start:stop].tolist()))
+            for key in set(keys):
+                if key not in templates:
+                    templates[key] = '%-8d ' + names[key[0]] + ' %d' * key[1] + '\n'
+            if len(set(keys)) == 1:
+                template = templates[keys[0]] * len(keys)
+            else:
+                template = ''.join([templates[key] for key in keys])
+            values = insert(nodes, offsets[start:stop] - offsets[start], numbers[start:stop])
+            self.fh.write(template % tuple(values.tolist()))
+        for keyword, values in (('MATERIALS', materials), ('GEOMETRY', geometries), ('DATA', data)):
+            if values is None:
+                continue
+            values = asarray(values, dtype=int64)
+            if values.ndim == 0:
+                if values:
+                    self.fh.write('{0} {1}\n'.format(keyword, int(values)))
+                continue
+            self.fh.write('{0}\n'.format(keyword))
+            for value in unique(values):
+                if value:
+                    self.fh.write('/ {0} / {1}\n'.format(_format_ranges(numbers[values == value]), value))
+
+    def write_materials(self, materials):
+        """Write the materials section.
+
+        Parameters:
+            materials (dict): The properties of the materials, per material number.
+        """
+        self._write_properties('MATERIALS', materials)
+
+    def write_geometries(self, geometries):
+        """Write the geometry section.
+
+        Parameters:
+            geometries (dict): The properties of the geometries, per geometry number.
+        """
+        self._write_properties('GEOMETRY', geometries)
+
+    def write_data(self, data):
+        """Write the data section.
+
+        Parameters:
+            data (dict): The properties of the data sets, per data number.
+        """
+        self._write_properties('DATA', data)
+
+    def write_supports(self, supports):
+        """Write the supports section.
+
+        Parameters:
+            supports (list): The supports, as tuples of node numbers,
+                the kind of support (``'TR'`` or ``'RO'``) and the constrained directions.
+        """
+        self.fh.write("'SUPPORTS'\n")
+        for nodes, kind, directions in supports:
+            nodes = _format_ranges(asarray(nodes, dtype=int64))
+            for direction in directions:
+                self.fh.write('/ {0} / {1} {2}\n'.format(nodes, kind, direction))
+
+    def _write_properties(self, keyword, properties):
+        self.fh.write("'{0}'\n".format(keyword))
+        for number in sorted(properties):
+            prefix = '{0:<8}'.format(number)
+            for name, value in properties[number].items():
+                if isinstance(value, (list, tuple)):
+                    value = ' '.join(_format_value(v) for v in value)
+                else:
+                    value = _format_value(value)
+                self.fh.write('{0}{1:<7} {2}\n'.format(prefix, name, value))
+                prefix = ' ' * 8
+
+
+# ==============================================================================
+# Mesh
+# ==============================================================================
+
+def mesh_from_diana(cls, filepath, dva=None, dfa=None, dea=None, types=None, **kwargs):
+    """Construct a mesh from the elements of a DIANA *dat* file.
+
+    Parameters:
+        cls (type): The mesh class.
+        filepath (str): Path to the file.
+        dva (dict): Optional. Default vertex attributes. Default is ``None``.
+        dfa (dict): Optional. Default face attributes. Default is ``None``.
+        dea (dict): Optional. Default edge attributes. Default is ``None``.
+        types (list): Optional. The names of the element types to include.
+            Default is ``None``, in which case all elements are included.
+        kwargs (dict): Remaining named parameters. Default is an empty :obj:`dict`.
+
+    Returns:
+        Mesh: A mesh with a vertex per node and a face per element.
+
+    Raises:
+        BRGInputError: If an element references an unknown node.
+
+    Note:
+        The face of an element runs through all its nodes, in the order
+        of the file. The vertices are in the order of the nodes in the file.
+
+    """
+    from compas.datastructures.mesh.arrays import MeshArrays
+    from compas.datastructures.mesh.arrays import _clean_faces
+
+    reader = DianaReader(filepath)
+    connectivity = reader.connectivity
+    offsets = reader.offsets
+    if types is not None:
+        codes = [reader.types.index(name) for name in types if name in reader.types]
+        keep = _isin(reader.element_types, codes)
+        sizes = diff(offsets)
+        connectivity = connectivity[repeat(keep, sizes)]
+        sizes = sizes[keep]
+        offsets = zeros(sizes.shape[0] + 1, dtype=int64)
+        cumsum(sizes, out=offsets[1:])
+    faces = _lookup(reader.nodes, connectivity)
+    if faces.shape[0] and faces.min() < 0:
+        raise BRGInputError('An element references an unknown node: {0}'.format(filepath))
+    faces, offsets = _clean_faces(faces, offsets)
+    arrays = MeshArrays.from_vertices_and_faces(reader.xyz, faces, offsets=offsets, validate=False)
+    # the default attributes are applied while the mesh is constructed
+    # the faces get their attributes as with update_default_face_attributes
+    arrays.dva.update(dva or {})
+    arrays.dfa.update(dfa or {})
+    arrays.dea.update(dea or {})
+    if dfa:
+        arrays.facedata = dict((index, dict(dfa)) for index in range(arrays.face_count))
+    mesh = arrays.to_mesh(cls)
+    mesh.attributes.update(kwargs)
+    return mesh
+
+
+def mesh_to_diana(mesh, filepath, types=None, material=None, geometry=None, data=None, supports=None, precision=None):
+    """Write a mesh to a DIANA *dat* file, with an element per face.
+
+    Parameters:
+        mesh (Mesh): The mesh.
+        filepath (str): Path to the file.
+        types (dict): Optional. The element type per number of face vertices.
+            Default is ``None``, in which case :data:`ELEMENT_TYPES` is used.
+        material (dict): Optional. The properties of the material of all elements.
+            Default is ``None``.
+        geometry (dict): Optional. The properties of the geometry of all elements.
+            Default is ``None``.
+        data (dict): Optional. The properties of the data of all elements.
+            Default is ``None``.
+        supports (list): Optional. The keys of the vertices of which the
+            translations are fixed. Default is ``None``.
+        precision (str): Optional. The precision of the coordinates.
+            Default is ``'9e'``.
+
+    Raises:
+        BRGInputError: If there is no element type for the number of vertices
+            of a face.
+
+    Note:
+        The nodes and elements are numbered in the order of the vertices and
+        faces of the mesh, starting at ``1``.
+
+    """
+    from compas.datastructures.mesh.arrays import MeshArrays
+
+    if types is None:
+        types = ELEMENT_TYPES
+    arrays = MeshArrays.from_mesh(mesh)
+    sizes = diff(arrays.face_offsets)
+    names = []
+    for size in sizes.tolist():
+        if size not in types:
+            raise BRGInputError('No element type for faces with {0} vertices.'.format(size))
+        names.append(types[size])
+
+    with DianaWriter(filepath, precision=precision) as writer:
+        writer.write_coordinates(arrays.xyz)
+        writer.write_elements(arrays.face_vertices + 1,
+                              offsets=arrays.face_offsets,
+                              types=names,
+                              materials=1 if material else None,
+                              geometries=1 if geometry else None,
+                              data=1 if data else None)
+        if material:
+            writer.write_materials({1: material})
+        if geometry:
+            writer.write_geometries({1: geometry})
+        if data:
+            writer.write_data({1: data})
+        if supports:
+            nodes = [arrays.key_index[key] + 1 for key in supports]
+            writer.write_supports([(nodes, 'TR', (1, 2, 3))])
+
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+
+def _lookup(numbers, values):
+    # the index of every value in an array of numbers,
+    # or -1 for values that are not in the array
+    # for repeated numbers, the index of the last occurrence is used
+    values = asarray(values, dtype=int64)
+    if not numbers.shape[0]:
+        return full(values.shape, -1, dtype=int64)
+    order = argsort(numbers, kind='mergesort')
+    ordered = numbers[order]
+    i = searchsorted(ordered, values, side='right') - 1
+    i[i < 0] = 0
+    return where(ordered[i] == values, order[i], -1)
+
+
+def _isin(values, codes):
+    lookup = zeros(max(codes or [0]) + 1, dtype=bool)
+    lookup[codes] = True
+    return lookup[values] if len(codes) else zeros(values.shape[0], dtype=bool)
+
+
+def _ranges(text):
+    # 1-10 20 30-32 => 1, ..., 10, 20, 30, 31, 32
+    numbers = []
+    for part in text.split():
+        start, _, stop = part.partition('-')
+        if stop:
+            numbers.append(arange(int(start), int(stop) + 1, dtype=int64))
+        else:
+            numbers.append(asarray([int(start)], dtype=int64))
+    if not numbers:
+        return zeros(0, dtype=int64)
+    return concatenate(numbers)
+
+
+def _format_ranges(numbers):
+    # 1, ..., 10, 20, 30, 31, 32 => 1-10 20 30-32
+    numbers = unique(numbers)
+    if not numbers.shape[0]:
+        return ''
+    breaks = flatnonzero(diff(numbers) != 1) + 1
+    starts = numbers[concatenate(([0], breaks))].tolist()
+    stops = numbers[concatenate((breaks - 1, [numbers.shape[0] - 1]))].tolist()
+    return ' '.join(str(a) if a == b else '{0}-{1}'.format(a, b) for a, b in zip(starts, stops))
+
+
+def _value(text):
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return '{0:.9e}'.format(value)
+    return '{0}'.format(value)
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import os
+    import tempfile
+
+    from compas.datastructures.mesh import Mesh
+
+    filepath = os.path.join(tempfile.mkdtemp(), 'mesh.dat')
+
+    with DianaWriter(filepath) as writer:
+        writer.write_coordinates([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], numbers=[10, 20, 30, 40])
+        writer.write_elements([[10, 20, 30], [10, 30, 40]], types='T15SH')
+
+    mesh = mesh_from_diana(Mesh, filepath, dva={'is_fixed': False}, dfa={'t': 1}, dea={'q': 1.0})
+
+    assert mesh.default_face_attributes['t'] == 1
+    assert all(mesh.get_face_attribute(fkey, 't') == 1 for fkey in mesh.face)
+    assert all(attr['is_fixed'] is False for attr in mesh.vertex.itervalues())
+    assert all(attr['q'] == 1.0 for u in mesh.edge for attr in mesh.edge[u].itervalues())
+
+    os.remove(filepath)
+
+    print('ok')
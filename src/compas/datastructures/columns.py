@@ -0,0 +1,976 @@
+from __future__ import print_function
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+from numpy import arange
+from numpy import asarray
+from numpy import bool_
+from numpy import empty
+from numpy import flatnonzero
+from numpy import float64
+from numpy import floating
+from numpy import fromiter
+from numpy import int64
+from numpy import integer
+from numpy import zeros
+
+
+__author__     = 'Tom Van Mele'
+__copyright__  = 'Copyright 2016, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'vanmelet@ethz.ch'
+
+
+__all__ = [
+    'AttributeColumns',
+    'AttributeView',
+    'ColumnarDict',
+    'ColumnarEdgeDict',
+]
+
+
+try:
+    _INTEGERS = (int, long, integer)
+except NameError:
+    _INTEGERS = (int, integer)
+
+_DTYPE = {'b': bool_, 'i': int64, 'f': float64, 'O': object}
+_FILL  = {'b': False, 'i': 0, 'f': 0.0, 'O': None}
+_RANK  = {'b': 0, 'i': 1, 'f': 2}
+
+
+def _kind(value):
+    if isinstance(value, (bool, bool_)):
+        return 'b'
+    if isinstance(value, _INTEGERS):
+        if -2 ** 63 <= value < 2 ** 63:
+            return 'i'
+        return 'O'
+    if isinstance(value, (float, floating)):
+        return 'f'
+    return 'O'
+
+
+def _promote(a, b, numeric=False):
+    # the kind of a column with values of kind a and b
+    # bool values are only converted to numbers if numeric is True,
+    # otherwise a column with bool and other values is an object column
+    if a == b or b is None:
+        return a
+    if a is None:
+        return b
+    if a in _RANK and b in _RANK and (numeric or 'b' not in (a, b)):
+        return a if _RANK[a] > _RANK[b] else b
+    return 'O'
+
+
+class _Column(object):
+    __slots__ = ('kind', 'index', 'mask')
+
+    def __init__(self, kind, index, mask=None):
+        self.kind  = kind
+        self.index = index
+        self.mask  = mask
+
+    def __getstate__(self):
+        return self.kind, self.index, self.mask
+
+    def __setstate__(self, state):
+        self.kind, self.index, self.mask = state
+
+
+class AttributeColumns(object):
+    """A columnar store for the attributes of the elements of a data structure.
+
+    Every attribute name is stored in a typed column (``bool``, ``int64``,
+    ``float64`` or ``object``). Columns of the same type are the columns of one
+    two-dimensional block, in the order in which they were created. The rows of
+    the blocks are the elements, in the order of ``keys``.
+
+    Attributes with a default value are present for all elements. Other attributes
+    have a mask that records which elements have them. The default values are stored
+    once, in ``defaults``, and only copied into a column when the column is created.
+
+    Parameters:
+        defaults (dict) : Optional. The default attributes of the elements.
+            The dict is stored by reference.
+
+    Attributes:
+        keys (list) : The element keys, in the order of the rows.
+        index (dict) : A *key-to-row* map.
+        defaults (dict) : The default attributes.
+
+    Note:
+        The store is not meant to be used directly. It is the storage behind
+        :class:`ColumnarDict` and :class:`ColumnarEdgeDict`, which provide the
+        dict interface of the ``vertex``, ``edge`` and ``facedata`` attributes of
+        the data structures.
+
+        A value of a different type than its column promotes the column like NumPy
+        would (``int`` to ``float``). All other combinations, including ``bool`` and
+        numbers, promote the column to ``object``, such that the existing values
+        keep their type.
+
+        A store can be copied with :func:`copy.deepcopy` and pickled.
+
+    """
+
+    def __init__(self, defaults=None):
+        self.defaults  = {} if defaults is None else defaults
+        self.keys      = []
+        self.index     = {}
+        self.columns   = {}
+        self.blocks    = {}
+        self._capacity = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    @classmethod
+    def from_dicts(cls, items, defaults=None):
+        """Construct a store from ``(key, attr)`` pairs.
+
+        Parameters:
+            items (iterable) : The keys and attribute dicts of the elements.
+            defaults (dict) : Optional. The default attributes of the elements.
+
+        Returns:
+            AttributeColumns : The store.
+        """
+        store = cls(defaults)
+        keys  = []
+        dicts = []
+        for key, attr in items:
+            keys.append(key)
+            dicts.append(attr)
+        store.keys  = keys
+        store.index = dict((key, row) for row, key in enumerate(keys))
+        store._reserve(len(keys))
+        names = set()
+        for attr in dicts:
+            names.update(attr)
+        for name in sorted(names):
+            rows = [row for row, attr in enumerate(dicts) if name in attr]
+            if len(rows) == len(dicts):
+                values = [attr[name] for attr in dicts]
+            else:
+                values = [dicts[row][name] for row in rows]
+            # one value of every type is enough to determine the kind of the column
+            kind = None
+            for value in dict((type(value), value) for value in values).values():
+                kind = _promote(kind, _kind(value))
+            column = store._add_column(name, kind)
+            store._write(column, rows, values)
+            if column.mask is not None:
+                column.mask[rows] = True
+        return store
+
+    def copy(self, defaults=None):
+        """Make an independent copy of the store.
+
+        The blocks and masks are copied as arrays. Values in ``object`` columns
+        are deep-copied.
+
+        Parameters:
+            defaults (dict) : Optional. The default attributes of the copy.
+                Defaults to the default attributes of the store.
+
+        Returns:
+            AttributeColumns : The copy.
+        """
+        from copy import deepcopy
+        store = type(self)(self.defaults if defaults is None else defaults)
+        n = len(self.keys)
+        store.keys  = list(self.keys)
+        store.index = self.index.copy()
+        for name, column in self.columns.items():
+            mask = None if column.mask is None else column.mask[:n].copy()
+            store.columns[name] = _Column(column.kind, column.index, mask)
+        for kind, block in self.blocks.items():
+            if kind == 'O':
+                store.blocks[kind] = deepcopy(block[:n])
+            else:
+                store.blocks[kind] = block[:n].copy()
+        store._capacity = n
+        return store
+
+    # --------------------------------------------------------------------------
+    # rows
+    # --------------------------------------------------------------------------
+
+    def rows(self, keys):
+        """Get the rows of the elements with the given keys.
+
+        Parameters:
+            keys (list) : The element keys.
+
+        Returns:
+            array : The row indices.
+
+        Raises:
+            KeyError : If one of the keys is not in the store.
+        """
+        index = self.index
+        return fromiter((index[key] for key in keys), int64)
+
+    def set_row(self, key, attr, replace=True):
+        """Set the attributes of an element, adding the element if necessary.
+
+        Parameters:
+            key (hashable) : The element key.
+            attr (dict) : The attributes.
+            replace (bool) : Optional. If ``True`` (default), attributes of an
+                existing element that are not in ``attr`` are reset.
+        """
+        attr = dict(attr)
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == self._capacity:
+                self._reserve(max(16, 2 * row))
+            self.keys.append(key)
+            self.index[key] = row
+            replace = True
+            # create the default columns together, in alphabetical order,
+            # such that for example 'x', 'y', 'z' are consecutive
+            missing = [name for name in self.defaults if name not in self.columns]
+            for name in sorted(missing):
+                self._add_column(name, _kind(self.defaults[name]))
+        if replace:
+            for name, column in self.columns.items():
+                if column.mask is not None:
+                    column.mask[row] = False
+                elif name not in attr:
+                    self._set(row, name, self.defaults.get(name, _FILL[column.kind]))
+        for name in sorted(attr):
+            self._set(row, name, attr[name])
+
+    def remove(self, key):
+        """Remove an element.
+
+        The last row is moved into the row of the removed element.
+
+        Parameters:
+            key (hashable) : The element key.
+
+        Raises:
+            KeyError : If the element is not in the store.
+        """
+        row  = self.index.pop(key)
+        last = len(self.keys) - 1
+        if row != last:
+            moved = self.keys[last]
+            self.keys[row] = moved
+            self.index[moved] = row
+            for block in self.blocks.values():
+                block[row] = block[last]
+            for column in self.columns.values():
+                if column.mask is not None:
+                    column.mask[row] = column.mask[last]
+        self.keys.pop()
+        if 'O' in self.blocks:
+            self.blocks['O'][last] = None
+
+    def row_names(self, row):
+        """Get the names of the attributes of the element in a row."""
+        names = list(self.defaults)
+        for name, column in self.columns.items():
+            if name in self.defaults:
+                continue
+            if column.mask is None or column.mask[row]:
+                names.append(name)
+        return names
+
+    def row_dict(self, row):
+        """Get the attributes of the element in a row as a dict."""
+        return dict((name, self.get_value(row, name)) for name in self.row_names(row))
+
+    def to_dicts(self):
+        """Get the attributes of all elements as dicts, in the order of the rows."""
+        n = len(self.keys)
+        dicts = [{} for _ in range(n)]
+        for name, value in self.defaults.items():
+            for attr in dicts:
+                attr[name] = value
+        for name, column in self.columns.items():
+            values = self.blocks[column.kind][:n, column.index].tolist()
+            if column.mask is None:
+                for attr, value in zip(dicts, values):
+                    attr[name] = value
+            else:
+                for attr, value, present in zip(dicts, values, column.mask[:n].tolist()):
+                    if present:
+                        attr[name] = value
+        return dicts
+
+    # --------------------------------------------------------------------------
+    # values
+    # --------------------------------------------------------------------------
+
+    def has_value(self, row, name):
+        """Verify that the element in a row has an attribute."""
+        column = self.columns.get(name)
+        if column is not None and (column.mask is None or column.mask[row]):
+            return True
+        return name in self.defaults
+
+    def get_value(self, row, name):
+        """Get the value of an attribute of the element in a row.
+
+        Raises:
+            KeyError : If the element does not have the attribute.
+        """
+        column = self.columns.get(name)
+        if column is not None and (column.mask is None or column.mask[row]):
+            if column.kind == 'O':
+                return self.blocks['O'][row, column.index]
+            return self.blocks[column.kind].item(row, column.index)
+        try:
+            return self.defaults[name]
+        except KeyError:
+            raise KeyError(name)
+
+    def set_value(self, row, name, value):
+        """Set the value of an attribute of the element in a row."""
+        self._set(row, name, value)
+
+    def del_value(self, row, name):
+        """Delete an attribute of the element in a row.
+
+        Attributes with a default value are reset to the default.
+
+        Raises:
+            KeyError : If the element does not have the attribute.
+        """
+        if not self.has_value(row, name):
+            raise KeyError(name)
+        column = self.columns.get(name)
+        if column is None:
+            return
+        if column.mask is None:
+            column.mask = zeros(self._capacity, dtype=bool)
+            column.mask[:len(self.keys)] = True
+        column.mask[row] = False
+
+    # --------------------------------------------------------------------------
+    # columns
+    # --------------------------------------------------------------------------
+
+    def array(self, names, defaults=None, keys=None):
+        """Get the values of a number of attributes as a two-dimensional array.
+
+        Parameters:
+            names (list) : The attribute names.
+            defaults (list) : Optional. Values for elements that do not have
+                the attribute, and for which the attribute has no default.
+            keys (list) : Optional. The element keys. Defaults to all elements,
+                in the order of the rows.
+
+        Returns:
+            array : The values. Shape ``(len(keys), len(names))``.
+
+        Note:
+            If ``keys`` is not provided and the attributes are consecutive columns
+            of the same block, the result is a view on the block. Changing the view
+            changes the attributes. The view is only valid until the next time a
+            column is added or the store is resized.
+
+        """
+        names = list(names)
+        if not defaults:
+            defaults = [None] * len(names)
+        columns = []
+        for name in names:
+            column = self.columns.get(name)
+            if column is None and name in self.defaults:
+                column = self._add_column(name, _kind(self.defaults[name]))
+            columns.append(column)
+        n = len(self.keys)
+        if keys is None:
+            view = self._view(columns, n)
+            if view is not None:
+                return view
+            rows = arange(n)
+        else:
+            rows = self.rows(keys)
+        parts = []
+        kind  = None
+        for name, column, default in zip(names, columns, defaults):
+            fill = self.defaults.get(name, default)
+            if column is None:
+                parts.append((None, None, fill))
+                kind = _promote(kind, _kind(fill), True)
+                continue
+            values  = self.blocks[column.kind][rows, column.index]
+            missing = None
+            if column.mask is not None:
+                missing = ~column.mask[rows]
+                if not missing.any():
+                    missing = None
+            parts.append((values, missing, fill))
+            kind = _promote(kind, column.kind, True)
+            if missing is not None:
+                kind = _promote(kind, _kind(fill), True)
+        result = empty((len(rows), len(names)), dtype=_DTYPE[kind or 'f'])
+        for i, (values, missing, fill) in enumerate(parts):
+            if values is None:
+                missing = slice(None)
+            else:
+                result[:, i] = values
+            if missing is not None:
+                if kind == 'O':
+                    for row in arange(len(rows))[missing]:
+                        result[row, i] = fill
+                else:
+                    result[missing, i] = fill
+        return result
+
+    def column(self, name, default=None, keys=None):
+        """Get the values of one attribute as a one-dimensional array.
+
+        See :meth:`array` for the parameters.
+        """
+        return self.array([name], [default], keys)[:, 0]
+
+    def set_column(self, name, values, keys=None):
+        """Set an attribute of a number of elements to the values of an array.
+
+        Parameters:
+            name (str) : The attribute name.
+            values (array) : One value per element.
+            keys (list) : Optional. The element keys. Defaults to all elements,
+                in the order of the rows.
+        """
+        values = asarray(values)
+        kind = values.dtype.kind
+        if kind == 'u':
+            kind = 'i'
+        column = self._ensure(name, kind if kind in _RANK else 'O')
+        if keys is None:
+            rows = arange(len(self.keys))
+        else:
+            rows = self.rows(keys)
+        self._write(column, rows, values)
+        if column.mask is not None:
+            column.mask[rows] = True
+
+    def fill(self, name, value, keys=None):
+        """Set an attribute of a number of elements to the same value.
+
+        Parameters:
+            name (str) : The attribute name.
+            value (object) : The value.
+            keys (list) : Optional. The element keys. Defaults to all elements.
+        """
+        column = self._ensure(name, _kind(value))
+        if keys:
+            rows = self.rows(keys)
+        else:
+            rows = slice(0, len(self.keys))
+        self._fill(column, rows, value)
+        if column.mask is not None:
+            column.mask[rows] = True
+
+    def update_defaults(self, attr_dict):
+        """Update the default attributes.
+
+        Elements that already have an attribute keep their value. All others
+        get the new default.
+
+        Parameters:
+            attr_dict (dict) : The new default attributes.
+        """
+        n = len(self.keys)
+        for name, value in attr_dict.items():
+            column = self.columns.get(name)
+            if column is None:
+                if name in self.defaults and n:
+                    # keep the previous default for the existing elements
+                    self._add_column(name, _kind(self.defaults[name]))
+            elif column.mask is not None:
+                rows = flatnonzero(~column.mask[:n])
+                column = self._ensure(name, _kind(value))
+                self._fill(column, rows, value)
+                column.mask = None
+            self.defaults[name] = value
+
+    # --------------------------------------------------------------------------
+    # helpers
+    # --------------------------------------------------------------------------
+
+    def _view(self, columns, n):
+        if not columns or any(column is None for column in columns):
+            return None
+        kind  = columns[0].kind
+        start = columns[0].index
+        for offset, column in enumerate(columns):
+            if column.kind != kind or column.index != start + offset:
+                return None
+            if column.mask is not None and not column.mask[:n].all():
+                return None
+        return self.blocks[kind][:n, start:start + len(columns)]
+
+    def _reserve(self, capacity):
+        if capacity <= self._capacity:
+            return
+        n = len(self.keys)
+        for kind, block in self.blocks.items():
+            new = empty((capacity, block.shape[1]), dtype=_DTYPE[kind])
+            new[:n] = block[:n]
+            self.blocks[kind] = new
+        for column in self.columns.values():
+            if column.mask is not None:
+                mask = zeros(capacity, dtype=bool)
+                mask[:n] = column.mask[:n]
+                column.mask = mask
+        self._capacity = capacity
+
+    def _append(self, kind, values=None):
+        dtype = _DTYPE[kind]
+        block = self.blocks.get(kind)
+        if block is None:
+            block = empty((self._capacity, 0), dtype=dtype)
+        index = block.shape[1]
+        new = empty((self._capacity, index + 1), dtype=dtype)
+        new[:, :index] = block
+        if values is not None:
+            new[:, index] = values
+        self.blocks[kind] = new
+        return index
+
+    def _add_column(self, name, kind):
+        if name in self.defaults:
+            kind = _promote(kind, _kind(self.defaults[name]))
+        kind = kind or 'O'
+        column = _Column(kind, self._append(kind))
+        self.columns[name] = column
+        rows = slice(0, len(self.keys))
+        if name in self.defaults:
+            self._fill(column, rows, self.defaults[name])
+        else:
+            column.mask = zeros(self._capacity, dtype=bool)
+            self._fill(column, rows, _FILL[kind])
+        return column
+
+    def _ensure(self, name, kind):
+        column = self.columns.get(name)
+        if column is None:
+            return self._add_column(name, kind)
+        self._ensure_kind(column, kind)
+        return column
+
+    def _ensure_kind(self, column, kind):
+        target = _promote(column.kind, kind)
+        if target != column.kind:
+            values = self.blocks[column.kind][:, column.index].astype(_DTYPE[target])
+            column.index = self._append(target, values)
+            column.kind = target
+
+    def _set(self, row, name, value):
+        column = self._ensure(name, _kind(value))
+        self.blocks[column.kind][row, column.index] = value
+        if column.mask is not None:
+            column.mask[row] = True
+
+    def _fill(self, column, rows, value):
+        block = self.blocks[column.kind]
+        if column.kind != 'O':
+            block[rows, column.index] = value
+            return
+        values = block[:, column.index]
+        if isinstance(rows, slice):
+            rows = range(*rows.indices(self._capacity))
+        for row in rows:
+            values[row] = value
+
+    def _write(self, column, rows, values):
+        if column.kind != 'O':
+            try:
+                self.blocks[column.kind][rows, column.index] = values
+                return
+            except OverflowError:
+                # integers that do not fit in int64
+                self._ensure_kind(column, 'O')
+        block = self.blocks['O']
+        for row, value in zip(rows, values):
+            block[row, column.index] = value
+
+
+class AttributeView(MutableMapping):
+    """A dict-like view on the attributes of one element of a columnar store.
+
+    Parameters:
+        store (AttributeColumns) : The store.
+        key (hashable) : The element key.
+
+    Note:
+        Copies of a view (``attr.copy()``, ``copy.copy(attr)``, ``copy.deepcopy(attr)``)
+        are regular dicts.
+
+    """
+
+    __slots__ = ('_store', '_key')
+
+    def __init__(self, store, key):
+        self._store = store
+        self._key   = key
+
+    def __getstate__(self):
+        return self._store, self._key
+
+    def __setstate__(self, state):
+        self._store, self._key = state
+
+    def __getitem__(self, name):
+        store = self._store
+        return store.get_value(store.index[self._key], name)
+
+    def __setitem__(self, name, value):
+        store = self._store
+        store.set_value(store.index[self._key], name, value)
+
+    def __delitem__(self, name):
+        store = self._store
+        store.del_value(store.index[self._key], name)
+
+    def __contains__(self, name):
+        store = self._store
+        return store.has_value(store.index[self._key], name)
+
+    def __iter__(self):
+        store = self._store
+        return iter(store.row_names(store.index[self._key]))
+
+    def __len__(self):
+        store = self._store
+        return len(store.row_names(store.index[self._key]))
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        from copy import deepcopy
+        return deepcopy(self.copy(), memo)
+
+    def get(self, name, default=None):
+        store = self._store
+        row = store.index[self._key]
+        if store.has_value(row, name):
+            return store.get_value(row, name)
+        return default
+
+    def update(self, *args, **kwargs):
+        attr = dict(*args, **kwargs)
+        self._store.set_row(self._key, attr, replace=False)
+
+    def copy(self):
+        store = self._store
+        return store.row_dict(store.index[self._key])
+
+
+class ColumnarDict(MutableMapping):
+    """A dict of attribute dicts, stored in columns.
+
+    ``ColumnarDict`` replaces the ``vertex`` and ``facedata`` dicts of a data
+    structure when its attributes are stored in columns. Items are views on the
+    rows of the underlying :class:`AttributeColumns` store.
+
+    Parameters:
+        store (AttributeColumns) : Optional. The store.
+
+    Attributes:
+        store (AttributeColumns) : The store.
+
+    Note:
+        Iteration follows the order of the rows of the store. Removing an element
+        moves the last element into its place.
+
+        A shallow copy (``copy.copy``, :meth:`copy`) is a regular dict of dicts.
+        A deep copy (``copy.deepcopy``) is a columnar dict with a copy of the store.
+
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else AttributeColumns()
+
+    @classmethod
+    def from_dict(cls, attrs, defaults=None):
+        """Construct a columnar dict from a dict of attribute dicts.
+
+        Parameters:
+            attrs (dict) : A dict of attribute dicts.
+            defaults (dict) : Optional. The default attributes.
+
+        Returns:
+            ColumnarDict : The columnar dict.
+        """
+        return cls(AttributeColumns.from_dicts(attrs.items(), defaults))
+
+    def __getitem__(self, key):
+        if key not in self.store.index:
+            raise KeyError(key)
+        return AttributeView(self.store, key)
+
+    def __setitem__(self, key, attr):
+        self.store.set_row(key, attr)
+
+    def __delitem__(self, key):
+        self.store.remove(key)
+
+    def __contains__(self, key):
+        return key in self.store.index
+
+    def __iter__(self):
+        return iter(list(self.store.keys))
+
+    def __len__(self):
+        return len(self.store.keys)
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        from copy import deepcopy
+        return type(self)(deepcopy(self.store, memo))
+
+    def keys(self):
+        return list(self.store.keys)
+
+    def setdefault(self, key, attr=None):
+        if key not in self.store.index:
+            self.store.set_row(key, attr or {})
+        return AttributeView(self.store, key)
+
+    def clone(self, defaults=None):
+        """Make an independent columnar copy.
+
+        Parameters:
+            defaults (dict) : Optional. The default attributes of the copy.
+
+        Returns:
+            ColumnarDict : The copy.
+        """
+        return type(self)(self.store.copy(defaults))
+
+    def copy(self):
+        """Get a regular dict of attribute dicts."""
+        return dict(zip(self.store.keys, self.store.to_dicts()))
+
+
+class _EdgeNeighbours(MutableMapping):
+
+    __slots__ = ('_edges', '_u')
+
+    def __init__(self, edges, u):
+        self._edges = edges
+        self._u     = u
+
+    def __getstate__(self):
+        return self._edges, self._u
+
+    def __setstate__(self, state):
+        self._edges, self._u = state
+
+    def __getitem__(self, v):
+        if v not in self._edges.nbrs[self._u]:
+            raise KeyError(v)
+        return AttributeView(self._edges.store, (self._u, v))
+
+    def __setitem__(self, v, attr):
+        self._edges.store.set_row((self._u, v), attr)
+        self._edges.nbrs[self._u].add(v)
+
+    def __delitem__(self, v):
+        self._edges.nbrs[self._u].remove(v)
+        self._edges.store.remove((self._u, v))
+
+    def __contains__(self, v):
+        return v in self._edges.nbrs[self._u]
+
+    def __iter__(self):
+        return iter(list(self._edges.nbrs[self._u]))
+
+    def __len__(self):
+        return len(self._edges.nbrs[self._u])
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def get(self, v, default=None):
+        if v in self._edges.nbrs[self._u]:
+            return AttributeView(self._edges.store, (self._u, v))
+        return default
+
+    def copy(self):
+        store = self._edges.store
+        return dict((v, store.row_dict(store.index[self._u, v])) for v in self._edges.nbrs[self._u])
+
+
+class ColumnarEdgeDict(MutableMapping):
+    """A nested dict of edge attribute dicts, stored in columns.
+
+    ``ColumnarEdgeDict`` replaces the ``edge`` dict of a data structure when its
+    attributes are stored in columns. ``edge[u]`` is a dict-like object that maps
+    the neighbours ``v`` of ``u`` to views on the attributes of the edges ``(u, v)``.
+
+    Parameters:
+        store (AttributeColumns) : Optional. The store. The keys of the store
+            are the ``(u, v)`` tuples of the edges.
+
+    Attributes:
+        store (AttributeColumns) : The store.
+        nbrs (dict) : A dict of sets with the neighbours ``v`` of every ``u``.
+
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else AttributeColumns()
+        self.nbrs  = {}
+        for u, v in self.store.keys:
+            self.nbrs.setdefault(u, set()).add(v)
+
+    @classmethod
+    def from_dict(cls, edge, defaults=None):
+        """Construct a columnar edge dict from a nested dict of attribute dicts.
+
+        Parameters:
+            edge (dict) : A nested dict of edge attribute dicts.
+            defaults (dict) : Optional. The default edge attributes.
+
+        Returns:
+            ColumnarEdgeDict : The columnar edge dict.
+        """
+        items = (((u, v), attr) for u in edge for v, attr in edge[u].items())
+        edges = cls(AttributeColumns.from_dicts(items, defaults))
+        for u in edge:
+            edges.nbrs.setdefault(u, set())
+        return edges
+
+    def __getitem__(self, u):
+        if u not in self.nbrs:
+            raise KeyError(u)
+        return _EdgeNeighbours(self, u)
+
+    def __setitem__(self, u, nbrs):
+        nbrs = dict((v, dict(attr)) for v, attr in nbrs.items())
+        if u in self.nbrs:
+            del self[u]
+        self.nbrs[u] = set()
+        for v, attr in nbrs.items():
+            self.store.set_row((u, v), attr)
+            self.nbrs[u].add(v)
+
+    def __delitem__(self, u):
+        for v in self.nbrs.pop(u):
+            self.store.remove((u, v))
+
+    def __contains__(self, u):
+        return u in self.nbrs
+
+    def __iter__(self):
+        return iter(list(self.nbrs))
+
+    def __len__(self):
+        return len(self.nbrs)
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        from copy import deepcopy
+        edges = type(self)(deepcopy(self.store, memo))
+        for u in self.nbrs:
+            edges.nbrs.setdefault(u, set())
+        return edges
+
+    def keys(self):
+        return list(self.nbrs)
+
+    def clone(self, defaults=None):
+        """Make an independent columnar copy.
+
+        Parameters:
+            defaults (dict) : Optional. The default attributes of the copy.
+
+        Returns:
+            ColumnarEdgeDict : The copy.
+        """
+        edges = type(self)(self.store.copy(defaults))
+        for u in self.nbrs:
+            edges.nbrs.setdefault(u, set())
+        return edges
+
+    def copy(self):
+        """Get a regular nested dict of attribute dicts."""
+        edge = dict((u, {}) for u in self.nbrs)
+        for (u, v), attr in zip(self.store.keys, self.store.to_dicts()):
+            edge[u][v] = attr
+        return edge
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    store = AttributeColumns({'x': 0.0, 'y': 0.0, 'z': 0.0})
+    vertex = ColumnarDict(store)
+
+    for i in range(5):
+        vertex[i] = {'x': float(i), 'y': 0.0, 'z': 0.0}
+
+    vertex[2]['is_fixed'] = True
+
+    print(vertex[2])
+    print(store.array('xyz'))
+
+    # bool values keep their type if a column is promoted
+
+    vertex[3]['is_fixed'] = 1
+
+    assert vertex[2]['is_fixed'] is True
+    assert vertex[3]['is_fixed'] == 1 and type(vertex[3]['is_fixed']) is not bool
+
+    # columnar meshes can be pickled and deep-copied
+
+    import copy
+    import pickle
+
+    import compas
+    from compas.datastructures.mesh import Mesh
+
+    mesh = Mesh.from_obj(compas.get_data('faces.obj'))
+    mesh.update_default_vertex_attributes({'is_fixed': False})
+    mesh.enable_attribute_columns()
+    mesh.vertex[0]['is_fixed'] = True
+    mesh.vertex[1]['t'] = 1.5
+    mesh.set_face_attribute(0, 'name', 'a')
+
+    for other in [copy.deepcopy(mesh)] + [pickle.loads(pickle.dumps(mesh, protocol)) for protocol in (0, 2)]:
+        assert type(other.vertex) is type(mesh.vertex)
+        assert type(other.edge) is type(mesh.edge)
+        assert type(other.facedata) is type(mesh.facedata)
+        assert other.vertex.store.defaults is other.default_vertex_attributes
+        assert other.vertex.copy() == mesh.vertex.copy()
+        assert other.edge.copy() == mesh.edge.copy()
+        assert other.facedata.copy() == mesh.facedata.copy()
+        other.vertex[0]['x'] = 100.0
+        assert mesh.vertex[0]['x'] != 100.0
+
+    print('ok')
@@ -19,6 +19,7 @@ Package for working with mesh objects.
 .. autosummary::
     :toctree: generated/
 
+    arrays.MeshArrays
     plotter.MeshPlotter2D
     viewer.MeshViewer
     viewer.SubdMeshViewer
@@ -47,6 +47,7 @@ def unify_cycles_mesh(mesh, root=None):
             mesh.halfedge[u][v] = fkey
             if u not in mesh.halfedge[v]:
                 mesh.halfedge[v][u] = None
+    mesh.invalidate_topology()
 
 
 def flip_cycles_mesh(mesh):
@@ -63,6 +64,7 @@ def flip_cycles_mesh(mesh):
             mesh.halfedge[v][u] = fkey
             if v not in mesh.halfedge[u]:
                 mesh.halfedge[u][v] = None
+    mesh.invalidate_topology()
 
 
 # ==============================================================================
@@ -136,6 +136,9 @@ def subdivide_mesh_corner(mesh):
         subd.add_face(face)
         del subd.face[fkey]
 
+    # the old faces were removed from the face dict directly
+    subd.invalidate_topology()
+
     return subd
 
 
@@ -280,6 +283,7 @@ def subdivide_mesh_catmullclark(mesh, k=1, fixed=None):
                 d = face[key]
                 subd.add_face([a, key, d, c])
             del subd.face[fkey]
+        subd.invalidate_topology()
         # ----------------------------------------------------------------------
 
         # these are the coordinates before updating
@@ -498,6 +502,7 @@ def subdivide_trimesh_loop(mesh, k=1, fixed=None):
             subd.add_face([vw, w, wu])
             subd.add_face([uv, vw, wu])
             del subd.face[fkey]
+        subd.invalidate_topology()
 
     return subd
 
@@ -0,0 +1,842 @@
+from __future__ import print_function
+
+import gc
+
+from numpy import arange
+from numpy import array
+from numpy import asarray
+from numpy import bincount
+from numpy import cross
+from numpy import cumsum
+from numpy import errstate
+from numpy import float64
+from numpy import full
+from numpy import int64
+from numpy import maximum
+from numpy import minimum
+from numpy import ndarray
+from numpy import repeat
+from numpy import unique
+from numpy import where
+from numpy import zeros
+from numpy.linalg import norm
+
+from compas.exceptions import BRGInputError
+from compas.exceptions import BRGMeshError
+
+
+__author__     = 'Tom Van Mele'
+__copyright__  = 'Copyright 2016, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'vanmelet@ethz.ch'
+
+
+__all__ = [
+    'MeshArrays',
+]
+
+
+class MeshArrays(object):
+    """A frozen, array-backed snapshot of a mesh.
+
+    The snapshot stores the geometry and topology of a mesh in a few flat arrays
+    instead of nested dictionaries. Vertices and faces are identified by their
+    index in the snapshot. The original keys are available through the
+    ``key_index`` and ``fkey_index`` maps, and the snapshot can be converted back
+    to a mesh without losing information.
+
+    Parameters:
+        mesh (Mesh) : Optional. The mesh to take a snapshot of.
+
+    Attributes:
+        keys (list) : The vertex keys, in the order of the rows of ``xyz``.
+        fkeys (list) : The face keys, in the order of the faces in ``face_offsets``.
+        key_index (dict) : A *key-to-index* map of the vertices.
+        fkey_index (dict) : A *key-to-index* map of the faces.
+        xyz (array) : The vertex coordinates. Shape ``(n, 3)``, ``float64``.
+        face_offsets (array) : The offsets of the faces in ``face_vertices``.
+            Shape ``(f + 1, )``.
+        face_vertices (array) : The vertex indices of all faces, in cycle order.
+            The vertices of face ``i`` are
+            ``face_vertices[face_offsets[i]:face_offsets[i + 1]]``.
+        halfedge_face (array) : The index of the face of every halfedge.
+            Halfedge ``h`` starts at vertex ``face_vertices[h]``.
+        halfedge_next (array) : The index of the next halfedge in the same face.
+        halfedge_twin (array) : The index of the opposite halfedge,
+            or ``-1`` if the opposite halfedge is on the boundary.
+        edges (array) : The vertex indices of the edges. Shape ``(e, 2)``.
+            The edges are listed in the same order and with the same direction as
+            in ``mesh.edges_iter()``.
+
+    Examples:
+
+        .. code-block:: python
+
+            import compas
+            from compas.datastructures.mesh import Mesh
+            from compas.datastructures.mesh.arrays import MeshArrays
+
+            mesh   = Mesh.from_obj(compas.get_data('faces.obj'))
+            arrays = MeshArrays.from_mesh(mesh)
+
+            print(arrays.xyz.shape)
+            print(arrays.edges.shape)
+
+            other = arrays.to_mesh()
+
+    """
+
+    def __init__(self, mesh=None):
+        self.keys           = []
+        self.fkeys          = []
+        self.key_index      = {}
+        self.fkey_index     = {}
+        self.xyz            = zeros((0, 3), dtype=float64)
+        self.face_offsets   = zeros(1, dtype=int64)
+        self.face_vertices  = zeros(0, dtype=int64)
+        self.halfedge_face  = zeros(0, dtype=int64)
+        self.halfedge_next  = zeros(0, dtype=int64)
+        self.halfedge_twin  = zeros(0, dtype=int64)
+        self.edges          = zeros((0, 2), dtype=int64)
+        self.attributes     = {}
+        self.dva            = {}
+        self.dfa            = {}
+        self.dea            = {}
+        self.vertexdata     = {}
+        self.edgedata       = {}
+        self.facedata       = {}
+        self.max_int_key    = -1
+        self.max_int_fkey   = -1
+        if mesh is not None:
+            self._from_mesh(mesh)
+
+    def __len__(self):
+        return len(self.keys)
+
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # descriptors
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+
+    @property
+    def vertex_count(self):
+        """:obj:`int` : The number of vertices."""
+        return self.xyz.shape[0]
+
+    @property
+    def face_count(self):
+        """:obj:`int` : The number of faces."""
+        return self.face_offsets.shape[0] - 1
+
+    @property
+    def edge_count(self):
+        """:obj:`int` : The number of edges."""
+        return self.edges.shape[0]
+
+    @property
+    def face_sizes(self):
+        """:obj:`array` : The number of vertices of every face."""
+        return self.face_offsets[1:] - self.face_offsets[:-1]
+
+    @property
+    def halfedge_vertices(self):
+        """:obj:`array` : The start and end vertex of every face halfedge.
+        Shape ``(h, 2)``."""
+        uv = zeros((self.face_vertices.shape[0], 2), dtype=int64)
+        uv[:, 0] = self.face_vertices
+        uv[:, 1] = self.face_vertices[self.halfedge_next]
+        return uv
+
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # constructors
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        """Construct an array snapshot of a mesh.
+
+        Parameters:
+            mesh (Mesh) : The mesh.
+
+        Returns:
+            MeshArrays : The snapshot.
+
+        """
+        return cls(mesh)
+
+    @classmethod
+    def from_vertices_and_faces(cls, vertices, faces, offsets=None, validate=True):
+        """Construct an array snapshot from vertex coordinates and face vertex indices.
+
+        The vertices and faces get keys ``0`` to ``n - 1`` and ``0`` to ``f - 1``,
+        exactly as if they had been added one by one to an empty mesh.
+
+        Parameters:
+            vertices (array) : The vertex coordinates. Shape ``(n, 3)``.
+            faces (array, list) : The faces. Either an integer array of shape
+                ``(f, k)`` (for example triangles or quads), a list of vertex index
+                lists of any length, or, if ``offsets`` is provided,
+                a flat array with the vertex indices of all faces.
+            offsets (array) : Optional. The offsets of the faces in the flat
+                array of vertex indices. Shape ``(f + 1, )``. Default is ``None``.
+            validate (bool) : Optional. Check that the vertex indices are valid,
+                that every face has at least three different vertices and that
+                no two faces share the same halfedge. Default is ``True``.
+
+        Returns:
+            MeshArrays : The snapshot.
+
+        Raises:
+            BRGMeshError : If ``validate`` is ``True`` and the faces are invalid.
+
+        """
+        xyz = array(vertices, dtype=float64).reshape((-1, 3))
+        sizes, indices = _face_arrays(faces, offsets)
+        n = xyz.shape[0]
+
+        if validate:
+            if indices.shape[0] and (indices.min() < 0 or indices.max() >= n):
+                raise BRGMeshError('Face vertex index out of range.')
+            if sizes.shape[0] and sizes.min() < 3:
+                raise BRGMeshError('Faces should have at least three vertices.')
+
+        arrays = cls()
+        arrays.keys       = list(range(n))
+        arrays.fkeys      = list(range(sizes.shape[0]))
+        arrays.key_index  = dict((key, key) for key in arrays.keys)
+        arrays.fkey_index = dict((fkey, fkey) for fkey in arrays.fkeys)
+        arrays.xyz        = xyz
+        arrays.dva        = {'x': 0, 'y': 0, 'z': 0}
+        arrays.max_int_key  = n - 1
+        arrays.max_int_fkey = sizes.shape[0] - 1
+        manifold = arrays._set_faces(sizes, indices)
+
+        u = arrays.face_vertices
+        v = u[arrays.halfedge_next]
+
+        if validate:
+            if (u == v).any():
+                raise BRGMeshError('Faces should not have repeated consecutive vertices.')
+            if not manifold:
+                raise BRGMeshError('The faces are not manifold or not consistently oriented.')
+
+        # one edge per pair of connected vertices
+        # with the direction of the first halfedge between them
+
+        if manifold:
+            twin = arrays.halfedge_twin
+            first = ((twin == -1) | (arange(twin.shape[0]) < twin)).nonzero()[0]
+        else:
+            first = unique(minimum(u, v) * n + maximum(u, v), return_index=True)[1]
+            first.sort()
+        edges = zeros((first.shape[0], 2), dtype=int64)
+        edges[:, 0] = u[first]
+        edges[:, 1] = v[first]
+        edges.flags.writeable = False
+        arrays.edges = edges
+        return arrays
+
+    @classmethod
+    def from_binary(cls, filepath, attributes=True):
+        """Construct an array snapshot from a binary file.
+
+        Parameters:
+            filepath (str) : Path to a file written by :meth:`to_binary`.
+            attributes (bool) : Optional. If ``False``, only the geometry, the
+                topology and the default attributes are read. Default is ``True``.
+
+        Returns:
+            MeshArrays : The snapshot.
+
+        Raises:
+            BRGInputError : If the file does not contain a mesh.
+        """
+        from compas.files.npz import NPZReader
+        with NPZReader(filepath) as reader:
+            meta = reader.meta
+            if meta.get('datastructure') != 'Mesh':
+                raise BRGInputError('The file does not contain a mesh: {0}'.format(filepath))
+            arrays = cls()
+            arrays.attributes   = meta['attributes']
+            arrays.dva          = meta['dva']
+            arrays.dfa          = meta['dfa']
+            arrays.dea          = meta['dea']
+            arrays.max_int_key  = meta['max_int_key']
+            arrays.max_int_fkey = meta['max_int_fkey']
+            arrays.keys         = reader.keys('vertex')
+            arrays.fkeys        = reader.keys('face')
+            arrays.key_index    = dict((key, index) for index, key in enumerate(arrays.keys))
+            arrays.fkey_index   = dict((fkey, index) for index, fkey in enumerate(arrays.fkeys))
+            arrays.xyz          = reader.array('vertex.xyz')
+            arrays.edges        = reader.array('edge.vertices')
+            offsets = reader.array('face.offsets')
+            arrays._set_faces(offsets[1:] - offsets[:-1], reader.array('face.vertices'))
+            if attributes:
+                arrays.vertexdata = reader.table('vertex.attributes')
+                arrays.edgedata   = reader.table('edge.attributes')
+                facedata = reader.table('face.attributes')
+                for index in reader.array('face.datarows').tolist():
+                    arrays.facedata[index] = facedata.get(index, {})
+        return arrays
+
+    def _from_mesh(self, mesh):
+        vertex = mesh.vertex
+        face   = mesh.face
+        dva    = mesh.default_vertex_attributes
+        dea    = mesh.default_edge_attributes
+
+        self.attributes   = dict(mesh.attributes)
+        self.dva          = dict(dva)
+        self.dfa          = dict(mesh.default_face_attributes)
+        self.dea          = dict(dea)
+        self.max_int_key  = mesh._max_int_key
+        self.max_int_fkey = mesh._max_int_fkey
+
+        # vertices
+        # only the attributes that differ from the defaults are stored per vertex
+
+        keys = list(vertex)
+        key_index = dict((key, index) for index, key in enumerate(keys))
+        xyz = []
+        vertexdata = {}
+        for index, key in enumerate(keys):
+            attr = vertex[key]
+            xyz.append((attr['x'], attr['y'], attr['z']))
+            if len(attr) > 3 or len(dva) > 3:
+                data = dict((name, value) for name, value in attr.iteritems()
+                            if name not in ('x', 'y', 'z') and (name not in dva or dva[name] != value))
+                if data:
+                    vertexdata[index] = data
+
+        # faces
+
+        fkeys = list(face)
+        fkey_index = dict((fkey, index) for index, fkey in enumerate(fkeys))
+        sizes = []
+        vertices = []
+        for fkey in fkeys:
+            cycle = face[fkey]
+            start = next(iter(cycle))
+            vertices.append(key_index[start])
+            v = cycle[start]
+            size = 1
+            while v != start:
+                vertices.append(key_index[v])
+                v = cycle[v]
+                size += 1
+            sizes.append(size)
+
+        facedata = {}
+        for fkey, attr in mesh.facedata.iteritems():
+            if fkey in fkey_index:
+                facedata[fkey_index[fkey]] = dict(attr)
+
+        # edges
+        # same order and direction as ``mesh.edges_iter``, without its side effects
+
+        edge = mesh.edge
+        edges = []
+        edgedata = {}
+        seen = set()
+        for u in mesh.halfedge:
+            for v in mesh.halfedge[u]:
+                if (u, v) in seen:
+                    continue
+                seen.add((u, v))
+                seen.add((v, u))
+                a, b = u, v
+                if v in edge and u in edge[v] and not (u in edge and v in edge[u]):
+                    a, b = v, u
+                attr = edge[a][b] if a in edge and b in edge[a] else None
+                if attr:
+                    data = dict((name, value) for name, value in attr.iteritems()
+                                if name not in dea or dea[name] != value)
+                    if data:
+                        edgedata[len(edges)] = data
+                edges.append((key_index[a], key_index[b]))
+
+        self.keys       = keys
+        self.fkeys      = fkeys
+        self.key_index  = key_index
+        self.fkey_index = fkey_index
+        self.xyz        = array(xyz, dtype=float64).reshape((-1, 3))
+        self.edges      = array(edges, dtype=int64).reshape((-1, 2))
+        self.vertexdata = vertexdata
+        self.edgedata   = edgedata
+        self.facedata   = facedata
+        self._set_faces(array(sizes, dtype=int64), array(vertices, dtype=int64))
+
+    def _set_faces(self, sizes, vertices):
+        n = self.xyz.shape[0]
+        h = vertices.shape[0]
+        offsets = zeros(sizes.shape[0] + 1, dtype=int64)
+        cumsum(sizes, out=offsets[1:])
+        # the next halfedge is the following one in the same face
+        # the last halfedge of every face wraps around to the first
+        nxt = arange(1, h + 1, dtype=int64)
+        if sizes.shape[0]:
+            nxt[offsets[1:] - 1] = offsets[:-1]
+        # the twin of u -> v is v -> u
+        # find it by sorting the integer codes of the halfedges
+        u = vertices
+        v = vertices[nxt]
+        twin = zeros(h, dtype=int64)
+        manifold = True
+        if h:
+            code = u * n + v
+            edoc = v * n + u
+            order = code.argsort()
+            sorted_code = code[order]
+            manifold = not (sorted_code[1:] == sorted_code[:-1]).any()
+            pos = sorted_code.searchsorted(edoc)
+            pos[pos == h] = 0
+            twin = where(sorted_code[pos] == edoc, order[pos], -1)
+        self.face_offsets  = offsets
+        self.face_vertices = vertices
+        self.halfedge_face = repeat(arange(sizes.shape[0], dtype=int64), sizes)
+        self.halfedge_next = nxt
+        self.halfedge_twin = twin
+        for a in (self.xyz, self.edges, self.face_offsets, self.face_vertices,
+                  self.halfedge_face, self.halfedge_next, self.halfedge_twin):
+            a.flags.writeable = False
+        return manifold
+
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # conversion
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+
+    def to_mesh(self, cls=None, xyz=None):
+        """Convert the snapshot back to a mesh.
+
+        Parameters:
+            cls (type) : Optional. The mesh class. Defaults to
+                :class:`compas.datastructures.mesh.Mesh`.
+            xyz (array) : Optional. Replacement coordinates for the vertices,
+                for example the result of a numerical method operating on
+                the snapshot. Defaults to ``None``.
+
+        Returns:
+            Mesh : A mesh with the same keys, topology and attributes as the
+                mesh from which the snapshot was made.
+
+        """
+        if cls is None:
+            from compas.datastructures.mesh import Mesh
+            cls = Mesh
+        if xyz is None:
+            xyz = self.xyz
+
+        mesh = cls()
+        mesh.attributes.update(self.attributes)
+        mesh.default_vertex_attributes.update(self.dva)
+        mesh.default_face_attributes.update(self.dfa)
+        mesh.default_edge_attributes.update(self.dea)
+
+        keys       = self.keys
+        fkeys      = self.fkeys
+        dva        = mesh.default_vertex_attributes
+        dea        = mesh.default_edge_attributes
+        vertexdata = self.vertexdata
+        edgedata   = self.edgedata
+        face       = mesh.face
+        n          = self.vertex_count
+
+        # the garbage collector is of no use while creating many small dicts
+        # but it slows down the construction of large meshes considerably
+
+        gcenabled = gc.isenabled()
+        gc.disable()
+        try:
+            xyz = asarray(xyz, dtype=float64).reshape((-1, 3)).tolist()
+            if not vertexdata and sorted(dva) == ['x', 'y', 'z']:
+                attrs = [{'x': x, 'y': y, 'z': z} for x, y, z in xyz]
+            else:
+                attrs = []
+                for index, (x, y, z) in enumerate(xyz):
+                    attr = dva.copy()
+                    if index in vertexdata:
+                        attr.update(vertexdata[index])
+                    attr['x'] = x
+                    attr['y'] = y
+                    attr['z'] = z
+                    attrs.append(attr)
+            mesh.vertex   = dict(zip(keys, attrs))
+            mesh.halfedge = halfedge = dict((key, {}) for key in keys)
+            mesh.edge     = edge     = dict((key, {}) for key in keys)
+
+            if keys == list(range(n)):
+                key = lambda indices: indices.tolist()
+            else:
+                key = lambda indices: [keys[i] for i in indices.tolist()]
+
+            offsets = self.face_offsets.tolist()
+            u = key(self.face_vertices)
+            v = key(self.face_vertices[self.halfedge_next])
+            for index, fkey in enumerate(fkeys):
+                a = offsets[index]
+                b = offsets[index + 1]
+                face[fkey] = cycle = dict(zip(u[a:b], v[a:b]))
+                for a, b in cycle.iteritems():
+                    halfedge[a][b] = fkey
+
+            # halfedges without a face
+            # on the boundary and on edges that are not part of any face
+
+            u = key(self.edges[:, 0])
+            v = key(self.edges[:, 1])
+            for a, b in zip(u, v):
+                if b not in halfedge[a]:
+                    halfedge[a][b] = None
+                if a not in halfedge[b]:
+                    halfedge[b][a] = None
+                edge[a][b] = dea.copy()
+            for index, attr in edgedata.iteritems():
+                edge[u[index]][v[index]].update(attr)
+
+            for index, attr in self.facedata.iteritems():
+                mesh.facedata[fkeys[index]] = dict(attr)
+        finally:
+            if gcenabled:
+                gc.enable()
+
+        mesh._max_int_key  = self.max_int_key
+        mesh._max_int_fkey = self.max_int_fkey
+        return mesh
+
+    def to_binary(self, filepath, compressed=False):
+        """Write the snapshot to a binary file.
+
+        The file is a NumPy *npz* archive (see :class:`compas.files.npz.NPZWriter`).
+        The geometry and topology are stored as float and integer arrays, and the
+        attributes that differ from the defaults as typed columns.
+
+        Parameters:
+            filepath (str) : Path to the file.
+            compressed (bool) : Optional. Compress the file. Default is ``False``.
+        """
+        from compas.files.npz import NPZWriter
+        writer = NPZWriter(filepath, compressed)
+        writer.meta['datastructure'] = 'Mesh'
+        writer.meta['attributes']    = self.attributes
+        writer.meta['dva']           = self.dva
+        writer.meta['dfa']           = self.dfa
+        writer.meta['dea']           = self.dea
+        writer.meta['max_int_key']   = self.max_int_key
+        writer.meta['max_int_fkey']  = self.max_int_fkey
+        writer.add_keys('vertex', self.keys)
+        writer.add_keys('face', self.fkeys)
+        writer.add_array('vertex.xyz', self.xyz)
+        writer.add_array('edge.vertices', self.edges)
+        writer.add_array('face.offsets', self.face_offsets)
+        writer.add_array('face.vertices', self.face_vertices)
+        writer.add_array('face.datarows', sorted(self.facedata), dtype=int64)
+        writer.add_table('vertex.attributes', self.vertexdata)
+        writer.add_table('edge.attributes', self.edgedata)
+        writer.add_table('face.attributes', self.facedata)
+        writer.write()
+
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # accessors
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+
+    def index_key(self):
+        """Returns an *index-to-key* map of the vertices."""
+        return dict(enumerate(self.keys))
+
+    def index_fkey(self):
+        """Returns an *index-to-key* map of the faces."""
+        return dict(enumerate(self.fkeys))
+
+    def face(self, index):
+        """Get the vertex indices of a face.
+
+        Parameters:
+            index (int) : The index of the face.
+
+        Returns:
+            array : The vertex indices of the face, in cycle order.
+
+        """
+        return self.face_vertices[self.face_offsets[index]:self.face_offsets[index + 1]]
+
+    def faces(self):
+        """Get the vertex indices of all faces.
+
+        Returns:
+            list : A list of vertex index lists, one per face.
+
+        """
+        offsets  = self.face_offsets.tolist()
+        vertices = self.face_vertices.tolist()
+        return [vertices[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def boundary_halfedges(self):
+        """Get the face halfedges of which the opposite halfedge is on the boundary.
+
+        Returns:
+            array : The indices of the halfedges.
+
+        """
+        return (self.halfedge_twin == -1).nonzero()[0]
+
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # geometry
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+
+    def _segment_sum(self, values, segments, count):
+        # sum the rows of values per segment
+        result = zeros((count, values.shape[1]), dtype=float64)
+        for i in range(values.shape[1]):
+            result[:, i] = bincount(segments, weights=values[:, i], minlength=count)
+        return result
+
+    def _return(self, values, keys, rtype):
+        if rtype == 'array':
+            return values
+        if rtype == 'list':
+            return values.tolist()
+        if rtype == 'dict':
+            return dict(zip(keys, values.tolist()))
+        raise ValueError('Unknown return type: {0}'.format(rtype))
+
+    def _face_cross_products(self):
+        # the cross products of the vectors from the face centroid
+        # to the start and end of every halfedge
+        centroids = self.face_centroids()
+        p = self.xyz[self.face_vertices] - centroids[self.halfedge_face]
+        q = p[self.halfedge_next]
+        return centroids, cross(p, q)
+
+    def face_centroids(self, rtype='array'):
+        """Compute the centroids of all faces.
+
+        Parameters:
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by face key). Default is ``'array'``.
+
+        Returns:
+            array : The centroids. Shape ``(f, 3)``.
+
+        """
+        f = self.face_count
+        sums = self._segment_sum(self.xyz[self.face_vertices], self.halfedge_face, f)
+        centroids = sums / self.face_sizes.reshape((-1, 1))
+        return self._return(centroids, self.fkeys, rtype)
+
+    def face_normals(self, unitized=True, rtype='array'):
+        """Compute the normals of all faces.
+
+        The normal of a face is computed as in :func:`compas.geometry.normal_polygon`.
+
+        Parameters:
+            unitized (bool) : Optional. Return unit vectors. Default is ``True``.
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by face key). Default is ``'array'``.
+
+        Returns:
+            array : The normals. Shape ``(f, 3)``.
+
+        """
+        centroids, n = self._face_cross_products()
+        normals = self._segment_sum(n, self.halfedge_face, self.face_count)
+        if unitized:
+            normals /= norm(normals, axis=1).reshape((-1, 1))
+        return self._return(normals, self.fkeys, rtype)
+
+    def face_areas(self, rtype='array'):
+        """Compute the areas of all faces.
+
+        The area of a face is computed as in :func:`compas.geometry.area_polygon`.
+
+        Parameters:
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by face key). Default is ``'array'``.
+
+        Returns:
+            array : The areas. Shape ``(f, )``.
+
+        """
+        centroids, n = self._face_cross_products()
+        a = 0.5 * norm(n, axis=1)
+        areas = bincount(self.halfedge_face, weights=a, minlength=self.face_count)
+        if rtype == 'array':
+            return areas
+        return self._return(areas, self.fkeys, rtype)
+
+    def vertex_normals(self, rtype='array'):
+        """Compute the normals of all vertices.
+
+        The normal of a vertex is the normalized sum of the (non-unitized)
+        normals of the faces around the vertex.
+
+        Parameters:
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by vertex key). Default is ``'array'``.
+
+        Returns:
+            array : The normals. Shape ``(n, 3)``.
+                The normals of vertices without faces are ``nan``.
+
+        """
+        normals = self.face_normals(unitized=False)
+        normals = self._segment_sum(normals[self.halfedge_face], self.face_vertices, self.vertex_count)
+        with errstate(invalid='ignore', divide='ignore'):
+            normals /= norm(normals, axis=1).reshape((-1, 1))
+        return self._return(normals, self.keys, rtype)
+
+    def vertex_areas(self, rtype='array'):
+        """Compute the areas of all vertices.
+
+        The area of a vertex is computed as in :meth:`Mesh.vertex_area`.
+        Every halfedge of a face contributes a quarter of the area of the
+        parallelogram spanned by the halfedge and the face centroid to the
+        area of the start and end vertex.
+
+        Parameters:
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by vertex key). Default is ``'array'``.
+
+        Returns:
+            array : The areas. Shape ``(n, )``.
+
+        """
+        centroids = self.face_centroids()
+        a = self.xyz[self.face_vertices]
+        b = self.xyz[self.face_vertices[self.halfedge_next]]
+        c = centroids[self.halfedge_face]
+        ab = b - a
+        aa = 0.25 * norm(cross(ab, c - a), axis=1)
+        ba = 0.25 * norm(cross(ab, c - b), axis=1)
+        n = self.vertex_count
+        areas = bincount(self.face_vertices, weights=aa, minlength=n)
+        areas += bincount(self.face_vertices[self.halfedge_next], weights=ba, minlength=n)
+        if rtype == 'array':
+            return areas
+        return self._return(areas, self.keys, rtype)
+
+
+def _face_arrays(faces, offsets=None):
+    if offsets is not None:
+        offsets = asarray(offsets, dtype=int64).ravel()
+        indices = asarray(faces, dtype=int64).ravel()[:offsets[-1]]
+        return offsets[1:] - offsets[:-1], indices
+    if isinstance(faces, ndarray) and faces.ndim == 2:
+        indices = asarray(faces, dtype=int64)
+        return full(indices.shape[0], indices.shape[1], dtype=int64), indices.ravel()
+    sizes = [len(face) for face in faces]
+    indices = [index for face in faces for index in face]
+    return array(sizes, dtype=int64), array(indices, dtype=int64)
+
+
+def _attribute_column(mesh, element, name, keys):
+    # the values of an attribute of the vertices or faces of a mesh
+    # in the order of the keys
+    # elements without the attribute get the default value of the attribute
+    # if there is no default, they are reported instead of resulting in an object array
+    if element == 'vertex':
+        default = mesh.default_vertex_attributes.get(name)
+        values = asarray(mesh.get_vertices_attribute(name, default, keys=keys, rtype='array'))
+    else:
+        default = mesh.default_face_attributes.get(name)
+        values = asarray(mesh.get_faces_attribute(name, default, fkeys=keys))
+    if values.dtype.kind != 'O' or default is not None:
+        return values
+    for key in keys:
+        if element == 'vertex':
+            attr = mesh.vertex[key]
+        else:
+            attr = mesh.facedata.get(key) or {}
+        if name not in attr:
+            raise BRGInputError('The {0} {1} has no attribute {2}, and the attribute has no default.'.format(element, key, name))
+    return values
+
+
+def _clean_faces(indices, offsets):
+    indices, offsets, valid = _clean_faces_valid(indices, offsets)
+    return indices, offsets
+
+
+def _clean_faces_valid(indices, offsets):
+    # the same clean up as in Mesh.add_face
+    # remove a closing vertex that is equal to the first vertex,
+    # then a closing vertex that is equal to the one before it,
+    # and skip faces with less than three vertices
+    # also returns which of the original faces are kept
+    sizes = offsets[1:] - offsets[:-1]
+    keep  = full(indices.shape[0], True)
+    last  = offsets[1:] - 1
+    drop  = (sizes > 1) & (indices[last] == indices[offsets[:-1]])
+    keep[last[drop]] = False
+    sizes = sizes - drop
+    last  = offsets[:-1] + sizes - 1
+    drop  = (sizes > 1) & (indices[last] == indices[last - 1])
+    keep[last[drop]] = False
+    sizes = sizes - drop
+    small = sizes < 3
+    keep[repeat(small, offsets[1:] - offsets[:-1])] = False
+    sizes = sizes[~small]
+    offsets = zeros(sizes.shape[0] + 1, dtype=int64)
+    cumsum(sizes, out=offsets[1:])
+    return indices[keep], offsets, ~small
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
+    from compas.datastructures.mesh import Mesh
+
+    mesh = Mesh.from_obj(compas.get_data('faces.obj'))
+
+    arrays = MeshArrays.from_mesh(mesh)
+
+    print(arrays.xyz.shape)
+    print(arrays.face_offsets)
+    print(arrays.edges.shape)
+    print(arrays.boundary_halfedges())
+
+    other = arrays.to_mesh()
+
+    print(other.data == mesh.data)
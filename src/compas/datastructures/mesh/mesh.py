@@ -20,7 +20,8 @@ from compas.geometry import area_polygon
 
 from compas.geometry.elements import Line
 
-from compas.utilities import geometric_key
+from compas.utilities import copy_attributes
+from compas.utilities.maps import _weld_lines
 
 from compas.datastructures.network.algorithms import network_bfs
 from compas.datastructures.network.algorithms import network_bfs2
@@ -137,15 +138,22 @@ class Mesh(object):
     """
 
     def __init__(self):
-        self._max_int_fkey = -1
-        self._max_int_key  = -1
-        self._plotter      = None
-        self.vertex        = {}
-        self.face          = {}
-        self.halfedge      = {}
-        self.edge          = {}
-        self.facedata      = {}
-        self.attributes    = {
+        self._max_int_fkey  = -1
+        self._max_int_key   = -1
+        self._plotter       = None
+        self._version       = 0
+        self._cache         = None
+        self._cache_version = 0
+        self._cache_hits    = 0
+        self._cache_misses  = 0
+        self._batch         = None
+        self._batch_version = 0
+        self.vertex         = {}
+        self.face           = {}
+        self.halfedge       = {}
+        self.edge           = {}
+        self.facedata       = {}
+        self.attributes     = {
             'name'         : 'Mesh',
             'color.vertex' : None,
             'color.edge'   : None,
@@ -286,20 +294,25 @@ mesh summary
                 'max_int_key' : self._max_int_key,
                 'max_int_fkey': self._max_int_fkey, }
 
+        # plain dicts, also if the attributes are stored in columns
+        vertex   = self.vertex.copy()
+        edge     = self.edge.copy()
+        facedata = self.facedata.copy()
+
         key_rkey = {}
 
-        for key in self.vertex:
+        for key in vertex:
             rkey = repr(key)
             key_rkey[key] = rkey
-            data['vertex'][rkey] = self.vertex[key]
+            data['vertex'][rkey] = vertex[key]
             data['edge'][rkey] = {}
             data['halfedge'][rkey] = {}
 
-        for u in self.edge:
+        for u in edge:
             ru = key_rkey[u]
-            for v in self.edge[u]:
+            for v in edge[u]:
                 rv = key_rkey[v]
-                data['edge'][ru][rv] = self.edge[u][v]
+                data['edge'][ru][rv] = edge[u][v]
 
         for u in self.halfedge:
             ru = key_rkey[u]
@@ -311,9 +324,9 @@ mesh summary
             rfkey = repr(fkey)
             data['face'][rfkey] = self.face[fkey]
 
-        for fkey in self.facedata:
+        for fkey in facedata:
             rfkey = repr(fkey)
-            data['facedata'][rfkey] = self.facedata[fkey]
+            data['facedata'][rfkey] = facedata[fkey]
 
         return data
 
@@ -423,6 +436,26 @@ mesh summary
         """:obj:`list` : The `z` coordinates of the vertices of the mesh."""
         return [a['z'] for k, a in self.vertices_iter(True)]
 
+    @property
+    def version(self):
+        """:obj:`int` : The topology version of the mesh.
+
+        The version is incremented by every function that changes the topology
+        of the mesh, and is used to invalidate the topology cache and the arrays
+        of the batch queries. Code that modifies or replaces the ``vertex``,
+        ``halfedge`` or ``face`` dicts directly is not tracked, and should call
+        :meth:`invalidate_topology` afterwards.
+        """
+        return self._version
+
+    @property
+    def topology_cache_stats(self):
+        """:obj:`dict` : The number of hits and misses of the topology cache,
+        and the number of cached results."""
+        return {'hits'   : self._cache_hits,
+                'misses' : self._cache_misses,
+                'size'   : 0 if self._cache is None else len(self._cache)}
+
     # **************************************************************************
     # **************************************************************************
     # **************************************************************************
@@ -483,13 +516,62 @@ mesh summary
         """
         return dict(self.vertices_enum())
 
-    def copy(self):
+    def copy(self, attributes=True):
+        """Make an independent copy of the mesh.
+
+        The topology dicts are duplicated structurally, without converting the
+        keys, and the attribute dicts are copied one level deep. Only attribute
+        values that are containers (lists, dicts, sets) are deep-copied. All
+        other values are shared with the original until they are replaced.
+
+        Parameters:
+            attributes (bool) : Optional. If ``False``, only copy the vertex
+                coordinates and the topology. The vertices, edges and faces of the
+                copy get the default attributes. Default is ``True``.
+
+        Returns:
+            Mesh : The copy.
+
+        Examples:
+
+            .. code-block:: python
+
+                other = mesh.copy()
+                other.vertex[key]['x'] += 1.0   # does not move the original
+
+        """
         cls  = type(self)
-        data = deepcopy(self.data)
-        mesh = cls.from_data(data)
+        mesh = cls()
+        mesh.attributes.update(deepcopy(self.attributes))
+        mesh.default_vertex_attributes.update(deepcopy(self.default_vertex_attributes))
+        mesh.default_edge_attributes.update(deepcopy(self.default_edge_attributes))
+        mesh.default_face_attributes.update(deepcopy(self.default_face_attributes))
+        mesh.halfedge = dict((u, nbrs.copy()) for u, nbrs in self.halfedge.iteritems())
+        mesh.face     = dict((fkey, face.copy()) for fkey, face in self.face.iteritems())
+        columns = not isinstance(self.vertex, dict)
+        if attributes and columns:
+            mesh.vertex   = self.vertex.clone(mesh.default_vertex_attributes)
+            mesh.edge     = self.edge.clone(mesh.default_edge_attributes)
+            mesh.facedata = self.facedata.clone(mesh.default_face_attributes)
+        elif attributes:
+            mesh.vertex   = dict((key, copy_attributes(attr)) for key, attr in self.vertex.iteritems())
+            mesh.edge     = dict((u, dict((v, copy_attributes(attr)) for v, attr in nbrs.iteritems())) for u, nbrs in self.edge.iteritems())
+            mesh.facedata = dict((fkey, copy_attributes(attr)) for fkey, attr in self.facedata.iteritems())
+        else:
+            dva = mesh.default_vertex_attributes
+            for key, attr in self.vertex.items():
+                mesh.vertex[key] = copy_attributes(dva)
+                mesh.vertex[key].update(x=attr['x'], y=attr['y'], z=attr['z'])
+            # edge attributes are created on demand
+            mesh.edge = dict((u, {}) for u in self.edge)
+            if columns:
+                mesh.enable_attribute_columns()
+        mesh._max_int_key  = self._max_int_key
+        mesh._max_int_fkey = self._max_int_fkey
         return mesh
 
     def clear(self):
+        columns = not isinstance(self.vertex, dict)
         del self.vertex
         del self.edge
         del self.halfedge
@@ -502,6 +584,9 @@ mesh summary
         self.edge       = {}
         self._max_int_key = -1
         self._max_int_fkey = -1
+        self._version += 1
+        if columns:
+            self.enable_attribute_columns()
 
     def get_any_vertex(self):
         return next(self.vertices_iter())
@@ -518,6 +603,116 @@ mesh summary
                 return self.attributes.get('color.vertex:{0}'.format(qualifier))
         return self.attributes['color.vertex']
 
+    # ..........................................................................
+    # topology cache
+    # ..........................................................................
+
+    def enable_topology_cache(self):
+        """Cache the results of topological queries.
+
+        With the cache enabled, the results of ``vertex_neighbours(key, ordered=True)``,
+        ``vertex_faces(key, ordered=True)``, unordered ``vertices_on_boundary()`` and
+        ``is_vertex_on_boundary(key)`` are stored until the topology of the mesh
+        changes.
+
+        Note:
+            The cache is invalidated by all methods and operations that change
+            the topology of the mesh. Code that modifies the ``halfedge`` or
+            ``face`` dicts directly should call :meth:`invalidate_topology`
+            afterwards.
+
+        >>> mesh.enable_topology_cache()
+        >>> nbrs = mesh.vertex_neighbours(key, ordered=True)
+        >>> nbrs = mesh.vertex_neighbours(key, ordered=True)
+        >>> mesh.topology_cache_stats
+        {'hits': 1, 'misses': 1, 'size': 1}
+
+        """
+        if self._cache is None:
+            self._cache = {}
+            self._cache_version = self._version
+
+    def disable_topology_cache(self):
+        """Disable the topology cache and clear the cached results."""
+        self._cache = None
+
+    def invalidate_topology(self):
+        """Increment the topology version, which invalidates the topology cache
+        and the arrays of the batch queries."""
+        self._version += 1
+
+    def _cached(self, name, key, compute):
+        cache = self._cache
+        if cache is None:
+            return compute(key)
+        if self._cache_version != self._version:
+            cache.clear()
+            self._cache_version = self._version
+        try:
+            result = cache[name, key]
+        except KeyError:
+            self._cache_misses += 1
+            result = cache[name, key] = compute(key)
+        else:
+            self._cache_hits += 1
+        return result
+
+    def _batch_arrays(self):
+        # an array snapshot for the batch queries
+        # the topology of the snapshot is reused as long as the topology version
+        # and the number of vertices and faces do not change
+        # the coordinates are read from the vertices on every call
+        from copy import copy
+        from numpy import asarray
+        from numpy import float64
+        from compas.datastructures.mesh.arrays import MeshArrays
+        arrays = self._batch
+        if (arrays is None or self._batch_version != self._version or
+                len(arrays.keys) != len(self.vertex) or len(arrays.fkeys) != len(self.face)):
+            self._batch = MeshArrays(self)
+            self._batch_version = self._version
+            return self._batch
+        arrays = copy(arrays)
+        arrays.xyz = asarray(self.get_vertices_attributes('xyz', keys=arrays.keys, rtype='array'), dtype=float64).reshape((-1, 3))
+        arrays.xyz.flags.writeable = False
+        return arrays
+
+    # ..........................................................................
+    # attribute columns
+    # ..........................................................................
+
+    def enable_attribute_columns(self):
+        """Store the vertex, edge and face attributes in typed columns.
+
+        The ``vertex``, ``edge`` and ``facedata`` dicts are replaced by dict-like
+        objects that store every attribute in one NumPy column
+        (see :mod:`compas.datastructures.columns`). Access through
+        ``mesh.vertex[key]['x']`` keeps working, and attributes of all vertices
+        can be retrieved as an array without copying them.
+
+        >>> mesh.enable_attribute_columns()
+        >>> xyz = mesh.get_vertices_attributes('xyz', rtype='array')
+
+        Note:
+            Requires NumPy.
+
+        """
+        if not isinstance(self.vertex, dict):
+            return
+        from compas.datastructures.columns import ColumnarDict
+        from compas.datastructures.columns import ColumnarEdgeDict
+        self.vertex   = ColumnarDict.from_dict(self.vertex, self.default_vertex_attributes)
+        self.edge     = ColumnarEdgeDict.from_dict(self.edge, self.default_edge_attributes)
+        self.facedata = ColumnarDict.from_dict(self.facedata, self.default_face_attributes)
+
+    def disable_attribute_columns(self):
+        """Store the vertex, edge and face attributes in regular dicts again."""
+        if isinstance(self.vertex, dict):
+            return
+        self.vertex   = self.vertex.copy()
+        self.edge     = self.edge.copy()
+        self.facedata = self.facedata.copy()
+
     # **************************************************************************
     # **************************************************************************
     # **************************************************************************
@@ -566,46 +761,94 @@ mesh summary
         Returns:
             Mesh: A ``Mesh`` of class ``cls``.
 
+        Note:
+            If NumPy is available, the mesh is constructed in bulk with
+            :meth:`from_arrays`. Otherwise, the vertices and faces are added
+            one by one.
+
         >>> vertices = []
         >>> faces = []
         >>> mesh = Mesh.from_vertices_and_faces(vertices, faces)
 
         """
-        mesh = cls()
-        mesh.attributes.update(kwargs)
-        for x, y, z in vertices:
-            mesh.add_vertex(x=x, y=y, z=z)
+        try:
+            import numpy
+        except ImportError:
+            mesh = cls()
+            mesh.attributes.update(kwargs)
+            for x, y, z in vertices:
+                mesh.add_vertex(x=x, y=y, z=z)
+            for face in faces:
+                mesh.add_face(face)
+            return mesh
+        # same clean up as in add_face
+        cleaned = []
         for face in faces:
-            mesh.add_face(face)
+            face = list(face)
+            if face[0] == face[-1]:
+                del face[-1]
+            if face[-2] == face[-1]:
+                del face[-1]
+            if len(face) < 3:
+                continue
+            cleaned.append(face)
+        return cls.from_arrays(vertices, cleaned, validate=False, **kwargs)
+
+    @classmethod
+    def from_arrays(cls, vertices, faces, offsets=None, validate=True, **kwargs):
+        """Construct a mesh from arrays of vertex coordinates and face vertex indices.
+
+        The vertex, halfedge, face and edge dicts are filled in a few bulk passes,
+        instead of adding the vertices and faces one by one.
+        The vertices and faces get the keys they would get if they were added
+        one by one to an empty mesh.
+
+        Parameters:
+            vertices (array) : The vertex coordinates. Shape ``(n, 3)``.
+            faces (array, list) : The faces. An integer array of shape ``(f, k)``,
+                for example with triangles or quads, or a list of vertex index lists
+                of any length, or, if ``offsets`` is provided, a flat array
+                with the vertex indices of all faces.
+            offsets (array) : Optional. The offsets of the faces in the flat
+                array of vertex indices. Shape ``(f + 1, )``. Default is ``None``.
+            validate (bool) : Optional. Check the validity of the faces before
+                constructing the mesh. Default is ``True``.
+            kwargs (dict) : Remaining named parameters. Default is an empty :obj:`dict`.
+
+        Returns:
+            Mesh: A ``Mesh`` of class ``cls``.
+
+        Raises:
+            BRGMeshError : If ``validate`` is ``True`` and the faces are invalid.
+
+        Note:
+            With ``validate=False`` the faces are assumed to be valid.
+            Faces with less than three vertices or out-of-range vertex indices
+            then result in an invalid mesh.
+
+        >>> import numpy as np
+        >>> vertices = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=float)
+        >>> faces = np.array([[0, 1, 2], [0, 2, 3]])
+        >>> mesh = Mesh.from_arrays(vertices, faces)
+
+        """
+        from compas.datastructures.mesh.arrays import MeshArrays
+        arrays = MeshArrays.from_vertices_and_faces(vertices, faces, offsets=offsets, validate=validate)
+        mesh = arrays.to_mesh(cls)
+        mesh.attributes.update(kwargs)
         return mesh
 
     @classmethod
-    def from_lines(cls, lines, boundary_face=False, precision='3f'):
+    def from_lines(cls, lines, boundary_face=False, precision='3f', tolerance=None):
         """"""
         from compas.datastructures.network.algorithms.duality import _sort_neighbours
         from compas.datastructures.network.algorithms.duality import _find_first_neighbour
         from compas.datastructures.network.algorithms.duality import _find_edge_face
 
         mesh = cls()
-        edges   = []
-        vertex  = {}
-        for line in lines:
-            sp = line[0]
-            ep = line[1]
-            a  = geometric_key(sp, precision)
-            b  = geometric_key(ep, precision)
-            vertex[a] = sp
-            vertex[b] = ep
-            edges.append((a, b))
-        key_index = dict((k, i) for i, k in enumerate(iter(vertex)))
-        for key, xyz in vertex.iteritems():
-            i = key_index[key]
-            mesh.add_vertex(i, x=xyz[0], y=xyz[1], z=xyz[2])
-        edges_uv = []
-        for u, v in edges:
-            i = key_index[u]
-            j = key_index[v]
-            edges_uv.append((i, j))
+        vertices, edges_uv = _weld_lines(lines, precision, tolerance)
+        for i, (x, y, z) in enumerate(vertices):
+            mesh.add_vertex(i, x=x, y=y, z=z)
         # the clear commands below are from the network equivalent. Needed?
         # network.clear_facedict()
         # network.clear_halfedgedict()
@@ -630,37 +873,155 @@ mesh summary
         return mesh
 
     @classmethod
-    def from_obj(cls, filepath, **kwargs):
+    def from_obj(cls, filepath, precision=None, weld=True, parallel=None, **kwargs):
         """Initialise a mesh from the data described in an obj file.
 
         Parameters:
             filepath (str): The path to the obj file.
+            precision (str): Optional. The precision of the geometric keys
+                used to merge vertices. Default is ``'3f'``.
+            weld (bool): Optional. Merge vertices with the same geometric key.
+                Default is ``True``.
+            parallel (int): Optional. Parse the file with this number of worker
+                processes. Default is ``None``.
             kwargs (dict) : Remaining named parameters. Default is an empty :obj:`dict`.
 
         Returns:
             Mesh: A ``Mesh`` of class ``cls``.
 
+        Note:
+            If NumPy is available, the file is parsed with
+            :class:`compas.files.obj.OBJArrayReader` and the mesh is constructed
+            in bulk with :meth:`from_arrays`. Otherwise ``parallel`` is ignored.
+
         >>> mesh = Mesh.from_obj('path/to/file.obj')
 
         """
-        mesh = cls()
-        mesh.attributes.update(kwargs)
-        obj = OBJ(filepath)
-        vertices = obj.parser.vertices
-        faces = obj.parser.faces
-        for x, y, z in vertices:
-            mesh.add_vertex(x=x, y=y, z=z)
-        for face in faces:
-            mesh.add_face(face)
-        return mesh
+        try:
+            import numpy
+        except ImportError:
+            obj = OBJ(filepath, precision=precision)
+            vertices = obj.parser.vertices
+            faces = obj.parser.faces
+            if not weld:
+                vertices = obj.reader.vertices
+                faces = obj.reader.faces
+            return cls.from_vertices_and_faces(vertices, faces, **kwargs)
+        from compas.files.obj import OBJArrayReader
+        from compas.files.obj import OBJArrayParser
+        from compas.datastructures.mesh.arrays import _clean_faces
+        reader = OBJArrayReader(filepath, parallel=parallel)
+        parser = OBJArrayParser(reader, precision=precision, weld=weld)
+        faces, offsets = _clean_faces(parser.faces, parser.offsets)
+        return cls.from_arrays(parser.vertices, faces, offsets=offsets, validate=False, **kwargs)
 
     @classmethod
-    def from_dxf(cls, filepath, **kwargs):
-        raise NotImplementedError
+    def from_dxf(cls, filepath, layers=None, precision=None, **kwargs):
+        """Initialise a mesh from the 3D faces and the polygon and polyface meshes
+        of a dxf file.
+
+        Parameters:
+            filepath (str): The path to the dxf file.
+            layers (list): Optional. Only read the entities on these layers.
+                Default is ``None``.
+            precision (str): Optional. The precision used to merge vertices.
+                Default is ``'3f'``.
+            kwargs (dict) : Remaining named parameters. Default is an empty :obj:`dict`.
+
+        Returns:
+            Mesh: A ``Mesh`` of class ``cls``.
+
+        Note:
+            Requires NumPy. The file is read with :class:`compas.files.dxf.DXF`
+            and the mesh is constructed in bulk with :meth:`from_arrays`.
+
+        >>> mesh = Mesh.from_dxf('site.dxf', layers=['terrain'])
+
+        """
+        from compas.files.dxf import DXF
+        from compas.datastructures.mesh.arrays import _clean_faces
+        dxf = DXF(filepath, layers=layers, types=('3DFACE', 'POLYLINE'), precision=precision)
+        faces, offsets = _clean_faces(dxf.parser.faces, dxf.parser.offsets)
+        return cls.from_arrays(dxf.parser.mesh_vertices, faces, offsets=offsets, validate=False, **kwargs)
 
     @classmethod
-    def from_stl(cls, filepath, **kwargs):
-        raise NotImplementedError
+    def from_stl(cls, filepath, precision=None, weld=True, **kwargs):
+        """Initialise a mesh from the triangles of a binary or ascii stl file.
+
+        Parameters:
+            filepath (str): The path to the stl file.
+            precision (str): Optional. The precision used to merge vertices.
+                Default is ``'3f'``.
+            weld (bool): Optional. Merge vertices. Default is ``True``.
+            kwargs (dict) : Remaining named parameters. Default is an empty :obj:`dict`.
+
+        Returns:
+            Mesh: A ``Mesh`` of class ``cls``.
+
+        Note:
+            Requires NumPy. The file is read with :class:`compas.files.stl.STL`
+            and the mesh is constructed in bulk with :meth:`from_arrays`.
+            Triangles that collapse when the vertices are merged are skipped.
+
+        >>> mesh = Mesh.from_stl('path/to/file.stl')
+
+        """
+        from compas.files.stl import STL
+        stl = STL(filepath, precision=precision, weld=weld)
+        return cls.from_arrays(stl.parser.vertices, stl.parser.faces, validate=False, **kwargs)
+
+    @classmethod
+    def from_ply(cls, filepath, attributes=True, columns=False, **kwargs):
+        """Initialise a mesh from the vertices and faces of a binary or ascii ply file.
+
+        Parameters:
+            filepath (str): The path to the ply file.
+            attributes (bool): Optional. Add the other properties of the vertices
+                and faces, such as colours and normals, as vertex and face attributes.
+                Default is ``True``.
+            columns (bool): Optional. Store the attributes in typed columns
+                (see :meth:`enable_attribute_columns`), and load every property
+                as a whole column. Default is ``False``.
+            kwargs (dict) : Remaining named parameters. Default is an empty :obj:`dict`.
+
+        Returns:
+            Mesh: A ``Mesh`` of class ``cls``.
+
+        Note:
+            Requires NumPy. The file is read with :class:`compas.files.ply.PLY`
+            and the mesh is constructed in bulk with :meth:`from_arrays`.
+            The faces are not validated, since scanned meshes are often not manifold.
+            Faces with less than three distinct vertices are skipped.
+
+        >>> mesh = Mesh.from_ply('path/to/file.ply')
+
+        """
+        from compas.files.ply import PLY
+        from compas.datastructures.mesh.arrays import _clean_faces_valid
+        ply = PLY(filepath)
+        parser = ply.parser
+        faces, offsets, valid = _clean_faces_valid(parser.faces, parser.offsets)
+        mesh = cls.from_arrays(parser.vertices, faces, offsets=offsets, validate=False, **kwargs)
+        if not attributes:
+            return mesh
+        if columns:
+            # every face needs a row in the store
+            for fkey in mesh.face:
+                if fkey not in mesh.facedata:
+                    mesh.facedata[fkey] = mesh.default_face_attributes.copy()
+            mesh.enable_attribute_columns()
+            for name, values in parser.vertex_attributes.items():
+                mesh.vertex.store.set_column(name, values)
+            for name, values in parser.face_attributes.items():
+                mesh.facedata.store.set_column(name, values[valid])
+            return mesh
+        for name, values in parser.vertex_attributes.items():
+            for key, value in enumerate(values.tolist()):
+                mesh.set_vertex_attribute(key, name, value)
+        for name, values in parser.face_attributes.items():
+            for fkey, value in enumerate(values[valid].tolist()):
+                mesh.set_face_attribute(fkey, name, value)
+        return mesh
 
     @classmethod
     def from_json(cls, filepath, **kwargs):
@@ -671,6 +1032,31 @@ mesh summary
         mesh.attributes.update(kwargs)
         return mesh
 
+    @classmethod
+    def from_binary(cls, filepath, attributes=True, **kwargs):
+        """Construct a mesh from a binary file written by :meth:`to_binary`.
+
+        Parameters:
+            filepath (str) : Path to the file.
+            attributes (bool) : Optional. If ``False``, only read the geometry and
+                topology, and not the vertex, edge and face attributes.
+                Default is ``True``.
+
+        Returns:
+            Mesh : A mesh object.
+
+        Note:
+            Requires NumPy.
+
+        >>> mesh.to_binary('mesh.npz')
+        >>> mesh = Mesh.from_binary('mesh.npz')
+
+        """
+        from compas.datastructures.mesh.arrays import MeshArrays
+        mesh = MeshArrays.from_binary(filepath, attributes=attributes).to_mesh(cls)
+        mesh.attributes.update(kwargs)
+        return mesh
+
     # **************************************************************************
     # **************************************************************************
     # **************************************************************************
@@ -688,21 +1074,38 @@ mesh summary
         be reconstructed."""
         return self.data
 
-    def to_obj(self, filepath):
+    def to_obj(self, filepath, precision=None, normals=False, groups=None):
         """Write the mesh to an OBJ file.
 
         Parameters:
-            filepath (str): Full path of the file to write.
+            filepath (str, file): Full path of the file to write, or an open file object.
+            precision (str): Optional. The precision of the coordinates.
+                Default is ``'3f'``.
+            normals (bool): Optional. Write the vertex normals. Default is ``False``.
+            groups (str): Optional. The name of a face attribute. Faces with the
+                same value of this attribute are written to a group with that value
+                as name. Default is ``None``.
 
         Notes:
-            Use the framework ``OBJ`` functionality for this. How to write vertices
-            and faces to an ``OBJ`` is not necessarily something a mesh knows how
-            to do.
+            If NumPy is available, the file is written in blocks with
+            :class:`compas.files.obj.OBJWriter`. Otherwise, the vertices and
+            faces are written line by line, without normals and groups.
         """
+        try:
+            import numpy
+        except ImportError:
+            pass
+        else:
+            from compas.files.obj import OBJComposer
+            from compas.files.obj import OBJWriter
+            with OBJWriter(filepath, precision=precision) as writer:
+                writer.write(OBJComposer(self, normals=normals, groups=groups))
+            return
+        precision = precision or '3f'
         key_index = dict((key, index) for index, key in self.vertices_enum())
-        with open(filepath, 'wb+') as fh:
+        with open(filepath, 'w') as fh:
             for key, attr in self.vertices_iter(True):
-                fh.write('v {0[x]:.3f} {0[y]:.3f} {0[z]:.3f}\n'.format(attr))
+                fh.write('v {0[x]:.{1}} {0[y]:.{1}} {0[z]:.{1}}\n'.format(attr, precision))
             for fkey in self.face:
                 vertices = self.face_vertices(fkey, ordered=True)
                 vertices = [key_index[key] + 1 for key in vertices]
@@ -711,6 +1114,62 @@ mesh summary
                     ixs.append('{0}'.format(vkey))
                 fh.write(' '.join(ixs) + '\n')
 
+    def to_stl(self, filepath, binary=True, precision=None):
+        """Write the mesh to an STL file.
+
+        Parameters:
+            filepath (str, file): Full path of the file to write, or an open file object.
+            binary (bool): Optional. Write a binary file. Default is ``True``.
+            precision (str): Optional. The precision of the coordinates of an
+                ascii file. Default is ``'6e'``.
+
+        Notes:
+            Requires NumPy. Faces with more than three vertices are triangulated
+            as a fan around their first vertex.
+        """
+        from compas.datastructures.mesh.arrays import MeshArrays
+        from compas.files.stl import STLWriter
+        arrays = MeshArrays.from_mesh(self)
+        with STLWriter(filepath, binary=binary, name=self.name, precision=precision) as writer:
+            writer.write_faces(arrays.xyz, arrays.face_vertices, arrays.face_offsets)
+
+    def to_ply(self, filepath, binary=True, vertex_attributes=None, face_attributes=None):
+        """Write the mesh to a PLY file.
+
+        Parameters:
+            filepath (str, file): Full path of the file to write, or a file object
+                opened in binary mode.
+            binary (bool): Optional. Write a binary file. Default is ``True``.
+            vertex_attributes (list): Optional. The names of numerical vertex
+                attributes to write as vertex properties. Default is ``None``.
+            face_attributes (list): Optional. The names of numerical face
+                attributes to write as face properties. Default is ``None``.
+
+        Raises:
+            BRGInputError: If a vertex or face does not have one of the attributes,
+                and the attribute has no default.
+
+        Notes:
+            Requires NumPy.
+
+        >>> mesh.to_ply('mesh.ply', vertex_attributes=['red', 'green', 'blue'])
+
+        """
+        from compas.datastructures.mesh.arrays import MeshArrays
+        from compas.datastructures.mesh.arrays import _attribute_column
+        from compas.files.ply import PLYWriter
+        arrays = MeshArrays.from_mesh(self)
+        columns = [(name, arrays.xyz[:, index]) for index, name in enumerate('xyz')]
+        for name in vertex_attributes or []:
+            columns.append((name, _attribute_column(self, 'vertex', name, arrays.keys)))
+        writer = PLYWriter(filepath, binary=binary)
+        writer.add_element('vertex', columns)
+        columns = []
+        for name in face_attributes or []:
+            columns.append((name, _attribute_column(self, 'face', name, arrays.fkeys)))
+        writer.add_element('face', columns, [('vertex_indices', arrays.face_vertices, arrays.face_offsets)])
+        writer.write()
+
     def to_json(self, filepath):
         """Serialize the mesh data to a JSON file.
 
@@ -724,6 +1183,25 @@ mesh summary
         with open(filepath, 'wb+') as fh:
             json.dump(data, fh)
 
+    def to_binary(self, filepath, compressed=False):
+        """Write the mesh to a binary file.
+
+        The file is a NumPy *npz* archive with the vertex coordinates and the
+        topology as arrays, and the vertex, edge and face attributes as typed
+        columns. Keys are stored as integers or strings, or as their ``repr``
+        if they are of any other type.
+
+        Parameters:
+            filepath (str) : Path to the file to write.
+            compressed (bool) : Optional. Compress the file. Default is ``False``.
+
+        Note:
+            Requires NumPy.
+
+        """
+        from compas.datastructures.mesh.arrays import MeshArrays
+        MeshArrays.from_mesh(self).to_binary(filepath, compressed=compressed)
+
     def to_lines(self, axes='xyz'):
         return [(self.vertex_coordinates(u, axes), self.vertex_coordinates(v, axes))
                 for u, v in self.edges_iter()]
@@ -821,6 +1299,7 @@ mesh summary
         if key not in self.vertex:
             self.vertex[key] = {}
             self.halfedge[key] = {}
+            self._version += 1
         self.vertex[key].update(attr)
         return key
 
@@ -868,6 +1347,7 @@ mesh summary
             self.halfedge[u][v] = fkey
             if u not in self.halfedge[v]:
                 self.halfedge[v][u] = None
+        self._version += 1
         return fkey
 
     def add_vertices(self):
@@ -892,6 +1372,7 @@ mesh summary
                     del self.halfedge[n][nbr]
         del self.halfedge[key]
         del self.vertex[key]
+        self._version += 1
 
     def delete_vertex(self, key):
         raise NotImplementedError
@@ -917,6 +1398,7 @@ mesh summary
         for u, v in self.face[fkey].iteritems():
             fkeys.append(self.add_face([u, v, w]))
         del self.face[fkey]
+        self._version += 1
         return fkeys
 
     def add_faces(self):
@@ -929,6 +1411,7 @@ mesh summary
                 del self.halfedge[u][v]
                 del self.halfedge[v][u]
         del self.face[fkey]
+        self._version += 1
 
     # **************************************************************************
     # **************************************************************************
@@ -946,6 +1429,9 @@ mesh summary
         if not attr_dict:
             attr_dict = {}
         attr_dict.update(kwattr)
+        if not isinstance(self.vertex, dict):
+            self.vertex.store.update_defaults(attr_dict)
+            return
         self.default_vertex_attributes.update(attr_dict)
         for key in self.vertex:
             attr = attr_dict.copy()
@@ -961,6 +1447,9 @@ mesh summary
         self.vertex[key].update(attr_dict)
 
     def set_vertices_attribute(self, name, value, keys=None):
+        if not isinstance(self.vertex, dict):
+            self.vertex.store.fill(name, value, keys)
+            return
         if not keys:
             for key, attr in self.vertices_iter(True):
                 attr[name] = value
@@ -971,6 +1460,10 @@ mesh summary
     def set_vertices_attributes(self, keys=None, attr_dict=None, **kwattr):
         attr_dict = attr_dict or {}
         attr_dict.update(kwattr)
+        if not isinstance(self.vertex, dict):
+            for name, value in attr_dict.items():
+                self.vertex.store.fill(name, value, keys)
+            return
         if not keys:
             for key, attr in self.vertices_iter(True):
                 attr.update(attr_dict)
@@ -986,12 +1479,58 @@ mesh summary
             defaults = [None] * len(names)
         return [self.vertex[key].get(name, default) for name, default in zip(names, defaults)]
 
-    def get_vertices_attribute(self, name, default=None, keys=None):
+    def get_vertices_attribute(self, name, default=None, keys=None, rtype='list'):
+        """Get the value of an attribute of a number of vertices.
+
+        Parameters:
+            name (str) : The name of the attribute.
+            default (object) : Optional. The value for vertices without the attribute.
+            keys (list) : Optional. The vertex keys. Defaults to all vertices.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values.
+
+        Note:
+            If the attributes are stored in columns (see :meth:`enable_attribute_columns`),
+            the array of all vertices is a view on the column instead of a copy.
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.vertex, dict):
+                return self.vertex.store.column(name, default, keys or None)
+            from numpy import asarray
+            return asarray(self.get_vertices_attribute(name, default, keys))
         if not keys:
             return [attr.get(name, default) for key, attr in self.vertices_iter(True)]
         return [self.vertex[key].get(name, default) for key in keys]
 
-    def get_vertices_attributes(self, names, defaults=None, keys=None):
+    def get_vertices_attributes(self, names, defaults=None, keys=None, rtype='list'):
+        """Get the values of a number of attributes of a number of vertices.
+
+        Parameters:
+            names (list) : The names of the attributes.
+            defaults (list) : Optional. The values for vertices without the attributes.
+            keys (list) : Optional. The vertex keys. Defaults to all vertices.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values per vertex.
+
+        Note:
+            If the attributes are stored in columns (see :meth:`enable_attribute_columns`),
+            the array of all vertices is a view on the columns instead of a copy,
+            provided that the columns are consecutive and of the same type.
+            This is for example the case for ``'xyz'``.
+
+        >>> xyz = mesh.get_vertices_attributes('xyz', rtype='array')
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.vertex, dict):
+                return self.vertex.store.array(names, defaults, keys or None)
+            from numpy import asarray
+            return asarray(self.get_vertices_attributes(names, defaults, keys))
         if not defaults:
             defaults = [None] * len(names)
         temp = zip(names, defaults)
@@ -1097,6 +1636,9 @@ mesh summary
         if not attr_dict:
             attr_dict = {}
         attr_dict.update(kwargs)
+        if not isinstance(self.edge, dict):
+            self.edge.store.update_defaults(attr_dict)
+            return
         self.default_edge_attributes.update(attr_dict)
         for u, v in self.edges():
             attr = attr_dict.copy()
@@ -1122,6 +1664,9 @@ mesh summary
             self.edge[u][v].update(attr_dict)
 
     def set_edges_attribute(self, name, value, keys=None):
+        if not keys and not isinstance(self.edge, dict):
+            self.edge.store.fill(name, value, self.edges())
+            return
         if not keys:
             for u, v, attr in self.edges_iter(True):
                 attr[name] = value
@@ -1155,12 +1700,46 @@ mesh summary
             return [self.edge[u][v].get(name, default) for name, default in zip(names, defaults)]
         return [self.edge[v][u].get(name, default) for name, default in zip(names, defaults)]
 
-    def get_edges_attribute(self, name, default=None, keys=None):
+    def get_edges_attribute(self, name, default=None, keys=None, rtype='list'):
+        """Get the value of an attribute of a number of edges.
+
+        Parameters:
+            name (str) : The name of the attribute.
+            default (object) : Optional. The value for edges without the attribute.
+            keys (list) : Optional. The edges. Defaults to all edges.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values.
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.edge, dict):
+                return self.edge.store.column(name, default, keys or self.edges())
+            from numpy import asarray
+            return asarray(self.get_edges_attribute(name, default, keys))
         if not keys:
             return [attr.get(name, default) for u, v, attr in self.edges_iter(True)]
         return [self.edge[u][v].get(name, default) for u, v in keys]
 
-    def get_edges_attributes(self, names, defaults=None, keys=None):
+    def get_edges_attributes(self, names, defaults=None, keys=None, rtype='list'):
+        """Get the values of a number of attributes of a number of edges.
+
+        Parameters:
+            names (list) : The names of the attributes.
+            defaults (list) : Optional. The values for edges without the attributes.
+            keys (list) : Optional. The edges. Defaults to all edges.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values per edge.
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.edge, dict):
+                return self.edge.store.array(names, defaults, keys or self.edges())
+            from numpy import asarray
+            return asarray(self.get_edges_attributes(names, defaults, keys))
         if not defaults:
             defaults = [None] * len(names)
         temp = zip(names, defaults)
@@ -1188,6 +1767,7 @@ mesh summary
                 if not self.halfedge[u]:
                     del self.vertex[u]
                     del self.halfedge[u]
+        self._version += 1
 
     def cull_unused_edges(self):
         for u, v in self.edges():
@@ -1306,7 +1886,7 @@ mesh summary
                             self.edge[u] = {}
                         self.edge[u][v] = attr
                         if data:
-                            yield u, v, attr
+                            yield u, v, self.edge[u][v]
                         else:
                             yield u, v
 
@@ -1471,6 +2051,9 @@ mesh summary
     def vertex_neighbours(self, key, ordered=False):
         if not ordered:
             return self.halfedge[key].keys()
+        return list(self._cached('vertex_neighbours', key, self._vertex_neighbours_ordered))
+
+    def _vertex_neighbours_ordered(self, key):
         temp = self.halfedge[key].keys()
         if len(temp) < 1:
             return []
@@ -1542,6 +2125,9 @@ mesh summary
     def vertex_faces(self, key, ordered=False):
         if not ordered:
             return self.halfedge[key].values()
+        return list(self._cached('vertex_faces', key, self._vertex_faces_ordered))
+
+    def _vertex_faces_ordered(self, key):
         nbrs = self.vertex_neighbours(key, ordered=True)
         return [self.halfedge[key][n] for n in nbrs]
 
@@ -1558,11 +2144,16 @@ mesh summary
         return self.vertex_degree(key) > 0
 
     def is_vertex_on_boundary(self, key):
+        if self._cache is not None:
+            return key in self._cached('vertices_with_boundary_halfedge', None, self._vertices_with_boundary_halfedge)
         for nbr in self.halfedge[key]:
             if self.halfedge[key][nbr] is None:
                 return True
         return False
 
+    def _vertices_with_boundary_halfedge(self, key=None):
+        return set(u for u in self.halfedge if None in self.halfedge[u].itervalues())
+
     def is_vertex_extraordinary(self, key, mtype=None):
         raise NotImplementedError
 
@@ -1624,44 +2215,39 @@ mesh summary
         return set(enbrs + vnbrs)
 
     def face_adjacency(self):
-        # this function does not actually use any of the topological information
-        # provided by the halfedges
-        # it is used for unifying face cycles
-        # so the premise is that halfedge data is not valid/reliable
-        try:
-            from scipy.spatial import cKDTree
-        except ImportError:
-            have_scipy = False
-        else:
-            have_scipy = True
-        fkey_index = dict((fkey, index) for index, fkey in self.faces_enum())
-        index_fkey = dict(self.faces_enum())
-        points = [self.face_centroid(fkey) for fkey in self.faces_iter()]
-        tree = cKDTree(points)
-        _, closest = tree.query(points, k=10, n_jobs=-1)
+        """Build a face adjacency dict.
+
+        Two faces are adjacent if they share an edge, independently of the
+        direction in which they traverse it. The halfedge dict is not used,
+        because this function is used for unifying face cycles, and the premise
+        is that the halfedge data is not valid/reliable.
+
+        Returns:
+            dict : For every face key, a list of the keys of the adjacent faces.
+
+        Note:
+            The undirected edges of all faces are hashed to the faces they belong to.
+            This takes linear time in the number of edges.
+
+        """
+        edge_faces = {}
+        for fkey, face in self.face.items():
+            for u, v in face.items():
+                uv = (u, v) if u < v else (v, u)
+                if uv in edge_faces:
+                    edge_faces[uv].append(fkey)
+                else:
+                    edge_faces[uv] = [fkey]
         adjacency = {}
-        for fkey in self.face:
+        for fkey, face in self.face.items():
             nbrs  = []
-            index = fkey_index[fkey]
-            # point = points[index]
-            # _, nnbrs = tree.query(point, k=10, n_jobs=-1)
-            nnbrs = closest[index]
-            found = set()
-            for u, v in self.face[fkey].iteritems():
-                for index in nnbrs:
-                    nbr = index_fkey[index]
-                    if nbr == fkey:
-                        continue
-                    if nbr in found:
-                        continue
-                    if v in self.face[nbr] and u == self.face[nbr][v]:
-                        nbrs.append(nbr)
-                        found.add(nbr)
-                        break
-                    if u in self.face[nbr] and v == self.face[nbr][u]:
+            found = set([fkey])
+            for u, v in face.items():
+                uv = (u, v) if u < v else (v, u)
+                for nbr in edge_faces[uv]:
+                    if nbr not in found:
                         nbrs.append(nbr)
                         found.add(nbr)
-                        break
             adjacency[fkey] = nbrs
         return adjacency
 
@@ -1731,7 +2317,7 @@ mesh summary
             nx += n[0]
             ny += n[1]
             nz += n[2]
-        a = length_vector(n)
+        a = length_vector((nx, ny, nz))
         return nx / a, ny / a, nz / a
 
     def face_coordinates(self, fkey, ordered=False):
@@ -1759,6 +2345,87 @@ mesh summary
         vertices = self.face_vertices(fkey, ordered=True)
         return area_polygon([coords(key) for key in vertices])
 
+    def face_centroids(self, rtype='array'):
+        """Compute the centroids of all faces at once.
+
+        Parameters:
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by face key). Default is ``'array'``.
+
+        Returns:
+            array : The centroids, in the order of ``mesh.faces_iter()``.
+
+        Note:
+            This requires NumPy.
+
+        """
+        return self._batch_arrays().face_centroids(rtype=rtype)
+
+    def face_normals(self, unitized=True, rtype='array'):
+        """Compute the normals of all faces at once.
+
+        Parameters:
+            unitized (bool) : Optional. Return unit vectors. Default is ``True``.
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by face key). Default is ``'array'``.
+
+        Returns:
+            array : The normals, in the order of ``mesh.faces_iter()``.
+
+        Note:
+            This requires NumPy.
+
+        """
+        return self._batch_arrays().face_normals(unitized=unitized, rtype=rtype)
+
+    def face_areas(self, rtype='array'):
+        """Compute the areas of all faces at once.
+
+        Parameters:
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by face key). Default is ``'array'``.
+
+        Returns:
+            array : The areas, in the order of ``mesh.faces_iter()``.
+
+        Note:
+            This requires NumPy.
+
+        """
+        return self._batch_arrays().face_areas(rtype=rtype)
+
+    def vertex_normals(self, rtype='array'):
+        """Compute the normals of all vertices at once.
+
+        Parameters:
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by vertex key). Default is ``'array'``.
+
+        Returns:
+            array : The normals, in the order of ``mesh.vertices_iter()``.
+
+        Note:
+            This requires NumPy.
+
+        """
+        return self._batch_arrays().vertex_normals(rtype=rtype)
+
+    def vertex_areas(self, rtype='array'):
+        """Compute the areas of all vertices at once.
+
+        Parameters:
+            rtype (str) : Optional. The return type: ``'array'``, ``'list'``,
+                or ``'dict'`` (keyed by vertex key). Default is ``'array'``.
+
+        Returns:
+            array : The areas, in the order of ``mesh.vertices_iter()``.
+
+        Note:
+            This requires NumPy.
+
+        """
+        return self._batch_arrays().vertex_areas(rtype=rtype)
+
     def edge_length(self, u, v):
         sp = self.vertex_coordinates(u)
         ep = self.vertex_coordinates(v)
@@ -1799,6 +2466,13 @@ mesh summary
     # **************************************************************************
 
     def vertices_on_boundary(self, ordered=False):
+        if not ordered:
+            return set(self._cached('vertices_on_boundary', False, self._vertices_on_boundary))
+        # the ordering starts at the vertex with the lowest coordinates
+        # and therefore depends on the geometry
+        return self._vertices_on_boundary(True)
+
+    def _vertices_on_boundary(self, ordered=False):
         if not ordered:
             vertices = set()
             for key, nbrs in self.halfedge.iteritems():
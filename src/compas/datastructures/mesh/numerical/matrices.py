@@ -7,7 +7,11 @@ from compas.geometry import cross_vectors
 from compas.numerical.matrices import adjacency_matrix
 from compas.numerical.matrices import connectivity_matrix
 from compas.numerical.matrices import laplacian_matrix
+from compas.numerical.matrices import _return_matrix
 
+from compas.datastructures.mesh.arrays import MeshArrays
+
+from numpy import concatenate
 from numpy import ones
 
 from scipy.sparse import coo_matrix
@@ -31,22 +35,62 @@ __all__ = [
 ]
 
 
+def _mesh_edges(mesh):
+    if isinstance(mesh, MeshArrays):
+        return mesh.edges
+    k_i = dict((key, index) for index, key in mesh.vertices_enum())
+    return [(k_i[u], k_i[v]) for u, v in mesh.edges_iter()]
+
+
 def mesh_adjacency_matrix(mesh, rtype='csr'):
+    """Construct the adjacency matrix of a mesh.
+
+    Parameters:
+        mesh (Mesh, MeshArrays) : The mesh, or an array snapshot of the mesh.
+        rtype (str) : The return type. Default is ``'csr'``.
+
+    Returns:
+        sparse : The adjacency matrix.
+
+    """
+    if isinstance(mesh, MeshArrays):
+        n    = mesh.vertex_count
+        m    = mesh.edge_count
+        rows = concatenate((mesh.edges[:, 0], mesh.edges[:, 1]))
+        cols = concatenate((mesh.edges[:, 1], mesh.edges[:, 0]))
+        A    = coo_matrix((ones(2 * m), (rows, cols)), shape=(n, n))
+        return _return_matrix(A, rtype)
     k_i   = dict((key, index) for index, key in mesh.vertices_enum())
     adjacency = [[k_i[nbr] for nbr in mesh.vertex_neighbours(key)] for key in mesh]
     return adjacency_matrix(adjacency, rtype=rtype)
 
 
 def mesh_connectivity_matrix(mesh, rtype='csr'):
-    k_i   = dict((key, index) for index, key in mesh.vertices_enum())
-    edges = [(k_i[u], k_i[v]) for u, v in mesh.edges_iter()]
-    return connectivity_matrix(edges, rtype=rtype)
+    """Construct the connectivity matrix of a mesh.
+
+    Parameters:
+        mesh (Mesh, MeshArrays) : The mesh, or an array snapshot of the mesh.
+        rtype (str) : The return type. Default is ``'csr'``.
+
+    Returns:
+        sparse : The connectivity matrix.
+
+    """
+    return connectivity_matrix(_mesh_edges(mesh), rtype=rtype)
 
 
 def mesh_laplacian_matrix(mesh, rtype='csr'):
-    k_i   = dict((key, index) for index, key in mesh.vertices_enum())
-    edges = [(k_i[u], k_i[v]) for u, v in mesh.edges_iter()]
-    return laplacian_matrix(edges, rtype=rtype)
+    """Construct the Laplacian matrix of a mesh with umbrella weights.
+
+    Parameters:
+        mesh (Mesh, MeshArrays) : The mesh, or an array snapshot of the mesh.
+        rtype (str) : The return type. Default is ``'csr'``.
+
+    Returns:
+        sparse : The Laplacian matrix.
+
+    """
+    return laplacian_matrix(_mesh_edges(mesh), rtype=rtype)
 
 
 def trimesh_edge_cotangent(mesh, u, v):
@@ -137,6 +181,9 @@ if __name__ == "__main__":
     from compas.datastructures.mesh import Mesh
 
     mesh = Mesh.from_obj(compas.get_data('faces.obj'))
+    arrays = MeshArrays.from_mesh(mesh)
+
+    print(mesh_laplacian_matrix(arrays, 'list'))
 
     # print(mesh_adjacency_matrix(mesh, 'list'))
     # print(mesh_connectivity_matrix(mesh, 'list'))
@@ -146,6 +146,7 @@ def collapse_edge_mesh(mesh, u, v, t=0.5):
     # delete V
     del mesh.halfedge[v]
     del mesh.vertex[v]
+    mesh.invalidate_topology()
 
 
 def _is_collapse_legal(mesh, u, v):
@@ -283,6 +284,7 @@ def collapse_edge_trimesh(mesh, u, v, t=0.5):
     # delete V
     del mesh.halfedge[v]
     del mesh.vertex[v]
+    mesh.invalidate_topology()
     return True
 
 
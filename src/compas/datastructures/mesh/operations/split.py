@@ -82,6 +82,7 @@ def split_edge_mesh(mesh, u, v, t=0.5, allow_boundary=False):
     if fkey_vu is not None:
         mesh.face[fkey_vu][v] = w
         mesh.face[fkey_vu][w] = u
+    mesh.invalidate_topology()
     # return the key of the split vertex
     return w
 
@@ -128,6 +129,7 @@ def split_edge_trimesh(mesh, u, v, t=0.5, allow_boundary=False, interpolate_attr
         mesh.add_face([w, u, o])
         del mesh.halfedge[v][u]
         del mesh.face[fkey_vu]
+    mesh.invalidate_topology()
     # return the key of the split vertex
     return w
 
@@ -162,6 +164,7 @@ def split_face_mesh(mesh, fkey, u, v):
     f = mesh.add_face(f)
     g = mesh.add_face(g)
     del mesh.face[fkey]
+    mesh.invalidate_topology()
     return f, g
 
 
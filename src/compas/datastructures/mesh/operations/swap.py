@@ -40,6 +40,7 @@ def swap_edge_trimesh(mesh, u, v):
     # add the faces created by the swap
     a = mesh.add_face([o_uv, o_vu, v])
     b = mesh.add_face([o_vu, o_uv, u])
+    mesh.invalidate_topology()
     return a, b
 
 
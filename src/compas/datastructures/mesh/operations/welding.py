@@ -31,6 +31,7 @@ def unweld_vertices_mesh(mesh, fkey, where=None):
         mesh.halfedge[a][key] = None
         mesh.halfedge[key][d] = None
     del mesh.face[fkey]
+    mesh.invalidate_topology()
 
 
 # ==============================================================================
@@ -19,6 +19,7 @@ Package for working with network objects.
 .. autosummary::
     :toctree: generated/
 
+    csr.NetworkCSR
     plotter.NetworkPlotter2D
     plotter.NetworkPlotter3D
     viewer.NetworkViewer
@@ -56,19 +57,24 @@ algorithms
     is_network_2d
     is_network_planar
     is_network_planar_embedding
+    network_planar_embedding
     embed_network_in_plane
     smooth_network_mixed
     smooth_network_centroid
     smooth_network_area
     smooth_network_mass
     smooth_network_length
+    network_traverse
+    network_connected_components
     network_dfs
     network_bfs
     network_dfs_paths
     network_bfs_paths
     network_shortest_path
     network_dijkstra_distances
+    network_dijkstra_tree
     network_dijkstra_path
+    network_dijkstra_distance_matrix
 
 
 numerical
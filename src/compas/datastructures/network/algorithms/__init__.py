@@ -2,5 +2,6 @@ from .combinatorial import *
 from .duality import *
 from .geometry import *
 from .graph import *
+from .planarity import *
 from .smoothing import *
 from .traversal import *
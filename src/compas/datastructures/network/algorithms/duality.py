@@ -1,3 +1,5 @@
+import gc
+
 from compas.geometry import angle_smallest_vectors
 from compas.geometry.planar import is_ccw_2d
 
@@ -93,7 +95,7 @@ def construct_dual_network(network, cls=None):
     return dual
 
 
-def find_network_faces(network, breakpoints=None):
+def find_network_faces(network, breakpoints=None, embedding=None):
     """Find the faces of a network.
 
     Parameters:
@@ -101,6 +103,11 @@ def find_network_faces(network, breakpoints=None):
         breakpoints (list): Optional.
             The vertices at which to break the found faces.
             Default is ``None``.
+        embedding (dict): Optional.
+            A combinatorial embedding of the network, mapping every vertex to its
+            neighbours in cyclic order, as returned by
+            :func:`compas.datastructures.network.algorithms.network_planar_embedding`.
+            Default is ``None``, in which case the neighbours are ordered by angle.
 
     Note:
         ``breakpoints`` are primarily used to break up the outside face in between
@@ -108,6 +115,9 @@ def find_network_faces(network, breakpoints=None):
         diagrams, any vertices where external forces are applied (loads or reactions)
         should be input as breakpoints.
 
+        With NumPy, the neighbours of all vertices are ordered at once, and the
+        faces are found as the cycles of the permutation that maps every halfedge
+        to the next halfedge of its face. The result is the same as without.
 
     Warning:
         This algorithms is essentially a wall follower (a type of maze-solving algorithm).
@@ -187,21 +197,157 @@ def find_network_faces(network, breakpoints=None):
     for u, v in network.edges_iter():
         network.halfedge[u][v] = None
         network.halfedge[v][u] = None
-    _sort_neighbours(network)
-    leaves = network.leaves()
-    if leaves:
-        u = sorted([(key, network.vertex[key]) for key in leaves], key=lambda x: (x[1]['y'], x[1]['x']))[0][0]
+    network.invalidate_topology()
+    # the garbage collector only slows down the creation of the many face lists
+    # and attribute dicts, none of which are part of a reference cycle
+    gcenabled = gc.isenabled()
+    gc.disable()
+    try:
+        try:
+            csr = network.csr()
+        except ImportError:
+            _find_faces(network, embedding)
+        else:
+            _find_faces_csr(network, csr, embedding)
+    finally:
+        if gcenabled:
+            gc.enable()
+    _break_faces(network, breakpoints)
+    network.invalidate_topology()
+    return network.face
+
+
+def _find_faces(network, embedding=None):
+    if embedding is None:
+        _sort_neighbours(network)
     else:
-        u = sorted(network.vertices_iter(True), key=lambda x: (x[1]['y'], x[1]['x']))[0][0]
-    v = _find_first_neighbour(u, network)
+        for key in network.vertex:
+            network.vertex[key]['sorted_neighbours'] = list(embedding[key])
+    u, v = _find_first_halfedge(network)
     _find_edge_face(u, v, network)
     for u, v in network.edges_iter():
         if network.halfedge[u][v] is None:
             _find_edge_face(u, v, network)
         if network.halfedge[v][u] is None:
             _find_edge_face(v, u, network)
-    _break_faces(network, breakpoints)
-    return network.face
+
+
+def _find_faces_csr(network, csr, embedding=None):
+    # the halfedges are the entries of the csr snapshot
+    # the faces are the cycles of the permutation that maps every halfedge
+    # to the next halfedge of its face
+    from numpy import arange
+    from numpy import arctan2
+    from numpy import argsort
+    from numpy import array
+    from numpy import column_stack
+    from numpy import float64
+    from numpy import fromiter
+    from numpy import lexsort
+    from numpy import zeros
+
+    keys = csr.keys
+    n = len(keys)
+    rows = csr.rows()
+    cols = csr.indices
+    h = cols.shape[0]
+    if not h:
+        return
+
+    codes = rows * n + cols
+    order = argsort(codes, kind='mergesort')
+    codes = codes[order]
+
+    def halfedge_index(u, v):
+        return order[codes.searchsorted(u * n + v)]
+
+    # the angle of every halfedge
+    # or its position in the embedding
+
+    if embedding is None:
+        x = fromiter((attr['x'] for attr in network.vertex.itervalues()), float64, n)
+        y = fromiter((attr['y'] for attr in network.vertex.itervalues()), float64, n)
+        angles = arctan2(y[cols] - y[rows], x[cols] - x[rows])
+    else:
+        key_index = csr.key_index
+        erows, ecols, epos = [], [], []
+        for i, key in enumerate(keys):
+            for pos, nbr in enumerate(embedding[key]):
+                erows.append(i)
+                ecols.append(key_index[nbr])
+                epos.append(pos)
+        angles = zeros(h, dtype=float64)
+        angles[halfedge_index(array(erows, dtype=int), array(ecols, dtype=int))] = epos
+
+    # the sorted neighbours of every vertex
+    # the vertex blocks of the sorted halfedges coincide with those of the snapshot
+
+    ordered = lexsort((angles, rows))
+    indptr = csr.indptr
+    preceding = arange(-1, h - 1)
+    nonempty = csr.degree > 0
+    preceding[indptr[:-1][nonempty]] = indptr[1:][nonempty] - 1
+    predecessor = zeros(h, dtype=int)
+    predecessor[ordered] = ordered[preceding]
+
+    # the face of halfedge (u, v) continues with the predecessor of (v, u) around v
+
+    twin = halfedge_index(cols, rows)
+    following = predecessor[twin].tolist()
+
+    ordered = cols[ordered].tolist()
+    indptr = indptr.tolist()
+    tails = rows.tolist()
+    if not csr._identity:
+        ordered = [keys[i] for i in ordered]
+        tails = [keys[i] for i in tails]
+    vertex = network.vertex
+    for i, key in enumerate(keys):
+        vertex[key]['sorted_neighbours'] = ordered[indptr[i]:indptr[i + 1]]
+
+    # walk the cycles of the permutation
+    # starting from the same halfedges, in the same order, as the wall follower
+
+    # the faces are added directly, since all their edges and halfedges exist
+
+    u, v = _find_first_halfedge(network)
+    edges = csr.edges
+    first = halfedge_index(array([csr.key_index[u]]), array([csr.key_index[v]]))
+    halfedges = column_stack((halfedge_index(edges[:, 0], edges[:, 1]), halfedge_index(edges[:, 1], edges[:, 0])))
+    face = network.face
+    facedata = network.facedata
+    attr = network.default_face_attributes
+    fkeys = [None] * h
+    for start in first.tolist() + halfedges.ravel().tolist():
+        if fkeys[start] is not None:
+            continue
+        fkey = network._get_facekey(None)
+        cycle = []
+        current = start
+        while True:
+            fkeys[current] = fkey
+            cycle.append(tails[current])
+            current = following[current]
+            if current == start:
+                break
+        cycle.append(cycle[0])
+        face[fkey] = cycle
+        facedata[fkey] = attr.copy()
+    heads = cols.tolist()
+    if not csr._identity:
+        heads = [keys[i] for i in heads]
+    halfedge = network.halfedge
+    for u, v, fkey in zip(tails, heads, fkeys):
+        halfedge[u][v] = fkey
+
+
+def _find_first_halfedge(network):
+    leaves = network.leaves()
+    if not leaves:
+        leaves = network.vertex
+    u = min(leaves, key=lambda key: (network.vertex[key]['y'], network.vertex[key]['x']))
+    v = _find_first_neighbour(u, network)
+    return u, v
 
 
 def _find_first_neighbour(key, network):
@@ -256,20 +402,24 @@ def _sort_neighbours(network, ccw=True):
 
 
 def _find_edge_face(u, v, network):
+    # the face is complete when the walk returns to the first halfedge
+    # a face can visit the same vertex more than once (e.g. around a leaf)
+    start = u, v
     cycle = [u]
     while True:
         cycle.append(v)
         nbrs = network.vertex[v]['sorted_neighbours']
         nbr = nbrs[nbrs.index(u) - 1]
         u, v = v, nbr
-        if v == cycle[0]:
-            cycle.append(v)
+        if (u, v) == start:
             break
     fkey = network.add_face(cycle)
     return fkey
 
 
 def _break_faces(network, breakpoints):
+    if not breakpoints:
+        return
     breakpoints = set(breakpoints)
     for fkey, vertices in network.face.items():
         faces = []
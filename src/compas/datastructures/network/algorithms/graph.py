@@ -6,6 +6,9 @@ from math import sin
 from compas.geometry.planar import angle_smallest_vectors_2d
 from compas.geometry.planar import is_intersection_segment_segment_2d
 
+from compas.datastructures.network.algorithms.planarity import _planar_rotation
+from compas.datastructures.network.algorithms.planarity import _network_adjacency
+
 
 __author__     = 'Tom Van Mele'
 __copyright__  = 'Copyright 2014, Block Research Group - ETH Zurich'
@@ -25,66 +28,218 @@ __all__ = [
 ]
 
 
-def is_network_crossed(network):
-    for u1, v1 in network.edges_iter():
-        for u2, v2 in network.edges_iter():
+# ==============================================================================
+# crossings
+# ==============================================================================
+
+
+# the edges are sorted into the cells of a uniform grid
+# only the pairs of edges that share a cell are tested for crossings
+# the size of the cells is the average size of the edges
+# edges that span many cells are tested against all other edges directly
+# pairs are tested in batches, such that the search can stop at the first crossing
+
+_MAX_EDGE_CELLS = 64
+_BATCHSIZE = 1000000
+
+
+def _network_xy_edges(network):
+    keys = list(network.vertex)
+    key_index = dict(zip(keys, range(len(keys))))
+    xy = [(network.vertex[key]['x'], network.vertex[key]['y']) for key in keys]
+    uv = list(network.edges_iter())
+    edges = [(key_index[u], key_index[v]) for u, v in uv]
+    return xy, edges, uv
+
+
+def _edge_crossings(xy, edges, stop=False):
+    """Find the pairs of edges that cross.
+
+    Parameters:
+        xy (list) : The XY coordinates of the vertices.
+        edges (list) : The edges, as pairs of indices into the list of vertices.
+        stop (bool) : Optional. Stop at the first crossing. Default is ``False``.
+
+    Returns:
+        list : The crossing pairs of edges, as pairs of indices into the list of edges,
+        in the order of a nested loop over the edges.
+
+    Note:
+        Edges that share a vertex are not tested.
+        As with :func:`is_intersection_segment_segment_2d`, a pair of edges
+        ``(i, j)`` is tested with edge ``i`` as the first segment, and is listed
+        separately from the pair ``(j, i)``.
+
+    """
+    try:
+        import numpy
+    except ImportError:
+        return _edge_crossings_python(xy, edges, stop)
+    return _edge_crossings_numpy(xy, edges, stop)
+
+
+def _edge_crossings_python(xy, edges, stop):
+    pairs = []
+    for i, (u1, v1) in enumerate(edges):
+        for j, (u2, v2) in enumerate(edges):
             if u1 == u2 or v1 == v2 or u1 == v2 or u2 == v1:
                 continue
-            else:
-                a = network.vertex[u1]['x'], network.vertex[u1]['y']
-                b = network.vertex[v1]['x'], network.vertex[v1]['y']
-                c = network.vertex[u2]['x'], network.vertex[u2]['y']
-                d = network.vertex[v2]['x'], network.vertex[v2]['y']
-                if is_intersection_segment_segment_2d((a, b), (c, d)):
-                    return True
-    return False
+            if is_intersection_segment_segment_2d((xy[u1], xy[v1]), (xy[u2], xy[v2])):
+                pairs.append((i, j))
+                if stop:
+                    return pairs
+    return pairs
+
+
+def _ccw(a, b, c):
+    # is_ccw_2d, for arrays of points
+    return (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]) > 0
+
+
+def _test_pairs(xy, edges, i, j):
+    # test the pairs (i, j) and (j, i) as is_intersection_segment_segment_2d would
+    from numpy import concatenate
+    ui, vi = edges[i, 0], edges[i, 1]
+    uj, vj = edges[j, 0], edges[j, 1]
+    keep = (ui != uj) & (vi != vj) & (ui != vj) & (uj != vi)
+    i, j = i[keep], j[keep]
+    ui, vi, uj, vj = ui[keep], vi[keep], uj[keep], vj[keep]
+    a, b, c, d = xy[ui], xy[vi], xy[uj], xy[vj]
+    ij = (_ccw(a, c, d) != _ccw(b, c, d)) & (_ccw(a, b, c) != _ccw(a, b, d))
+    ji = (_ccw(c, a, b) != _ccw(d, a, b)) & (_ccw(c, d, a) != _ccw(c, d, b))
+    return concatenate((i[ij], j[ji])), concatenate((j[ij], i[ji]))
+
+
+def _edge_crossings_numpy(xy, edges, stop):
+    from numpy import arange
+    from numpy import asarray
+    from numpy import concatenate
+    from numpy import cumsum
+    from numpy import float64
+    from numpy import floor
+    from numpy import int64
+    from numpy import lexsort
+    from numpy import maximum
+    from numpy import minimum
+    from numpy import repeat
+    from numpy import searchsorted
+    from numpy import zeros
+
+    xy = asarray(xy, dtype=float64).reshape((-1, 2))
+    edges = asarray(edges, dtype=int64).reshape((-1, 2))
+    m = edges.shape[0]
+    if not m:
+        return []
+
+    a = xy[edges[:, 0]]
+    b = xy[edges[:, 1]]
+    lo = minimum(a, b)
+    hi = maximum(a, b)
+
+    # the grid cells covered by the bounding box of every edge
+
+    size = (hi - lo).max(axis=1).mean()
+    if not size > 0:
+        size = 1.0
+    origin = lo.min(axis=0)
+    c0 = floor((lo - origin) / size).astype(int64)
+    c1 = floor((hi - origin) / size).astype(int64)
+    span = c1 - c0 + 1
+    count = span[:, 0] * span[:, 1]
+    ny = int(c1[:, 1].max()) + 1
+
+    found_i = []
+    found_j = []
+
+    def found(i, j):
+        i, j = _test_pairs(xy, edges, i, j)
+        found_i.append(i)
+        found_j.append(j)
+        return stop and i.shape[0] > 0
+
+    # the long edges are tested against all other edges with an overlapping bounding box
+
+    islong = count > _MAX_EDGE_CELLS
+    for i in islong.nonzero()[0]:
+        j = ((lo[:, 0] <= hi[i, 0]) & (hi[:, 0] >= lo[i, 0]) &
+             (lo[:, 1] <= hi[i, 1]) & (hi[:, 1] >= lo[i, 1]))
+        j[i] = False
+        j[:i] &= ~islong[:i]
+        j = j.nonzero()[0]
+        if found(repeat(i, j.shape[0]), j):
+            break
+    else:
+
+        # the short edges are listed once per cell, sorted by cell
+
+        short = (~islong).nonzero()[0]
+        count = count[short]
+        e = repeat(short, count)
+        k = arange(e.shape[0]) - repeat(cumsum(count) - count, count)
+        cx = c0[e, 0] + k // span[e, 1]
+        cy = c0[e, 1] + k % span[e, 1]
+        cell = cx * ny + cy
+        order = lexsort((e, cell))
+        e, cell = e[order], cell[order]
+
+        # the pairs of edges per cell, generated in batches of whole cells
+        # every entry is paired with the entries after it in the same cell
+
+        stops = searchsorted(cell, cell, side='right')
+        npairs = stops - arange(e.shape[0]) - 1
+        total = cumsum(npairs)
+        start = 0
+        while start < e.shape[0]:
+            done = 0 if not start else total[start - 1]
+            end = int(searchsorted(total, done + _BATCHSIZE, side='right'))
+            end = max(end, start + 1)
+            end = int(stops[end - 1])
+            n = npairs[start:end]
+            p = repeat(arange(start, end), n)
+            q = p + 1 + arange(p.shape[0]) - repeat(cumsum(n) - n, n)
+            i = minimum(e[p], e[q])
+            j = maximum(e[p], e[q])
+            # every pair is tested only in the cell at the lower-left corner
+            # of the intersection of the bounding boxes
+            x = maximum(c0[i, 0], c0[j, 0])
+            y = maximum(c0[i, 1], c0[j, 1])
+            keep = (x * ny + y == cell[p]) & (minimum(c1[i, 0], c1[j, 0]) >= x) & (minimum(c1[i, 1], c1[j, 1]) >= y)
+            if found(i[keep], j[keep]):
+                break
+            start = end
+
+    if not found_i:
+        return []
+    i = concatenate(found_i)
+    j = concatenate(found_j)
+    order = lexsort((j, i))
+    pairs = list(zip(i[order].tolist(), j[order].tolist()))
+    if stop:
+        return pairs[:1]
+    return pairs
+
+
+def is_network_crossed(network):
+    xy, edges, uv = _network_xy_edges(network)
+    return len(_edge_crossings(xy, edges, stop=True)) > 0
 
 
 def are_network_edges_crossed(edges, vertices):
-    for u1, v1 in edges:
-        for u2, v2 in edges:
-            if u1 == u2 or v1 == v2 or u1 == v2 or u2 == v1:
-                continue
-            else:
-                a = vertices[u1]
-                b = vertices[v1]
-                c = vertices[u2]
-                d = vertices[v2]
-                if is_intersection_segment_segment_2d((a, b), (c, d)):
-                    return True
-    return False
+    keys = list(set(key for edge in edges for key in edge))
+    key_index = dict(zip(keys, range(len(keys))))
+    xy = [(vertices[key][0], vertices[key][1]) for key in keys]
+    edges = [(key_index[u], key_index[v]) for u, v in edges]
+    return len(_edge_crossings(xy, edges, stop=True)) > 0
 
 
 def count_network_crossings(network):
-    count = 0
-    for u1, v1 in network.edges_iter():
-        for u2, v2 in network.edges_iter():
-            if u1 == u2 or v1 == v2 or u1 == v2 or u2 == v1:
-                continue
-            else:
-                a = network.vertex[u1]['x'], network.vertex[u1]['y']
-                b = network.vertex[v1]['x'], network.vertex[v1]['y']
-                c = network.vertex[u2]['x'], network.vertex[u2]['y']
-                d = network.vertex[v2]['x'], network.vertex[v2]['y']
-                if is_intersection_segment_segment_2d((a, b), (c, d)):
-                    count += 1
-    return count
+    xy, edges, uv = _network_xy_edges(network)
+    return len(_edge_crossings(xy, edges))
 
 
 def find_network_crossings(network):
-    crossings = []
-    for u1, v1 in network.edges_iter():
-        for u2, v2 in network.edges_iter():
-            if u1 == u2 or v1 == v2 or u1 == v2 or u2 == v1:
-                continue
-            else:
-                a = network.vertex_coordinates(u1, 'xy')
-                b = network.vertex_coordinates(v1, 'xy')
-                c = network.vertex_coordinates(u2, 'xy')
-                d = network.vertex_coordinates(v2, 'xy')
-                if is_intersection_segment_segment_2d((a, b), (c, d)):
-                    crossings.append(((u1, v1), (u2, v2)))
-    return crossings
+    xy, edges, uv = _network_xy_edges(network)
+    return [(uv[i], uv[j]) for i, j in _edge_crossings(xy, edges)]
 
 
 def is_network_2d(network):
@@ -106,9 +261,11 @@ def is_network_planar(network):
     the plane exists, and, furthermore, that straight-line embedding in the plane
     exists.
 
-    Warning:
-        This function uses the python binding of the *edge addition planarity suite*
-        in the background. The package is available on GitHub: https://github.com/hagberg/planarity.
+    The network is tested with the left-right planarity test, in linear time.
+    The geometry of the network is not taken into account.
+
+    See also:
+        :func:`compas.datastructures.network.algorithms.network_planar_embedding`
 
     Parameters:
         network (compas.datastructures.network.Network): The network object.
@@ -116,9 +273,6 @@ def is_network_planar(network):
     Returns:
         bool: ``True`` if the network is planar. ``False`` otherwise.
 
-    Raises:
-        ImportError: If the planarity package is not installed.
-
     Example:
 
         .. plot::
@@ -132,8 +286,8 @@ def is_network_planar(network):
 
             network = Network.from_obj(compas.get_data('lines.obj'))
 
-            network.add_edge(21, 29)
-            network.add_edge(17, 28)
+            network.add_edge(8, 15)
+            network.add_edge(9, 14)
 
             if not is_network_planar(network):
                 crossings = find_network_crossings(network)
@@ -145,12 +299,8 @@ def is_network_planar(network):
             )
 
     """
-    try:
-        import planarity
-    except ImportError:
-        print("Planarity is not installed. Get Planarity at https://github.com/hagberg/planarity.")
-        raise
-    return planarity.is_planar(network.edges())
+    keys, adjacency = _network_adjacency(network)
+    return _planar_rotation(adjacency) is not None
 
 
 # is it embedded in the plane without crossing (curved) edges
@@ -179,8 +329,18 @@ def embed_network_in_plane(network, fix=None, straightline=True):
         ``True`` if the embedding was successful.
         ``False`` otherwise.
 
-    Raises:
-        ImportError: If NetworkX is not installed.
+    Note:
+        The network is embedded natively, by placing the vertices of its largest
+        face on a circle and every other vertex at the centroid of its neighbours
+        (a Tutte embedding [tutte1963]_), using the combinatorial embedding of
+        :func:`compas.datastructures.network.algorithms.network_planar_embedding`.
+        If that does not produce an embedding without crossings, and NetworkX is
+        installed, a spring layout is tried instead.
+        Leaves are not taken into account.
+        Requires NumPy.
+
+    References:
+        .. [tutte1963] Tutte, W.T. *How to draw a graph*. 1963.
 
     Example:
 
@@ -194,7 +354,7 @@ def embed_network_in_plane(network, fix=None, straightline=True):
             network = Network.from_obj(compas.get_data('fink.obj'))
             embedding = network.copy()
 
-            fix = (1, 12)
+            fix = (6, 9)
 
             if embed_network_in_plane(embedding, fix=fix):
 
@@ -224,37 +384,11 @@ def embed_network_in_plane(network, fix=None, straightline=True):
                 )
 
     """
-    try:
-        import networkx as nx
-    except ImportError:
-        print("NetworkX is not installed. Get NetworkX at https://networkx.github.io/.")
-        raise
-    count = 100
-    is_embedded = False
     edges = [(u, v) for u, v in network.edges_iter() if not network.is_vertex_leaf(u) and not network.is_vertex_leaf(v)]
-    #
-    x = network.get_vertices_attribute('x')
-    y = network.get_vertices_attribute('y')
-    xmin, xmax = min(x), max(x)
-    ymin, ymax = min(y), max(y)
-    xspan = xmax - xmin
-    yspan = ymax - ymin
-    n = len(network)
-    # k = 15. / (n ** 0.5)
-    #
-    while count:
-        graph = nx.Graph(edges)
-        pos = nx.spring_layout(graph,
-                               2,
-                               iterations=100,
-                               # fixed=fix,
-                               # pos={key: network.vertex_coordinates(key, 'xy') for key in network if not network.is_vertex_leaf(key)},
-                               scale=max(xspan, yspan))
-        if not are_network_edges_crossed(edges, pos):
-            is_embedded = True
-            break
-        count -= 1
-    if not is_embedded:
+    pos = _tutte_embedding(network, edges)
+    if pos is None or are_network_edges_crossed(edges, pos):
+        pos = _spring_embedding(network, edges)
+    if pos is None:
         return False
     if fix:
         a, b = fix
@@ -288,6 +422,167 @@ def embed_network_in_plane(network, fix=None, straightline=True):
     return True
 
 
+def _network_span(network):
+    x = network.get_vertices_attribute('x')
+    y = network.get_vertices_attribute('y')
+    xmin, xmax = min(x), max(x)
+    ymin, ymax = min(y), max(y)
+    return xmin, xmax, ymin, ymax
+
+
+def _rotation_faces(rotation):
+    # walk the faces of a rotation system
+    # the face of halfedge (u, v) continues with the neighbour of v after u
+    position = [dict((nbr, i) for i, nbr in enumerate(nbrs)) for nbrs in rotation]
+    seen = set()
+    faces = []
+    for u, nbrs in enumerate(rotation):
+        for v in nbrs:
+            if (u, v) in seen:
+                continue
+            face = []
+            while (u, v) not in seen:
+                seen.add((u, v))
+                face.append(u)
+                nbrs_v = rotation[v]
+                u, v = v, nbrs_v[(position[v][u] + 1) % len(nbrs_v)]
+            faces.append(face)
+    return faces
+
+
+def _tutte_embedding(network, edges):
+    from numpy import arange
+    from numpy import array
+    from numpy import bincount
+    from numpy import cos as npcos
+    from numpy import dot
+    from numpy import float64
+    from numpy import pi
+    from numpy import sin as npsin
+    from numpy import zeros
+
+    used = set(key for edge in edges for key in edge)
+    keys = [key for key in network if key in used]
+    if len(keys) < 3:
+        return None
+    key_index = dict(zip(keys, range(len(keys))))
+    n = len(keys)
+    adjacency = [set() for _ in range(n)]
+    for u, v in edges:
+        i, j = key_index[u], key_index[v]
+        if i != j:
+            adjacency[i].add(j)
+            adjacency[j].add(i)
+    adjacency = [sorted(nbrs) for nbrs in adjacency]
+
+    # a connected, planar graph is required
+
+    tovisit = [0]
+    visited = set(tovisit)
+    while tovisit:
+        for j in adjacency[tovisit.pop()]:
+            if j not in visited:
+                visited.add(j)
+                tovisit.append(j)
+    if len(visited) < n:
+        return None
+    rotation = _planar_rotation(adjacency)
+    if rotation is None:
+        return None
+
+    # the vertices of the largest face on a circle
+
+    faces = _rotation_faces(rotation)
+    exterior = max(faces, key=len)
+    boundary = []
+    for i in exterior:
+        if i not in boundary:
+            boundary.append(i)
+    if len(boundary) < 3:
+        return None
+
+    # a dummy vertex in every other face, connected to all vertices of the face
+    # turns the graph into a triangulation
+    # which guarantees an embedding with convex faces if the graph is biconnected
+
+    for face in faces:
+        if face is exterior:
+            continue
+        vertices = list(set(face))
+        if len(vertices) > 3:
+            for i in vertices:
+                adjacency[i].append(len(adjacency))
+            adjacency.append(vertices)
+    m = n
+    n = len(adjacency)
+    xmin, xmax, ymin, ymax = _network_span(network)
+    radius = 0.5 * max(xmax - xmin, ymax - ymin) or 1.0
+    angles = 2 * pi * arange(len(boundary)) / len(boundary)
+    xy = zeros((n, 2), dtype=float64)
+    xy[boundary, 0] = 0.5 * (xmin + xmax) + radius * npcos(angles)
+    xy[boundary, 1] = 0.5 * (ymin + ymax) + radius * npsin(angles)
+
+    # the other vertices at the centroid of their neighbours
+    # by solving the laplacian system of the free vertices with conjugate gradients
+
+    fixed = zeros(n, dtype=bool)
+    fixed[boundary] = True
+    free = (~fixed).nonzero()[0]
+    rows = array([i for i, nbrs in enumerate(adjacency) for j in nbrs])
+    cols = array([j for nbrs in adjacency for j in nbrs])
+    degree = bincount(rows, minlength=n).astype(float64)
+    inner = ~fixed[rows] & ~fixed[cols]
+    outer = ~fixed[rows] & fixed[cols]
+    rows_ff, cols_ff = rows[inner], cols[inner]
+
+    def laplacian(x):
+        y = degree * x - bincount(rows_ff, weights=x[cols_ff], minlength=n)
+        y[fixed] = 0
+        return y
+
+    for k in range(2):
+        b = bincount(rows[outer], weights=xy[cols[outer], k], minlength=n)
+        x = zeros(n, dtype=float64)
+        x[free] = b[free] / degree[free]
+        r = b - laplacian(x)
+        p = r.copy()
+        rr = dot(r, r)
+        tol = 1e-24 * max(1.0, dot(b, b))
+        for _ in range(10 * n):
+            if rr <= tol:
+                break
+            Ap = laplacian(p)
+            alpha = rr / dot(p, Ap)
+            x += alpha * p
+            r -= alpha * Ap
+            rr, rr_old = dot(r, r), rr
+            p = r + (rr / rr_old) * p
+        xy[free, k] = x[free]
+    xy = xy[:m]
+    return dict((key, xy[key_index[key]].tolist()) for key in keys)
+
+
+def _spring_embedding(network, edges):
+    try:
+        import networkx as nx
+    except ImportError:
+        return None
+    count = 100
+    xmin, xmax, ymin, ymax = _network_span(network)
+    xspan = xmax - xmin
+    yspan = ymax - ymin
+    while count:
+        graph = nx.Graph(edges)
+        pos = nx.spring_layout(graph,
+                               2,
+                               iterations=100,
+                               scale=max(xspan, yspan))
+        if not are_network_edges_crossed(edges, pos):
+            return pos
+        count -= 1
+    return None
+
+
 # ==============================================================================
 # Debugging
 # ==============================================================================
@@ -301,7 +596,7 @@ if __name__ == '__main__':
     network = Network.from_obj(compas.get_data('fink.obj'))
     embedding = network.copy()
 
-    fix = (1, 12)
+    fix = (6, 9)
 
     x = network.get_vertices_attribute('x')
     y = network.get_vertices_attribute('y')
@@ -0,0 +1,511 @@
+from __future__ import print_function
+
+import gc
+
+
+__author__     = 'Tom Van Mele'
+__copyright__  = 'Copyright 2014, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = '<vanmelet@ethz.ch>'
+
+
+__all__ = [
+    'network_planar_embedding',
+]
+
+
+# ==============================================================================
+# left-right planarity test
+# ==============================================================================
+
+# the implementation follows
+# U. Brandes, The Left-Right Planarity Test, 2009
+# with the recursive depth-first searches replaced by explicit stacks
+#
+# the vertices are the integers 0 to n - 1
+# the edges are tuples (v, w), oriented by the first depth-first search
+
+
+class _Interval(object):
+
+    __slots__ = ('low', 'high')
+
+    def __init__(self, low=None, high=None):
+        self.low = low
+        self.high = high
+
+    def empty(self):
+        return self.low is None and self.high is None
+
+    def copy(self):
+        return _Interval(self.low, self.high)
+
+    def conflicting(self, b, lowpt):
+        return not self.empty() and lowpt[self.high] > lowpt[b]
+
+
+class _ConflictPair(object):
+
+    __slots__ = ('left', 'right')
+
+    def __init__(self, left=None, right=None):
+        self.left = left or _Interval()
+        self.right = right or _Interval()
+
+    def swap(self):
+        self.left, self.right = self.right, self.left
+
+    def lowest(self, lowpt):
+        if self.left.empty():
+            return lowpt[self.right.low]
+        if self.right.empty():
+            return lowpt[self.left.low]
+        return min(lowpt[self.left.low], lowpt[self.right.low])
+
+
+class _LRPlanarity(object):
+
+    def __init__(self, adjacency):
+        n = len(adjacency)
+        self.n = n
+        self.adjacency = adjacency
+        self.m = sum(len(nbrs) for nbrs in adjacency) // 2
+        self.roots = []
+        self.height = [None] * n
+        self.parent_edge = [None] * n
+        self.out = [[] for _ in range(n)]
+        self.ordered = None
+        self.lowpt = {}
+        self.lowpt2 = {}
+        self.nesting_depth = {}
+        self.ref = {}
+        self.side = {}
+        self.stack = []
+        self.stack_bottom = {}
+        self.lowpt_edge = {}
+        self.left_ref = {}
+        self.right_ref = {}
+        self.cw = [{} for _ in range(n)]
+        self.ccw = [{} for _ in range(n)]
+        self.first = [None] * n
+
+    def run(self):
+        n = self.n
+        if n > 2 and self.m > 3 * n - 6:
+            return False
+        for v in range(n):
+            if self.height[v] is None:
+                self.height[v] = 0
+                self.roots.append(v)
+                self._orientation(v)
+        depth = self.nesting_depth
+        self.ordered = [sorted(self.out[v], key=lambda w: depth[v, w]) for v in range(n)]
+        for v in self.roots:
+            if not self._testing(v):
+                return False
+        for v in range(n):
+            for w in self.out[v]:
+                depth[v, w] = self._sign((v, w)) * depth[v, w]
+        for v in range(n):
+            self.ordered[v] = sorted(self.out[v], key=lambda w: depth[v, w])
+            previous = None
+            for w in self.ordered[v]:
+                self._add_cw(v, w, previous)
+                previous = w
+        for v in self.roots:
+            self._embedding(v)
+        return True
+
+    # --------------------------------------------------------------------------
+    # phase 1: orientation and nesting depths
+    # --------------------------------------------------------------------------
+
+    def _orientation(self, root):
+        adjacency = self.adjacency
+        height = self.height
+        parent_edge = self.parent_edge
+        lowpt = self.lowpt
+        lowpt2 = self.lowpt2
+        depth = self.nesting_depth
+        out = self.out
+        oriented = set()
+        index = {}
+        resume = set()
+        tovisit = [root]
+        while tovisit:
+            v = tovisit.pop()
+            e = parent_edge[v]
+            nbrs = adjacency[v]
+            i = index.get(v, 0)
+            while i < len(nbrs):
+                w = nbrs[i]
+                vw = v, w
+                if vw not in resume:
+                    if vw in oriented or (w, v) in oriented:
+                        i += 1
+                        continue
+                    oriented.add(vw)
+                    out[v].append(w)
+                    lowpt[vw] = height[v]
+                    lowpt2[vw] = height[v]
+                    if height[w] is None:
+                        # tree edge
+                        # revisit v after the subtree of w is done
+                        parent_edge[w] = vw
+                        height[w] = height[v] + 1
+                        resume.add(vw)
+                        index[v] = i
+                        tovisit.append(v)
+                        tovisit.append(w)
+                        break
+                    # back edge
+                    lowpt[vw] = height[w]
+                depth[vw] = 2 * lowpt[vw]
+                if lowpt2[vw] < height[v]:
+                    # chordal
+                    depth[vw] += 1
+                if e is not None:
+                    if lowpt[vw] < lowpt[e]:
+                        lowpt2[e] = min(lowpt[e], lowpt2[vw])
+                        lowpt[e] = lowpt[vw]
+                    elif lowpt[vw] > lowpt[e]:
+                        lowpt2[e] = min(lowpt2[e], lowpt[vw])
+                    else:
+                        lowpt2[e] = min(lowpt2[e], lowpt2[vw])
+                i += 1
+            else:
+                index[v] = i
+
+    # --------------------------------------------------------------------------
+    # phase 2: testing
+    # --------------------------------------------------------------------------
+
+    def _testing(self, root):
+        ordered = self.ordered
+        height = self.height
+        parent_edge = self.parent_edge
+        lowpt = self.lowpt
+        lowpt_edge = self.lowpt_edge
+        stack = self.stack
+        index = {}
+        resume = set()
+        tovisit = [root]
+        while tovisit:
+            v = tovisit.pop()
+            e = parent_edge[v]
+            nbrs = ordered[v]
+            i = index.get(v, 0)
+            descend = False
+            while i < len(nbrs):
+                w = nbrs[i]
+                ei = v, w
+                if ei not in resume:
+                    self.stack_bottom[ei] = stack[-1] if stack else None
+                    if ei == parent_edge[w]:
+                        # tree edge
+                        resume.add(ei)
+                        index[v] = i
+                        tovisit.append(v)
+                        tovisit.append(w)
+                        descend = True
+                        break
+                    # back edge
+                    lowpt_edge[ei] = ei
+                    stack.append(_ConflictPair(right=_Interval(ei, ei)))
+                # integrate the new return edges
+                if lowpt[ei] < height[v]:
+                    if w == nbrs[0]:
+                        lowpt_edge[e] = lowpt_edge[ei]
+                    elif not self._add_constraints(ei, e):
+                        return False
+                i += 1
+            if descend:
+                continue
+            index[v] = i
+            if e is not None:
+                self._remove_back_edges(e)
+        return True
+
+    def _add_constraints(self, ei, e):
+        lowpt = self.lowpt
+        ref = self.ref
+        stack = self.stack
+        bottom = self.stack_bottom[ei]
+        P = _ConflictPair()
+        # merge the return edges of ei into P.right
+        while True:
+            Q = stack.pop()
+            if not Q.left.empty():
+                Q.swap()
+            if not Q.left.empty():
+                return False
+            if lowpt[Q.right.low] > lowpt[e]:
+                if P.right.empty():
+                    P.right = Q.right.copy()
+                else:
+                    ref[P.right.low] = Q.right.high
+                P.right.low = Q.right.low
+            else:
+                ref[Q.right.low] = self.lowpt_edge[e]
+            if (stack[-1] if stack else None) is bottom:
+                break
+        # merge the conflicting return edges of the previous edges into P.left
+        while stack and (stack[-1].left.conflicting(ei, lowpt) or stack[-1].right.conflicting(ei, lowpt)):
+            Q = stack.pop()
+            if Q.right.conflicting(ei, lowpt):
+                Q.swap()
+            if Q.right.conflicting(ei, lowpt):
+                return False
+            ref[P.right.low] = Q.right.high
+            if Q.right.low is not None:
+                P.right.low = Q.right.low
+            if P.left.empty():
+                P.left = Q.left.copy()
+            else:
+                ref[P.left.low] = Q.left.high
+            P.left.low = Q.left.low
+        if not (P.left.empty() and P.right.empty()):
+            stack.append(P)
+        return True
+
+    def _remove_back_edges(self, e):
+        lowpt = self.lowpt
+        ref = self.ref
+        side = self.side
+        stack = self.stack
+        u = e[0]
+        hu = self.height[u]
+        # trim the back edges that end at the parent u
+        while stack and stack[-1].lowest(lowpt) == hu:
+            P = stack.pop()
+            if P.left.low is not None:
+                side[P.left.low] = -1
+        if stack:
+            P = stack.pop()
+            while P.left.high is not None and P.left.high[1] == u:
+                P.left.high = ref.get(P.left.high)
+            if P.left.high is None and P.left.low is not None:
+                ref[P.left.low] = P.right.low
+                side[P.left.low] = -1
+                P.left.low = None
+            while P.right.high is not None and P.right.high[1] == u:
+                P.right.high = ref.get(P.right.high)
+            if P.right.high is None and P.right.low is not None:
+                ref[P.right.low] = P.left.low
+                side[P.right.low] = -1
+                P.right.low = None
+            stack.append(P)
+        # the side of e is the side of a highest return edge
+        if lowpt[e] < hu:
+            hl = stack[-1].left.high
+            hr = stack[-1].right.high
+            if hl is not None and (hr is None or lowpt[hl] > lowpt[hr]):
+                ref[e] = hl
+            else:
+                ref[e] = hr
+
+    def _sign(self, e):
+        ref = self.ref
+        side = self.side
+        previous = {}
+        tosign = [e]
+        while tosign:
+            e = tosign.pop()
+            r = ref.get(e)
+            if r is not None:
+                # sign the referenced edge first
+                tosign.append(e)
+                tosign.append(r)
+                previous[e] = r
+                ref[e] = None
+            else:
+                r = previous.get(e)
+                if r is not None:
+                    side[e] = side.get(e, 1) * side.get(r, 1)
+        return side.get(e, 1)
+
+    # --------------------------------------------------------------------------
+    # phase 3: embedding
+    # --------------------------------------------------------------------------
+
+    def _add_cw(self, v, w, reference):
+        cw = self.cw[v]
+        ccw = self.ccw[v]
+        if reference is None:
+            cw[w] = w
+            ccw[w] = w
+            self.first[v] = w
+            return
+        after = cw[reference]
+        cw[w] = after
+        ccw[w] = reference
+        cw[reference] = w
+        ccw[after] = w
+
+    def _add_ccw(self, v, w, reference):
+        if reference is None:
+            self._add_cw(v, w, None)
+            return
+        self._add_cw(v, w, self.ccw[v][reference])
+        if reference == self.first[v]:
+            self.first[v] = w
+
+    def _add_first(self, v, w):
+        if self.first[v] is None:
+            self._add_cw(v, w, None)
+        else:
+            self._add_ccw(v, w, self.first[v])
+
+    def _embedding(self, root):
+        ordered = self.ordered
+        parent_edge = self.parent_edge
+        side = self.side
+        left_ref = self.left_ref
+        right_ref = self.right_ref
+        index = {}
+        tovisit = [root]
+        while tovisit:
+            v = tovisit.pop()
+            nbrs = ordered[v]
+            i = index.get(v, 0)
+            while i < len(nbrs):
+                w = nbrs[i]
+                i += 1
+                index[v] = i
+                if (v, w) == parent_edge[w]:
+                    # tree edge
+                    self._add_first(w, v)
+                    left_ref[v] = w
+                    right_ref[v] = w
+                    tovisit.append(v)
+                    tovisit.append(w)
+                    break
+                # back edge
+                if side.get((v, w), 1) == 1:
+                    self._add_cw(w, v, right_ref.get(w))
+                else:
+                    self._add_ccw(w, v, left_ref.get(w))
+                    left_ref[w] = v
+
+    def rotation(self):
+        rotation = []
+        for v in range(self.n):
+            first = self.first[v]
+            nbrs = []
+            if first is not None:
+                cw = self.cw[v]
+                nbr = first
+                while True:
+                    nbrs.append(nbr)
+                    nbr = cw[nbr]
+                    if nbr == first:
+                        break
+            rotation.append(nbrs)
+        return rotation
+
+
+def _planar_rotation(adjacency):
+    """Compute a planar rotation system of a graph.
+
+    Parameters:
+        adjacency (list) : The neighbours of every vertex, as lists of vertex indices.
+            The graph should be undirected, and have no loops or multiple edges.
+
+    Returns:
+        list : Per vertex, the neighbours in (clockwise) cyclic order around the vertex,
+        or ``None`` if the graph is not planar.
+
+    """
+    # the garbage collector only slows down the creation of the many small
+    # objects of the test, none of which are part of a reference cycle
+    gcenabled = gc.isenabled()
+    gc.disable()
+    try:
+        lr = _LRPlanarity(adjacency)
+        if not lr.run():
+            return None
+        return lr.rotation()
+    finally:
+        if gcenabled:
+            gc.enable()
+
+
+def _network_adjacency(network):
+    # the integer adjacency of the network without loops
+    try:
+        csr = network.csr()
+    except ImportError:
+        keys = list(network.vertex)
+        key_index = dict(zip(keys, range(len(keys))))
+        adjacency = [[key_index[nbr] for nbr in network.halfedge[key]] for key in keys]
+    else:
+        keys = csr.keys
+        adjacency = csr.adjacency()
+    adjacency = [[j for j in nbrs if j != i] for i, nbrs in enumerate(adjacency)]
+    return keys, adjacency
+
+
+def network_planar_embedding(network):
+    """Compute a combinatorial planar embedding of a network.
+
+    The embedding is computed with the left-right planarity test [brandes2009]_,
+    in linear time, without relying on the geometry of the network.
+
+    Parameters:
+        network (compas.datastructures.network.Network): The network object.
+
+    Returns:
+        dict: A rotation system, which maps every vertex to a list with its neighbours
+        in cyclic order around the vertex, such that the network can be drawn in
+        the plane without crossings.
+        ``None`` if the network is not planar.
+
+    Note:
+        The cyclic order is only defined up to a reflection of the entire embedding.
+        For disconnected networks, the embedding is defined per connected component.
+        Loops are ignored.
+
+    References:
+        .. [brandes2009] Brandes, U. *The Left-Right Planarity Test*. 2009.
+
+    Example:
+
+        .. code-block:: python
+
+            import compas
+            from compas.datastructures.network import Network
+            from compas.datastructures.network.algorithms import network_planar_embedding
+            from compas.datastructures.network.algorithms import find_network_faces
+
+            network = Network.from_obj(compas.get_data('lines.obj'))
+
+            embedding = network_planar_embedding(network)
+
+            if embedding:
+                find_network_faces(network, embedding=embedding)
+
+    """
+    keys, adjacency = _network_adjacency(network)
+    rotation = _planar_rotation(adjacency)
+    if rotation is None:
+        return None
+    return dict((keys[i], [keys[j] for j in nbrs]) for i, nbrs in enumerate(rotation))
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
+    from compas.datastructures.network import Network
+
+    network = Network.from_obj(compas.get_data('lines.obj'))
+
+    print(network_planar_embedding(network))
+
+    network.add_edge(8, 15)
+    network.add_edge(9, 14)
+
+    print(network_planar_embedding(network))
@@ -1,3 +1,5 @@
+from itertools import chain
+
 from compas.geometry import centroid_points
 from compas.geometry import center_of_mass_polygon
 
@@ -199,6 +201,12 @@ def smooth_network_centroid(network, fixed=None, kmax=1, d=0.5, callback=None):
     if callback:
         if not callable(callback):
             raise Exception('The callback is not callable.')
+    try:
+        csr = network.csr()
+    except ImportError:
+        pass
+    else:
+        return _smooth_network_csr(network, csr, _centroids, fixed, kmax, d, callback)
     for k in range(kmax):
         key_xyz = dict((key, network.vertex_coordinates(key)) for key in network)
         for key in network:
@@ -359,6 +367,14 @@ def smooth_network_length(network, lmin, lmax, fixed=None, kmax=1, d=0.5, callba
     if callback:
         if not callable(callback):
             raise Exception('The callback is not callable.')
+    try:
+        csr = network.csr()
+    except ImportError:
+        pass
+    else:
+        def points(csr, xyz):
+            return _length_points(csr, xyz, lmin, lmax)
+        return _smooth_network_csr(network, csr, points, fixed, kmax, d, callback)
     for k in range(kmax):
         key_xyz = dict((key, network.vertex_coordinates(key)) for key in network)
         for key in network:
@@ -384,6 +400,69 @@ def smooth_network_length(network, lmin, lmax, fixed=None, kmax=1, d=0.5, callba
             callback(network, k)
 
 
+# ==============================================================================
+# Array-based smoothing
+# ==============================================================================
+
+
+# the centroid and length smoothers only depend on the coordinates of the
+# neighbours, and can therefore be computed for all vertices at once with the
+# CSR snapshot of the network (see compas.datastructures.network.csr)
+
+
+def _centroids(csr, xyz):
+    # the target points are the neighbours themselves
+    return xyz[csr.indices]
+
+
+def _length_points(csr, xyz, lmin, lmax):
+    # the neighbours moved along the edges to bring the lengths within bounds
+    sp = xyz[csr.indices]
+    ep = xyz[csr.rows()]
+    vec = ep - sp
+    lvec = (vec ** 2).sum(axis=1) ** 0.5
+    uvec = vec / lvec[:, None]
+    lvec = lvec.clip(lmin, lmax)
+    return sp + lvec[:, None] * uvec
+
+
+def _smooth_network_csr(network, csr, points, fixed, kmax, d, callback):
+    from numpy import asarray
+    from numpy import bincount
+    from numpy import float64
+    from numpy import fromiter
+    from numpy import zeros
+
+    n = len(csr)
+    rows = csr.rows()
+    free = csr.degree > 0
+    free[[csr.key_index[key] for key in fixed if key in csr.key_index]] = False
+    free = free.nonzero()[0]
+    keys = [csr.keys[i] for i in free]
+    degree = csr.degree[free].astype(float64)
+    vertex = network.vertex
+    for k in range(kmax):
+        if isinstance(vertex, dict):
+            xyz = fromiter(chain.from_iterable((vertex[key]['x'], vertex[key]['y'], vertex[key]['z']) for key in csr.keys), float64, 3 * n)
+            xyz = xyz.reshape((n, 3))
+        else:
+            xyz = asarray(network.get_vertices_attributes('xyz', keys=csr.keys, rtype='array'), dtype=float64)
+        p = points(csr, xyz)
+        c = zeros((n, 3), dtype=float64)
+        for j in range(3):
+            c[:, j] = bincount(rows, weights=p[:, j], minlength=n)
+        c = c[free] / degree[:, None]
+        xyz = xyz[free]
+        xyz += d * (c - xyz)
+        for key, x, y, z in zip(keys, xyz[:, 0].tolist(), xyz[:, 1].tolist(), xyz[:, 2].tolist()):
+            attr = network.vertex[key]
+            attr['x'] = x
+            attr['y'] = y
+            attr['z'] = z
+        if callback:
+            callback(network, k)
+
+
 # ==============================================================================
 # Debugging
 # ==============================================================================
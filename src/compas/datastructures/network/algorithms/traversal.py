@@ -2,6 +2,12 @@ from __future__ import print_function
 
 from collections import deque
 
+from itertools import chain
+
+from heapq import heapify
+from heapq import heappop
+from heapq import heappush
+
 
 __author__     = ['Tom Van Mele <vanmelet@ethz.ch>', ]
 __copyright__  = 'Copyright 2014, Block Research Group - ETH Zurich'
@@ -10,6 +16,8 @@ __email__      = 'vanmelet@ethz.ch'
 
 
 __all__ = [
+    'network_traverse',
+    'network_connected_components',
     'network_dfs',
     'network_bfs',
     'network_bfs2',
@@ -17,7 +25,9 @@ __all__ = [
     'network_bfs_paths',
     'network_shortest_path',
     'network_dijkstra_distances',
-    'network_dijkstra_path'
+    'network_dijkstra_tree',
+    'network_dijkstra_path',
+    'network_dijkstra_distance_matrix',
 ]
 
 
@@ -26,6 +36,182 @@ __all__ = [
 # @todo: move to _graph module
 
 
+# ==============================================================================
+# helpers
+# ==============================================================================
+
+
+def _adjacency_csr(adjacency, weight=None):
+    # integer-indexed adjacency in CSR format, with the weight of every entry
+    # for a network, the cached csr snapshot of its topology is used if possible
+    if hasattr(adjacency, 'csr'):
+        try:
+            csr = adjacency.csr()
+        except ImportError:
+            adjacency = adjacency.adjacency
+        else:
+            return _network_csr(csr, weight)
+    keys = list(adjacency)
+    n = len(keys)
+    key_index = dict(zip(keys, range(n)))
+    indptr = [0] * (n + 1)
+    count = 0
+    for i, u in enumerate(keys):
+        count += len(adjacency[u])
+        indptr[i + 1] = count
+    nbrs = chain.from_iterable(adjacency[u] for u in keys)
+    # with the default keys the mapping of neighbours to indices can be skipped
+    if keys == list(range(n)):
+        indices = list(nbrs)
+    else:
+        indices = list(map(key_index.__getitem__, nbrs))
+    weights = []
+    if weight is not None:
+        weights = [weight[(u, v)] for u in keys for v in adjacency[u]]
+    return keys, key_index, indptr, indices, weights
+
+
+def _network_csr(csr, weight=None):
+    keys = list(csr.keys)
+    indptr = csr.indptr.tolist()
+    indices = csr.indices.tolist()
+    weights = []
+    if weight is not None:
+        us = csr.rows().tolist()
+        if csr._identity:
+            weights = [weight[(u, v)] for u, v in zip(us, indices)]
+        else:
+            weights = [weight[(keys[u], keys[v])] for u, v in zip(us, indices)]
+    return keys, csr.key_index, indptr, indices, weights
+
+
+def _traverse(indptr, indices, roots, parent, depth_first=False):
+    # iterative traversal from one or more roots
+    # yields every vertex as soon as it is reached
+    # and records the vertex from which it was reached in parent
+    # roots are their own parent, unreached vertices have parent -1
+    # roots that were reached from a previous root are skipped
+    for root in roots:
+        if parent[root] != -1:
+            continue
+        parent[root] = root
+        yield root
+        if depth_first:
+            # the vertices on the current branch
+            # and the position of the next neighbour to try for each of them
+            stack = [root]
+            pointer = [indptr[root]]
+            while stack:
+                u = stack[-1]
+                i = pointer[-1]
+                end = indptr[u + 1]
+                while i < end and parent[indices[i]] != -1:
+                    i += 1
+                if i == end:
+                    stack.pop()
+                    pointer.pop()
+                    continue
+                pointer[-1] = i + 1
+                v = indices[i]
+                parent[v] = u
+                yield v
+                stack.append(v)
+                pointer.append(indptr[v])
+        else:
+            queue = deque([root])
+            while queue:
+                u = queue.popleft()
+                for v in indices[indptr[u]:indptr[u + 1]]:
+                    if parent[v] == -1:
+                        parent[v] = u
+                        yield v
+                        queue.append(v)
+
+
+def _parent_path(parent, index):
+    # the path from the root of the traversal to a vertex
+    path = [index]
+    while parent[path[-1]] != path[-1]:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
+
+
+# ==============================================================================
+# traversal
+# ==============================================================================
+
+
+def network_traverse(adjacency, roots, depth_first=False):
+    """Traverse a network from one or more roots, and yield every vertex
+    together with the vertex from which it was reached.
+
+    Parameters:
+        adjacency (dict): An adjacency dictionary. Each key represents a vertex
+            and maps to a list of neighbouring vertex keys.
+            Or a network, in which case the cached CSR snapshot of its topology is used.
+        roots (list): The vertices from which to start the traversal.
+            A root that was reached from a previous root is skipped.
+        depth_first (bool): Optional. Traverse depth-first instead of breadth-first.
+            Default is ``False``.
+
+    Returns:
+        generator: Yields ``(key, parent)`` tuples in visitation order.
+        The parent of a root is ``None``.
+
+    Note:
+        The traversal runs on an integer copy of the adjacency in CSR format,
+        with an array of parent pointers instead of sets of visited vertices.
+        The vertices are generated lazily, so the traversal can be stopped at any time.
+        Neighbours are visited in the order in which they are listed in the adjacency.
+
+    Examples:
+
+        .. code-block:: python
+
+            import compas
+            from compas.datastructures.network import Network
+            from compas.datastructures.network.algorithms import network_traverse
+
+            network = Network.from_obj(compas.get_data('lines.obj'))
+
+            tree = dict(network_traverse(network.adjacency, [network.vertices_iter().next()]))
+
+    """
+    keys, key_index, indptr, indices, _ = _adjacency_csr(adjacency)
+    parent = [-1] * len(keys)
+    for i in _traverse(indptr, indices, [key_index[key] for key in roots], parent, depth_first):
+        p = parent[i]
+        yield keys[i], None if p == i else keys[p]
+
+
+def network_connected_components(adjacency):
+    """Find the connected components of a network.
+
+    Parameters:
+        adjacency (dict): An adjacency dictionary. Each key represents a vertex
+            and maps to a list of neighbouring vertex keys.
+            Or a network, in which case the cached CSR snapshot of its topology is used.
+
+    Returns:
+        list: The vertices of every component, in breadth-first order.
+
+    Examples:
+        >>> import compas
+        >>> network = Network.from_obj(compas.get_data('lines.obj'))
+        >>> print(len(network_connected_components(network.adjacency)))
+
+    """
+    keys, key_index, indptr, indices, _ = _adjacency_csr(adjacency)
+    parent = [-1] * len(keys)
+    components = []
+    for i in _traverse(indptr, indices, range(len(keys)), parent):
+        if parent[i] == i:
+            components.append([])
+        components[-1].append(keys[i])
+    return components
+
+
 # ==============================================================================
 # depth-first
 # ==============================================================================
@@ -36,15 +222,16 @@ def network_dfs(adjacency, root, callback=None):
     Return all nodes of a connected component containing 'root' of a network
     represented by an adjacency dictionary.
 
-    This implementation uses a 'to visit' stack. The principle of a stack
-    is LIFO. In Python, a list is a stack.
+    This implementation keeps the nodes of the current branch on a stack,
+    together with the position of the next neighbour to try for each of them.
+    The principle of a stack is LIFO. In Python, a list is a stack.
 
     Initially only the root element is on the stack. While there are still
-    elements on the stack, the node on top of the stack is 'popped off' and if
-    this node was not already visited, its neighbours are added to the stack if
-    they hadn't already been visited themselves.
+    elements on the stack, the first unvisited neighbour of the node on top of
+    the stack is visited and added to the stack. If the node on top of the stack
+    has no unvisited neighbours left, it is 'popped off'.
 
-    Since the last element on top of the stack is always popped off, the
+    Since the last element on top of the stack is always extended first, the
     algorithm goes deeper and deeper in the datastructure, until it reaches a
     node without (unvisited) neighbours and then backtracks. Once a new node
     with unvisited neighbours is found, there too it will go as deep as possible
@@ -57,6 +244,7 @@ def network_dfs(adjacency, root, callback=None):
     Parameters:
         adjacency (dict): An adjacency dictionary. Each key represents a vertex
             and maps to a list of neighbouring vertex keys.
+            Or a network, in which case the cached CSR snapshot of its topology is used.
         root (str): The vertex from which to start the depth-first search.
         callback (callable): Optional. A function that is called on every node
             when it is found. Default is ``None``.
@@ -70,74 +258,63 @@ def network_dfs(adjacency, root, callback=None):
     Examples:
         >>> import compas
         >>> network = Network.from_obj(compas.get_data('lines.obj'))
-        >>> print(network_dfs(network, network.get_any_vertex()))
+        >>> print(network_dfs(network.adjacency, network.vertices_iter().next()))
 
     See Also:
-        ...
+        :func:`network_traverse`
 
     """
     if callback:
         assert callable(callback), 'The provided callback is not callable: {0}'.format(callback)
-    adjacency = dict((key, set(nbrs)) for key, nbrs in adjacency.iteritems())
-    tovisit = [root]
-    visited = set()
+    keys, key_index, indptr, indices, _ = _adjacency_csr(adjacency)
+    parent = [-1] * len(keys)
     tree = []
-    while tovisit:
-        # pop the last added element from the stack
-        node = tovisit.pop()
-        if node not in visited:
-            # mark the node as visited
-            visited.add(node)
-            tree.append(node)
-            # call the callback
-            if callback:
-                callback(node)
-            # add the unvisited nbrs to the stack
-            tovisit.extend(adjacency[node] - visited)
+    for i in _traverse(indptr, indices, [key_index[root]], parent, True):
+        tree.append(keys[i])
+        if callback:
+            callback(keys[i])
     return tree
 
 
-# def network_dfs_tree(adjacency, root):
-#     adjacency = dict((key, set(nbrs)) for key, nbrs in adjacency.iteritems())
-#     tovisit = [(root, [root])]
-#     visited = {}
-#     while tovisit:
-#         # a node to visit
-#         # and the nodes that have been visited to get there
-#         node, path = tovisit.pop()
-#         # add every unvisited nbr
-#         # and the path that leads to it
-#         for nbr in adjacency[node] - set(path):
-#             # if the nbr is the goal, yield the path that leads to it
-#             tovisit.append((nbr, path + [nbr]))
-#         visited[node] = path
-#     return visited
-
-
 def network_dfs_paths(adjacency, root, goal):
     """
     Yield all paths that lead from a root node to a specific goal.
 
-    The implementation is based on
-    http://eddmann.com/posts/depth-first-search-and-breadth-first-search-in-python/
+    The search backtracks over the nodes of a single path,
+    instead of storing a copy of the path for every node that remains to be visited.
+    Only the paths that reach the goal are copied.
     """
-    adjacency = dict((key, set(nbrs)) for key, nbrs in adjacency.iteritems())
-    tovisit = [(root, [root])]
-    while tovisit:
-        # get the last added node and the path that led to that node
-        node, path = tovisit.pop()
-        # add every unvisited nbr
-        # and the path that leads to it
-        for nbr in adjacency[node] - set(path):
-            # if the nbr is the goal, yield the path that leads to it
-            if nbr == goal:
-                yield path + [nbr]
-            else:
-                tovisit.append((nbr, path + [nbr]))
+    keys, key_index, indptr, indices, _ = _adjacency_csr(adjacency)
+    r = key_index[root]
+    g = key_index.get(goal, -1)
+    onpath = [False] * len(keys)
+    onpath[r] = True
+    path = [r]
+    pointer = [indptr[r]]
+    while path:
+        # the last node of the path and its next neighbour
+        u = path[-1]
+        i = pointer[-1]
+        if i == indptr[u + 1]:
+            onpath[u] = False
+            path.pop()
+            pointer.pop()
+            continue
+        pointer[-1] = i + 1
+        v = indices[i]
+        if onpath[v]:
+            continue
+        # if the nbr is the goal, yield the path that leads to it
+        if v == g:
+            yield [keys[j] for j in path] + [goal]
+        else:
+            onpath[v] = True
+            path.append(v)
+            pointer.append(indptr[v])
 
 
 # ==============================================================================
-# depth-first
+# breadth-first
 # ==============================================================================
 
 
@@ -156,6 +333,7 @@ def network_bfs(adjacency, root, callback=None):
     Parameters:
         adjacency (dict): An adjacency dictionary. Each key represents a vertex
             and maps to a list of neighbouring vertex keys.
+            Or a network, in which case the cached CSR snapshot of its topology is used.
         root (str): The vertex from which to start the breadth-first search.
         callback (callable): Optional. A function that is called on every node
             when it is found. Default is ``None``.
@@ -175,66 +353,93 @@ def network_bfs(adjacency, root, callback=None):
         and by visiting the nodes at the start of the list first, the network is
         traversed in *breadth-first* order.
 
+        The callback is called with the node from which a node was found,
+        and the found node.
+
     """
     if callback:
         assert callable(callback), 'The provided callback is not callable: {0}'.format(callback)
-    tovisit = deque([root])
-    tree = [root]
-    visited = set(tree)
-    while tovisit:
-        node = tovisit.popleft()
-        # for nbr in adjacency[node] - visited:
-        #     tovisit
-        for nbr in adjacency[node]:
-            if nbr not in visited:
-                tovisit.append(nbr)
-                visited.add(nbr)
-                tree.append(nbr)
-                if callback:
-                    callback(node, nbr)
+    keys, key_index, indptr, indices, _ = _adjacency_csr(adjacency)
+    parent = [-1] * len(keys)
+    tree = []
+    for i in _traverse(indptr, indices, [key_index[root]], parent):
+        tree.append(keys[i])
+        if callback and parent[i] != i:
+            callback(keys[parent[i]], keys[i])
     return tree
 
 
 def network_bfs2(adjacency, root):
-    adjacency = dict((key, set(nbrs)) for key, nbrs in adjacency.iteritems())
-    tovisit = deque([root])
-    visited = set()
-    while tovisit:
-        # visit all the neighbours of a node first
-        # before moving on to their respective neighbours in the same order
-        node = tovisit.popleft()
-        if node not in visited:
-            visited.add(node)
-            # add all the neighbours of the current node that have not yet been visited
-            tovisit.extend(adjacency[node] - visited)
     # returning this is pointless
     # since visited is a set
     # and sets have no order
-    return visited
+    return set(network_bfs(adjacency, root))
 
 
 def network_bfs_paths(adjacency, root, goal):
     """Return all paths from root to goal.
 
     Due to the nature of the search, the first path returned is the shortest.
+
+    Every node that remains to be visited is stored with a pointer to the entry
+    from which it was reached, instead of with a copy of the path that leads to it.
+    The entries share the beginning of their paths, so every entry takes constant memory.
+    A neighbour is on the path of an entry if it is on the chain of entries
+    that leads to it.
+    An entry is freed as soon as it and all entries reached from it are visited.
+    Only the paths that reach the goal are reconstructed.
     """
-    adjacency = dict((key, set(nbrs)) for key, nbrs in adjacency.iteritems())
-    tovisit = deque([(root, [root])])
+    keys, key_index, indptr, indices, _ = _adjacency_csr(adjacency)
+    r = key_index[root]
+    g = key_index.get(goal, -1)
+    tovisit = deque([(r, None)])
     while tovisit:
-        node, path = tovisit.popleft()
-        for nbr in adjacency[node] - set(path):
-            if nbr == goal:
-                yield path + [nbr]
+        entry = tovisit.popleft()
+        for v in indices[indptr[entry[0]]:indptr[entry[0] + 1]]:
+            node = entry
+            while node is not None and node[0] != v:
+                node = node[1]
+            if node is not None:
+                continue
+            if v == g:
+                path = [goal]
+                node = entry
+                while node is not None:
+                    path.append(keys[node[0]])
+                    node = node[1]
+                path.reverse()
+                yield path
             else:
-                tovisit.append((nbr, path + [nbr]))
+                tovisit.append((v, entry))
 
 
 def network_shortest_path(adjacency, root, goal):
-    """"""
-    try:
-        return next(network_bfs_paths(adjacency, root, goal))
-    except StopIteration:
+    """Find the path between two vertices with the fewest edges.
+
+    Parameters:
+        adjacency (dict): An adjacency dictionary. Each key represents a vertex
+            and maps to a list of neighbouring vertex keys.
+            Or a network, in which case the cached CSR snapshot of its topology is used.
+        root (str): The start vertex.
+        goal (str): The end vertex.
+
+    Returns:
+        list: The shortest path, or ``None`` if the goal cannot be reached.
+
+    Note:
+        The breadth-first search stops as soon as the goal is reached,
+        and the path is reconstructed from the parent pointers of the search.
+
+    """
+    keys, key_index, indptr, indices, _ = _adjacency_csr(adjacency)
+    if goal not in key_index:
         return None
+    g = key_index[goal]
+    parent = [-1] * len(keys)
+    for i in _traverse(indptr, indices, [key_index[root]], parent):
+        if i == g:
+            return [keys[j] for j in _parent_path(parent, g)]
+    return None
 
 
 # ==============================================================================
@@ -242,6 +447,37 @@ def network_shortest_path(adjacency, root, goal):
 # ==============================================================================
 
 
+def _dijkstra(indptr, indices, weights, sources, target=-1):
+    # binary-heap dijkstra from one or more sources
+    # vertices that are popped from the heap are settled
+    # the search stops as soon as the target is settled
+    n = len(indptr) - 1
+    dist = [float('inf')] * n
+    pred = [-1] * n
+    done = [False] * n
+    heap = [(0, s) for s in sources]
+    for s in sources:
+        dist[s] = 0
+    heapify(heap)
+    while heap:
+        d, u = heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        if u == target:
+            break
+        for i in range(indptr[u], indptr[u + 1]):
+            v = indices[i]
+            if done[v]:
+                continue
+            dv = d + weights[i]
+            if dv < dist[v]:
+                dist[v] = dv
+                pred[v] = u
+                heappush(heap, (dv, v))
+    return dist, pred, done
+
+
 def network_dijkstra_distances(adjacency, weight, target):
     """Compute Dijkstra distances to a specific vertex of a network to every other
     vertex of the network.
@@ -249,32 +485,76 @@ def network_dijkstra_distances(adjacency, weight, target):
     Parameters:
         adjacency (dict): An adjacency dictionary. Each key represents a vertex
             and maps to a list of neighbouring vertex keys.
+            Or a network, in which case the cached CSR snapshot of its topology is used.
         weight (dict): A dictionary of edge weights.
         target (str): The key of the vertex to which the distances are computed.
 
     Returns:
         dict: A dictionary of distances from every vertex in the network.
+        Vertices that cannot be reached have a distance of ``1e17``.
 
     Examples:
         >>>
 
     Notes:
-        ...
+        The vertices are visited in order of increasing distance using a binary heap,
+        which takes :math:`O((V + E) \log V)` time.
 
     """
-    adjacency = dict((key, set(nbrs)) for key, nbrs in adjacency.items())
-    dist = dict((key, 0 if key == target else 1e17) for key in adjacency)
-    tovisit = set(adjacency.keys())
-    visited = set()
-    while tovisit:
-        u = min(tovisit, key=lambda k: dist[k])
-        tovisit.remove(u)
-        visited.add(u)
-        for v in adjacency[u] - visited:
-            d_uuv = dist[u] + weight[(u, v)]
-            if d_uuv < dist[v]:
-                dist[v] = d_uuv
-    return dist
+    keys, key_index, indptr, indices, weights = _adjacency_csr(adjacency, weight)
+    dist, pred, done = _dijkstra(indptr, indices, weights, [key_index[target]])
+    return dict((key, d if reached else 1e17) for key, d, reached in zip(keys, dist, done))
+
+
+def network_dijkstra_tree(adjacency, weight, sources, target=None):
+    """Compute the shortest paths from one or more source vertices to the other
+    vertices of a network.
+
+    Parameters:
+        adjacency (dict): An adjacency dictionary. Each key represents a vertex
+            and maps to a list of neighbouring vertex keys.
+            Or a network, in which case the cached CSR snapshot of its topology is used.
+        weight (dict): A dictionary of edge weights.
+        sources (list): The keys of the vertices from which the distances are computed.
+        target (str): Optional. The key of a vertex at which the search can stop.
+            Default is ``None``.
+
+    Returns:
+        tuple: Two dictionaries.
+        The first maps every reached vertex to its distance from the nearest source.
+        The second maps every reached vertex to its predecessor on the shortest path,
+        or to ``None`` for the sources.
+
+    Note:
+        If a target is provided, only the vertices that are closer to the sources
+        than the target, and the target itself, are returned.
+
+    Examples:
+
+        .. code-block:: python
+
+            import compas
+            from compas.datastructures.network import Network
+            from compas.datastructures.network.algorithms import network_dijkstra_tree
+
+            network = Network.from_obj(compas.get_data('grid_irregular.obj'))
+
+            weight = dict(((u, v), network.edge_length(u, v)) for u, v in network.edges())
+            weight.update({(v, u): weight[(u, v)] for u, v in network.edges()})
+
+            dist, pred = network_dijkstra_tree(network.adjacency, weight, network.leaves())
+
+    """
+    keys, key_index, indptr, indices, weights = _adjacency_csr(adjacency, weight)
+    t = -1 if target is None else key_index[target]
+    dist, pred, done = _dijkstra(indptr, indices, weights, [key_index[key] for key in sources], t)
+    distances = {}
+    predecessors = {}
+    for i, key in enumerate(keys):
+        if done[i]:
+            distances[key] = dist[i]
+            predecessors[key] = None if pred[i] == -1 else keys[pred[i]]
+    return distances, predecessors
 
 
 def network_dijkstra_path(adjacency, weight, source, target, dist=None):
@@ -284,15 +564,20 @@ def network_dijkstra_path(adjacency, weight, source, target, dist=None):
     Parameters:
         adjacency (dict): An adjacency dictionary. Each key represents a vertex
             and maps to a list of neighbouring vertex keys.
+            Or a network, in which case the cached CSR snapshot of its topology is used.
         weight (dict): A dictionary of edge weights.
         source (str): The start vertex.
         target (str): The end vertex.
+        dist (dict): Optional. Precomputed distances to the target.
+            Default is ``None``.
 
     Returns:
-        list: The shortest path.
+        list: The shortest path, or ``None`` if the target cannot be reached.
 
     Note:
         The edge weights should all be positive.
+        If no distances are provided, the search starts at the source
+        and stops as soon as the shortest path to the target is known.
         For a directed graph, set the weights of the reversed edges to ``+inf``.
         For an undirected graph, add the same weight for an edge in both directions.
 
@@ -311,8 +596,8 @@ def network_dijkstra_path(adjacency, weight, source, target, dist=None):
             weight = dict(((u, v), network.edge_length(u, v)) for u, v in network.edges())
             weight.update({(v, u): weight[(u, v)] for u, v in network.edges()})
 
-            start = 21
-            end = 22
+            start = 20
+            end = 30
 
             path = network_dijkstra_path(network.adjacency, weight, start, end)
 
@@ -346,11 +631,11 @@ def network_dijkstra_path(adjacency, weight, source, target, dist=None):
             weight = dict(((u, v), network.edge_length(u, v)) for u, v in network.edges())
             weight.update({(v, u): weight[(u, v)] for u, v in network.edges()})
 
-            weight[(8, 7)] = 1000
-            weight[(7, 8)] = 1000
+            weight[(2, 29)] = 1000
+            weight[(29, 2)] = 1000
 
-            start = 21
-            end = 22
+            start = 20
+            end = 30
 
             path = network_dijkstra_path(network.adjacency, weight, start, end)
 
@@ -372,16 +657,76 @@ def network_dijkstra_path(adjacency, weight, source, target, dist=None):
             )
 
     """
-    if not dist:
-        dist = network_dijkstra_distances(adjacency, weight, target)
-    path = [source]
-    node = source
-    node = min(adjacency[node], key=lambda nbr: dist[nbr] + weight[(node, nbr)])
-    path.append(node)
-    while node != target:
-        node = min(adjacency[node], key=lambda nbr: dist[nbr])
+    if dist:
+        if hasattr(adjacency, 'csr'):
+            adjacency = adjacency.adjacency
+        path = [source]
+        node = source
+        node = min(adjacency[node], key=lambda nbr: dist[nbr] + weight[(node, nbr)])
         path.append(node)
-    return path
+        while node != target:
+            node = min(adjacency[node], key=lambda nbr: dist[nbr])
+            path.append(node)
+        return path
+    keys, key_index, indptr, indices, weights = _adjacency_csr(adjacency, weight)
+    t = key_index[target]
+    dist, pred, done = _dijkstra(indptr, indices, weights, [key_index[source]], t)
+    if not done[t]:
+        return None
+    path = [t]
+    while pred[path[-1]] != -1:
+        path.append(pred[path[-1]])
+    return [keys[i] for i in reversed(path)]
+
+
+def network_dijkstra_distance_matrix(adjacency, weight, sources=None, rtype='list'):
+    """Compute the Dijkstra distances from a number of source vertices to all
+    vertices of a network.
+
+    Parameters:
+        adjacency (dict): An adjacency dictionary. Each key represents a vertex
+            and maps to a list of neighbouring vertex keys.
+            Or a network, in which case the cached CSR snapshot of its topology is used.
+        weight (dict): A dictionary of edge weights.
+        sources (list): Optional. The keys of the source vertices.
+            Default is ``None``, in which case all vertices are used.
+        rtype (str): Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+    Returns:
+        tuple: The keys of the vertices, in the order of the columns of the distances,
+        and the distances, with one row per source.
+        Vertices that cannot be reached have a distance of ``inf``.
+
+    Note:
+        If SciPy is available, the distances are computed by
+        :func:`scipy.sparse.csgraph.dijkstra` for all sources at once.
+        Otherwise, a separate search is performed per source.
+
+    >>> keys, D = network_dijkstra_distance_matrix(network.adjacency, weight, network.leaves())
+
+    """
+    keys, key_index, indptr, indices, weights = _adjacency_csr(adjacency, weight)
+    if sources is None:
+        sources = keys
+    sources = [key_index[key] for key in sources]
+    try:
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import dijkstra
+    except ImportError:
+        D = []
+        for source in sources:
+            dist, pred, done = _dijkstra(indptr, indices, weights, [source])
+            D.append(dist)
+        if rtype == 'array':
+            from numpy import array
+            D = array(D, dtype=float).reshape((-1, len(keys)))
+        return keys, D
+    n = len(keys)
+    A = csr_matrix((weights, indices, indptr), shape=(n, n), dtype=float)
+    D = dijkstra(A, directed=True, indices=sources)
+    if rtype == 'list':
+        D = D.tolist()
+    return keys, D
 
 
 # ==============================================================================
@@ -400,16 +745,16 @@ if __name__ == '__main__':
     weight = dict(((u, v), 1.0) for u, v in network.edges())
     weight.update({(v, u): weight[(u, v)] for u, v in network.edges()})
 
-    weight[(7, 17)] = 1000
-    weight[(17, 7)] = 1000
+    weight[(29, 13)] = 1000
+    weight[(13, 29)] = 1000
 
-    start = 21
-    end = 29
+    start = 20
+    end = 1
 
     path1 = network_dijkstra_path(network.adjacency, weight, start, end)
 
-    start = 29
-    end = 22
+    start = 1
+    end = 30
 
     path2 = network_dijkstra_path(network.adjacency, weight, start, end)
 
@@ -424,8 +769,8 @@ if __name__ == '__main__':
         edges.append([u, v])
 
     vcolor = {key: (255, 0, 0) for key in path}
-    vcolor[21] = '#00ff00'
-    vcolor[22] = '#00ff00'
+    vcolor[20] = '#00ff00'
+    vcolor[30] = '#00ff00'
 
     network.plot(
         vlabel={key: key for key in network},
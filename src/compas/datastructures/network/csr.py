@@ -0,0 +1,258 @@
+from __future__ import print_function
+
+from itertools import chain
+
+from numpy import argsort
+from numpy import cumsum
+from numpy import fromiter
+from numpy import full
+from numpy import int64
+from numpy import minimum
+from numpy import repeat
+from numpy import zeros
+
+
+__author__     = 'Tom Van Mele'
+__copyright__  = 'Copyright 2014, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'vanmelet@ethz.ch'
+
+
+__all__ = [
+    'NetworkCSR',
+]
+
+
+class NetworkCSR(object):
+    """A compact, integer-indexed snapshot of the topology of a network.
+
+    The adjacency of the network is stored in compressed sparse row (CSR) format.
+    The neighbours of the vertex with index ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]``, in the same order as in
+    ``network.halfedge[key]``. The snapshot does not contain any geometry
+    and remains valid until the topology of the network changes.
+    Code that edits the ``vertex``, ``edge`` or ``halfedge`` dicts directly
+    should call ``network.invalidate_topology()`` afterwards.
+
+    Parameters:
+        network (Network) : The network to take a snapshot of.
+
+    Attributes:
+        version (int) : The topology version of the network at the time of the snapshot.
+        keys (list) : The vertex keys, in the order of ``network.vertices_iter()``.
+        key_index (dict) : A *key-to-index* map of the vertices.
+        indptr (array) : The offsets of the neighbours of every vertex in ``indices``.
+            Shape ``(n + 1, )``.
+        indices (array) : The vertex indices of the neighbours of all vertices.
+            Shape ``(2 * m, )`` for a network without reciprocal edges.
+        edges (array) : The vertex indices of the edges. Shape ``(m, 2)``.
+            The edges are listed in the same order and with the same direction as
+            in ``network.edges_iter()``.
+        halfedge_edge (array) : The index of the edge of every entry in ``indices``,
+            or ``-1`` if there is no corresponding edge.
+            An entry refers to the edge with the same direction, if it exists.
+        degree (array) : The number of neighbours of every vertex. Shape ``(n, )``.
+
+    Examples:
+
+        .. code-block:: python
+
+            import compas
+            from compas.datastructures.network import Network
+
+            network = Network.from_obj(compas.get_data('lines.obj'))
+            csr = network.csr()
+
+            i = csr.key_index[network.get_any_vertex()]
+
+            for j in csr.neighbours(i):
+                print(csr.keys[j])
+
+    """
+
+    def __init__(self, network):
+        self.version       = network.version
+        self.keys          = list(network.vertex)
+        self.key_index     = dict(zip(self.keys, range(len(self.keys))))
+        self.indptr        = zeros(1, dtype=int64)
+        self.indices       = zeros(0, dtype=int64)
+        self.edges         = zeros((0, 2), dtype=int64)
+        self.halfedge_edge = zeros(0, dtype=int64)
+        self.degree        = zeros(0, dtype=int64)
+        self._identity     = False
+        self._uv_index     = None
+        self._sizes        = _sizes(network)
+        self._from_network(network)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _from_network(self, network):
+        keys      = self.keys
+        key_index = self.key_index
+        halfedge  = network.halfedge
+        edge      = network.edge
+        n = len(keys)
+
+        # with the default keys the mapping of neighbours to indices can be skipped
+
+        identity = self._identity = keys == list(range(n))
+
+        degree = fromiter((len(halfedge[key]) for key in keys), int64, n)
+        indptr = zeros(n + 1, dtype=int64)
+        cumsum(degree, out=indptr[1:])
+        nbrs = chain.from_iterable(halfedge[key] for key in keys)
+        if not identity:
+            nbrs = (key_index[nbr] for nbr in nbrs)
+        indices = fromiter(nbrs, int64, int(indptr[-1]))
+
+        ukeys = list(edge)
+        count = fromiter((len(edge[u]) for u in ukeys), int64, len(ukeys))
+        m = int(count.sum())
+        vs = chain.from_iterable(edge[u] for u in ukeys)
+        if identity:
+            us = fromiter(ukeys, int64, len(ukeys))
+        else:
+            us = fromiter((key_index[u] for u in ukeys), int64, len(ukeys))
+            vs = (key_index[v] for v in vs)
+        edges = zeros((m, 2), dtype=int64)
+        edges[:, 0] = repeat(us, count)
+        edges[:, 1] = fromiter(vs, int64, m)
+
+        self.degree        = degree
+        self.indptr        = indptr
+        self.indices       = indices
+        self.edges         = edges
+        self.halfedge_edge = self._halfedge_edge()
+
+    def _halfedge_edge(self):
+        n = len(self.keys)
+        rows = repeat(range(n), self.degree)
+        cols = self.indices
+        hids = full(cols.shape[0], -1, dtype=int64)
+        if not self.edges.shape[0]:
+            return hids
+        codes = self.edges[:, 0] * n + self.edges[:, 1]
+        order = argsort(codes, kind='mergesort')
+        codes = codes[order]
+        # try the edge in the same direction first, then the reverse
+        for query in (rows * n + cols, cols * n + rows):
+            todo = hids == -1
+            i = minimum(codes.searchsorted(query[todo]), codes.shape[0] - 1)
+            found = codes[i] == query[todo]
+            hids[todo.nonzero()[0][found]] = order[i[found]]
+        return hids
+
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # helpers
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+    # **************************************************************************
+
+    def is_valid(self, network):
+        """Verify that the snapshot still describes the topology of a network.
+
+        Parameters:
+            network (Network) : The network.
+
+        Returns:
+            bool : ``True`` if the topology version of the network did not change,
+            and the ``vertex``, ``edge`` and ``halfedge`` dicts still have the same size.
+
+        Note:
+            The sizes of the dicts catch most direct edits of the dicts that do not
+            increment the version. Edits that keep the sizes the same,
+            such as replacing a vertex or an edge, are only detected if
+            ``network.invalidate_topology()`` is called afterwards.
+
+        """
+        return self.version == network.version and self._sizes == _sizes(network)
+
+    def neighbours(self, index):
+        """Return the indices of the neighbours of a vertex."""
+        return self.indices[self.indptr[index]:self.indptr[index + 1]]
+
+    def neighbour_edges(self, index):
+        """Return the indices of the edges connected to a vertex."""
+        return self.halfedge_edge[self.indptr[index]:self.indptr[index + 1]]
+
+    def rows(self):
+        """Return the vertex index of every entry in ``indices``."""
+        return repeat(range(len(self.keys)), self.degree)
+
+    def index_key(self):
+        """Return an *index-to-key* map of the vertices."""
+        return dict(enumerate(self.keys))
+
+    def _edge_keys(self):
+        us = self.edges[:, 0].tolist()
+        vs = self.edges[:, 1].tolist()
+        if not self._identity:
+            keys = self.keys
+            us = [keys[u] for u in us]
+            vs = [keys[v] for v in vs]
+        return list(zip(us, vs))
+
+    def _get_uv_index(self):
+        if self._uv_index is None:
+            uv = self._edge_keys()
+            self._uv_index = dict(zip(uv, range(len(uv))))
+        return self._uv_index
+
+    def uv_index(self):
+        """Return a *uv-to-index* map of the edges."""
+        return dict(self._get_uv_index())
+
+    def edge_index(self, u, v):
+        """Return the index of the edge from vertex ``u`` to vertex ``v``.
+
+        Parameters:
+            u (hashable) : The key of the start vertex.
+            v (hashable) : The key of the end vertex.
+
+        Returns:
+            int : The index of the edge in ``edges``.
+
+        """
+        return self._get_uv_index()[u, v]
+
+    def index_uv(self):
+        """Return an *index-to-uv* map of the edges."""
+        return dict(enumerate(self._edge_keys()))
+
+    def adjacency(self):
+        """Return the adjacency as a list of lists of neighbour indices."""
+        indices = self.indices.tolist()
+        indptr = self.indptr.tolist()
+        return [indices[a:b] for a, b in zip(indptr[:-1], indptr[1:])]
+
+
+def _sizes(network):
+    return len(network.vertex), len(network.edge), len(network.halfedge)
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
+    from compas.datastructures.network import Network
+
+    network = Network.from_obj(compas.get_data('lines.obj'))
+    csr = network.csr()
+
+    print(csr.indptr)
+    print(csr.indices)
+    print(csr.edges)
+    print(csr.halfedge_edge)
+
+    print(csr.key_index == network.key_index())
+    print(csr.uv_index() == network.uv_index())
@@ -1,5 +1,6 @@
 from __future__ import print_function
 
+import gc
 import json
 import ast
 
@@ -18,7 +19,10 @@ from compas.geometry import length_vector
 from compas.geometry import area_polygon
 from compas.geometry import subtract_vectors
 
-from compas.utilities import geometric_key
+from compas.utilities import copy_attributes
+from compas.utilities.maps import _weld_lines
+
+from compas.exceptions import BRGInputError
 
 from compas.datastructures.network.algorithms import network_bfs
 
@@ -108,6 +112,8 @@ class Network(object):
         self._max_int_key  = -1
         self._max_int_fkey = -1
         self._plotter      = None
+        self._version      = 0
+        self._csr          = None
         self.vertex        = {}
         self.edge          = {}
         self.halfedge      = {}
@@ -199,6 +205,16 @@ network: {0}
         """Alias for the halfedge attribute."""
         return self.halfedge
 
+    @property
+    def version(self):
+        """:obj:`int` : The topology version of the network.
+
+        The version is incremented by every function that changes the topology
+        of the network, and is used to invalidate the snapshot returned by
+        :meth:`csr`.
+        """
+        return self._version
+
     @property
     def data(self):
         """A dictionary describing the fundamental data making up the network data structure.
@@ -230,20 +246,25 @@ network: {0}
                 'max_int_key' : self._max_int_key,
                 'max_int_fkey': self._max_int_fkey, }
 
+        # plain dicts, also if the attributes are stored in columns
+        vertex   = self.vertex.copy()
+        edge     = self.edge.copy()
+        facedata = self.facedata.copy()
+
         key_rkey = {}
 
-        for key in self.vertex:
+        for key in vertex:
             rkey = repr(key)
             key_rkey[key] = rkey
-            data['vertex'][rkey] = self.vertex[key]
+            data['vertex'][rkey] = vertex[key]
             data['edge'][rkey] = {}
             data['halfedge'][rkey] = {}
 
-        for u in self.edge:
+        for u in edge:
             ru = key_rkey[u]
-            for v in self.edge[u]:
+            for v in edge[u]:
                 rv = key_rkey[v]
-                data['edge'][ru][rv] = self.edge[u][v]
+                data['edge'][ru][rv] = edge[u][v]
 
         for u in self.halfedge:
             ru = key_rkey[u]
@@ -255,9 +276,9 @@ network: {0}
             rfkey = repr(fkey)
             data['face'][rfkey] = self.face[fkey]
 
-        for fkey in self.facedata:
+        for fkey in facedata:
             rfkey = repr(fkey)
-            data['facedata'][rfkey] = self.facedata[fkey]
+            data['facedata'][rfkey] = facedata[fkey]
 
         return data
 
@@ -358,52 +379,256 @@ network: {0}
         network.data = rdata
         return network
 
+    @classmethod
+    def from_binary(cls, filepath, attributes=True):
+        """Construct a network from a binary file written by :meth:`to_binary`.
+
+        Parameters:
+            filepath (str) : Path to the file.
+            attributes (bool) : Optional. If ``False``, only read the geometry and
+                topology, and not the vertex, edge and face attributes.
+                Default is ``True``.
+
+        Returns:
+            Network : A network object.
+
+        Raises:
+            BRGInputError : If the file does not contain a network.
+
+        Note:
+            Requires NumPy.
+
+        """
+        from compas.files.npz import NPZReader
+        network = cls()
+        with NPZReader(filepath) as reader:
+            meta = reader.meta
+            if meta.get('datastructure') != 'Network':
+                raise BRGInputError('The file does not contain a network: {0}'.format(filepath))
+            network.attributes.update(meta['attributes'])
+            network.default_vertex_attributes.update(meta['dva'])
+            network.default_edge_attributes.update(meta['dea'])
+            network.default_face_attributes.update(meta['dfa'])
+            dva = network.default_vertex_attributes
+            dea = network.default_edge_attributes
+
+            keys  = reader.keys('vertex')
+            fkeys = reader.keys('face')
+
+            vertexdata = reader.table('vertex.attributes') if attributes else {}
+            for index, (x, y, z) in enumerate(reader.array('vertex.xyz').tolist()):
+                key = keys[index]
+                attr = dva.copy()
+                if index in vertexdata:
+                    attr.update(vertexdata[index])
+                attr['x'] = x
+                attr['y'] = y
+                attr['z'] = z
+                network.vertex[key] = attr
+                network.edge[key] = {}
+                network.halfedge[key] = {}
+
+            edgedata = reader.table('edge.attributes') if attributes else {}
+            for index, (u, v) in enumerate(reader.array('edge.vertices').tolist()):
+                attr = dea.copy()
+                if index in edgedata:
+                    attr.update(edgedata[index])
+                network.edge[keys[u]][keys[v]] = attr
+
+            halfedges = reader.array('halfedge.vertices').tolist()
+            for (u, v), f in zip(halfedges, reader.array('halfedge.faces').tolist()):
+                network.halfedge[keys[u]][keys[v]] = fkeys[f] if f >= 0 else None
+
+            offsets  = reader.array('face.offsets').tolist()
+            vertices = [keys[index] for index in reader.array('face.vertices').tolist()]
+            for index, fkey in enumerate(fkeys):
+                network.face[fkey] = vertices[offsets[index]:offsets[index + 1]]
+
+            if attributes:
+                facedata = reader.table('face.attributes')
+                for index in reader.array('face.datarows').tolist():
+                    network.facedata[fkeys[index]] = facedata.get(index, {})
+
+            network._max_int_key = meta['max_int_key']
+            network._max_int_fkey = meta['max_int_fkey']
+        return network
+
     @classmethod
     def from_yaml(cls, filepath):
         raise NotImplementedError
 
     @classmethod
     def from_obj(cls, filepath, precision='3f'):
-        network  = cls()
-        obj      = OBJ(filepath, precision=precision)
-        vertices = obj.parser.vertices
-        edges    = obj.parser.lines
-        for i, (x, y, z) in enumerate(vertices):
-            network.add_vertex(i, x=x, y=y, z=z)
-        for u, v in edges:
-            network.add_edge(u, v)
-        return network
+        obj = OBJ(filepath, precision=precision)
+        return cls.from_vertices_and_edges(obj.parser.vertices, obj.parser.lines)
 
     @classmethod
-    def from_lines(cls, lines, precision='3f'):
-        network = cls()
-        edges   = []
-        vertex  = {}
-        for line in lines:
-            sp = line[0]
-            ep = line[1]
-            a  = geometric_key(sp, precision)
-            b  = geometric_key(ep, precision)
-            vertex[a] = sp
-            vertex[b] = ep
-            edges.append((a, b))
-        key_index = dict((k, i) for i, k in enumerate(iter(vertex)))
-        for key, xyz in vertex.iteritems():
-            i = key_index[key]
-            network.add_vertex(i, x=xyz[0], y=xyz[1], z=xyz[2])
-        for u, v in edges:
-            i = key_index[u]
-            j = key_index[v]
-            network.add_edge(i, j)
-        return network
+    def from_dxf(cls, filepath, layers=None, precision='3f'):
+        """Construct a network from the lines and polylines of a dxf file.
+
+        Parameters:
+            filepath (str): The path to the dxf file.
+            layers (list): Optional. Only read the entities on these layers.
+                Default is ``None``.
+            precision (str): Optional. The precision used to merge vertices.
+                Default is ``'3f'``.
+
+        Returns:
+            Network: A network of class ``cls``.
+
+        Note:
+            Requires NumPy. The file is read with :class:`compas.files.dxf.DXF`.
+            Every segment of a polyline becomes an edge.
+
+        >>> network = Network.from_dxf('site.dxf', layers=['roads'])
+
+        """
+        from compas.files.dxf import DXF
+        dxf = DXF(filepath, layers=layers, types=('LINE', 'LWPOLYLINE', 'POLYLINE'), precision=precision)
+        return cls.from_arrays(dxf.parser.vertices, dxf.parser.edges)
+
+    @classmethod
+    def from_lines(cls, lines, precision='3f', tolerance=None):
+        """Initialise a network from a list of lines.
+
+        Parameters:
+            lines (list): The lines, as pairs of XYZ coordinates.
+            precision (str): Optional. The precision of the geometric keys
+                used to merge the end points. Default is ``'3f'``.
+            tolerance (float): Optional. Also merge end points that are rounded
+                to neighbouring keys but are closer than this value.
+                Requires NumPy. Default is ``None``.
+
+        Returns:
+            Network: A network of class ``cls``.
+
+        Note:
+            If NumPy is available, the end points are merged with
+            :func:`compas.utilities.weld_points` instead of by string key,
+            and the network is constructed in bulk with :meth:`from_arrays`.
+            The vertices are numbered in the order of their first occurrence.
+
+        >>> network = Network.from_lines([([0, 0, 0], [1, 0, 0]), ([1, 0, 0], [1, 1, 0])])
+
+        """
+        vertices, edges = _weld_lines(lines, precision, tolerance, arrays=True)
+        return cls.from_vertices_and_edges(vertices, edges)
 
     @classmethod
     def from_vertices_and_edges(cls, vertices, edges):
+        """Initialise a network from a list of vertices and edges.
+
+        Parameters:
+            vertices (list) : The vertices, represented by their XYZ coordinates.
+            edges (list) : The edges, as pairs of indices into the list of vertices.
+
+        Returns:
+            Network: A network of class ``cls``.
+
+        Note:
+            If NumPy is available, the network is constructed in bulk with
+            :meth:`from_arrays`. Otherwise, the vertices and edges are added
+            one by one.
+
+        """
+        try:
+            import numpy
+        except ImportError:
+            network = cls()
+            for x, y, z in vertices:
+                network.add_vertex(x=x, y=y, z=z)
+            for u, v in edges:
+                network.add_edge(u, v)
+            return network
+        return cls.from_arrays(vertices, edges)
+
+    @classmethod
+    def from_arrays(cls, xyz, edges, **kwargs):
+        """Construct a network from arrays of vertex coordinates and edge vertex indices.
+
+        The vertex, edge and halfedge dicts are filled in a few bulk passes,
+        instead of adding the vertices and edges one by one.
+        The vertices get the keys ``0`` to ``n - 1``, and the dicts are the same
+        as if the vertices and edges were added one by one to an empty network.
+
+        Parameters:
+            xyz (array) : The vertex coordinates. Shape ``(n, 3)``.
+            edges (array) : The edges, as pairs of vertex indices. Shape ``(m, 2)``.
+            kwargs (dict) : Remaining named parameters. Default is an empty :obj:`dict`.
+
+        Returns:
+            Network: A network of class ``cls``.
+
+        Raises:
+            BRGInputError : If an edge references a vertex that does not exist.
+
+        Note:
+            Requires NumPy.
+
+        >>> import numpy as np
+        >>> xyz = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0]], dtype=float)
+        >>> edges = np.array([[0, 1], [1, 2]])
+        >>> network = Network.from_arrays(xyz, edges)
+
+        """
+        from numpy import argsort
+        from numpy import asarray
+        from numpy import bincount
+        from numpy import column_stack
+        from numpy import cumsum
+        from numpy import float64
+        from numpy import int64
+
+        xyz = asarray(xyz, dtype=float64).reshape((-1, 3))
+        edges = asarray(edges, dtype=int64).reshape((-1, 2))
+        n = xyz.shape[0]
+        if edges.shape[0] and (edges.min() < 0 or edges.max() >= n):
+            raise BRGInputError('The edges reference vertices that do not exist.')
+
         network = cls()
-        for x, y, z in vertices:
-            network.add_vertex(x=x, y=y, z=z)
-        for u, v in edges:
-            network.add_edge(u, v)
+        network.attributes.update(kwargs)
+        dva = network.default_vertex_attributes
+        dea = network.default_edge_attributes
+
+        # the edges and halfedges sorted by their first vertex
+        # a stable sort keeps the order in which add_edge would insert them
+
+        order = argsort(edges[:, 0], kind='mergesort')
+        u_stop = cumsum(bincount(edges[:, 0], minlength=n)).tolist()
+        u_nbrs = edges[order, 1].tolist()
+        halfedges = column_stack((edges, edges[:, ::-1])).reshape((-1, 2))
+        order = argsort(halfedges[:, 0], kind='mergesort')
+        h_stop = cumsum(bincount(halfedges[:, 0], minlength=n)).tolist()
+        h_nbrs = halfedges[order, 1].tolist()
+        u_start = [0] + u_stop[:-1]
+        h_start = [0] + h_stop[:-1]
+        keys = list(range(n))
+
+        # the garbage collector is of no use while creating many small dicts
+        # but it slows down the construction of large networks considerably
+
+        gcenabled = gc.isenabled()
+        gc.disable()
+        try:
+            if sorted(dva) == ['x', 'y', 'z']:
+                attrs = [{'x': x, 'y': y, 'z': z} for x, y, z in xyz.tolist()]
+            else:
+                attrs = []
+                for x, y, z in xyz.tolist():
+                    attr = dva.copy()
+                    attr['x'] = x
+                    attr['y'] = y
+                    attr['z'] = z
+                    attrs.append(attr)
+            network.vertex = dict(zip(keys, attrs))
+            items = list(zip(u_nbrs, [dea.copy() for _ in u_nbrs]))
+            network.edge = dict(zip(keys, [dict(items[a:b]) for a, b in zip(u_start, u_stop)]))
+            network.halfedge = dict(zip(keys, [dict.fromkeys(h_nbrs[a:b]) for a, b in zip(h_start, h_stop)]))
+        finally:
+            if gcenabled:
+                gc.enable()
+
+        network._max_int_key = n - 1
         return network
 
     # **************************************************************************
@@ -425,6 +650,78 @@ network: {0}
         with open(filepath, 'w+') as fp:
             json.dump(self.data, fp)
 
+    def to_binary(self, filepath, compressed=False):
+        """Write the network to a binary file.
+
+        The file is a NumPy *npz* archive with the vertex coordinates and the
+        topology as arrays, and the vertex, edge and face attributes as typed
+        columns. Keys are stored as integers or strings, or as their ``repr``
+        if they are of any other type.
+
+        Parameters:
+            filepath (str) : Path to the file to write.
+            compressed (bool) : Optional. Compress the file. Default is ``False``.
+
+        Note:
+            Requires NumPy.
+
+        """
+        from numpy import float64
+        from numpy import int64
+        from compas.files.npz import NPZWriter
+
+        keys       = list(self.vertex)
+        fkeys      = list(self.face)
+        key_index  = dict((key, index) for index, key in enumerate(keys))
+        fkey_index = dict((fkey, index) for index, fkey in enumerate(fkeys))
+
+        writer = NPZWriter(filepath, compressed)
+        writer.meta['datastructure'] = 'Network'
+        writer.meta['attributes']    = self.attributes
+        writer.meta['dva']           = self.default_vertex_attributes
+        writer.meta['dea']           = self.default_edge_attributes
+        writer.meta['dfa']           = self.default_face_attributes
+        writer.meta['max_int_key']   = self._max_int_key
+        writer.meta['max_int_fkey']  = self._max_int_fkey
+        writer.add_keys('vertex', keys)
+        writer.add_keys('face', fkeys)
+
+        attrs = [self.vertex[key] for key in keys]
+        xyz = [(attr['x'], attr['y'], attr['z']) for attr in attrs]
+        writer.add_array('vertex.xyz', xyz, dtype=float64)
+        writer.add_table('vertex.attributes', dict(enumerate(attrs)), self.default_vertex_attributes, exclude=('x', 'y', 'z'))
+
+        edges = []
+        edgedata = {}
+        for u in self.edge:
+            for v, attr in self.edge[u].items():
+                edgedata[len(edges)] = attr
+                edges.append((key_index[u], key_index[v]))
+        writer.add_array('edge.vertices', edges, dtype=int64)
+        writer.add_table('edge.attributes', edgedata, self.default_edge_attributes)
+
+        halfedges = []
+        faces = []
+        for u in self.halfedge:
+            for v, fkey in self.halfedge[u].items():
+                halfedges.append((key_index[u], key_index[v]))
+                faces.append(-1 if fkey is None else fkey_index[fkey])
+        writer.add_array('halfedge.vertices', halfedges, dtype=int64)
+        writer.add_array('halfedge.faces', faces, dtype=int64)
+
+        offsets = [0]
+        vertices = []
+        for fkey in fkeys:
+            vertices.extend(key_index[key] for key in self.face[fkey])
+            offsets.append(len(vertices))
+        facedata = dict((fkey_index[fkey], attr) for fkey, attr in self.facedata.items() if fkey in fkey_index)
+        writer.add_array('face.offsets', offsets, dtype=int64)
+        writer.add_array('face.vertices', vertices, dtype=int64)
+        writer.add_array('face.datarows', sorted(facedata), dtype=int64)
+        writer.add_table('face.attributes', facedata)
+
+        writer.write()
+
     def to_yaml(self, filepath):
         raise NotImplementedError
 
@@ -452,16 +749,69 @@ network: {0}
     # **************************************************************************
     # **************************************************************************
 
+    def csr(self):
+        """Return a compact, integer-indexed snapshot of the topology of the network.
+
+        The snapshot is cached, and rebuilt only if the topology of the network
+        has changed since it was taken.
+
+        Returns:
+            NetworkCSR : The adjacency of the network in CSR format,
+            with the edges and the maps between keys and indices.
+
+        Note:
+            Requires NumPy.
+
+            The snapshot is invalidated by all methods and operations that change
+            the topology of the network. Code that modifies the ``vertex``, ``edge``
+            or ``halfedge`` dicts directly should call :meth:`invalidate_topology`
+            afterwards. Without it, the snapshot is only rebuilt if the size of
+            one of these dicts has changed.
+            The same holds for the maps between keys and indices
+            (:meth:`key_index`, :meth:`uv_index`, ...), which are taken from the snapshot.
+
+        >>> csr = network.csr()
+        >>> nbrs = csr.neighbours(csr.key_index[key])
+
+        """
+        if self._csr is None or not self._csr.is_valid(self):
+            from compas.datastructures.network.csr import NetworkCSR
+            self._csr = NetworkCSR(self)
+        return self._csr
+
+    def invalidate_topology(self):
+        """Increment the topology version, which invalidates the cached snapshot."""
+        self._version += 1
+        self._csr = None
+
+    def _get_csr(self):
+        try:
+            return self.csr()
+        except ImportError:
+            return None
+
     def key_index(self):
+        csr = self._get_csr()
+        if csr is not None:
+            return dict(csr.key_index)
         return {key: index for index, key in self.vertices_enum()}
 
     def index_key(self):
+        csr = self._get_csr()
+        if csr is not None:
+            return csr.index_key()
         return dict(self.vertices_enum())
 
     def uv_index(self):
+        csr = self._get_csr()
+        if csr is not None:
+            return csr.uv_index()
         return {(u, v): index for index, u, v in self.edges_enum()}
 
     def index_uv(self):
+        csr = self._get_csr()
+        if csr is not None:
+            return csr.index_uv()
         return {index: (u, v) for index, u, v in self.edges_enum()}
 
     def vertex_color(self, key, qualifier=None):
@@ -472,15 +822,63 @@ network: {0}
         return self.attributes.get('color.vertex')
 
     def edge_index(self, u, v):
+        csr = self._get_csr()
+        if csr is not None:
+            return csr.edge_index(u, v)
         uv_index = self.uv_index()
         return uv_index[(u, v)]
 
-    def copy(self):
-        cls  = type(self)
-        data = deepcopy(self.data)
-        return cls.from_data(data)
+    def copy(self, attributes=True):
+        """Make an independent copy of the network.
+
+        The topology dicts are duplicated structurally, without converting the
+        keys, and the attribute dicts are copied one level deep. Only attribute
+        values that are containers (lists, dicts, sets) are deep-copied. All
+        other values are shared with the original until they are replaced.
+
+        Parameters:
+            attributes (bool) : Optional. If ``False``, only copy the vertex
+                coordinates and the topology. The vertices, edges and faces of the
+                copy get the default attributes. Default is ``True``.
+
+        Returns:
+            Network : The copy.
+
+        """
+        cls     = type(self)
+        network = cls()
+        network.attributes.update(deepcopy(self.attributes))
+        network.default_vertex_attributes.update(deepcopy(self.default_vertex_attributes))
+        network.default_edge_attributes.update(deepcopy(self.default_edge_attributes))
+        network.default_face_attributes.update(deepcopy(self.default_face_attributes))
+        network.halfedge = dict((u, nbrs.copy()) for u, nbrs in self.halfedge.iteritems())
+        network.face     = dict((fkey, list(vertices)) for fkey, vertices in self.face.iteritems())
+        columns = not isinstance(self.vertex, dict)
+        if attributes and columns:
+            network.vertex   = self.vertex.clone(network.default_vertex_attributes)
+            network.edge     = self.edge.clone(network.default_edge_attributes)
+            network.facedata = self.facedata.clone(network.default_face_attributes)
+        elif attributes:
+            network.vertex   = dict((key, copy_attributes(attr)) for key, attr in self.vertex.iteritems())
+            network.edge     = dict((u, dict((v, copy_attributes(attr)) for v, attr in nbrs.iteritems())) for u, nbrs in self.edge.iteritems())
+            network.facedata = dict((fkey, copy_attributes(attr)) for fkey, attr in self.facedata.iteritems())
+        else:
+            dva = network.default_vertex_attributes
+            dea = network.default_edge_attributes
+            for key, attr in self.vertex.items():
+                network.vertex[key] = copy_attributes(dva)
+                network.vertex[key].update(x=attr['x'], y=attr['y'], z=attr['z'])
+            for u in self.edge:
+                network.edge[u] = dict((v, copy_attributes(dea)) for v in self.edge[u])
+            if columns:
+                network.enable_attribute_columns()
+        network._key_to_str   = self._key_to_str
+        network._max_int_key  = self._max_int_key
+        network._max_int_fkey = self._max_int_fkey
+        return network
 
     def clear(self):
+        columns = not isinstance(self.vertex, dict)
         del self.vertex
         del self.edge
         del self.halfedge
@@ -493,11 +891,15 @@ network: {0}
         self.facedata = {}
         self._max_int_key = -1
         self._max_int_fkey = -1
+        self.invalidate_topology()
+        if columns:
+            self.enable_attribute_columns()
 
     def clear_vertexdict(self):
         del self.vertex
         self.vertex = {}
         self._max_int_key = -1
+        self.invalidate_topology()
 
     def clear_facedict(self):
         del self.face
@@ -505,14 +907,50 @@ network: {0}
         self.face = {}
         self.facedata = {}
         self._max_int_fkey = -1
+        self.invalidate_topology()
 
     def clear_edgedict(self):
         del self.edge
         self.edge = {}
+        self.invalidate_topology()
 
     def clear_halfedgedict(self):
         del self.halfedge
         self.halfedge = {}
+        self.invalidate_topology()
+
+    def enable_attribute_columns(self):
+        """Store the vertex, edge and face attributes in typed columns.
+
+        The ``vertex``, ``edge`` and ``facedata`` dicts are replaced by dict-like
+        objects that store every attribute in one NumPy column
+        (see :mod:`compas.datastructures.columns`). Access through
+        ``network.vertex[key]['x']`` keeps working, and attributes of all vertices
+        can be retrieved as an array without copying them.
+
+        >>> network.enable_attribute_columns()
+        >>> xyz = network.get_vertices_attributes('xyz', rtype='array')
+        >>> q = network.get_edges_attribute('q', 1.0, rtype='array')
+
+        Note:
+            Requires NumPy.
+
+        """
+        if not isinstance(self.vertex, dict):
+            return
+        from compas.datastructures.columns import ColumnarDict
+        from compas.datastructures.columns import ColumnarEdgeDict
+        self.vertex   = ColumnarDict.from_dict(self.vertex, self.default_vertex_attributes)
+        self.edge     = ColumnarEdgeDict.from_dict(self.edge, self.default_edge_attributes)
+        self.facedata = ColumnarDict.from_dict(self.facedata, self.default_face_attributes)
+
+    def disable_attribute_columns(self):
+        """Store the vertex, edge and face attributes in regular dicts again."""
+        if isinstance(self.vertex, dict):
+            return
+        self.vertex   = self.vertex.copy()
+        self.edge     = self.edge.copy()
+        self.facedata = self.facedata.copy()
 
     def vertex_name(self, key):
         return '{0}.vertex.{1}'.format(self.name, key)
@@ -574,6 +1012,7 @@ network: {0}
             self.vertex[key] = {}
             self.halfedge[key] = {}
             self.edge[key] = {}
+            self.invalidate_topology()
         self.vertex[key].update(attr)
         return key
 
@@ -589,6 +1028,8 @@ network: {0}
             u = self.add_vertex(u)
         if v not in self.vertex:
             v = self.add_vertex(v)
+        if v not in self.edge[u]:
+            self.invalidate_topology()
         data_dict = self.edge[u].get(v, {})
         data_dict.update(attr)
         self.edge[u][v] = data_dict
@@ -610,6 +1051,7 @@ network: {0}
             return
         # get the correct face key
         fkey = self._get_facekey(fkey)
+        self.invalidate_topology()
         self.face[fkey] = vertices
         self.facedata[fkey] = attr
         for i in range(0, len(vertices) - 1):
@@ -859,7 +1301,7 @@ network: {0}
 
     def face_tree(self, root, algo=network_bfs):
         adj = self.face_adjacency()
-        tree = algo(root, adj)
+        tree = algo(adj, root)
         return tree
 
     def face_adjacency_edge(self, f1, f2):
@@ -889,6 +1331,9 @@ network: {0}
         if not attr_dict:
             attr_dict = {}
         attr_dict.update(kwattr)
+        if not isinstance(self.vertex, dict):
+            self.vertex.store.update_defaults(attr_dict)
+            return
         self.default_vertex_attributes.update(attr_dict)
         for key in self.vertex:
             attr = attr_dict.copy()
@@ -904,6 +1349,9 @@ network: {0}
         self.vertex[key].update(attr_dict)
 
     def set_vertices_attribute(self, name, value, keys=None):
+        if not isinstance(self.vertex, dict):
+            self.vertex.store.fill(name, value, keys)
+            return
         if not keys:
             for key, attr in self.vertices_iter(True):
                 attr[name] = value
@@ -914,6 +1362,10 @@ network: {0}
     def set_vertices_attributes(self, keys=None, attr_dict=None, **kwattr):
         attr_dict = attr_dict or {}
         attr_dict.update(kwattr)
+        if not isinstance(self.vertex, dict):
+            for name, value in attr_dict.items():
+                self.vertex.store.fill(name, value, keys)
+            return
         if not keys:
             for key, attr in self.vertices_iter(True):
                 attr.update(attr_dict)
@@ -929,12 +1381,58 @@ network: {0}
             defaults = [None] * len(names)
         return [self.vertex[key].get(name, default) for name, default in zip(names, defaults)]
 
-    def get_vertices_attribute(self, name, default=None, keys=None):
+    def get_vertices_attribute(self, name, default=None, keys=None, rtype='list'):
+        """Get the value of an attribute of a number of vertices.
+
+        Parameters:
+            name (str) : The name of the attribute.
+            default (object) : Optional. The value for vertices without the attribute.
+            keys (list) : Optional. The vertex keys. Defaults to all vertices.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values.
+
+        Note:
+            If the attributes are stored in columns (see :meth:`enable_attribute_columns`),
+            the array of all vertices is a view on the column instead of a copy.
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.vertex, dict):
+                return self.vertex.store.column(name, default, keys or None)
+            from numpy import asarray
+            return asarray(self.get_vertices_attribute(name, default, keys))
         if not keys:
             return [attr.get(name, default) for key, attr in self.vertices_iter(True)]
         return [self.vertex[key].get(name, default) for key in keys]
 
-    def get_vertices_attributes(self, names, defaults=None, keys=None):
+    def get_vertices_attributes(self, names, defaults=None, keys=None, rtype='list'):
+        """Get the values of a number of attributes of a number of vertices.
+
+        Parameters:
+            names (list) : The names of the attributes.
+            defaults (list) : Optional. The values for vertices without the attributes.
+            keys (list) : Optional. The vertex keys. Defaults to all vertices.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values per vertex.
+
+        Note:
+            If the attributes are stored in columns (see :meth:`enable_attribute_columns`),
+            the array of all vertices is a view on the columns instead of a copy,
+            provided that the columns are consecutive and of the same type.
+            This is for example the case for ``'xyz'``.
+
+        >>> xyz = network.get_vertices_attributes('xyz', rtype='array')
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.vertex, dict):
+                return self.vertex.store.array(names, defaults, keys or None)
+            from numpy import asarray
+            return asarray(self.get_vertices_attributes(names, defaults, keys))
         if not defaults:
             defaults = [None] * len(names)
         temp = zip(names, defaults)
@@ -950,6 +1448,9 @@ network: {0}
         if not attr_dict:
             attr_dict = {}
         attr_dict.update(kwargs)
+        if not isinstance(self.edge, dict):
+            self.edge.store.update_defaults(attr_dict)
+            return
         self.default_edge_attributes.update(attr_dict)
         for u, v in self.edges_iter():
             attr = attr_dict.copy()
@@ -965,6 +1466,9 @@ network: {0}
         self.edge[u][v].update(attr_dict)
 
     def set_edges_attribute(self, name, value, keys=None):
+        if not keys and not isinstance(self.edge, dict):
+            self.edge.store.fill(name, value, self.edges())
+            return
         if not keys:
             for u, v, attr in self.edges_iter(True):
                 attr[name] = value
@@ -994,12 +1498,46 @@ network: {0}
             return [self.edge[u][v].get(name, default) for name, default in zip(names, defaults)]
         return [self.edge[v][u].get(name, default) for name, default in zip(names, defaults)]
 
-    def get_edges_attribute(self, name, default=None, keys=None):
+    def get_edges_attribute(self, name, default=None, keys=None, rtype='list'):
+        """Get the value of an attribute of a number of edges.
+
+        Parameters:
+            name (str) : The name of the attribute.
+            default (object) : Optional. The value for edges without the attribute.
+            keys (list) : Optional. The edges. Defaults to all edges.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values.
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.edge, dict):
+                return self.edge.store.column(name, default, keys or self.edges())
+            from numpy import asarray
+            return asarray(self.get_edges_attribute(name, default, keys))
         if not keys:
             return [attr.get(name, default) for u, v, attr in self.edges_iter(True)]
         return [self.edge[u][v].get(name, default) for u, v in keys]
 
-    def get_edges_attributes(self, names, defaults=None, keys=None):
+    def get_edges_attributes(self, names, defaults=None, keys=None, rtype='list'):
+        """Get the values of a number of attributes of a number of edges.
+
+        Parameters:
+            names (list) : The names of the attributes.
+            defaults (list) : Optional. The values for edges without the attributes.
+            keys (list) : Optional. The edges. Defaults to all edges.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values per edge.
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.edge, dict):
+                return self.edge.store.array(names, defaults, keys or self.edges())
+            from numpy import asarray
+            return asarray(self.get_edges_attributes(names, defaults, keys))
         if not defaults:
             defaults = [None] * len(names)
         temp = zip(names, defaults)
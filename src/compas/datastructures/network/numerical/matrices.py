@@ -1,9 +1,11 @@
 from __future__ import print_function
 
 from numpy import array
+from numpy import ones
+
+from scipy.sparse import csr_matrix
+from scipy.sparse import diags
 
-from compas.numerical.matrices import adjacency_matrix
-from compas.numerical.matrices import degree_matrix
 from compas.numerical.matrices import connectivity_matrix
 from compas.numerical.matrices import laplacian_matrix
 from compas.numerical.matrices import face_matrix
@@ -38,22 +40,25 @@ def _return_matrix(M, rtype):
     return M
 
 
+# the matrices are built directly from the cached CSR snapshot of the network
+# see: compas.datastructures.network.csr.NetworkCSR
+
+
 def network_adjacency_matrix(network, rtype='array'):
-    k_i = dict((key, index) for index, key in network.vertices_enum())
-    adjacency = [[k_i[nbr] for nbr in network.neighbours(key)] for key in network.vertices_iter()]
-    return adjacency_matrix(adjacency, rtype=rtype)
+    csr = network.csr()
+    n   = len(csr)
+    A   = csr_matrix((ones(csr.indices.shape[0]), csr.indices, csr.indptr), shape=(n, n))
+    return _return_matrix(A, rtype)
 
 
 def network_degree_matrix(network, rtype='array'):
-    k_i = dict((key, index) for index, key in network.vertices_enum())
-    adjacency = [[k_i[nbr] for nbr in network.neighbours(key)] for key in network.vertices_iter()]
-    return degree_matrix(adjacency, rtype=rtype)
+    csr = network.csr()
+    D   = diags(csr.degree.astype(float), 0).tocoo()
+    return _return_matrix(D, rtype)
 
 
 def network_connectivity_matrix(network, rtype='array'):
-    k_i   = dict((key, index) for index, key in network.vertices_enum())
-    edges = [(k_i[u], k_i[v]) for u, v in network.edges_iter()]
-    return connectivity_matrix(edges, rtype=rtype)
+    return connectivity_matrix(network.csr().edges, rtype=rtype)
 
 
 def network_laplacian_matrix(network, rtype='array', normalize=False):
@@ -108,9 +113,7 @@ def network_laplacian_matrix(network, rtype='array', normalize=False):
             network.plot(lines=lines)
 
     """
-    k_i   = dict((key, index) for index, key in network.vertices_enum())
-    edges = [(k_i[u], k_i[v]) for u, v in network.edges_iter()]
-    return laplacian_matrix(edges, normalize=normalize, rtype=rtype)
+    return laplacian_matrix(network.csr().edges, normalize=normalize, rtype=rtype)
 
 
 def network_face_matrix(network, rtype='csr'):
@@ -158,7 +161,7 @@ def network_face_matrix(network, rtype='csr'):
             c   = F.dot(xyz)
 
     """
-    k_i = dict((key, index) for index, key in network.vertices_enum())
+    k_i = network.csr().key_index
     face_vertices = [[k_i[key] for key in network.face_vertices(fkey)] for fkey in network.faces()]
     return face_matrix(face_vertices, rtype=rtype)
 
@@ -132,6 +132,7 @@ def split_edge_network(network, u, v, t=0.5, allow_boundary=True):
         else:
             vertices.insert(i + 1, w)
         network.face[fkey_vu] = vertices
+    network.invalidate_topology()
     # return the key of the split vertex
     return w
 
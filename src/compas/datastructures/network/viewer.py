@@ -31,9 +31,9 @@ class NetworkViewer(Viewer):
 
             network = Network.from_obj(compas.get_data('lines.obj'))
 
-            network.add_edge(0, 14)
-            network.add_edge(15, 10)
-            network.add_edge(21, 24)
+            network.add_edge(4, 20)
+            network.add_edge(22, 13)
+            network.add_edge(8, 0)
 
             viewer = NetworkViewer(network, 600, 600)
 
@@ -102,9 +102,9 @@ if __name__ == '__main__':
 
     network = Network.from_obj(compas.get_data('lines.obj'))
 
-    network.add_edge(0, 14)
-    network.add_edge(15, 10)
-    network.add_edge(21, 24)
+    network.add_edge(4, 20)
+    network.add_edge(22, 13)
+    network.add_edge(8, 0)
 
     viewer = NetworkViewer(network, 600, 600)
 
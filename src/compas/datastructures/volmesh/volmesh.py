@@ -1,6 +1,7 @@
 import json
 
 from ast import literal_eval as _eval
+from copy import deepcopy
 from math import sqrt
 
 from compas.files.obj import OBJ
@@ -8,8 +9,12 @@ from compas.files.obj import OBJ
 from compas.datastructures.mesh import Mesh
 from compas.datastructures.volmesh.exceptions import VolMeshError
 
+from compas.exceptions import BRGInputError
+
 from compas.geometry import centroid_points
 
+from compas.utilities import copy_attributes
+
 
 __author__     = 'Tom Van Mele'
 __copyright__  = 'Copyright 2014, Block Research Group - ETH Zurich'
@@ -163,20 +168,24 @@ under construction
             'max_int_fkey'             : self._max_int_fkey,
             'max_int_ckey'             : self._max_int_ckey, }
 
+        # plain dicts, also if the attributes are stored in columns
+        vertex = self.vertex.copy()
+        edge   = self.edge.copy()
+
         key_rkey = {}
 
-        for key in self.vertex:
+        for key in vertex:
             rkey = repr(key)
             key_rkey[key] = rkey
-            data['vertex'][rkey] = self.vertex[key]
+            data['vertex'][rkey] = vertex[key]
             data['plane'][rkey] = {}
             data['edge'][rkey] = {}
 
-        for u in self.edge:
+        for u in edge:
             ru = key_rkey[u]
-            for v in self.edge[u]:
+            for v in edge[u]:
                 rv = key_rkey[v]
-                data['edge'][ru][rv] = self.edge[u][v]
+                data['edge'][ru][rv] = edge[u][v]
 
         for f in self.halfface:
             _f = repr(f)
@@ -346,6 +355,91 @@ under construction
             cells.append(cell)
         return cls.from_vertices_and_cells(vertices, cells)
 
+    @classmethod
+    def from_binary(cls, filepath, attributes=True):
+        """Construct a volmesh from a binary file written by :meth:`to_binary`.
+
+        Parameters:
+            filepath (str) : Path to the file.
+            attributes (bool) : Optional. If ``False``, only read the geometry and
+                topology, and not the vertex and edge attributes.
+                Default is ``True``.
+
+        Returns:
+            VolMesh : A volmesh object.
+
+        Raises:
+            BRGInputError : If the file does not contain a volmesh.
+
+        Note:
+            Requires NumPy.
+
+        """
+        from compas.files.npz import NPZReader
+        volmesh = cls()
+        with NPZReader(filepath) as reader:
+            meta = reader.meta
+            if meta.get('datastructure') != 'VolMesh':
+                raise BRGInputError('The file does not contain a volmesh: {0}'.format(filepath))
+            volmesh.attributes.update(meta['attributes'])
+            volmesh.default_vertex_attributes.update(meta['dva'])
+            volmesh.default_edge_attributes.update(meta['dea'])
+            dva = volmesh.default_vertex_attributes
+            dea = volmesh.default_edge_attributes
+
+            keys  = reader.keys('vertex')
+            fkeys = reader.keys('halfface')
+            ckeys = reader.keys('cell')
+
+            vertexdata = reader.table('vertex.attributes') if attributes else {}
+            for index, (x, y, z) in enumerate(reader.array('vertex.xyz').tolist()):
+                key = keys[index]
+                attr = dva.copy()
+                if index in vertexdata:
+                    attr.update(vertexdata[index])
+                attr['x'] = x
+                attr['y'] = y
+                attr['z'] = z
+                volmesh.vertex[key] = attr
+                volmesh.plane[key] = {}
+                volmesh.edge[key] = {}
+
+            edgedata = reader.table('edge.attributes') if attributes else {}
+            for index, (u, v) in enumerate(reader.array('edge.vertices').tolist()):
+                attr = dea.copy()
+                if index in edgedata:
+                    attr.update(edgedata[index])
+                volmesh.edge[keys[u]][keys[v]] = attr
+
+            for fkey in fkeys:
+                volmesh.halfface[fkey] = {}
+            halfedges = reader.array('halfface.vertices').tolist()
+            for f, (u, v) in zip(reader.array('halfface.faces').tolist(), halfedges):
+                volmesh.halfface[fkeys[f]][keys[u]] = keys[v]
+
+            planes = reader.array('plane.vertices').tolist()
+            for (u, v, w), c in zip(planes, reader.array('plane.cells').tolist()):
+                u, v, w = keys[u], keys[v], keys[w]
+                if v not in volmesh.plane[u]:
+                    volmesh.plane[u][v] = {}
+                volmesh.plane[u][v][w] = ckeys[c] if c >= 0 else None
+
+            for ckey in ckeys:
+                volmesh.cell[ckey] = {}
+            halfedges = reader.array('cell.vertices').tolist()
+            cells = reader.array('cell.cells').tolist()
+            for c, (u, v), f in zip(cells, halfedges, reader.array('cell.faces').tolist()):
+                u = keys[u]
+                cell = volmesh.cell[ckeys[c]]
+                if u not in cell:
+                    cell[u] = {}
+                cell[u][keys[v]] = fkeys[f]
+
+            volmesh._max_int_key  = meta['max_int_key']
+            volmesh._max_int_fkey = meta['max_int_fkey']
+            volmesh._max_int_ckey = meta['max_int_ckey']
+        return volmesh
+
     # --------------------------------------------------------------------------
     # special
     # --------------------------------------------------------------------------
@@ -382,6 +476,93 @@ under construction
         with open(filepath, 'wb+') as fp:
             json.dump(self.data, fp)
 
+    def to_binary(self, filepath, compressed=False):
+        """Write the volmesh to a binary file.
+
+        The file is a NumPy *npz* archive with the vertex coordinates and the
+        topology as arrays, and the vertex and edge attributes as typed columns.
+        Keys are stored as integers or strings, or as their ``repr`` if they are
+        of any other type.
+
+        Parameters:
+            filepath (str) : Path to the file to write.
+            compressed (bool) : Optional. Compress the file. Default is ``False``.
+
+        Note:
+            Requires NumPy.
+
+        """
+        from numpy import float64
+        from numpy import int64
+        from compas.files.npz import NPZWriter
+
+        keys       = list(self.vertex)
+        fkeys      = list(self.halfface)
+        ckeys      = list(self.cell)
+        key_index  = dict((key, index) for index, key in enumerate(keys))
+        fkey_index = dict((fkey, index) for index, fkey in enumerate(fkeys))
+        ckey_index = dict((ckey, index) for index, ckey in enumerate(ckeys))
+
+        writer = NPZWriter(filepath, compressed)
+        writer.meta['datastructure'] = 'VolMesh'
+        writer.meta['attributes']    = self.attributes
+        writer.meta['dva']           = self.default_vertex_attributes
+        writer.meta['dea']           = self.default_edge_attributes
+        writer.meta['max_int_key']   = self._max_int_key
+        writer.meta['max_int_fkey']  = self._max_int_fkey
+        writer.meta['max_int_ckey']  = self._max_int_ckey
+        writer.add_keys('vertex', keys)
+        writer.add_keys('halfface', fkeys)
+        writer.add_keys('cell', ckeys)
+
+        attrs = [self.vertex[key] for key in keys]
+        xyz = [(attr['x'], attr['y'], attr['z']) for attr in attrs]
+        writer.add_array('vertex.xyz', xyz, dtype=float64)
+        writer.add_table('vertex.attributes', dict(enumerate(attrs)), self.default_vertex_attributes, exclude=('x', 'y', 'z'))
+
+        edges = []
+        edgedata = {}
+        for u in self.edge:
+            for v, attr in self.edge[u].items():
+                edgedata[len(edges)] = attr
+                edges.append((key_index[u], key_index[v]))
+        writer.add_array('edge.vertices', edges, dtype=int64)
+        writer.add_table('edge.attributes', edgedata, self.default_edge_attributes)
+
+        faces = []
+        halfedges = []
+        for fkey in fkeys:
+            for u, v in self.halfface[fkey].items():
+                faces.append(fkey_index[fkey])
+                halfedges.append((key_index[u], key_index[v]))
+        writer.add_array('halfface.faces', faces, dtype=int64)
+        writer.add_array('halfface.vertices', halfedges, dtype=int64)
+
+        planes = []
+        cells = []
+        for u in self.plane:
+            for v in self.plane[u]:
+                for w, ckey in self.plane[u][v].items():
+                    planes.append((key_index[u], key_index[v], key_index[w]))
+                    cells.append(-1 if ckey is None else ckey_index[ckey])
+        writer.add_array('plane.vertices', planes, dtype=int64)
+        writer.add_array('plane.cells', cells, dtype=int64)
+
+        cells = []
+        halfedges = []
+        faces = []
+        for ckey in ckeys:
+            for u in self.cell[ckey]:
+                for v, fkey in self.cell[ckey][u].items():
+                    cells.append(ckey_index[ckey])
+                    halfedges.append((key_index[u], key_index[v]))
+                    faces.append(fkey_index[fkey])
+        writer.add_array('cell.cells', cells, dtype=int64)
+        writer.add_array('cell.vertices', halfedges, dtype=int64)
+        writer.add_array('cell.faces', faces, dtype=int64)
+
+        writer.write()
+
     def to_obj(self, filepath):
         raise NotImplementedError
 
@@ -397,7 +578,56 @@ under construction
     # **************************************************************************
     # **************************************************************************
 
+    def copy(self, attributes=True):
+        """Make an independent copy of the volmesh.
+
+        The topology dicts are duplicated structurally, without converting the
+        keys, and the attribute dicts are copied one level deep. Only attribute
+        values that are containers (lists, dicts, sets) are deep-copied. All
+        other values are shared with the original until they are replaced.
+
+        Parameters:
+            attributes (bool) : Optional. If ``False``, only copy the vertex
+                coordinates and the topology. The vertices and edges of the copy
+                get the default attributes. Default is ``True``.
+
+        Returns:
+            VolMesh : The copy.
+
+        """
+        cls     = type(self)
+        volmesh = cls()
+        volmesh.attributes.update(deepcopy(self.attributes))
+        volmesh.default_vertex_attributes.update(deepcopy(self.default_vertex_attributes))
+        volmesh.default_edge_attributes.update(deepcopy(self.default_edge_attributes))
+        volmesh.halfface = dict((fkey, face.copy()) for fkey, face in self.halfface.iteritems())
+        volmesh.plane    = dict((u, dict((v, planes.copy()) for v, planes in nbrs.iteritems())) for u, nbrs in self.plane.iteritems())
+        volmesh.cell     = dict((ckey, dict((u, nbrs.copy()) for u, nbrs in cell.iteritems())) for ckey, cell in self.cell.iteritems())
+        columns = not isinstance(self.vertex, dict)
+        if attributes and columns:
+            volmesh.vertex = self.vertex.clone(volmesh.default_vertex_attributes)
+            volmesh.edge   = self.edge.clone(volmesh.default_edge_attributes)
+        elif attributes:
+            volmesh.vertex = dict((key, copy_attributes(attr)) for key, attr in self.vertex.iteritems())
+            volmesh.edge   = dict((u, dict((v, copy_attributes(attr)) for v, attr in nbrs.iteritems())) for u, nbrs in self.edge.iteritems())
+        else:
+            dva = volmesh.default_vertex_attributes
+            dea = volmesh.default_edge_attributes
+            for key, attr in self.vertex.items():
+                volmesh.vertex[key] = copy_attributes(dva)
+                volmesh.vertex[key].update(x=attr['x'], y=attr['y'], z=attr['z'])
+            for u in self.edge:
+                volmesh.edge[u] = dict((v, copy_attributes(dea)) for v in self.edge[u])
+            if columns:
+                volmesh.enable_attribute_columns()
+        volmesh._key_to_str   = self._key_to_str
+        volmesh._max_int_key  = self._max_int_key
+        volmesh._max_int_fkey = self._max_int_fkey
+        volmesh._max_int_ckey = self._max_int_ckey
+        return volmesh
+
     def clear(self):
+        columns = not isinstance(self.vertex, dict)
         del self.vertex
         del self.cell
         del self.halfface
@@ -411,6 +641,38 @@ under construction
         self._max_int_key = -1
         self._max_int_fkey = -1
         self._max_int_ckey = -1
+        if columns:
+            self.enable_attribute_columns()
+
+    def enable_attribute_columns(self):
+        """Store the vertex and edge attributes in typed columns.
+
+        The ``vertex`` and ``edge`` dicts are replaced by dict-like objects that
+        store every attribute in one NumPy column
+        (see :mod:`compas.datastructures.columns`). Access through
+        ``volmesh.vertex[key]['x']`` keeps working, and attributes of all vertices
+        can be retrieved as an array without copying them.
+
+        >>> volmesh.enable_attribute_columns()
+        >>> xyz = volmesh.get_vertices_attributes('xyz', rtype='array')
+
+        Note:
+            Requires NumPy.
+
+        """
+        if not isinstance(self.vertex, dict):
+            return
+        from compas.datastructures.columns import ColumnarDict
+        from compas.datastructures.columns import ColumnarEdgeDict
+        self.vertex = ColumnarDict.from_dict(self.vertex, self.default_vertex_attributes)
+        self.edge   = ColumnarEdgeDict.from_dict(self.edge, self.default_edge_attributes)
+
+    def disable_attribute_columns(self):
+        """Store the vertex and edge attributes in regular dicts again."""
+        if isinstance(self.vertex, dict):
+            return
+        self.vertex = self.vertex.copy()
+        self.edge   = self.edge.copy()
 
     # **************************************************************************
     # **************************************************************************
@@ -761,6 +1023,9 @@ under construction
         if not attr_dict:
             attr_dict = {}
         attr_dict.update(kwattr)
+        if not isinstance(self.vertex, dict):
+            self.vertex.store.update_defaults(attr_dict)
+            return
         self.default_vertex_attributes.update(attr_dict)
         for key in self.vertex:
             attr = attr_dict.copy()
@@ -776,6 +1041,9 @@ under construction
         self.vertex[key].update(attr_dict)
 
     def set_vertices_attribute(self, name, value, keys=None):
+        if not isinstance(self.vertex, dict):
+            self.vertex.store.fill(name, value, keys)
+            return
         if not keys:
             for key, attr in self.vertices_iter(True):
                 attr[name] = value
@@ -786,6 +1054,10 @@ under construction
     def set_vertices_attributes(self, keys=None, attr_dict=None, **kwattr):
         attr_dict = attr_dict or {}
         attr_dict.update(kwattr)
+        if not isinstance(self.vertex, dict):
+            for name, value in attr_dict.items():
+                self.vertex.store.fill(name, value, keys)
+            return
         if not keys:
             for key, attr in self.vertices_iter(True):
                 attr.update(attr_dict)
@@ -801,12 +1073,58 @@ under construction
             defaults = [None] * len(names)
         return [self.vertex[key].get(name, default) for name, default in zip(names, defaults)]
 
-    def get_vertices_attribute(self, name, default=None, keys=None):
+    def get_vertices_attribute(self, name, default=None, keys=None, rtype='list'):
+        """Get the value of an attribute of a number of vertices.
+
+        Parameters:
+            name (str) : The name of the attribute.
+            default (object) : Optional. The value for vertices without the attribute.
+            keys (list) : Optional. The vertex keys. Defaults to all vertices.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values.
+
+        Note:
+            If the attributes are stored in columns (see :meth:`enable_attribute_columns`),
+            the array of all vertices is a view on the column instead of a copy.
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.vertex, dict):
+                return self.vertex.store.column(name, default, keys or None)
+            from numpy import asarray
+            return asarray(self.get_vertices_attribute(name, default, keys))
         if not keys:
             return [attr.get(name, default) for key, attr in self.vertices_iter(True)]
         return [self.vertex[key].get(name, default) for key in keys]
 
-    def get_vertices_attributes(self, names, defaults=None, keys=None):
+    def get_vertices_attributes(self, names, defaults=None, keys=None, rtype='list'):
+        """Get the values of a number of attributes of a number of vertices.
+
+        Parameters:
+            names (list) : The names of the attributes.
+            defaults (list) : Optional. The values for vertices without the attributes.
+            keys (list) : Optional. The vertex keys. Defaults to all vertices.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values per vertex.
+
+        Note:
+            If the attributes are stored in columns (see :meth:`enable_attribute_columns`),
+            the array of all vertices is a view on the columns instead of a copy,
+            provided that the columns are consecutive and of the same type.
+            This is for example the case for ``'xyz'``.
+
+        >>> xyz = volmesh.get_vertices_attributes('xyz', rtype='array')
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.vertex, dict):
+                return self.vertex.store.array(names, defaults, keys or None)
+            from numpy import asarray
+            return asarray(self.get_vertices_attributes(names, defaults, keys))
         if not defaults:
             defaults = [None] * len(names)
         temp = zip(names, defaults)
@@ -822,6 +1140,9 @@ under construction
         if not attr_dict:
             attr_dict = {}
         attr_dict.update(kwargs)
+        if not isinstance(self.edge, dict):
+            self.edge.store.update_defaults(attr_dict)
+            return
         self.default_edge_attributes.update(attr_dict)
         for u, v in self.edges_iter():
             attr = attr_dict.copy()
@@ -837,6 +1158,9 @@ under construction
         self.edge[u][v].update(attr_dict)
 
     def set_edges_attribute(self, name, value, keys=None):
+        if not keys and not isinstance(self.edge, dict):
+            self.edge.store.fill(name, value, self.edges())
+            return
         if not keys:
             for u, v, attr in self.edges_iter(True):
                 attr[name] = value
@@ -866,12 +1190,46 @@ under construction
             return [self.edge[u][v].get(name, default) for name, default in zip(names, defaults)]
         return [self.edge[v][u].get(name, default) for name, default in zip(names, defaults)]
 
-    def get_edges_attribute(self, name, default=None, keys=None):
+    def get_edges_attribute(self, name, default=None, keys=None, rtype='list'):
+        """Get the value of an attribute of a number of edges.
+
+        Parameters:
+            name (str) : The name of the attribute.
+            default (object) : Optional. The value for edges without the attribute.
+            keys (list) : Optional. The edges. Defaults to all edges.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values.
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.edge, dict):
+                return self.edge.store.column(name, default, keys or self.edges())
+            from numpy import asarray
+            return asarray(self.get_edges_attribute(name, default, keys))
         if not keys:
             return [attr.get(name, default) for u, v, attr in self.edges_iter(True)]
         return [self.edge[u][v].get(name, default) for u, v in keys]
 
-    def get_edges_attributes(self, names, defaults=None, keys=None):
+    def get_edges_attributes(self, names, defaults=None, keys=None, rtype='list'):
+        """Get the values of a number of attributes of a number of edges.
+
+        Parameters:
+            names (list) : The names of the attributes.
+            defaults (list) : Optional. The values for edges without the attributes.
+            keys (list) : Optional. The edges. Defaults to all edges.
+            rtype (str) : Optional. The return type, ``'list'`` (default) or ``'array'``.
+
+        Returns:
+            list, array : The attribute values per edge.
+
+        """
+        if rtype == 'array':
+            if not isinstance(self.edge, dict):
+                return self.edge.store.array(names, defaults, keys or self.edges())
+            from numpy import asarray
+            return asarray(self.get_edges_attributes(names, defaults, keys))
         if not defaults:
             defaults = [None] * len(names)
         temp = zip(names, defaults)
@@ -37,10 +37,88 @@ OBJ
 
     OBJ
     OBJReader
+    OBJArrayReader
     OBJParser
+    OBJArrayParser
     OBJComposer
     OBJWriter
 
+
+DXF
+===
+
+.. currentmodule:: compas.files.dxf
+
+:mod:`compas.files.dxf`
+
+.. autosummary::
+    :toctree: generated/
+
+    DXF
+    DXFReader
+    DXFParser
+
+
+STL
+===
+
+.. currentmodule:: compas.files.stl
+
+:mod:`compas.files.stl`
+
+.. autosummary::
+    :toctree: generated/
+
+    STL
+    STLReader
+    STLParser
+    STLWriter
+
+
+PLY
+===
+
+.. currentmodule:: compas.files.ply
+
+:mod:`compas.files.ply`
+
+.. autosummary::
+    :toctree: generated/
+
+    PLY
+    PLYElement
+    PLYReader
+    PLYParser
+    PLYWriter
+
+
+NPZ
+===
+
+.. currentmodule:: compas.files.npz
+
+:mod:`compas.files.npz`
+
+.. autosummary::
+    :toctree: generated/
+
+    NPZReader
+    NPZWriter
+
+
+Mesh store
+==========
+
+.. currentmodule:: compas.files.meshstore
+
+:mod:`compas.files.meshstore`
+
+.. autosummary::
+    :toctree: generated/
+
+    MeshStore
+    MeshStoreWriter
+
 """
 
 from .csv import CSVReader
@@ -48,6 +126,8 @@ from .csv import CSVWriter
 
 from .obj import OBJ
 from .obj import OBJReader
+from .obj import OBJArrayReader
 from .obj import OBJParser
+from .obj import OBJArrayParser
 from .obj import OBJComposer
 from .obj import OBJWriter
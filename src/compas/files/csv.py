@@ -1,139 +1,345 @@
-from __future__ import print_function
-
-try:
-    import urllib.request as urllib2
-except ImportError:
-    import urllib2
-
-
-__author__     = ['Tom Van Mele <vanmelet@ethz.ch>', ]
-__copyright__  = 'Copyright 2014, Block Research Group - ETH Zurich'
-__license__    = 'MIT License'
-__email__      = 'vanmelet@ethz.ch'
-
-
-class CSVReader(object):
-    """Read the contents of a *csv* file.
-
-    Parameters:
-        filepath (str): Path to the file.
-        delimiter (str): Optional. Cell delimiter. Default is ``','``.
-        remote (bool): Optional. Is the file in a remote location? Default is ``False``.
-
-    """
-
-    def __init__(self, filepath, delimiter=',', remote=False):
-        self.filepath = filepath
-        self.delimiter = delimiter
-        self.remote = remote
-        self._content = None
-        self._headers = []
-        self._rows = []
-        self.open()
-        self.pre()
-        self.read()
-        self.post()
-
-    def open(self):
-        if self.remote:
-            resp = urllib2.urlopen(self.filepath)
-            self._content = resp.readlines()
-        else:
-            with open(self.filepath) as fh:
-                self._content = fh.readlines()
-
-    def pre(self):
-        pass
-
-    def read(self):
-        self._headers = self._content[0].strip().split(self.delimiter)
-        for line in iter(self._content[1:]):
-            line = line.strip()
-            row = line.split(self.delimiter)
-            self._rows.append(row)
-
-    def post(self):
-        pass
-
-    def headers(self):
-        return self._headers
-
-    def rows(self, include_headers=False):
-        """Retrieve the row data.
-
-        Parameters:
-            include_headers (bool): Optional. If ``True``, return per row a
-                dictionary with the headers as keys and the corresponding columns
-                as values. Default is ``False``.
-
-        Returns:
-            list of list: If ``include_headers=False``. The row data.
-            list of dict: If ``include_headers=True``. The row data as a list of dicts.
-
-        """
-        if include_headers:
-            return [dict((self._headers[i], row[i]) for i in range(len(row))) for row in self._rows]
-        return self._rows
-
-    def columns(self, include_headers=False):
-        """Retrieve the column data.
-
-        Parameters:
-            include_headers (bool): Optional. Default is ``False``.
-
-        Returns:
-            list of list: If ``include_headers=False``. The column data.
-            list of dict: If ``include_headers=True``. The column data as a dictionary.
-
-        """
-        columns = zip(*self._rows)
-        if include_headers:
-            return dict((self._headers[i], columns[i]) for i in range(len(columns)))
-        return columns
-
-
-class CSVWriter(object):
-    """Write the contents of a *csv* file.
-
-    Parameters:
-        filepath (str): Path to the file.
-        rows (list of list, list of dict): The row data.
-        headers (list): Optional. Column headers. Default is ``None``.
-        delimiter (str): Optional. Cell delimiter. Default is ``','``.
-
-    """
-
-    def __init__(self, filepath, rows, headers=None, delimiter=','):
-        self.filepath = filepath
-        self.rows = rows
-        self.headers = headers
-        self.delimiter = delimiter
-        self.pre()
-        self.write()
-
-    def pre(self):
-        if self.headers:
-            h = len(self.headers)
-            assert all([len(row) <= h for row in self.rows]), 'Some rows contain more data than there are headers.'
-
-    def write(self):
-        with open(self.filepath, 'wb+') as fp:
-            if self.headers:
-                fp.write('{0}\n'.format(self.delimiter.join(self.headers)))
-            for row in self.rows:
-                if isinstance(row, dict):
-                    pass
-                else:
-                    fp.write('{0}\n'.format(self.delimiter.join(row)))
-
-
-# ==============================================================================
-# Debugging
-# ==============================================================================
-
-if __name__ == '__main__':
-
-    csv = CSVReader('make_blocks.csv', ',')
-    print(csv.headers())
-    print(csv.rows())
-    print(csv.columns(True))
+from __future__ import print_function
+
+try:
+    import urllib.request as urllib2
+except ImportError:
+    import urllib2
+
+from compas.exceptions import BRGInputError
+
+
+__author__     = ['Tom Van Mele <vanmelet@ethz.ch>', ]
+__copyright__  = 'Copyright 2014, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'vanmelet@ethz.ch'
+
+
+class CSVReader(object):
+    """Read the contents of a *csv* file.
+
+    The header line is read when the reader is created. The rows are read
+    only when they are requested, either all at once with :meth:`rows`, one by
+    one with :meth:`iter_rows`, or as typed NumPy columns with :meth:`typed_columns`.
+    The latter two read the file in chunks of lines, without holding the contents
+    of the file in memory.
+
+    Parameters:
+        filepath (str): Path to the file.
+        delimiter (str): Optional. Cell delimiter. Default is ``','``.
+        remote (bool): Optional. Is the file in a remote location? Default is ``False``.
+        chunksize (int): Optional. The approximate number of bytes per chunk of lines.
+            Default is ``1048576``.
+
+    """
+
+    def __init__(self, filepath, delimiter=',', remote=False, chunksize=2 ** 20):
+        self.filepath = filepath
+        self.delimiter = delimiter
+        self.remote = remote
+        self.chunksize = chunksize
+        self._content = None
+        self._headers = []
+        self._rows = None
+        self.open()
+        self.pre()
+        self.read()
+        self.post()
+
+    def open(self):
+        self._content = self._chunks()
+
+    def _chunks(self):
+        if self.remote:
+            fh = urllib2.urlopen(self.filepath)
+        else:
+            fh = open(self.filepath)
+        try:
+            while True:
+                lines = fh.readlines(self.chunksize)
+                if not lines:
+                    break
+                if not isinstance(lines[0], str):
+                    lines = [line.decode('utf-8') for line in lines]
+                yield lines
+        finally:
+            fh.close()
+
+    def pre(self):
+        pass
+
+    def read(self):
+        # only the header line
+        for lines in self._content:
+            self._headers = lines[0].strip().split(self.delimiter)
+            break
+        self._content.close()
+        self._content = None
+
+    def post(self):
+        pass
+
+    def headers(self):
+        return self._headers
+
+    def _row_chunks(self):
+        # the rows in chunks, without the header line
+        first = True
+        for lines in self._chunks():
+            if first:
+                lines = lines[1:]
+                first = False
+            if not lines:
+                continue
+            yield [line.strip().split(self.delimiter) for line in lines]
+
+    def iter_rows(self, include_headers=False):
+        """Iterate over the rows, without reading the entire file.
+
+        Parameters:
+            include_headers (bool): Optional. If ``True``, yield per row a
+                dictionary with the headers as keys. Default is ``False``.
+
+        Yields:
+            list, dict: The cells of a row.
+
+        """
+        headers = self._headers
+        for rows in self._row_chunks():
+            for row in rows:
+                if include_headers:
+                    yield dict((headers[i], row[i]) for i in range(len(row)))
+                else:
+                    yield row
+
+    def rows(self, include_headers=False):
+        """Retrieve the row data.
+
+        Parameters:
+            include_headers (bool): Optional. If ``True``, return per row a
+                dictionary with the headers as keys and the corresponding columns
+                as values. Default is ``False``.
+
+        Returns:
+            list of list: If ``include_headers=False``. The row data.
+            list of dict: If ``include_headers=True``. The row data as a list of dicts.
+
+        """
+        if self._rows is None:
+            self._rows = list(self.iter_rows())
+        if include_headers:
+            return [dict((self._headers[i], row[i]) for i in range(len(row))) for row in self._rows]
+        return self._rows
+
+    def columns(self, include_headers=False):
+        """Retrieve the column data.
+
+        Parameters:
+            include_headers (bool): Optional. Default is ``False``.
+
+        Returns:
+            list of list: If ``include_headers=False``. The column data.
+            list of dict: If ``include_headers=True``. The column data as a dictionary.
+
+        """
+        columns = list(zip(*self.rows()))
+        if include_headers:
+            return dict((self._headers[i], columns[i]) for i in range(len(columns)))
+        return columns
+
+    def typed_columns(self, names=None, schema=None):
+        """Load columns as typed NumPy arrays.
+
+        The file is read in chunks of lines, and the cells of every column of a
+        chunk are converted in one go. Without a schema, the type of a column is
+        inferred from the first chunk: integer, float or string. An integer
+        column becomes a float column if a later chunk contains floats or empty
+        cells. Empty cells of float columns are ``nan``. A numerical column with
+        text in a later chunk needs a schema.
+
+        Parameters:
+            names (list): Optional. The headers of the columns to load.
+                Default is ``None``, in which case all columns are loaded.
+            schema (dict): Optional. The NumPy type per header, for example
+                ``{'id': int, 'load': float}``. Columns not in the schema are
+                inferred. Default is ``None``.
+
+        Returns:
+            OrderedDict: The columns by header.
+
+        Raises:
+            BRGInputError: If a column does not exist, or if the cells of a column
+                cannot be converted to its type.
+
+        Note:
+            Requires NumPy.
+
+        >>> columns = CSVReader('loads.csv').typed_columns(['node', 'fz'], {'node': int})
+
+        """
+        from collections import OrderedDict
+        from numpy import concatenate
+        from numpy import dtype
+        names = list(names or self._headers)
+        for name in names:
+            if name not in self._headers:
+                raise BRGInputError('No such column: {0}'.format(name))
+        schema = dict((name, dtype(value)) for name, value in (schema or {}).items())
+        indices = [self._headers.index(name) for name in names]
+        types = [schema.get(name) for name in names]
+        chunks = [[] for _ in names]
+        for rows in self._row_chunks():
+            for i, index in enumerate(indices):
+                cells = [row[index] if index < len(row) else '' for row in rows]
+                values, types[i] = _typed(cells, types[i], names[i] in schema, names[i])
+                chunks[i].append(values)
+        columns = OrderedDict()
+        for name, kind, values in zip(names, types, chunks):
+            if not values:
+                columns[name] = _typed([], kind, True, name)[0]
+                continue
+            if kind.kind in 'SU':
+                # strings keep the width of their own chunk
+                columns[name] = concatenate(values)
+            else:
+                columns[name] = concatenate([part.astype(kind) for part in values])
+        return columns
+
+
+def _typed(cells, kind, fixed, name):
+    # convert the cells of a column to an array of a type
+    # without a fixed type, integers are promoted to floats where necessary
+    from numpy import array
+    from numpy import dtype
+    from numpy import float64
+    from numpy import int64
+    cells = array(cells, dtype=str)
+    if kind is None:
+        for kind in (dtype(int64), dtype(float64), cells.dtype):
+            try:
+                return _convert(cells, kind), kind
+            except ValueError:
+                pass
+    try:
+        return _convert(cells, kind), kind
+    except ValueError:
+        if fixed or kind.kind not in 'iu':
+            raise BRGInputError('The values of column {0} cannot be converted to {1}.'.format(name, kind))
+    try:
+        return _convert(cells, dtype(float64)), dtype(float64)
+    except ValueError:
+        raise BRGInputError('The values of column {0} cannot be converted to {1}.'.format(name, kind))
+
+
+def _convert(cells, kind):
+    if kind.kind in 'SU':
+        return cells
+    if kind.kind == 'f':
+        from numpy import where
+        cells = where(cells == '', 'nan', cells)
+    elif kind.kind == 'b':
+        # bool columns are written as 1 and 0 in bulk mode
+        from numpy import char
+        from numpy import in1d
+        cells = char.lower(char.strip(cells))
+        true = in1d(cells, ['true', '1'])
+        if not (true | in1d(cells, ['false', '0'])).all():
+            raise ValueError
+        return true
+    return cells.astype(kind)
+
+
+class CSVWriter(object):
+    """Write the contents of a *csv* file.
+
+    Parameters:
+        filepath (str): Path to the file.
+        rows (list of list, list of dict): The row data.
+        headers (list): Optional. Column headers. Default is ``None``.
+        delimiter (str): Optional. Cell delimiter. Default is ``','``.
+        columns (list, dict): Optional. Column data, as a list of arrays, or a
+            dict of arrays by header. If provided, ``rows`` is ignored and the
+            columns are written in bulk. Default is ``None``.
+        precision (str): Optional. The precision of the float columns in bulk mode.
+            Default is ``None``, in which case floats are written in full.
+
+    Note:
+        In bulk mode the rows are formatted in chunks, with a single string
+        operation per chunk. This requires NumPy.
+
+    Examples:
+
+        .. code-block:: python
+
+            CSVWriter('loads.csv', None, columns=OrderedDict([('node', nodes), ('fz', fz)]))
+
+    """
+
+    def __init__(self, filepath, rows, headers=None, delimiter=',', columns=None, precision=None):
+        self.filepath = filepath
+        self.rows = rows
+        self.headers = headers
+        self.delimiter = delimiter
+        self.columns = columns
+        self.precision = precision
+        self.chunksize = 10000
+        self.pre()
+        self.write()
+
+    def pre(self):
+        if self.columns is not None:
+            if hasattr(self.columns, 'keys'):
+                if not self.headers:
+                    self.headers = list(self.columns.keys())
+                self.columns = list(self.columns.values())
+            return
+        if self.headers:
+            h = len(self.headers)
+            assert all([len(row) <= h for row in self.rows]), 'Some rows contain more data than there are headers.'
+
+    def write(self):
+        if self.columns is not None:
+            self._write_columns()
+            return
+        with open(self.filepath, 'wb+') as fp:
+            if self.headers:
+                fp.write('{0}\n'.format(self.delimiter.join(self.headers)))
+            for row in self.rows:
+                if isinstance(row, dict):
+                    pass
+                else:
+                    fp.write('{0}\n'.format(self.delimiter.join(row)))
+
+    def _write_columns(self):
+        from numpy import asarray
+        columns = [asarray(column).ravel() for column in self.columns]
+        if len(set(column.shape[0] for column in columns)) > 1:
+            raise BRGInputError('The columns should have the same length.')
+        formats = []
+        for column in columns:
+            if column.dtype.kind in 'iub':
+                formats.append('%d')
+            elif column.dtype.kind == 'f':
+                formats.append('%.' + self.precision if self.precision else '%r')
+            else:
+                formats.append('%s')
+        template = self.delimiter.join(formats) + '\n'
+        count = columns[0].shape[0] if columns else 0
+        with open(self.filepath, 'w') as fp:
+            if self.headers:
+                fp.write('{0}\n'.format(self.delimiter.join(self.headers)))
+            for start in range(0, count, self.chunksize):
+                block = [column[start:start + self.chunksize].tolist() for column in columns]
+                values = [value for row in zip(*block) for value in row]
+                fp.write((template * len(block[0])) % tuple(values))
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    csv = CSVReader('make_blocks.csv', ',')
+    print(csv.headers())
+    print(csv.rows())
+    print(csv.columns(True))
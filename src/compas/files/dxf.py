@@ -1,5 +1,11 @@
 from __future__ import print_function
 
+import io
+
+from array import array
+
+from compas.exceptions import BRGInputError
+
 
 __author__    = ['Tom Van Mele', ]
 __copyright__ = 'Copyright 2016 - Block Research Group, ETH Zurich'
@@ -7,24 +13,410 @@ __license__   = 'MIT License'
 __email__     = 'vanmelet@ethz.ch'
 
 
+__all__ = [
+    'DXF',
+    'DXFReader',
+    'DXFParser',
+    'DXFComposer',
+    'DXFWriter',
+]
+
+
+ENTITY_TYPES = ('LINE', 'LWPOLYLINE', 'POLYLINE', '3DFACE')
+
+
 class DXF(object):
-    pass
+    """Read and parse a *dxf* file.
+
+    Parameters:
+        filepath (str): Path to the file.
+        layers (list): Optional. Only read the entities on these layers.
+            Default is ``None``.
+        types (list): Optional. Only read entities of these types.
+            Default is ``None``.
+        precision (str): Optional. The precision used to merge vertices.
+            Default is ``'3f'``.
+
+    Note:
+        Requires NumPy.
+
+    """
+    def __init__(self, filepath, layers=None, types=None, precision=None):
+        self.reader = DXFReader(filepath, layers=layers, types=types)
+        self.parser = DXFParser(self.reader, precision=precision)
 
 
 class DXFReader(object):
-    """"""
+    """Read the geometry of the entities of a *dxf* file.
+
+    The file is read as a stream of group code/value pairs, from which the
+    entities of the ``ENTITIES`` section are assembled one by one.
+    Entities on other layers, or of other types, are skipped while reading.
+    The coordinates of the selected entities are collected in compact buffers
+    of doubles. Memory use therefore only grows with the selected entities,
+    and not with the size of the file.
+
+    Supported entities are ``LINE``, ``LWPOLYLINE``, ``POLYLINE`` (2D and 3D
+    polylines, polygon meshes and polyface meshes) and ``3DFACE``.
+
+    Parameters:
+        filepath (str): Path to the file.
+        layers (list): Optional. Only read the entities on these layers.
+            Default is ``None``, in which case all layers are read.
+        types (list): Optional. Only read entities of these types.
+            Default is ``None``, in which case all supported types are read.
+        encoding (str): Optional. The encoding of the file. Default is ``'latin-1'``.
+
+    Attributes:
+        lines (array): The start and end points of the lines. Shape ``(m, 2, 3)``.
+        polyline_points (array): The points of all polylines. Shape ``(p, 3)``.
+        polyline_offsets (array): The offsets of the polylines in ``polyline_points``.
+        polyline_closed (array): Is a polyline closed? Shape ``(k, )``.
+        face_points (array): The corners of 3D faces and the vertices of
+            polygon and polyface meshes. Shape ``(q, 3)``.
+        faces (array): The indices of the points of all faces in ``face_points``.
+        face_offsets (array): The offsets of the faces in ``faces``.
+        layer_names (set): The names of all layers with entities, including
+            the layers that were not read.
+
+    Note:
+        Coordinates are read as they are stored. Object coordinate systems
+        (extrusion directions other than the world Z axis) are not taken into
+        account, and the bulges of polyline segments are ignored.
+
+    Examples:
+
+        .. code-block:: python
+
+            reader = DXFReader('site.dxf', layers=['contours'])
+            for etype, layer, codes in reader.entities():
+                print(etype, layer)
+
+    References:
+        http://images.autodesk.com/adsk/files/autocad_2012_pdf_dxf-reference_enu.pdf
+
+    """
+    def __init__(self, filepath, layers=None, types=None, encoding='latin-1'):
+        self.filepath         = filepath
+        self.layers           = set(layers) if layers is not None else None
+        self.types            = set(types) if types is not None else set(ENTITY_TYPES)
+        self.encoding         = encoding
+        self.layer_names      = set()
+        self.lines            = None
+        self.polyline_points  = None
+        self.polyline_offsets = None
+        self.polyline_closed  = None
+        self.face_points      = None
+        self.faces            = None
+        self.face_offsets     = None
+        self._lines           = array('d')
+        self._points          = array('d')
+        self._sizes           = array('l')
+        self._closed          = array('b')
+        self._corners         = array('d')
+        self._indices         = array('l')
+        self._faces           = array('l')
+        self.open()
+        self.pre()
+        self.read()
+        self.post()
+
+    def open(self):
+        pass
+
+    def pre(self):
+        pass
+
+    def pairs(self):
+        """Iterate over the group code/value pairs of the file.
+
+        Yields:
+            tuple: The group code (int) and the value (str).
+
+        """
+        with io.open(self.filepath, 'r', encoding=self.encoding) as fh:
+            for code in fh:
+                value = next(fh, None)
+                if value is None:
+                    break
+                yield int(code), value.strip()
+
+    def entities(self):
+        """Iterate over the selected entities of the ``ENTITIES`` section.
 
-    def __init__(self, filepath):
-        self.filepath = filepath
+        The vertices of a ``POLYLINE`` are included in the polyline entity.
+
+        Yields:
+            tuple: The type of the entity, its layer, and a dict with the values
+            per group code, as lists of strings in the order of the file.
+            A polyline has a list with the dicts of its vertices at key ``'vertices'``.
+
+        """
+        pairs = self.pairs()
+        try:
+            for entity in self._entities(pairs):
+                yield entity
+        finally:
+            pairs.close()
+
+    def _entities(self, pairs):
+        for code, value in pairs:
+            if code == 0 and value == 'SECTION':
+                code, value = next(pairs, (None, None))
+                if code == 2 and value == 'ENTITIES':
+                    break
+        else:
+            return
+        polyline = None
+        etype = None
+        codes = None
+        for code, value in pairs:
+            if code != 0:
+                if codes is not None:
+                    if code in codes:
+                        codes[code].append(value)
+                    else:
+                        codes[code] = [value]
+                continue
+            # the end of the previous entity
+            if etype is not None:
+                layer = codes[8][0] if codes and 8 in codes else '0'
+                if etype == 'VERTEX':
+                    if polyline is not None:
+                        polyline[2]['vertices'].append(codes)
+                elif etype == 'SEQEND':
+                    if polyline is not None:
+                        if self._select(polyline[1]):
+                            yield polyline
+                        polyline = None
+                elif etype == 'POLYLINE':
+                    self.layer_names.add(layer)
+                    if not isinstance(codes, _LayerOnly):
+                        codes['vertices'] = []
+                        polyline = ('POLYLINE', layer, codes)
+                else:
+                    self.layer_names.add(layer)
+                    if not isinstance(codes, _LayerOnly) and self._select(layer):
+                        yield etype, layer, codes
+            if value == 'ENDSEC':
+                break
+            etype = value
+            if etype in self.types or (etype in ('VERTEX', 'SEQEND') and 'POLYLINE' in self.types):
+                codes = {}
+            else:
+                # only the layer of a skipped entity is recorded
+                codes = _LayerOnly()
+
+    def _select(self, layer):
+        return self.layers is None or layer in self.layers
 
     def read(self):
-        with open(self.filepath, 'rb') as fp:
-            for line in fp:
-                print(line.strip())
+        for etype, layer, codes in self.entities():
+            if etype == 'LINE':
+                self._read_line(codes)
+            elif etype == 'LWPOLYLINE':
+                self._read_lwpolyline(codes)
+            elif etype == 'POLYLINE':
+                self._read_polyline(codes)
+            elif etype == '3DFACE':
+                self._read_3dface(codes)
+
+    def _read_line(self, codes):
+        self._lines.extend(_floats(codes, (10, 20, 30, 11, 21, 31)))
+
+    def _read_lwpolyline(self, codes):
+        x = [float(value) for value in codes.get(10, [])]
+        y = [float(value) for value in codes.get(20, [])]
+        z = float(codes[38][0]) if 38 in codes else 0.0
+        if len(x) != len(y) or len(x) < 2:
+            return
+        for point in zip(x, y):
+            self._points.extend((point[0], point[1], z))
+        self._sizes.append(len(x))
+        self._closed.append(int(codes[70][0]) & 1 if 70 in codes else 0)
+
+    def _read_polyline(self, codes):
+        flags = int(codes[70][0]) if 70 in codes else 0
+        vertices = codes['vertices']
+        if flags & 64:
+            self._read_polyface(vertices)
+            return
+        if flags & 16:
+            self._read_polygon_mesh(codes, flags, vertices)
+            return
+        if len(vertices) < 2:
+            return
+        # the vertices of a 2D polyline are at the elevation of the polyline
+        elevation = None if flags & 8 else _floats(codes, (30, ))[0]
+        for vertex in vertices:
+            x, y, z = _floats(vertex, (10, 20, 30))
+            self._points.extend((x, y, z if elevation is None else elevation))
+        self._sizes.append(len(vertices))
+        self._closed.append(flags & 1)
+
+    def _read_polyface(self, vertices):
+        # vertices with flag 64 have coordinates,
+        # vertices with only flag 128 define a face by 1-based vertex indices
+        # the sign of an index is the visibility of an edge
+        start = len(self._corners) // 3
+        for vertex in vertices:
+            flags = int(vertex[70][0]) if 70 in vertex else 0
+            if flags & 64:
+                self._corners.extend(_floats(vertex, (10, 20, 30)))
+                continue
+            if flags & 128:
+                indices = [abs(int(vertex[code][0])) for code in (71, 72, 73, 74) if code in vertex]
+                indices = [start + index - 1 for index in indices if index]
+                if len(indices) < 3:
+                    continue
+                self._indices.extend(indices)
+                self._faces.append(len(indices))
+
+    def _read_polygon_mesh(self, codes, flags, vertices):
+        # an m by n grid of vertices
+        m = int(codes[71][0]) if 71 in codes else 0
+        n = int(codes[72][0]) if 72 in codes else 0
+        if m < 2 or n < 2 or len(vertices) < m * n:
+            return
+        start = len(self._corners) // 3
+        for vertex in vertices[:m * n]:
+            self._corners.extend(_floats(vertex, (10, 20, 30)))
+        rows = m if flags & 1 else m - 1
+        cols = n if flags & 32 else n - 1
+        for i in range(rows):
+            for j in range(cols):
+                a = i * n + j
+                b = ((i + 1) % m) * n + j
+                c = ((i + 1) % m) * n + (j + 1) % n
+                d = i * n + (j + 1) % n
+                self._indices.extend((start + a, start + b, start + c, start + d))
+                self._faces.append(4)
+
+    def _read_3dface(self, codes):
+        # the fourth corner of a triangle is equal to the third
+        start = len(self._corners) // 3
+        self._corners.extend(_floats(codes, (10, 20, 30, 11, 21, 31, 12, 22, 32, 13, 23, 33)))
+        self._indices.extend((start, start + 1, start + 2, start + 3))
+        self._faces.append(4)
+
+    def post(self):
+        from numpy import frombuffer
+        from numpy import float64
+        from numpy import int64
+        from numpy import zeros
+        self.lines = frombuffer(self._lines, dtype=float64).reshape((-1, 2, 3)).copy()
+        self.polyline_points = frombuffer(self._points, dtype=float64).reshape((-1, 3)).copy()
+        self.polyline_offsets = zeros(len(self._sizes) + 1, dtype=int64)
+        self.polyline_offsets[1:] = self._sizes
+        self.polyline_offsets = self.polyline_offsets.cumsum()
+        self.polyline_closed = zeros(len(self._closed), dtype=bool)
+        self.polyline_closed[:] = self._closed
+        self.face_points = frombuffer(self._corners, dtype=float64).reshape((-1, 3)).copy()
+        self.faces = zeros(len(self._indices), dtype=int64)
+        self.faces[:] = self._indices
+        self.face_offsets = zeros(len(self._faces) + 1, dtype=int64)
+        self.face_offsets[1:] = self._faces
+        self.face_offsets = self.face_offsets.cumsum()
+        del self._lines, self._points, self._sizes, self._closed, self._corners, self._indices, self._faces
+
+
+class _LayerOnly(dict):
+    # the codes of a skipped entity
+    # only the layer is stored
+
+    def __contains__(self, code):
+        return code == 8 and dict.__contains__(self, code)
+
+    def __setitem__(self, code, values):
+        if code == 8:
+            dict.__setitem__(self, code, values)
+
+
+def _floats(codes, keys):
+    return [float(codes[key][0]) if key in codes else 0.0 for key in keys]
 
 
 class DXFParser(object):
-    pass
+    """Parse the geometry of a :class:`DXFReader` into vertices, edges and faces.
+
+    The points of the lines and polylines are merged into the vertices of a
+    network, and the segments become its edges. The points of the faces are
+    merged separately into the vertices of a mesh.
+
+    Parameters:
+        reader (DXFReader): The reader.
+        precision (str): Optional. The precision used to merge points.
+            Default is ``'3f'``.
+
+    Attributes:
+        vertices (array): The network vertices. Shape ``(n, 3)``.
+        edges (array): The network edges, without duplicates and loops.
+            Shape ``(e, 2)``.
+        mesh_vertices (array): The mesh vertices. Shape ``(v, 3)``.
+        faces (array): The vertex indices of all faces, one face after the other.
+        offsets (array): The offsets of the faces in ``faces``.
+
+    Note:
+        Requires NumPy.
+
+    """
+    def __init__(self, reader, precision=None):
+        self.precision     = precision if precision is not None else '3f'
+        self.reader        = reader
+        self.vertices      = None
+        self.edges         = None
+        self.mesh_vertices = None
+        self.faces         = None
+        self.offsets       = None
+        self.parse()
+
+    def parse(self):
+        self._parse_edges()
+        self._parse_faces()
+
+    def _parse_edges(self):
+        from numpy import arange
+        from numpy import column_stack
+        from numpy import concatenate
+        from numpy import maximum
+        from numpy import minimum
+        from numpy import ones
+        from numpy import sort
+        from numpy import unique
+        reader = self.reader
+        m = reader.lines.shape[0]
+        offsets = reader.polyline_offsets + 2 * m
+        points = concatenate((reader.lines.reshape((-1, 3)), reader.polyline_points))
+        # the segments of the polylines, from every point to the next
+        # except from the last point, and from the last to the first if closed
+        last = ones(points.shape[0], dtype=bool)
+        last[:2 * m] = False
+        last[offsets[1:] - 1] = False
+        u = [arange(0, 2 * m, 2), last.nonzero()[0], (offsets[1:] - 1)[reader.polyline_closed]]
+        v = [arange(1, 2 * m, 2), last.nonzero()[0] + 1, offsets[:-1][reader.polyline_closed]]
+        edges = column_stack((concatenate(u), concatenate(v)))
+        index, first = self._weld(points)
+        edges = index[edges]
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        # one edge per pair of vertices, in the order of the file
+        n = first.shape[0]
+        codes = minimum(edges[:, 0], edges[:, 1]) * n + maximum(edges[:, 0], edges[:, 1])
+        self.edges = edges[sort(unique(codes, return_index=True)[1])]
+        self.vertices = points[first]
+
+    def _parse_faces(self):
+        reader = self.reader
+        index, first = self._weld(reader.face_points)
+        self.mesh_vertices = reader.face_points[first]
+        self.faces = index[reader.faces]
+        self.offsets = reader.face_offsets
+
+    def _weld(self, points):
+        from compas.utilities import weld_points
+        try:
+            return weld_points(points, self.precision)
+        except ValueError:
+            raise BRGInputError('Unsupported precision: {0}'.format(self.precision))
 
 
 class DXFComposer(object):
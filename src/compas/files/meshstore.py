@@ -0,0 +1,688 @@
+from __future__ import print_function
+
+import os
+import json
+
+from numpy import arange
+from numpy import asarray
+from numpy import bincount
+from numpy import concatenate
+from numpy import cross
+from numpy import cumsum
+from numpy import dot
+from numpy import errstate
+from numpy import float64
+from numpy import int64
+from numpy import maximum
+from numpy import memmap
+from numpy import minimum
+from numpy import ones
+from numpy import searchsorted
+from numpy import unique
+from numpy import zeros
+from numpy.linalg import norm
+
+from compas.exceptions import BRGInputError
+
+
+__author__     = 'Tom Van Mele'
+__copyright__  = 'Copyright 2016, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'vanmelet@ethz.ch'
+
+
+__all__ = [
+    'MESHSTORE_FORMAT',
+    'MESHSTORE_VERSION',
+    'MeshStore',
+    'MeshStoreWriter',
+]
+
+
+MESHSTORE_FORMAT = 'compas.meshstore'
+MESHSTORE_VERSION = 1
+
+_META = 'meta.json'
+_XYZ = 'vertex.xyz'
+_OFFSETS = 'face.offsets'
+_VERTICES = 'face.vertices'
+
+
+def _column_file(element, name):
+    return '{0}.attributes.{1}'.format(element, name)
+
+
+def _read_meta(path):
+    # the meta data of the store in a directory,
+    # or None if the directory does not contain a store
+    filepath = os.path.join(path, _META)
+    if not os.path.isfile(filepath):
+        return None
+    try:
+        with open(filepath, 'r') as fh:
+            meta = json.load(fh)
+    except ValueError:
+        return None
+    if not isinstance(meta, dict) or meta.get('format') != MESHSTORE_FORMAT:
+        return None
+    return meta
+
+
+def _store_files(meta):
+    # the names of the files of a store
+    names = [_META, _XYZ, _OFFSETS, _VERTICES]
+    for element, columns in meta.get('columns', {}).items():
+        for name in columns or {}:
+            names.append(_column_file(element, name))
+    return names
+
+
+def _segment_sum(values, segments, count):
+    result = zeros((count, values.shape[1]), dtype=float64)
+    for i in range(values.shape[1]):
+        result[:, i] = bincount(segments, weights=values[:, i], minlength=count)
+    return result
+
+
+def _face_centroids(xyz, offsets):
+    # the face of every face vertex, and the centroids of the faces
+    sizes = offsets[1:] - offsets[:-1]
+    faces = arange(sizes.shape[0]).repeat(sizes)
+    return faces, _segment_sum(xyz, faces, sizes.shape[0]) / sizes.reshape((-1, 1))
+
+
+class MeshStoreWriter(object):
+    """Write a mesh to an out-of-core mesh store, block by block.
+
+    A mesh store is a directory with one raw binary file per array: the vertex
+    coordinates, the face offsets, the face vertex indices, and one file per
+    vertex or face attribute column. A JSON file ``meta.json`` records the
+    number of vertices and faces, the types of the columns, and the mesh
+    attributes and default attributes, with the keys of :attr:`Mesh.data`
+    (``attributes``, ``dva``, ``dfa``, ``dea``).
+
+    Blocks are appended to the files as they are added, so the mesh never has
+    to be in memory as a whole.
+
+    Parameters:
+        path (str) : Path to the directory of the store. It is created if it
+            does not exist. The files of an existing store are replaced.
+            Other files in the directory are left untouched.
+
+    Raises:
+        BRGInputError : If the directory is neither empty nor a mesh store.
+        attributes (dict) : Optional. The mesh attributes. Default is ``None``.
+        dva (dict) : Optional. The default vertex attributes. Default is ``None``.
+        dfa (dict) : Optional. The default face attributes. Default is ``None``.
+        dea (dict) : Optional. The default edge attributes. Default is ``None``.
+
+    Attributes:
+        vertex_count (int) : The number of vertices written so far.
+        face_count (int) : The number of faces written so far.
+
+    Note:
+        The face vertex indices refer to all vertices of the store, and not to
+        the vertices of a block. The meta data is written when the writer is
+        closed.
+
+    Examples:
+
+        .. code-block:: python
+
+            with MeshStoreWriter('scan.store') as writer:
+                for xyz, rgb in blocks:
+                    writer.add_vertices(xyz, {'red': rgb[:, 0]})
+                writer.add_faces(faces)
+
+    """
+    def __init__(self, path, attributes=None, dva=None, dfa=None, dea=None):
+        self.path         = path
+        self.attributes   = {'name': 'Mesh'}
+        self.dva          = {'x': 0, 'y': 0, 'z': 0}
+        self.dfa          = {}
+        self.dea          = {}
+        self.vertex_count = 0
+        self.face_count   = 0
+        self.index_count  = 0
+        self.columns      = {'vertex': None, 'face': None}
+        self._files       = {}
+        self.attributes.update(attributes or {})
+        self.dva.update(dva or {})
+        self.dfa.update(dfa or {})
+        self.dea.update(dea or {})
+        self.open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        elif os.listdir(self.path):
+            # only the files of an existing store are replaced
+            meta = _read_meta(self.path)
+            if meta is None:
+                raise BRGInputError('Not an empty directory or a compas mesh store: {0}'.format(self.path))
+            for name in _store_files(meta):
+                filepath = os.path.join(self.path, name)
+                if os.path.isfile(filepath):
+                    os.remove(filepath)
+        self._files[_XYZ] = open(os.path.join(self.path, _XYZ), 'wb')
+        self._files[_OFFSETS] = open(os.path.join(self.path, _OFFSETS), 'wb')
+        self._files[_VERTICES] = open(os.path.join(self.path, _VERTICES), 'wb')
+        self._files[_OFFSETS].write(zeros(1, dtype='<i8').tobytes())
+
+    def close(self):
+        if not self._files:
+            return
+        for fh in self._files.values():
+            fh.close()
+        self._files = {}
+        meta = {
+            'format'       : MESHSTORE_FORMAT,
+            'version'      : MESHSTORE_VERSION,
+            'attributes'   : self.attributes,
+            'dva'          : self.dva,
+            'dfa'          : self.dfa,
+            'dea'          : self.dea,
+            'vertex_count' : self.vertex_count,
+            'face_count'   : self.face_count,
+            'index_count'  : self.index_count,
+            'columns'      : dict((element, columns or {}) for element, columns in self.columns.items()),
+        }
+        with open(os.path.join(self.path, _META), 'w') as fh:
+            json.dump(meta, fh)
+
+    def _write(self, name, values):
+        self._files[name].write(values.tobytes())
+
+    def _write_columns(self, element, count, attributes):
+        attributes = attributes or {}
+        columns = self.columns[element]
+        if columns is None:
+            # the first block determines the columns
+            columns = {}
+            for name, values in attributes.items():
+                values = asarray(values)
+                if values.dtype.kind not in 'biuf':
+                    raise BRGInputError('Attribute {0} is not numerical.'.format(name))
+                columns[name] = values.dtype.newbyteorder('<').str
+                self._files[_column_file(element, name)] = open(os.path.join(self.path, _column_file(element, name)), 'wb')
+            self.columns[element] = columns
+        if set(attributes) != set(columns):
+            raise BRGInputError('Every block should have the same {0} attributes.'.format(element))
+        for name, values in attributes.items():
+            values = asarray(values, dtype=columns[name]).ravel()
+            if values.shape[0] != count:
+                raise BRGInputError('Attribute {0} should have one value per {1}.'.format(name, element))
+            self._write(_column_file(element, name), values)
+
+    def add_vertices(self, xyz, attributes=None):
+        """Add a block of vertices.
+
+        Parameters:
+            xyz (array) : The vertex coordinates. Shape ``(n, 3)``.
+            attributes (dict) : Optional. Numerical vertex attributes, as arrays
+                of shape ``(n, )`` by name. Every block should have the same
+                attributes. Default is ``None``.
+
+        Returns:
+            int : The index of the first vertex of the block.
+        """
+        xyz = asarray(xyz, dtype='<f8').reshape((-1, 3))
+        start = self.vertex_count
+        self._write_columns('vertex', xyz.shape[0], attributes)
+        self._write(_XYZ, xyz)
+        self.vertex_count += xyz.shape[0]
+        return start
+
+    def add_faces(self, faces, offsets=None, attributes=None):
+        """Add a block of faces.
+
+        Parameters:
+            faces (array, list) : The faces. An integer array of shape ``(f, k)``,
+                a list of vertex index lists, or, if ``offsets`` is provided,
+                a flat array with the vertex indices of all faces of the block.
+            offsets (array) : Optional. The offsets of the faces in the flat
+                array of vertex indices. Default is ``None``.
+            attributes (dict) : Optional. Numerical face attributes, as arrays
+                of shape ``(f, )`` by name. Every block should have the same
+                attributes. Default is ``None``.
+
+        Returns:
+            int : The index of the first face of the block.
+        """
+        from compas.datastructures.mesh.arrays import _face_arrays
+        sizes, indices = _face_arrays(faces, offsets)
+        start = self.face_count
+        self._write_columns('face', sizes.shape[0], attributes)
+        self._write(_VERTICES, indices.astype('<i8'))
+        self._write(_OFFSETS, (cumsum(sizes) + self.index_count).astype('<i8'))
+        self.face_count += sizes.shape[0]
+        self.index_count += indices.shape[0]
+        return start
+
+
+class MeshStore(object):
+    """An out-of-core mesh, memory-mapped from a mesh store on disk.
+
+    The coordinates, face offsets, face vertex indices and attribute columns
+    are separate memory maps. They are only read from disk where they are
+    accessed, so a store can be much larger than the available memory.
+    Vertices and faces are identified by their index in the store.
+
+    Parameters:
+        path (str) : Path to the directory of the store.
+        mode (str) : Optional. ``'r'`` for read-only access, ``'r+'`` to modify
+            the coordinates and attributes in place. Default is ``'r'``.
+        blocksize (int) : Optional. The default number of vertices or faces per
+            block. Default is ``1000000``.
+
+    Attributes:
+        meta (dict) : The meta data of the store.
+        vertex_count (int) : The number of vertices.
+        face_count (int) : The number of faces.
+        xyz (array) : The vertex coordinates. Shape ``(n, 3)``.
+        face_offsets (array) : The offsets of the faces in ``face_vertices``.
+            Shape ``(f + 1, )``.
+        face_vertices (array) : The vertex indices of all faces.
+
+    Raises:
+        BRGInputError : If the directory does not contain a mesh store, or if the
+            store was written with a newer version of the format.
+
+    Examples:
+
+        .. code-block:: python
+
+            store = MeshStore.from_mesh(mesh, 'mesh.store')
+            store = MeshStore('mesh.store', mode='r+')
+            store.transform(matrix)
+            lo, hi = store.bounds()
+            part = store.submesh(box=(lo, 0.5 * (lo + hi)))
+
+    """
+    def __init__(self, path, mode='r', blocksize=1000000):
+        self.path          = path
+        self.mode          = mode
+        self.blocksize     = blocksize
+        self.meta          = None
+        self.xyz           = None
+        self.face_offsets  = None
+        self.face_vertices = None
+        self._columns      = {}
+        self.open()
+
+    def open(self):
+        meta = _read_meta(self.path)
+        if meta is None:
+            raise BRGInputError('Not a compas mesh store: {0}'.format(self.path))
+        if meta.get('version', 0) > MESHSTORE_VERSION:
+            raise BRGInputError('Unsupported version of the compas mesh store: {0}'.format(meta.get('version')))
+        self.meta = meta
+        self.xyz = self._map(_XYZ, '<f8', (self.vertex_count, 3))
+        self.face_offsets = self._map(_OFFSETS, '<i8', (self.face_count + 1, ), 'r')
+        self.face_vertices = self._map(_VERTICES, '<i8', (meta['index_count'], ), 'r')
+
+    def _map(self, name, code, shape, mode=None):
+        if not shape[0]:
+            return zeros(shape, dtype=code)
+        return memmap(os.path.join(self.path, name), dtype=code, mode=mode or self.mode, shape=shape)
+
+    @property
+    def vertex_count(self):
+        return self.meta['vertex_count']
+
+    @property
+    def face_count(self):
+        return self.meta['face_count']
+
+    @property
+    def attributes(self):
+        return self.meta['attributes']
+
+    @property
+    def default_vertex_attributes(self):
+        return self.meta['dva']
+
+    @property
+    def default_face_attributes(self):
+        return self.meta['dfa']
+
+    def vertex_attribute_names(self):
+        return sorted(self.meta['columns'].get('vertex', {}))
+
+    def face_attribute_names(self):
+        return sorted(self.meta['columns'].get('face', {}))
+
+    def column(self, element, name):
+        """Get an attribute column.
+
+        Parameters:
+            element (str) : ``'vertex'`` or ``'face'``.
+            name (str) : The name of the attribute.
+
+        Returns:
+            array : The memory-mapped column.
+        """
+        if (element, name) not in self._columns:
+            columns = self.meta['columns'].get(element, {})
+            if name not in columns:
+                raise KeyError(name)
+            count = self.vertex_count if element == 'vertex' else self.face_count
+            self._columns[element, name] = self._map(_column_file(element, name), columns[name], (count, ))
+        return self._columns[element, name]
+
+    def flush(self):
+        """Write changes made in place to disk."""
+        for values in [self.xyz] + list(self._columns.values()):
+            if isinstance(values, memmap):
+                values.flush()
+
+    # ..........................................................................
+    # construction
+    # ..........................................................................
+
+    @classmethod
+    def from_mesh(cls, mesh, path, vertex_attributes=None, face_attributes=None, mode='r'):
+        """Write a mesh to a mesh store and open it.
+
+        Parameters:
+            mesh (Mesh) : The mesh.
+            path (str) : Path to the directory of the store.
+            vertex_attributes (list) : Optional. The names of numerical vertex
+                attributes to store as columns. Default is ``None``.
+            face_attributes (list) : Optional. The names of numerical face
+                attributes to store as columns. Default is ``None``.
+            mode (str) : Optional. The mode of the store. Default is ``'r'``.
+
+        Returns:
+            MeshStore : The store.
+
+        Raises:
+            BRGInputError : If a vertex or face does not have one of the attributes,
+                and the attribute has no default.
+
+        Note:
+            The vertices and faces are stored in the order of iteration over
+            ``mesh.vertex`` and ``mesh.face``.
+        """
+        from compas.datastructures.mesh.arrays import MeshArrays
+        from compas.datastructures.mesh.arrays import _attribute_column
+        arrays = MeshArrays.from_mesh(mesh)
+        dva = mesh.default_vertex_attributes
+        dfa = mesh.default_face_attributes
+        dea = mesh.default_edge_attributes
+        vertex = dict((name, _attribute_column(mesh, 'vertex', name, arrays.keys)) for name in vertex_attributes or [])
+        face = dict((name, _attribute_column(mesh, 'face', name, arrays.fkeys)) for name in face_attributes or [])
+        with MeshStoreWriter(path, mesh.attributes, dva, dfa, dea) as writer:
+            writer.add_vertices(arrays.xyz, vertex)
+            writer.add_faces(arrays.face_vertices, arrays.face_offsets, face)
+        return cls(path, mode=mode)
+
+    # ..........................................................................
+    # blocks
+    # ..........................................................................
+
+    def vertex_blocks(self, blocksize=None, names=None):
+        """Iterate over the vertices in blocks.
+
+        Parameters:
+            blocksize (int) : Optional. The number of vertices per block.
+                Default is the block size of the store.
+            names (list) : Optional. The names of attribute columns to include.
+                Default is ``None``.
+
+        Yields:
+            tuple : The index of the first vertex of the block, the coordinates
+                (a view of the memory map), and a dict with the attribute columns.
+        """
+        blocksize = blocksize or self.blocksize
+        columns = [(name, self.column('vertex', name)) for name in names or []]
+        for start in range(0, self.vertex_count, blocksize):
+            end = min(start + blocksize, self.vertex_count)
+            yield start, self.xyz[start:end], dict((name, values[start:end]) for name, values in columns)
+
+    def face_blocks(self, blocksize=None, names=None):
+        """Iterate over the faces in blocks.
+
+        Parameters:
+            blocksize (int) : Optional. The number of faces per block.
+                Default is the block size of the store.
+            names (list) : Optional. The names of attribute columns to include.
+                Default is ``None``.
+
+        Yields:
+            tuple : The index of the first face of the block, the vertex indices
+                of the faces of the block, their offsets relative to the start
+                of the block, and a dict with the attribute columns.
+        """
+        blocksize = blocksize or self.blocksize
+        columns = [(name, self.column('face', name)) for name in names or []]
+        for start in range(0, self.face_count, blocksize):
+            end = min(start + blocksize, self.face_count)
+            offsets = asarray(self.face_offsets[start:end + 1])
+            indices = self.face_vertices[offsets[0]:offsets[-1]]
+            yield start, indices, offsets - offsets[0], dict((name, values[start:end]) for name, values in columns)
+
+    # ..........................................................................
+    # block operations
+    # ..........................................................................
+
+    def bounds(self, blocksize=None):
+        """Compute the bounding box of the vertices.
+
+        Returns:
+            tuple : The minimum and maximum coordinates, as arrays of shape ``(3, )``.
+        """
+        lo = None
+        hi = None
+        for _, xyz, _ in self.vertex_blocks(blocksize):
+            a = xyz.min(axis=0)
+            b = xyz.max(axis=0)
+            lo = a if lo is None else minimum(lo, a)
+            hi = b if hi is None else maximum(hi, b)
+        return lo, hi
+
+    def transform(self, matrix, blocksize=None):
+        """Transform the vertices in place.
+
+        Parameters:
+            matrix (list) : A 4x4 transformation matrix.
+
+        Raises:
+            BRGInputError : If the store is read-only.
+        """
+        if self.mode == 'r':
+            raise BRGInputError('The mesh store is read-only.')
+        matrix = asarray(matrix, dtype=float64)
+        for _, xyz, _ in self.vertex_blocks(blocksize):
+            points = dot(xyz, matrix[:3, :3].T) + matrix[:3, 3]
+            w = dot(xyz, matrix[3, :3]) + matrix[3, 3]
+            xyz[:] = points / w.reshape((-1, 1))
+        self.flush()
+
+    def face_normals(self, blocksize=None, unitized=True):
+        """Compute the face normals, block by block.
+
+        The normal of a face is computed as in :func:`compas.geometry.normal_polygon`.
+
+        Parameters:
+            unitized (bool) : Optional. Unitize the normals. Default is ``True``.
+
+        Yields:
+            tuple : The index of the first face of the block, and the normals of
+                the faces of the block. Shape ``(f, 3)``.
+        """
+        for start, indices, offsets, _ in self.face_blocks(blocksize):
+            xyz = asarray(self.xyz[asarray(indices)], dtype=float64)
+            faces, centroids = _face_centroids(xyz, offsets)
+            # the cross products of the vectors from the centroid
+            # to the start and end of every halfedge
+            nxt = arange(1, xyz.shape[0] + 1)
+            nxt[offsets[1:] - 1] = offsets[:-1]
+            p = xyz - centroids[faces]
+            normals = _segment_sum(cross(p, p[nxt]), faces, centroids.shape[0])
+            if unitized:
+                with errstate(divide='ignore', invalid='ignore'):
+                    normals /= norm(normals, axis=1).reshape((-1, 1))
+            yield start, normals
+
+    def face_centroids(self, blocksize=None):
+        """Compute the face centroids, block by block.
+
+        Yields:
+            tuple : The index of the first face of the block, and the centroids
+                of the faces of the block. Shape ``(f, 3)``.
+        """
+        for start, indices, offsets, _ in self.face_blocks(blocksize):
+            yield start, _face_centroids(self.xyz[asarray(indices)], offsets)[1]
+
+    # ..........................................................................
+    # sub meshes
+    # ..........................................................................
+
+    def vertices_in_box(self, box, blocksize=None):
+        """Find the vertices inside a box.
+
+        Parameters:
+            box (tuple) : The minimum and maximum corner of an axis-aligned box.
+
+        Returns:
+            array : A boolean mask of the vertices in the box. Shape ``(n, )``.
+        """
+        lo = asarray(box[0], dtype=float64)
+        hi = asarray(box[1], dtype=float64)
+        mask = zeros(self.vertex_count, dtype=bool)
+        for start, xyz, _ in self.vertex_blocks(blocksize):
+            mask[start:start + xyz.shape[0]] = ((xyz >= lo) & (xyz <= hi)).all(axis=1)
+        return mask
+
+    def submesh(self, faces=None, vertices=None, box=None, cls=None, attributes=True, blocksize=None):
+        """Construct a regular mesh from a region of interest of the store.
+
+        The region is given by a list of faces, a list of vertices, or a box.
+        With vertices or a box, the sub mesh contains the faces of which all
+        vertices are selected, and the selected vertices.
+
+        Parameters:
+            faces (list) : Optional. The indices of the faces.
+            vertices (list) : Optional. The indices of the vertices.
+            box (tuple) : Optional. The minimum and maximum corner of an axis-aligned box.
+            cls (type) : Optional. The mesh class. Defaults to
+                :class:`compas.datastructures.mesh.Mesh`.
+            attributes (bool) : Optional. Include the attribute columns as
+                vertex and face attributes. Default is ``True``.
+
+        Returns:
+            Mesh : The sub mesh. The vertex and face keys are the indices of the
+                vertices and faces in the store.
+        """
+        from compas.datastructures.mesh.arrays import MeshArrays
+
+        if faces is not None:
+            fkeys = unique(asarray(faces, dtype=int64))
+            mask = None
+        else:
+            if box is not None:
+                mask = self.vertices_in_box(box, blocksize)
+            elif vertices is not None:
+                mask = zeros(self.vertex_count, dtype=bool)
+                mask[asarray(vertices, dtype=int64)] = True
+            else:
+                mask = ones(self.vertex_count, dtype=bool)
+            selected = []
+            for start, indices, offsets, _ in self.face_blocks(blocksize):
+                # the number of vertices of every face outside of the selection
+                outside = zeros(offsets[-1] + 1, dtype=int64)
+                cumsum(~mask[asarray(indices)], out=outside[1:])
+                inside = (outside[offsets[1:]] - outside[offsets[:-1]]) == 0
+                selected.append(inside.nonzero()[0] + start)
+            fkeys = concatenate(selected) if selected else zeros(0, dtype=int64)
+
+        # the vertex indices of the selected faces
+        starts = asarray(self.face_offsets[fkeys])
+        sizes = asarray(self.face_offsets[fkeys + 1]) - starts
+        offsets = zeros(sizes.shape[0] + 1, dtype=int64)
+        cumsum(sizes, out=offsets[1:])
+        local = arange(offsets[-1]) - offsets[:-1].repeat(sizes)
+        indices = asarray(self.face_vertices[starts.repeat(sizes) + local])
+
+        keys = indices if mask is None else concatenate((indices, mask.nonzero()[0]))
+        keys = unique(keys)
+        indices = searchsorted(keys, indices)
+
+        arrays = MeshArrays.from_vertices_and_faces(self.xyz[keys], indices, offsets=offsets)
+        arrays.attributes   = dict(self.meta['attributes'])
+        arrays.dva          = dict(self.meta['dva'])
+        arrays.dfa          = dict(self.meta['dfa'])
+        arrays.dea          = dict(self.meta['dea'])
+        arrays.keys         = keys.tolist()
+        arrays.fkeys        = fkeys.tolist()
+        arrays.key_index    = dict((key, index) for index, key in enumerate(arrays.keys))
+        arrays.fkey_index   = dict((fkey, index) for index, fkey in enumerate(arrays.fkeys))
+        arrays.max_int_key  = max(arrays.keys) if arrays.keys else -1
+        arrays.max_int_fkey = max(arrays.fkeys) if arrays.fkeys else -1
+        if attributes:
+            arrays.vertexdata = self._rows('vertex', keys)
+            arrays.facedata = self._rows('face', fkeys)
+        return arrays.to_mesh(cls)
+
+    def _rows(self, element, indices):
+        names = sorted(self.meta['columns'].get(element, {}))
+        if not names:
+            return {}
+        columns = [self.column(element, name)[indices].tolist() for name in names]
+        return dict((index, dict(zip(names, values))) for index, values in enumerate(zip(*columns)))
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import shutil
+    import tempfile
+
+    path = tempfile.mkdtemp()
+
+    try:
+        with MeshStoreWriter(path) as writer:
+            writer.add_vertices([[0, 0, 0], [1, 0, 0], [1, 1, 0]], {'t': [1, 2, 3]})
+            writer.add_faces([[0, 1, 2]])
+
+        # files that do not belong to the store survive a rewrite
+        for name in ('face.obj', 'vertex.notes'):
+            with open(os.path.join(path, name), 'w') as fh:
+                fh.write(name)
+
+        with MeshStoreWriter(path) as writer:
+            writer.add_vertices([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]])
+            writer.add_faces([[0, 1, 2, 3]])
+
+        store = MeshStore(path)
+        assert store.vertex_count == 4
+        assert store.vertex_attribute_names() == []
+        assert not os.path.exists(os.path.join(path, _column_file('vertex', 't')))
+        for name in ('face.obj', 'vertex.notes'):
+            with open(os.path.join(path, name), 'r') as fh:
+                assert fh.read() == name
+
+        # a directory with other files is not a store
+        os.remove(os.path.join(path, _META))
+        try:
+            MeshStoreWriter(path)
+        except BRGInputError:
+            pass
+        else:
+            raise AssertionError('A directory that is not a store was overwritten.')
+        assert os.path.exists(os.path.join(path, _XYZ))
+
+    finally:
+        shutil.rmtree(path)
+
+    print('ok')
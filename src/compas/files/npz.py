@@ -0,0 +1,311 @@
+from __future__ import print_function
+
+import json
+
+from ast import literal_eval
+
+from numpy import array
+from numpy import asarray
+from numpy import int64
+from numpy import float64
+from numpy import load
+from numpy import savez
+from numpy import savez_compressed
+
+from compas.exceptions import BRGInputError
+
+
+__author__     = 'Tom Van Mele'
+__copyright__  = 'Copyright 2016, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'vanmelet@ethz.ch'
+
+
+__all__ = [
+    'NPZ_FORMAT',
+    'NPZ_VERSION',
+    'NPZReader',
+    'NPZWriter',
+]
+
+
+NPZ_FORMAT = 'compas.npz'
+NPZ_VERSION = 1
+
+try:
+    _INTEGERS = (int, long)
+    _STRINGS = (str, unicode)
+except NameError:
+    _INTEGERS = (int, )
+    _STRINGS = (str, )
+
+
+def _is_integer(value):
+    return isinstance(value, _INTEGERS) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63
+
+
+def _encode_keys(keys):
+    if all(_is_integer(key) for key in keys):
+        return 'int', array(keys, dtype=int64)
+    if all(isinstance(key, _STRINGS) for key in keys):
+        return 'str', array(keys)
+    return 'repr', array([repr(key) for key in keys])
+
+
+def _decode_keys(encoding, values):
+    if encoding == 'repr':
+        return [literal_eval(key) for key in values.tolist()]
+    return values.tolist()
+
+
+def _column_kind(values):
+    if all(isinstance(value, bool) for value in values):
+        return 'bool'
+    if all(_is_integer(value) for value in values):
+        return 'int'
+    if all(isinstance(value, float) for value in values):
+        return 'float'
+    return 'json'
+
+
+class NPZWriter(object):
+    """Write the arrays and attributes of a data structure to a binary *npz* file.
+
+    The file is a regular NumPy *npz* archive that can be read without pickle.
+    Next to the arrays, it contains a JSON encoded dict with meta data, the format
+    name and the format version.
+
+    Parameters:
+        filepath (str) : Path to the file.
+        compressed (bool) : Optional. Compress the archive. Default is ``False``.
+
+    Attributes:
+        meta (dict) : Meta data. Must be serializable to JSON.
+
+    Examples:
+
+        .. code-block:: python
+
+            writer = NPZWriter('mesh.npz')
+            writer.meta['datastructure'] = 'Mesh'
+            writer.add_keys('vertex', keys)
+            writer.add_array('vertex.xyz', xyz)
+            writer.add_table('vertex.attributes', {0: {'is_fixed': True}})
+            writer.write()
+
+    """
+
+    def __init__(self, filepath, compressed=False):
+        self.filepath   = filepath
+        self.compressed = compressed
+        self.meta       = {}
+        self._arrays    = {}
+        self._keys      = {}
+        self._tables    = {}
+
+    def add_array(self, name, values, dtype=None):
+        """Add an array.
+
+        Parameters:
+            name (str) : The name of the array.
+            values (array-like) : The values.
+            dtype (type) : Optional. The data type of the array.
+        """
+        self._arrays[name] = asarray(values, dtype=dtype)
+
+    def add_keys(self, name, keys):
+        """Add a list of keys.
+
+        Integer and string keys are stored as arrays of the corresponding type.
+        Other keys are stored as the ``repr`` of the key.
+
+        Parameters:
+            name (str) : The name of the list.
+            keys (list) : The keys.
+        """
+        encoding, values = _encode_keys(list(keys))
+        self._keys[name] = encoding
+        self._arrays['{0}.keys'.format(name)] = values
+
+    def add_table(self, name, data, defaults=None, exclude=None):
+        """Add a sparse table of attributes.
+
+        Every attribute is stored as a separate column: the rows that have the
+        attribute, and the values. Columns with only booleans, integers or floats
+        are stored as arrays of that type. All other columns are stored as JSON.
+
+        Parameters:
+            name (str) : The name of the table.
+            data (dict) : A dict of attribute dicts per row.
+            defaults (dict) : Optional. Default values. Attributes equal to their
+                default are not stored.
+            exclude (list) : Optional. Names of attributes that are not stored,
+                for example because they are stored as a separate array.
+        """
+        defaults = defaults or {}
+        names = set()
+        for attr in data.values():
+            names.update(attr)
+        names.difference_update(exclude or ())
+        order = sorted(data)
+        columns = []
+        for index, attrname in enumerate(sorted(names)):
+            rows   = []
+            values = []
+            for row in order:
+                attr = data[row]
+                if attrname not in attr:
+                    continue
+                value = attr[attrname]
+                if attrname in defaults and defaults[attrname] == value and type(defaults[attrname]) is type(value):
+                    continue
+                rows.append(row)
+                values.append(value)
+            if not rows:
+                continue
+            kind = _column_kind(values)
+            prefix = '{0}.{1}'.format(name, index)
+            self._arrays[prefix + '.rows'] = array(rows, dtype=int64)
+            if kind == 'json':
+                self._arrays[prefix + '.values'] = array(json.dumps(values))
+            else:
+                self._arrays[prefix + '.values'] = array(values, dtype={'bool': bool, 'int': int64, 'float': float64}[kind])
+            columns.append([attrname, index, kind])
+        self._tables[name] = columns
+
+    def write(self):
+        """Write the file."""
+        meta = dict(self.meta)
+        meta['format'] = NPZ_FORMAT
+        meta['version'] = NPZ_VERSION
+        meta['keys'] = self._keys
+        meta['tables'] = self._tables
+        arrays = dict(self._arrays)
+        arrays['meta'] = array(json.dumps(meta))
+        # write to an open file to prevent numpy from appending '.npz' to the path
+        with open(self.filepath, 'wb') as fh:
+            if self.compressed:
+                savez_compressed(fh, **arrays)
+            else:
+                savez(fh, **arrays)
+
+
+class NPZReader(object):
+    """Read the arrays and attributes of a data structure from a binary *npz* file.
+
+    Arrays are loaded only when they are requested.
+
+    Parameters:
+        filepath (str) : Path to the file.
+
+    Attributes:
+        meta (dict) : The meta data.
+
+    Raises:
+        BRGInputError : If the file is not a *npz* file written by :class:`NPZWriter`,
+            or if it was written with a newer version of the format.
+
+    Examples:
+
+        .. code-block:: python
+
+            with NPZReader('mesh.npz') as reader:
+                keys = reader.keys('vertex')
+                xyz  = reader.array('vertex.xyz')
+
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.meta     = {}
+        self._npz     = None
+        self.open()
+        self.read()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        npz = load(self.filepath, allow_pickle=False)
+        if not hasattr(npz, 'files'):
+            raise BRGInputError('Not a compas npz file: {0}'.format(self.filepath))
+        self._npz = npz
+
+    def read(self):
+        if 'meta' not in self._npz.files:
+            self.close()
+            raise BRGInputError('Not a compas npz file: {0}'.format(self.filepath))
+        meta = json.loads(self._npz['meta'].item())
+        if meta.get('format') != NPZ_FORMAT:
+            self.close()
+            raise BRGInputError('Not a compas npz file: {0}'.format(self.filepath))
+        if meta.get('version', 0) > NPZ_VERSION:
+            self.close()
+            raise BRGInputError('Unsupported version of the compas npz format: {0}'.format(meta.get('version')))
+        self.meta = meta
+
+    def close(self):
+        if self._npz is not None:
+            self._npz.close()
+            self._npz = None
+
+    def has_array(self, name):
+        return name in self._npz.files
+
+    def array(self, name):
+        """Get an array.
+
+        Parameters:
+            name (str) : The name of the array.
+
+        Returns:
+            array : The array.
+        """
+        return self._npz[name]
+
+    def keys(self, name):
+        """Get a list of keys.
+
+        Parameters:
+            name (str) : The name of the list.
+
+        Returns:
+            list : The keys.
+        """
+        return _decode_keys(self.meta['keys'][name], self._npz['{0}.keys'.format(name)])
+
+    def table(self, name):
+        """Get a sparse table of attributes.
+
+        Parameters:
+            name (str) : The name of the table.
+
+        Returns:
+            dict : A dict of attribute dicts per row. Rows without attributes
+                are not included.
+        """
+        data = {}
+        for attrname, index, kind in self.meta['tables'].get(name, []):
+            prefix = '{0}.{1}'.format(name, index)
+            rows = self._npz[prefix + '.rows'].tolist()
+            values = self._npz[prefix + '.values']
+            if kind == 'json':
+                values = json.loads(values.item())
+            else:
+                values = values.tolist()
+            for row, value in zip(rows, values):
+                if row not in data:
+                    data[row] = {}
+                data[row][attrname] = value
+        return data
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == "__main__":
+    pass
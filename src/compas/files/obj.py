@@ -1,9 +1,14 @@
+import re
+
 try:
     import urllib.request as urllib2
 except ImportError:
     import urllib2
 
 from compas.utilities import geometric_key
+from compas.utilities import weld_points
+from compas.utilities.maps import _PRECISION
+from compas.utilities.maps import _last_points
 
 
 __author__     = ['Tom Van Mele <vanmelet@ethz.ch>', ]
@@ -16,30 +21,55 @@ __date__       = 'Mar 31, 2015'
 docs = [
     'OBJ',
     'OBJReader',
+    'OBJArrayReader',
     'OBJParser',
+    'OBJArrayParser',
     'OBJComposer',
     'OBJWriter',
 ]
 
 
 class OBJ(object):
-    """"""
-    def __init__(self, filepath, remote=False, precision=None):
-        self.reader = OBJReader(filepath, remote=remote)
-        self.parser = OBJParser(self.reader, precision=precision)
+    """Read and parse an *obj* file.
+
+    Parameters:
+        filepath (str): Path to the file.
+        remote (bool): Optional. Is the file on a remote location? Default is ``False``.
+        precision (str): Optional. The precision of the geometric keys used to
+            merge vertices. Default is ``'3f'``.
+        parallel (int): Optional. Parse the file with this number of worker
+            processes. Default is ``None``.
+
+    Note:
+        With ``parallel``, the file is read with :class:`OBJArrayReader` and parsed
+        with :class:`OBJArrayParser`, and therefore requires NumPy.
+
+    """
+    def __init__(self, filepath, remote=False, precision=None, parallel=None):
+        if parallel:
+            self.reader = OBJArrayReader(filepath, remote=remote, parallel=parallel)
+            self.parser = OBJArrayParser(self.reader, precision=precision)
+        else:
+            self.reader = OBJReader(filepath, remote=remote)
+            self.parser = OBJParser(self.reader, precision=precision)
 
 
 class OBJReader(object):
     """Read the contents of an *obj* file.
 
+    The file is read in chunks of lines, through a chain of generators.
+    The contents are therefore never in memory all at once.
+
     Parameters:
         filepath (str): Path to the file.
         remote (bool): Optional. Is the file on a remote location? Default is ``False``.
+        chunksize (int): Optional. The approximate number of bytes per chunk.
+            Default is ``1048576``.
 
     Attributes:
         filepath (str): Path to the file.
         remote (bool): Is the file on a remote location.
-        content (iter): The contents of the file, line by line.
+        content (iter): The contents of the file, in chunks of lines.
         vertices (list): Vertex coordinates.
         weights (list): Vertex weights.
         textures (list): Vertex textures.
@@ -50,15 +80,21 @@ class OBJReader(object):
         curves (list): Curves
         curves2 (list): Curves
         surfaces (list): Surfaces
+        groups (dict): The elements per group, as ``(type, index)`` tuples.
+        objects (dict): The elements per object, as ``(type, index)`` tuples.
+
+    Note:
+        Negative (relative) vertex references are converted to regular indices.
 
     References:
         http://paulbourke.net/dataformats/obj/
 
     """
 
-    def __init__(self, filepath, remote=False):
+    def __init__(self, filepath, remote=False, chunksize=2 ** 20):
         self.filepath = filepath
         self.remote = remote
+        self.chunksize = chunksize
         self.content = None
         # vertex data
         self.vertices = []
@@ -84,6 +120,7 @@ class OBJReader(object):
         self.groups = {}
         self.objects = {}
         self.group = None
+        self.object = None
         # open file path and read
         self.open()
         self.pre()
@@ -91,29 +128,46 @@ class OBJReader(object):
         self.post()
 
     def open(self):
+        self.content = self._chunks()
+
+    def _chunks(self):
         if self.remote:
-            resp = urllib2.urlopen(self.filepath)
-            self.content = iter(resp.readlines())
+            fh = urllib2.urlopen(self.filepath)
         else:
-            with open(self.filepath, 'r') as fh:
-                self.content = iter(fh.readlines())
+            fh = open(self.filepath, 'r')
+        try:
+            while True:
+                lines = fh.readlines(self.chunksize)
+                if not lines:
+                    break
+                yield lines
+        finally:
+            fh.close()
 
     def pre(self):
-        lines = []
-        is_continuation = False
-        for line in self.content:
-            line = line.rstrip()
-            if not line:
-                continue
-            if is_continuation:
-                lines[-1] = lines[-1][:-2] + line
-            else:
+        self.content = self._joined(self.content)
+
+    def _joined(self, chunks):
+        # remove empty lines and join continued lines
+        # a continuation may span the boundary between two chunks
+        continued = None
+        for chunk in chunks:
+            lines = []
+            for line in chunk:
+                line = line.rstrip()
+                if not line:
+                    continue
+                if continued is not None:
+                    line = continued[:-1] + ' ' + line
+                    continued = None
+                if line[-1] == '\\':
+                    continued = line
+                    continue
                 lines.append(line)
-            if line[-1] == '\\':
-                is_continuation = True
-            else:
-                is_continuation = False
-        self.content = iter(lines)
+            if lines:
+                yield lines
+        if continued is not None:
+            yield [continued[:-1]]
 
     def post(self):
         pass
@@ -136,46 +190,69 @@ class OBJReader(object):
         * ``bmat``: freeform attribute *basis matrix*
         * ``step``: freeform attribute *step size*
         * ``cstype``: freeform attribute *curve or surface type*
+        * ``g``: group
+        * ``o``: object
 
         """
         if not self.content:
             return
-        for line in self.content:
-            parts = line.split()
-            if not parts:
-                continue
-            head = parts[0]
-            tail = parts[1:]
-            if head == '#':
-                self._read_comment(tail)
-                continue
-            if head == 'v':
-                self._read_vertex_coordinates(tail)
-                continue
-            if head == 'vt':
-                self._read_vertex_texture(tail)
-                continue
-            if head == 'vn':
-                self._read_vertex_normal(tail)
-                continue
-            if head == 'vp':
-                self._read_parameter_vertex(tail)
-                continue
-            if head in ('p', 'l', 'f'):
-                self._read_polygonal_geometry(head, tail)
-                continue
-            if head in ('deg', 'bmat', 'step', 'cstype'):
-                self._read_freeform_attribute(head, tail)
-                continue
-            if head in ('curv', 'curv2', 'surf'):
-                self._read_freeform_geometry(head, tail)
-                continue
-            if head in ('parm', 'trim', 'hole', 'scrv', 'sp', 'end'):
-                self._read_freeform_statement(head, tail)
-                continue
-            if head in ('g', 's', 'mg', 'o'):
-                self._read_grouping(head, tail)
-                continue
+        for lines in self.content:
+            for line in lines:
+                self._read_line(line)
+
+    def _read_line(self, line):
+        parts = line.split()
+        if not parts:
+            return
+        head = parts[0]
+        tail = parts[1:]
+        if head == '#':
+            self._read_comment(tail)
+            return
+        if head == 'v':
+            self._read_vertex_coordinates(tail)
+            return
+        if head == 'vt':
+            self._read_vertex_texture(tail)
+            return
+        if head == 'vn':
+            self._read_vertex_normal(tail)
+            return
+        if head == 'vp':
+            self._read_parameter_vertex(tail)
+            return
+        if head in ('p', 'l', 'f'):
+            self._read_polygonal_geometry(head, tail)
+            return
+        if head in ('deg', 'bmat', 'step', 'cstype'):
+            self._read_freeform_attribute(head, tail)
+            return
+        if head in ('curv', 'curv2', 'surf'):
+            self._read_freeform_geometry(head, tail)
+            return
+        if head in ('parm', 'trim', 'hole', 'scrv', 'sp', 'end'):
+            self._read_freeform_statement(head, tail)
+            return
+        if head in ('g', 's', 'mg', 'o'):
+            self._read_grouping(head, tail)
+            return
+
+    def _vertex_count(self):
+        return len(self.vertices)
+
+    def _vertex_index(self, data):
+        # vertex references start at 1
+        # negative references are relative to the end of the current list of vertices
+        index = int(data.split('/')[0])
+        if index < 0:
+            return self._vertex_count() + index
+        return index - 1
+
+    def _add_to_groups(self, name, index):
+        if self.group is not None:
+            self.groups[self.group].append((name, index))
+        if self.object is not None:
+            self.objects[self.object].append((name, index))
 
     def _read_comment(self, data):
         """Read a comment.
@@ -201,10 +278,22 @@ class OBJReader(object):
             self.weights.append(float(data[3]))
 
     def _read_vertex_texture(self, data):
-        pass
+        """Read the texture coordinates of a vertex.
+
+        * u
+        * u v
+        * u v w
+        """
+        if data:
+            self.textures.append([float(x) for x in data[:3]])
 
     def _read_vertex_normal(self, data):
-        pass
+        """Read the components of a vertex normal.
+
+        * i j k
+        """
+        if len(data) == 3:
+            self.normals.append([float(x) for x in data])
 
     def _read_parameter_vertex(self, data):
         pass
@@ -212,28 +301,20 @@ class OBJReader(object):
     def _read_polygonal_geometry(self, name, data):
         # point
         if name == 'p':
-            self.points.append(int(data[0]) - 1)
-            if self.group:
-                self.groups[self.group].append(('p', len(self.points) - 1))
+            self.points.append(self._vertex_index(data[0]))
+            self._add_to_groups('p', len(self.points) - 1)
         # line
         elif name == 'l':
             if len(data) < 2:
                 return
-            self.lines.append([int(i) - 1 for i in data])
-            if self.group:
-                self.groups[self.group].append(('l', len(self.lines) - 1))
+            self.lines.append([self._vertex_index(d) for d in data])
+            self._add_to_groups('l', len(self.lines) - 1)
         # face
         elif name == 'f':
             if len(data) < 3:
                 return
-            face = []
-            for d in data:
-                parts = d.split('/')
-                i = int(parts[0]) - 1
-                face.append(i)
-            self.faces.append(face)
-            if self.group:
-                self.groups[self.group].append(('f', len(self.faces) - 1))
+            self.faces.append([self._vertex_index(d) for d in data])
+            self._add_to_groups('f', len(self.faces) - 1)
 
     def _read_freeform_attribute(self, name, data):
         if name == 'deg':
@@ -257,12 +338,11 @@ class OBJReader(object):
         if name == 'curv':
             if self.deg[0] == 1:
                 if len(data) == 4:
-                    self.lines.append((int(data[2]) - 1, int(data[3]) - 1))
-                    if self.group:
-                        self.groups[self.group].append(('l', len(self.lines) - 1))
+                    self.lines.append((self._vertex_index(data[2]), self._vertex_index(data[3])))
+                    self._add_to_groups('l', len(self.lines) - 1)
                     return
                 if len(data) > 4:
-                    self.lines.append([int(d) - 1 for d in data[2:]])
+                    self.lines.append([self._vertex_index(d) for d in data[2:]])
                     # if self.group:
                     #     self.groups[self.group].append(('l', len(self.lines) - 1))
                     return
@@ -272,11 +352,355 @@ class OBJReader(object):
 
     def _read_grouping(self, name, data):
         if name == 'g':
-            self.group = data[0]
-            self.groups[self.group] = []
+            # a group without a name is the default group
+            self.group = data[0] if data else None
+            if self.group is not None:
+                self.groups.setdefault(self.group, [])
+            return
+        if name == 'o':
+            self.object = data[0] if data else None
+            if self.object is not None:
+                self.objects.setdefault(self.object, [])
             return
 
 
+class OBJArrayReader(OBJReader):
+    """Read the contents of an *obj* file into NumPy arrays.
+
+    Blocks of consecutive vertex and face lines are parsed in one go, directly
+    into preallocated arrays. All other lines are read as with :class:`OBJReader`.
+
+    Parameters:
+        filepath (str): Path to the file.
+        remote (bool): Optional. Is the file on a remote location? Default is ``False``.
+        chunksize (int): Optional. The approximate number of bytes per chunk.
+            Default is ``1048576``.
+        parallel (int): Optional. The number of worker processes. Default is ``None``.
+
+    Attributes:
+        vertices (array): Vertex coordinates. Shape ``(n, 3)``.
+        weights (array): Vertex weights. Shape ``(n, )``.
+        faces (array): The vertex indices of all faces, one face after the other.
+        offsets (array): The offsets of the faces in ``faces``. Shape ``(f + 1, )``.
+
+    Note:
+        Requires NumPy.
+
+    Note:
+        With ``parallel``, the file is split at line boundaries into one byte
+        range per process. Every range is parsed into arrays by a worker process.
+        The arrays are merged in the order of the ranges, and the other lines
+        (groups, objects, lines, normals, ...) are then read in the main process,
+        exactly where they appear in the file. The result is identical to that of
+        a serial read. On Windows, the calling script should be protected by an
+        ``if __name__ == '__main__'`` guard. Remote files are always read serially.
+
+    Examples:
+
+        .. code-block:: python
+
+            reader = OBJArrayReader(compas.get_data('faces.obj'))
+            mesh = Mesh.from_arrays(reader.vertices, reader.faces, offsets=reader.offsets)
+
+    """
+
+    def __init__(self, filepath, remote=False, chunksize=2 ** 20, parallel=None):
+        self.offsets = None
+        self.parallel = parallel if parallel and parallel > 1 and not remote else None
+        self._xyz = _ArrayBuffer('float64', 3)
+        self._weights = _ArrayBuffer('float64')
+        self._indices = _ArrayBuffer('int64')
+        self._sizes = _ArrayBuffer('int64')
+        super(OBJArrayReader, self).__init__(filepath, remote=remote, chunksize=chunksize)
+
+    def open(self):
+        if self.parallel:
+            return
+        super(OBJArrayReader, self).open()
+
+    def pre(self):
+        if self.parallel:
+            return
+        super(OBJArrayReader, self).pre()
+
+    def read(self):
+        if self.parallel:
+            self._read_parallel()
+            return
+        if not self.content:
+            return
+        for lines in self.content:
+            i = 0
+            n = len(lines)
+            while i < n:
+                head = lines[i][:2]
+                if head == 'v ' or head == 'f ':
+                    j = i + 1
+                    while j < n and lines[j][:2] == head:
+                        j += 1
+                    tails = [line[2:] for line in lines[i:j]]
+                    if head == 'v ':
+                        self._read_vertex_block(tails)
+                    else:
+                        self._read_face_block(tails)
+                    i = j
+                    continue
+                self._read_line(lines[i])
+                i += 1
+
+    def _read_parallel(self):
+        from multiprocessing import Pool
+        ranges = _split_file(self.filepath, self.parallel)
+        pool = Pool(min(self.parallel, len(ranges)))
+        try:
+            results = pool.map(_read_range, [(self.filepath, start, end, self.chunksize) for start, end in ranges])
+        finally:
+            pool.close()
+            pool.join()
+        for result in results:
+            self._merge(*result)
+
+    def _merge(self, xyz, weights, faces, offsets, relative, events):
+        # relative references were resolved against the vertices of the range
+        faces[relative] += len(self._xyz)
+        v = 0
+        f = 0
+        for vcount, fcount, line in events:
+            self._extend(xyz, weights, faces, offsets, v, vcount, f, fcount)
+            v = vcount
+            f = fcount
+            self._read_line(line)
+        self._extend(xyz, weights, faces, offsets, v, xyz.shape[0], f, offsets.shape[0] - 1)
+
+    def _extend(self, xyz, weights, faces, offsets, v0, v1, f0, f1):
+        self._xyz.extend(xyz[v0:v1])
+        self._weights.extend(weights[v0:v1])
+        start = len(self._sizes)
+        self._indices.extend(faces[offsets[f0]:offsets[f1]])
+        self._sizes.extend(offsets[f0 + 1:f1 + 1] - offsets[f0:f1])
+        if self.group is not None or self.object is not None:
+            for index in range(start, len(self._sizes)):
+                self._add_to_groups('f', index)
+
+    def post(self):
+        from numpy import cumsum
+        from numpy import zeros
+        self.vertices = self._xyz.array()
+        self.weights = self._weights.array()
+        self.faces = self._indices.array()
+        sizes = self._sizes.array()
+        self.offsets = zeros(sizes.shape[0] + 1, dtype=sizes.dtype)
+        cumsum(sizes, out=self.offsets[1:])
+        del self._xyz
+        del self._weights
+        del self._indices
+        del self._sizes
+
+    def _vertex_count(self):
+        return len(self._xyz)
+
+    def _read_vertex_coordinates(self, data):
+        self._read_vertex_block([' '.join(data)])
+
+    def _read_polygonal_geometry(self, name, data):
+        if name == 'f':
+            self._read_face_block([' '.join(data)])
+            return
+        super(OBJArrayReader, self)._read_polygonal_geometry(name, data)
+
+    def _read_vertex_block(self, tails):
+        from numpy import array
+        from numpy import float64
+        from numpy import ones
+        n = len(tails)
+        sizes = set(len(tail.split()) for tail in tails)
+        if sizes == set([3]) or sizes == set([4]):
+            size = sizes.pop()
+            values = _fromstring(' '.join(tails), float64)
+            if values.shape[0] == size * n:
+                values = values.reshape((n, size))
+                self._xyz.extend(values[:, :3])
+                self._weights.extend(values[:, 3] if size == 4 else ones(n))
+                return
+        # vertices with a different number of components are skipped
+        # as in the regular reader
+        xyz = []
+        weights = []
+        for tail in tails:
+            data = tail.split()
+            if len(data) == 3:
+                xyz.append([float(x) for x in data])
+                weights.append(1.0)
+            elif len(data) == 4:
+                xyz.append([float(x) for x in data[:3]])
+                weights.append(float(data[3]))
+        if xyz:
+            self._xyz.extend(array(xyz, dtype=float64))
+            self._weights.extend(array(weights, dtype=float64))
+
+    def _read_face_block(self, tails):
+        from numpy import array
+        from numpy import int64
+        from numpy import repeat
+        sizes = array([len(tail.split()) for tail in tails], dtype=int64)
+        text = ' '.join(tails)
+        if '/' in text:
+            # only keep the vertex references
+            text = _REFERENCES.sub('', text)
+        values = _fromstring(text, int64)
+        if values.shape[0] != sizes.sum():
+            values = array([int(d.split('/')[0]) for tail in tails for d in tail.split()], dtype=int64)
+        if sizes.min() < 3:
+            # faces with less than three vertices are skipped
+            # as in the regular reader
+            keep = sizes >= 3
+            values = values[repeat(keep, sizes)]
+            sizes = sizes[keep]
+        self._resolve(values)
+        start = len(self._sizes)
+        self._indices.extend(values)
+        self._sizes.extend(sizes)
+        if self.group is not None or self.object is not None:
+            for index in range(start, len(self._sizes)):
+                self._add_to_groups('f', index)
+
+    def _resolve(self, values):
+        # vertex references start at 1
+        # negative references are relative to the end of the current list of vertices
+        values[values > 0] -= 1
+        values[values < 0] += self._vertex_count()
+
+
+class _OBJRangeReader(OBJArrayReader):
+    # read a range of lines of a file in a worker process
+    # lines that are not vertices or faces are recorded,
+    # together with the number of vertices and faces before them,
+    # and are only read when the ranges are merged
+
+    def __init__(self, filepath, start, end, chunksize=2 ** 20):
+        self.start = start
+        self.end = end
+        self.events = []
+        self.relative = None
+        self._relative = _ArrayBuffer('bool')
+        super(_OBJRangeReader, self).__init__(filepath, chunksize=chunksize)
+
+    def _chunks(self):
+        with open(self.filepath, 'rb') as fh:
+            fh.seek(self.start)
+            position = self.start
+            while position < self.end:
+                data = fh.read(min(self.chunksize, self.end - position))
+                if not data:
+                    break
+                position += len(data)
+                if position < self.end:
+                    # complete the last line
+                    line = fh.readline()
+                    position += len(line)
+                    data += line
+                if not isinstance(data, str):
+                    data = data.decode('utf-8')
+                yield data.split('\n')
+
+    def post(self):
+        self.relative = self._relative.array()
+        del self._relative
+        super(_OBJRangeReader, self).post()
+
+    def _read_line(self, line):
+        head = line.split(None, 1)[0]
+        if head == 'v' or head == 'f':
+            super(_OBJRangeReader, self)._read_line(line)
+            return
+        self.events.append((len(self._xyz), len(self._sizes), line))
+
+    def _resolve(self, values):
+        relative = values < 0
+        self._relative.extend(relative)
+        super(_OBJRangeReader, self)._resolve(values)
+
+
+def _read_range(args):
+    filepath, start, end, chunksize = args
+    reader = _OBJRangeReader(filepath, start, end, chunksize)
+    return reader.vertices, reader.weights, reader.faces, reader.offsets, reader.relative, reader.events
+
+
+def _split_file(filepath, n):
+    # split a file into at most n ranges of about the same size
+    # a range ends after a line that is not empty and not continued on the next line
+    with open(filepath, 'rb') as fh:
+        fh.seek(0, 2)
+        size = fh.tell()
+        bounds = [0]
+        for i in range(1, n):
+            position = max(size * i // n, bounds[-1])
+            if position >= size:
+                break
+            fh.seek(position)
+            # skip the rest of the current line
+            fh.readline()
+            while True:
+                line = fh.readline()
+                if not line:
+                    break
+                line = line.rstrip()
+                if line and line[-1:] != b'\\':
+                    break
+            position = fh.tell()
+            if position > bounds[-1] and position < size:
+                bounds.append(position)
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class _ArrayBuffer(object):
+    # an array with room to grow
+    # the capacity is doubled whenever it is exceeded
+
+    def __init__(self, dtype, width=None):
+        self.dtype = dtype
+        self.width = width
+        self.size = 0
+        self.data = None
+
+    def __len__(self):
+        return self.size
+
+    def extend(self, values):
+        from numpy import empty
+        n = values.shape[0]
+        if self.data is None or self.size + n > self.data.shape[0]:
+            capacity = max(2 * (self.size + n), 1024)
+            shape = (capacity, ) if self.width is None else (capacity, self.width)
+            data = empty(shape, dtype=self.dtype)
+            if self.size:
+                data[:self.size] = self.data[:self.size]
+            self.data = data
+        self.data[self.size:self.size + n] = values
+        self.size += n
+
+    def array(self):
+        from numpy import empty
+        if self.data is None:
+            shape = (0, ) if self.width is None else (0, self.width)
+            return empty(shape, dtype=self.dtype)
+        return self.data[:self.size].copy()
+
+
+_REFERENCES = re.compile(r'/\S*')
+
+
+def _fromstring(text, dtype):
+    import warnings
+    from numpy import fromstring
+    # incomplete parsing is detected by the caller from the number of values
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        return fromstring(text, dtype=dtype, sep=' ')
+
+
 class OBJParser(object):
     """"""
     def __init__(self, reader, precision=None):
@@ -298,10 +722,30 @@ class OBJParser(object):
         self.parse()
 
     def parse(self):
+        index_index, self.vertices = self._weld(self.reader.vertices)
+
+        self.points    = [index_index[index] for index in self.reader.points]
+        self.lines     = [[index_index[index] for index in line] for line in self.reader.lines if len(line) == 2]
+        self.polylines = [[index_index[index] for index in line] for line in self.reader.lines if len(line) > 2]
+        self.faces     = [[index_index[index] for index in face] for face in self.reader.faces]
+        self.groups    = self.reader.groups
+
+    def _weld(self, vertices):
+        # merge the vertices with the same geometric key
+        # without formatting a key per vertex if possible
+        if _PRECISION.match(self.precision):
+            try:
+                index_index, first = weld_points(vertices, self.precision)
+            except ImportError:
+                pass
+            else:
+                # the coordinates of the last vertex with a key
+                last = _last_points(index_index, first.shape[0])
+                return index_index.tolist(), [vertices[index] for index in last.tolist()]
         index_key = {}
         vertex = {}
 
-        for i, xyz in enumerate(iter(self.reader.vertices)):
+        for i, xyz in enumerate(iter(vertices)):
             key = geometric_key(xyz, self.precision)
             index_key[i] = key
             vertex[key] = xyz
@@ -309,30 +753,384 @@ class OBJParser(object):
         key_index = dict((key, index) for index, key in enumerate(vertex.iterkeys()))
         index_index = dict((index, key_index[key]) for index, key in index_key.iteritems())
 
-        self.vertices  = [xyz for xyz in vertex.itervalues()]
-        self.points    = [index_index[index] for index in self.reader.points]
-        self.lines     = [[index_index[index] for index in line] for line in self.reader.lines if len(line) == 2]
-        self.polylines = [[index_index[index] for index in line] for line in self.reader.lines if len(line) > 2]
-        self.faces     = [[index_index[index] for index in face] for face in self.reader.faces]
+        return index_index, [xyz for xyz in vertex.itervalues()]
+
+
+class OBJArrayParser(object):
+    """Parse the arrays of an :class:`OBJArrayReader`.
+
+    Vertices with the same geometric key are merged, as in :class:`OBJParser`,
+    but in bulk. The merged vertices are listed in the order of their first
+    occurrence in the file.
+
+    Parameters:
+        reader (OBJArrayReader): The reader.
+        precision (str): Optional. The precision of the geometric keys.
+            Default is ``'3f'``.
+        weld (bool): Optional. Merge vertices with the same geometric key.
+            Default is ``True``.
+
+    Attributes:
+        vertices (array): The vertex coordinates. Shape ``(n, 3)``.
+        faces (array): The vertex indices of all faces, one face after the other.
+        offsets (array): The offsets of the faces in ``faces``.
+        points (list): Points, referencing the vertices.
+        lines (list): Lines, referencing the vertices.
+        polylines (list): Polylines, referencing the vertices.
+        groups (dict): The elements per group.
+        objects (dict): The elements per object.
+
+    Note:
+        Requires NumPy.
+
+    """
+    def __init__(self, reader, precision=None, weld=True):
+        self.precision = precision if precision is not None else '3f'
+        self.weld      = weld
+        self.reader    = reader
+        self.vertices  = None
+        self.faces     = None
+        self.offsets   = None
+        self.points    = None
+        self.lines     = None
+        self.polylines = None
+        self.groups    = None
+        self.objects   = None
+        self.parse()
+
+    def parse(self):
+        from numpy import arange
+        xyz = self.reader.vertices
+
+        if self.weld:
+            index_index, last = self._weld(xyz)
+            self.vertices = xyz[last]
+        else:
+            index_index = arange(xyz.shape[0])
+            self.vertices = xyz
+
+        lookup = index_index.tolist()
+
+        self.faces     = index_index[self.reader.faces]
+        self.offsets   = self.reader.offsets
+        self.points    = [lookup[index] for index in self.reader.points]
+        self.lines     = [[lookup[index] for index in line] for line in self.reader.lines if len(line) == 2]
+        self.polylines = [[lookup[index] for index in line] for line in self.reader.lines if len(line) > 2]
         self.groups    = self.reader.groups
+        self.objects   = self.reader.objects
+
+    def _weld(self, xyz):
+        # the index of the merged vertex per vertex,
+        # and the index of the last vertex of every merged vertex
+        # as with the vertices of OBJParser
+        from numpy import array
+        from numpy import int64
+        if not _PRECISION.match(self.precision):
+            # formats that cannot be reproduced with rounding
+            # the merged vertices are in the order of the dict of OBJParser
+            index_key = []
+            vertex = {}
+            for index, point in enumerate(xyz.tolist()):
+                key = geometric_key(point, self.precision)
+                index_key.append(key)
+                vertex[key] = index
+            key_index = dict((key, index) for index, key in enumerate(vertex.iterkeys()))
+            index_index = [key_index[key] for key in index_key]
+            return array(index_index, dtype=int64), array(list(vertex.itervalues()), dtype=int64)
+        index_index, first = weld_points(xyz, self.precision)
+        return index_index, _last_points(index_index, first.shape[0])
 
 
 class OBJComposer(object):
-    """"""
-    def __init__(self):
-        pass
+    """Compose the arrays of an *obj* file from a mesh.
+
+    Parameters:
+        mesh (Mesh): The mesh.
+        normals (bool): Optional. Include the vertex normals. Default is ``False``.
+        groups (str): Optional. The name of a face attribute. Faces with the same
+            value of this attribute are put in a group with that value as name.
+            Default is ``None``.
+
+    Attributes:
+        vertices (array): The vertex coordinates. Shape ``(n, 3)``.
+        normals (array): The vertex normals, or ``None``. Shape ``(n, 3)``.
+        faces (array): The vertex indices of all faces, one face after the other.
+        offsets (array): The offsets of the faces in ``faces``.
+        groups (list): The groups, as ``(name, start, end)`` tuples with the
+            range of the faces of the group. Faces without group come first.
+
+    Note:
+        Requires NumPy.
+
+    """
+    def __init__(self, mesh, normals=False, groups=None):
+        self.mesh     = mesh
+        self.vertices = None
+        self.normals  = normals
+        self.faces    = None
+        self.offsets  = None
+        self.groups   = groups
+        self.compose()
 
     def compose(self):
-        pass
+        import gc
+        from numpy import arange
+        from numpy import argsort
+        from numpy import array
+        from numpy import cumsum
+        from numpy import float64
+        from numpy import int64
+        from numpy import isnan
+        from numpy import repeat
+        from numpy import zeros
+        from compas.datastructures.mesh.arrays import MeshArrays
+
+        mesh = self.mesh
+        keys = list(mesh.vertex)
+        key_index = dict((key, index) for index, key in enumerate(keys))
+        fkeys = list(mesh.face)
+
+        # the loop over the faces only creates integers
+        # there is no need to look for reference cycles
+        gcenabled = gc.isenabled()
+        gc.disable()
+        try:
+            xyz = [(attr['x'], attr['y'], attr['z']) for attr in (mesh.vertex[key] for key in keys)]
+            sizes = []
+            vertices = []
+            for fkey in fkeys:
+                cycle = mesh.face[fkey]
+                start = next(iter(cycle))
+                vertices.append(key_index[start])
+                v = cycle[start]
+                size = 1
+                while v != start:
+                    vertices.append(key_index[v])
+                    v = cycle[v]
+                    size += 1
+                sizes.append(size)
+        finally:
+            if gcenabled:
+                gc.enable()
+
+        self.vertices = array(xyz, dtype=float64).reshape((-1, 3))
+        self.faces    = array(vertices, dtype=int64)
+        self.offsets  = zeros(len(sizes) + 1, dtype=int64)
+        cumsum(sizes, out=self.offsets[1:])
+
+        if self.normals:
+            arrays = MeshArrays.from_vertices_and_faces(self.vertices, self.faces, offsets=self.offsets, validate=False)
+            normals = arrays.vertex_normals()
+            # vertices without faces have no normal
+            normals[isnan(normals)] = 0.0
+            self.normals = normals
+        else:
+            self.normals = None
+
+        if not self.groups:
+            self.groups = []
+            return
+
+        values = mesh.get_faces_attribute(self.groups, None, fkeys)
+        names = []
+        name_index = {}
+        for value in values:
+            if value is not None and value not in name_index:
+                name_index[value] = len(names)
+                names.append(value)
+        # faces without group come first
+        group = array([-1 if value is None else name_index[value] for value in values], dtype=int64)
+        order = argsort(group, kind='mergesort')
+        sizes = (self.offsets[1:] - self.offsets[:-1])[order]
+        offsets = zeros(sizes.shape[0] + 1, dtype=int64)
+        cumsum(sizes, out=offsets[1:])
+        start = repeat(self.offsets[:-1][order] - offsets[:-1], sizes)
+        self.faces = self.faces[start + arange(offsets[-1])]
+        self.offsets = offsets
+        bounds = cumsum([(group == index).sum() for index in range(-1, len(names))])
+        self.groups = [(name, bounds[index], bounds[index + 1]) for index, name in enumerate(names)]
 
 
 class OBJWriter(object):
-    """"""
-    def __init__(self):
-        pass
+    """Write vertices, normals, faces and groups to an *obj* file, block by block.
 
-    def write(self):
-        pass
+    Every block of data is formatted with a single string operation per chunk
+    of rows, instead of line by line.
+
+    Parameters:
+        filepath (str, file): Path to the file, or an open file object.
+        precision (str): Optional. The precision of the coordinates. Any float
+            precision, or decimal integer (``'d'``). Default is ``'3f'``.
+        chunksize (int): Optional. The number of rows per chunk. Default is ``10000``.
+
+    Attributes:
+        vertex_count (int): The number of vertices written so far.
+        normal_count (int): The number of normals written so far.
+
+    Note:
+        Vertex and normal indices are zero-based and refer to all vertices and
+        normals written so far. A file object is not closed by the writer.
+
+    Examples:
+
+        .. code-block:: python
+
+            with OBJWriter('mesh.obj', precision='6f') as writer:
+                writer.write_vertices(xyz)
+                writer.write_group('base')
+                writer.write_faces(faces)
+
+            # or, for a mesh
+            with OBJWriter('mesh.obj') as writer:
+                writer.write(OBJComposer(mesh, normals=True, groups='part'))
+
+    """
+    def __init__(self, filepath, precision=None, chunksize=10000):
+        self.filepath     = filepath
+        self.precision    = precision if precision is not None else '3f'
+        self.chunksize    = chunksize
+        self.vertex_count = 0
+        self.normal_count = 0
+        self.fh           = None
+        self._close       = False
+        self.open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        if hasattr(self.filepath, 'write'):
+            self.fh = self.filepath
+            self._close = False
+        else:
+            self.fh = open(self.filepath, 'w')
+            self._close = True
+
+    def close(self):
+        if self.fh is not None and self._close:
+            self.fh.close()
+        self.fh = None
+
+    def _float(self):
+        if self.precision == 'd':
+            return '%d'
+        return '%.' + self.precision
+
+    def _write_rows(self, head, values):
+        from numpy import asarray
+        from numpy import float64
+        values = asarray(values, dtype=float64)
+        if values.ndim == 1:
+            values = values.reshape((-1, 1))
+        template = head + (' ' + self._float()) * values.shape[1] + '\n'
+        for start in range(0, values.shape[0], self.chunksize):
+            block = values[start:start + self.chunksize]
+            self.fh.write((template * block.shape[0]) % tuple(block.ravel().tolist()))
+
+    def write_comment(self, text):
+        """Write a comment.
+
+        Parameters:
+            text (str): The comment. Every line of the text becomes a comment line.
+        """
+        for line in text.splitlines():
+            self.fh.write('# {0}\n'.format(line))
+
+    def write_vertices(self, vertices):
+        """Write vertex coordinates.
+
+        Parameters:
+            vertices (array): The vertex coordinates. Shape ``(n, 3)``.
+        """
+        self._write_rows('v', vertices)
+        self.vertex_count += len(vertices)
+
+    def write_normals(self, normals):
+        """Write vertex normals.
+
+        Parameters:
+            normals (array): The normal vectors. Shape ``(n, 3)``.
+        """
+        self._write_rows('vn', normals)
+        self.normal_count += len(normals)
+
+    def write_group(self, name):
+        """Start a new group.
+
+        Parameters:
+            name (str): The name of the group.
+        """
+        self.fh.write('g {0}\n'.format(name))
+
+    def write_faces(self, faces, offsets=None, normals=None):
+        """Write faces.
+
+        Parameters:
+            faces (array, list): The faces. An integer array of shape ``(f, k)``,
+                a list of vertex index lists, or, if ``offsets`` is provided,
+                a flat array with the vertex indices of all faces.
+            offsets (array): Optional. The offsets of the faces in the flat
+                array of vertex indices. Default is ``None``.
+            normals (array): Optional. The normal indices of the face vertices,
+                in the same layout as the flat array of vertex indices
+                (``f v//n ...``). Default is ``None``.
+        """
+        from numpy import arange
+        from numpy import asarray
+        from numpy import column_stack
+        from numpy import int64
+        from numpy import ndarray
+        from numpy import zeros
+        if offsets is None:
+            if isinstance(faces, ndarray) and faces.ndim == 2:
+                offsets = faces.shape[1] * arange(faces.shape[0] + 1)
+            else:
+                offsets = zeros(len(faces) + 1, dtype=int64)
+                offsets[1:] = [len(face) for face in faces]
+                offsets = offsets.cumsum()
+                faces = [index for face in faces for index in face]
+        offsets = asarray(offsets, dtype=int64)
+        indices = asarray(faces, dtype=int64).ravel() + 1
+        width = 1
+        reference = ' %d'
+        if normals is not None:
+            indices = column_stack((indices, asarray(normals, dtype=int64).ravel() + 1)).ravel()
+            width = 2
+            reference = ' %d//%d'
+        templates = {}
+        sizes = (offsets[1:] - offsets[:-1]).tolist()
+        for start in range(0, len(sizes), self.chunksize):
+            chunk = sizes[start:start + self.chunksize]
+            for size in chunk:
+                if size not in templates:
+                    templates[size] = 'f' + reference * size + '\n'
+            values = indices[width * offsets[start]:width * offsets[start + len(chunk)]]
+            self.fh.write(''.join([templates[size] for size in chunk]) % tuple(values.tolist()))
+
+    def write(self, composer):
+        """Write the data of a composer.
+
+        Parameters:
+            composer (OBJComposer): The composer.
+        """
+        faces = composer.faces + self.vertex_count
+        normals = None
+        self.write_vertices(composer.vertices)
+        if composer.normals is not None:
+            normals = composer.faces + self.normal_count
+            self.write_normals(composer.normals)
+        offsets = composer.offsets
+        # the faces without group, followed by the groups
+        bounds = [0] + [start for _, start, _ in composer.groups] + [offsets.shape[0] - 1]
+        names = [None] + [name for name, _, _ in composer.groups]
+        for name, start, end in zip(names, bounds[:-1], bounds[1:]):
+            if name is not None:
+                self.write_group(name)
+            i, j = offsets[start], offsets[end]
+            self.write_faces(faces[i:j], offsets[start:end + 1] - i, None if normals is None else normals[i:j])
 
 
 # ==============================================================================
@@ -349,3 +1147,29 @@ if __name__ == '__main__':
     print(obj.parser.lines)
     print(obj.parser.points)
     print(obj.parser.faces)
+
+    # the parallel parser merges coincident vertices as the serial parser
+
+    import os
+    import tempfile
+
+    filepath = os.path.join(tempfile.mkdtemp(), 'coincident.obj')
+
+    with open(filepath, 'w') as fh:
+        for i in range(2000):
+            x, y = i % 50, i // 50
+            fh.write('v {0} {1} 0.0\n'.format(x + 0.0001, y))
+            fh.write('v {0} {1} 0.0\n'.format(x + 1.0, y + 0.0002))
+            fh.write('v {0} {1} 0.0\n'.format(x + 1.0001, y + 1.0))
+            fh.write('v {0} {1} 0.0\n'.format(x, y + 1.0))
+            fh.write('f -4 -3 -2 -1\n')
+
+    for precision in ('3f', '1f', '3e'):
+        serial = OBJ(filepath, precision=precision)
+        parallel = OBJ(filepath, precision=precision, parallel=2)
+        faces = parallel.parser.faces.tolist()
+        offsets = parallel.parser.offsets.tolist()
+        assert parallel.parser.vertices.tolist() == serial.parser.vertices
+        assert [faces[a:b] for a, b in zip(offsets[:-1], offsets[1:])] == serial.parser.faces
+
+    os.remove(filepath)
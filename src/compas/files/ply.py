@@ -0,0 +1,685 @@
+from __future__ import print_function
+
+import os
+import struct
+
+from collections import OrderedDict
+
+from numpy import arange
+from numpy import array
+from numpy import ascontiguousarray
+from numpy import asarray
+from numpy import column_stack
+from numpy import cumsum
+from numpy import dtype
+from numpy import empty
+from numpy import float64
+from numpy import int64
+from numpy import memmap
+from numpy import repeat
+from numpy import uint8
+from numpy import zeros
+
+from compas.exceptions import BRGInputError
+
+from compas.files.obj import _fromstring
+
+
+__author__     = 'Tom Van Mele'
+__copyright__  = 'Copyright 2016, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'vanmelet@ethz.ch'
+
+
+__all__ = [
+    'PLY',
+    'PLYElement',
+    'PLYReader',
+    'PLYParser',
+    'PLYWriter',
+]
+
+
+_TYPES = {
+    'char'    : 'i1',
+    'int8'    : 'i1',
+    'uchar'   : 'u1',
+    'uint8'   : 'u1',
+    'short'   : 'i2',
+    'int16'   : 'i2',
+    'ushort'  : 'u2',
+    'uint16'  : 'u2',
+    'int'     : 'i4',
+    'int32'   : 'i4',
+    'uint'    : 'u4',
+    'uint32'  : 'u4',
+    'float'   : 'f4',
+    'float32' : 'f4',
+    'double'  : 'f8',
+    'float64' : 'f8',
+}
+
+_NAMES = {
+    'i1' : 'char',
+    'u1' : 'uchar',
+    'i2' : 'short',
+    'u2' : 'ushort',
+    'i4' : 'int',
+    'u4' : 'uint',
+    'f4' : 'float',
+    'f8' : 'double',
+}
+
+_STRUCT = {
+    'i1' : 'b',
+    'u1' : 'B',
+    'i2' : 'h',
+    'u2' : 'H',
+    'i4' : 'i',
+    'u4' : 'I',
+    'f4' : 'f',
+    'f8' : 'd',
+}
+
+_BYTEORDER = {
+    'ascii'                : None,
+    'binary_little_endian' : '<',
+    'binary_big_endian'    : '>',
+}
+
+
+def _type(values):
+    # the ply type of an array
+    kind = values.dtype.kind
+    size = values.dtype.itemsize
+    if kind == 'b':
+        return 'uchar'
+    if kind == 'f':
+        return 'float' if size <= 4 else 'double'
+    if kind == 'u':
+        return _NAMES['u{0}'.format(min(size, 4))]
+    if kind == 'i':
+        return _NAMES['i{0}'.format(min(size, 4))]
+    raise BRGInputError('Values of type {0} cannot be written to a PLY file.'.format(values.dtype))
+
+
+def _list_positions(starts, sizes, itemsize):
+    # the positions of the items of lists with the given starts and sizes
+    offsets = zeros(sizes.shape[0] + 1, dtype=int64)
+    cumsum(sizes, out=offsets[1:])
+    local = arange(offsets[-1]) - repeat(offsets[:-1], sizes)
+    return repeat(starts, sizes) + local * itemsize, offsets
+
+
+def _gather(data, positions, code):
+    # the values of a type at byte positions of a byte array
+    size = dtype(code).itemsize
+    raw = data[positions.reshape((-1, 1)) + arange(size)]
+    return ascontiguousarray(raw).view(code).ravel()
+
+
+def _scatter(data, positions, values):
+    # the inverse of _gather
+    raw = ascontiguousarray(values).view(uint8).reshape((-1, values.dtype.itemsize))
+    data[positions.reshape((-1, 1)) + arange(raw.shape[1])] = raw
+
+
+class PLY(object):
+    """Read and parse a *ply* file.
+
+    Parameters:
+        filepath (str): Path to the file.
+
+    Note:
+        Requires NumPy.
+
+    """
+    def __init__(self, filepath):
+        self.reader = PLYReader(filepath)
+        self.parser = PLYParser(self.reader)
+
+
+class PLYElement(object):
+    """An element of a *ply* file, such as the vertices or the faces.
+
+    Parameters:
+        name (str): The name of the element.
+        count (int): The number of items.
+
+    Attributes:
+        name (str): The name of the element.
+        count (int): The number of items.
+        properties (list): The properties, as ``(name, type, count type)`` tuples.
+            The count type of a scalar property is ``None``.
+        columns (OrderedDict): The values of the scalar properties,
+            as typed arrays of shape ``(count, )``.
+        lists (OrderedDict): The values of the list properties,
+            as ``(values, offsets)`` tuples. The values of all items are
+            stored one after the other, and ``offsets`` has shape ``(count + 1, )``.
+
+    """
+    def __init__(self, name, count):
+        self.name       = name
+        self.count      = count
+        self.properties = []
+        self.columns    = OrderedDict()
+        self.lists      = OrderedDict()
+
+    def __repr__(self):
+        return 'PLYElement({0!r}, {1})'.format(self.name, self.count)
+
+    def has_lists(self):
+        return any(ctype is not None for _, _, ctype in self.properties)
+
+    def record_dtype(self, byteorder, sizes=None):
+        """The record of an item, as a NumPy structured dtype.
+
+        Parameters:
+            byteorder (str): ``'<'`` or ``'>'``.
+            sizes (dict): Optional. The sizes of the list properties.
+                Default is ``None``.
+
+        Note:
+            The count of a list property ``name`` is a field ``'count:name'``.
+        """
+        fields = []
+        for name, ptype, ctype in self.properties:
+            if ctype is None:
+                fields.append((name, byteorder + _TYPES[ptype]))
+            else:
+                fields.append(('count:' + name, byteorder + _TYPES[ctype]))
+                fields.append((name, byteorder + _TYPES[ptype], (sizes[name], )))
+        return dtype(fields)
+
+
+class PLYReader(object):
+    """Read the elements of an ascii or binary *ply* file.
+
+    The elements of a binary file are mapped to NumPy arrays straight from disk.
+    The columns of an element without list properties are views of a memory map.
+    An element with list properties of the same length for all items, for
+    example the faces of a triangle or quad mesh, is mapped in the same way.
+    Lists of different lengths are located with a scan over the records,
+    after which all values are gathered in one go.
+
+    The elements of an ascii file are read in chunks of lines, and the numbers
+    of every chunk are parsed in one go.
+
+    Parameters:
+        filepath (str): Path to the file.
+        chunksize (int): Optional. The number of lines per chunk of an ascii file.
+            Default is ``100000``.
+
+    Attributes:
+        filepath (str): Path to the file.
+        format (str): ``'ascii'``, ``'binary_little_endian'`` or ``'binary_big_endian'``.
+        version (str): The version of the format.
+        comments (list): The comments and ``obj_info`` lines of the header.
+        elements (OrderedDict): The elements, by name.
+
+    Note:
+        The file of a memory map stays open for as long as any of the columns exists.
+
+    References:
+        http://paulbourke.net/dataformats/ply/
+
+    """
+    def __init__(self, filepath, chunksize=100000):
+        self.filepath  = filepath
+        self.chunksize = chunksize
+        self.format    = None
+        self.version   = None
+        self.comments  = []
+        self.elements  = OrderedDict()
+        self.start     = None
+        self.open()
+        self.read()
+
+    def open(self):
+        self._read_header()
+
+    def read(self):
+        if self.format == 'ascii':
+            self._read_ascii()
+        else:
+            self._read_binary()
+
+    def _read_header(self):
+        element = None
+        with open(self.filepath, 'rb') as fh:
+            if fh.readline().strip() != b'ply':
+                raise BRGInputError('Not a PLY file: {0}'.format(self.filepath))
+            while True:
+                line = fh.readline()
+                if not line:
+                    raise BRGInputError('Incomplete PLY header: {0}'.format(self.filepath))
+                parts = line.decode('latin-1').split()
+                if not parts:
+                    continue
+                head = parts[0]
+                if head == 'end_header':
+                    break
+                if head == 'format':
+                    self.format = parts[1]
+                    self.version = parts[2]
+                    if self.format not in _BYTEORDER:
+                        raise BRGInputError('Unknown PLY format: {0}'.format(self.format))
+                elif head in ('comment', 'obj_info'):
+                    self.comments.append(line.decode('latin-1').strip()[len(head) + 1:])
+                elif head == 'element':
+                    element = PLYElement(parts[1], int(parts[2]))
+                    self.elements[element.name] = element
+                elif head == 'property':
+                    if element is None:
+                        raise BRGInputError('Property without element: {0}'.format(line))
+                    if parts[1] == 'list':
+                        element.properties.append((parts[4], parts[3], parts[2]))
+                    else:
+                        element.properties.append((parts[2], parts[1], None))
+            self.start = fh.tell()
+
+    # ..........................................................................
+    # binary
+    # ..........................................................................
+
+    def _read_binary(self):
+        byteorder = _BYTEORDER[self.format]
+        size = os.path.getsize(self.filepath)
+        position = self.start
+        for element in self.elements.values():
+            if not element.count:
+                self._set_empty(element)
+                continue
+            if element.has_lists():
+                position = self._read_binary_lists(element, position, size, byteorder)
+                continue
+            record = element.record_dtype(byteorder)
+            end = position + element.count * record.itemsize
+            if end > size:
+                raise BRGInputError('The PLY file is too short for element {0}.'.format(element.name))
+            data = memmap(self.filepath, dtype=record, mode='r', offset=position, shape=(element.count, ))
+            for name, _, _ in element.properties:
+                element.columns[name] = data[name]
+            position = end
+
+    def _read_binary_lists(self, element, position, size, byteorder):
+        if position >= size:
+            raise BRGInputError('The PLY file is too short for element {0}.'.format(element.name))
+        data = memmap(self.filepath, dtype=uint8, mode='r', offset=position, shape=(size - position, ))
+        # try the lengths of the lists of the first item for all items
+        sizes = {}
+        p = 0
+        for name, ptype, ctype in element.properties:
+            if ctype is None:
+                p += dtype(_TYPES[ptype]).itemsize
+                continue
+            n, = struct.unpack_from(byteorder + _STRUCT[_TYPES[ctype]], data, p)
+            sizes[name] = n
+            p += dtype(_TYPES[ctype]).itemsize + n * dtype(_TYPES[ptype]).itemsize
+        record = element.record_dtype(byteorder, sizes)
+        end = element.count * record.itemsize
+        if end <= data.shape[0]:
+            records = data[:end].view(record)
+            if all((records['count:' + name] == n).all() for name, n in sizes.items()):
+                for name, _, ctype in element.properties:
+                    if ctype is None:
+                        element.columns[name] = records[name]
+                    else:
+                        n = sizes[name]
+                        element.lists[name] = (ascontiguousarray(records[name]).ravel(), n * arange(element.count + 1))
+                return position + end
+        return position + self._scan_binary_lists(element, data, byteorder)
+
+    def _scan_binary_lists(self, element, data, byteorder):
+        # the lists have different lengths
+        # the positions of the properties are found record by record
+        properties = element.properties
+        itemsizes = [dtype(_TYPES[ptype]).itemsize for _, ptype, _ in properties]
+        counts = [None if ctype is None else (byteorder + _STRUCT[_TYPES[ctype]], dtype(_TYPES[ctype]).itemsize) for _, _, ctype in properties]
+        starts = [[] for _ in properties]
+        sizes = [[] for _ in properties]
+        unpack = struct.unpack_from
+        p = 0
+        try:
+            for _ in range(element.count):
+                for i, count in enumerate(counts):
+                    starts[i].append(p)
+                    if count is None:
+                        p += itemsizes[i]
+                    else:
+                        n, = unpack(count[0], data, p)
+                        sizes[i].append(n)
+                        p += count[1] + n * itemsizes[i]
+        except struct.error:
+            raise BRGInputError('The PLY file is too short for element {0}.'.format(element.name))
+        if p > data.shape[0]:
+            raise BRGInputError('The PLY file is too short for element {0}.'.format(element.name))
+        for i, (name, ptype, ctype) in enumerate(properties):
+            code = byteorder + _TYPES[ptype]
+            start = array(starts[i], dtype=int64)
+            if ctype is None:
+                element.columns[name] = _gather(data, start, code)
+                continue
+            size = array(sizes[i], dtype=int64)
+            positions, offsets = _list_positions(start + counts[i][1], size, itemsizes[i])
+            element.lists[name] = (_gather(data, positions, code), offsets)
+        return p
+
+    # ..........................................................................
+    # ascii
+    # ..........................................................................
+
+    def _read_ascii(self):
+        with open(self.filepath, 'rb') as fh:
+            fh.seek(self.start)
+            for element in self.elements.values():
+                if not element.count:
+                    self._set_empty(element)
+                    continue
+                chunks = []
+                remaining = element.count
+                while remaining:
+                    lines = []
+                    for _ in range(min(remaining, self.chunksize)):
+                        line = fh.readline()
+                        if not line:
+                            raise BRGInputError('The PLY file is too short for element {0}.'.format(element.name))
+                        if not line.strip():
+                            continue
+                        lines.append(line.decode('latin-1'))
+                    remaining -= len(lines)
+                    if lines:
+                        chunks.append(self._read_ascii_lines(element, lines))
+                self._set_chunks(element, chunks)
+
+    def _read_ascii_lines(self, element, lines):
+        # the numbers of all lines are parsed at once
+        # the position of every property is tracked per line
+        tokens = array([len(line.split()) for line in lines], dtype=int64)
+        values = _fromstring(' '.join(lines), float64)
+        if values.shape[0] != tokens.sum():
+            raise BRGInputError('Invalid values in element {0}.'.format(element.name))
+        p = zeros(len(lines), dtype=int64)
+        cumsum(tokens[:-1], out=p[1:])
+        end = p + tokens
+        columns = {}
+        lists = {}
+        for name, ptype, ctype in element.properties:
+            if (p >= end).any():
+                raise BRGInputError('Missing values in element {0}.'.format(element.name))
+            if ctype is None:
+                columns[name] = values[p].astype(_TYPES[ptype])
+                p = p + 1
+                continue
+            sizes = values[p].astype(int64)
+            positions, offsets = _list_positions(p + 1, sizes, 1)
+            lists[name] = (values[positions].astype(_TYPES[ptype]), offsets)
+            p = p + 1 + sizes
+        return columns, lists
+
+    def _set_chunks(self, element, chunks):
+        from numpy import concatenate
+        for name, ptype, ctype in element.properties:
+            if ctype is None:
+                element.columns[name] = concatenate([columns[name] for columns, _ in chunks])
+                continue
+            values = [lists[name][0] for _, lists in chunks]
+            offsets = [zeros(1, dtype=int64)]
+            shift = 0
+            for _, lists in chunks:
+                offsets.append(lists[name][1][1:] + shift)
+                shift += lists[name][1][-1]
+            element.lists[name] = (concatenate(values), concatenate(offsets))
+
+    def _set_empty(self, element):
+        for name, ptype, ctype in element.properties:
+            if ctype is None:
+                element.columns[name] = zeros(0, dtype=_TYPES[ptype])
+            else:
+                element.lists[name] = (zeros(0, dtype=_TYPES[ptype]), zeros(1, dtype=int64))
+
+
+class PLYParser(object):
+    """Parse the elements of a :class:`PLYReader` into the arrays of a mesh.
+
+    Parameters:
+        reader (PLYReader): The reader.
+
+    Attributes:
+        vertices (array): The vertex coordinates. Shape ``(n, 3)``.
+        faces (array): The vertex indices of all faces, one face after the other.
+        offsets (array): The offsets of the faces in ``faces``.
+        vertex_attributes (OrderedDict): The other scalar properties of the
+            vertices, such as colours (``red``, ``green``, ``blue``)
+            or normals (``nx``, ``ny``, ``nz``), by name.
+        face_attributes (OrderedDict): The scalar properties of the faces, by name.
+
+    Note:
+        The vertex indices of a face are the (first) list property of the face
+        element, usually ``vertex_indices`` or ``vertex_index``.
+        A file without faces, for example a point cloud, has zero faces.
+
+    """
+    def __init__(self, reader):
+        self.reader            = reader
+        self.vertices          = None
+        self.faces             = None
+        self.offsets           = None
+        self.vertex_attributes = None
+        self.face_attributes   = None
+        self.parse()
+
+    def parse(self):
+        elements = self.reader.elements
+        if 'vertex' not in elements:
+            raise BRGInputError('A PLY file without vertex element: {0}'.format(self.reader.filepath))
+        vertex = elements['vertex']
+        for name in 'xyz':
+            if name not in vertex.columns:
+                raise BRGInputError('The vertices have no {0} coordinate.'.format(name))
+        self.vertices = column_stack([asarray(vertex.columns[name], dtype=float64) for name in 'xyz'])
+        self.vertex_attributes = OrderedDict((name, column) for name, column in vertex.columns.items() if name not in 'xyz')
+
+        self.faces = zeros(0, dtype=int64)
+        self.offsets = zeros(1, dtype=int64)
+        self.face_attributes = OrderedDict()
+        face = elements.get('face')
+        if face is None:
+            return
+        for name in ('vertex_indices', 'vertex_index'):
+            if name in face.lists:
+                break
+        else:
+            name = next(iter(face.lists), None)
+        if name is not None:
+            values, offsets = face.lists[name]
+            self.faces = values.astype(int64)
+            self.offsets = asarray(offsets, dtype=int64)
+        self.face_attributes = face.columns.copy()
+
+
+class PLYWriter(object):
+    """Write elements to an ascii or binary *ply* file.
+
+    The items of an element are assembled in chunks, with the byte position
+    (or token position, for ascii) of every property computed for all items
+    at once. Lists of different lengths do therefore not need a loop over
+    the items.
+
+    Parameters:
+        filepath (str, file): Path to the file, or a file object opened in binary mode.
+        binary (bool): Optional. Write a binary file. Default is ``True``.
+        byteorder (str): Optional. The byte order of a binary file,
+            ``'<'`` (little endian) or ``'>'`` (big endian). Default is ``'<'``.
+        precision (str): Optional. The precision of the floats of an ascii file.
+            Default is ``'6f'``.
+        comments (list): Optional. Comments for the header. Default is ``None``.
+        chunksize (int): Optional. The number of items per chunk. Default is ``100000``.
+
+    Note:
+        The ply type of a property is derived from the type of its values.
+        64-bit integers are written as 32-bit integers, and booleans as ``uchar``.
+        A file object is not closed by the writer.
+
+    Examples:
+
+        .. code-block:: python
+
+            writer = PLYWriter('mesh.ply')
+            writer.add_element('vertex', [('x', x), ('y', y), ('z', z), ('red', red)])
+            writer.add_element('face', lists=[('vertex_indices', faces, offsets)])
+            writer.write()
+
+    """
+    def __init__(self, filepath, binary=True, byteorder='<', precision=None, comments=None, chunksize=100000):
+        self.filepath  = filepath
+        self.binary    = binary
+        self.byteorder = byteorder
+        self.precision = precision if precision is not None else '6f'
+        self.comments  = comments or []
+        self.chunksize = chunksize
+        self.elements  = []
+
+    def add_element(self, name, columns=None, lists=None):
+        """Add an element.
+
+        Parameters:
+            name (str): The name of the element.
+            columns (list): Optional. The scalar properties, as ``(name, values)`` pairs.
+            lists (list): Optional. The list properties, as ``(name, values, offsets)``
+                triples, with the values of all items one after the other.
+                A 2D array of values, for example of triangles, does not need offsets.
+
+        Returns:
+            PLYElement: The element.
+        """
+        properties = []
+        for pname, values in columns or []:
+            values = asarray(values).ravel()
+            properties.append((pname, _type(values), None, values, None))
+        for item in lists or []:
+            pname, values = item[0], asarray(item[1])
+            offsets = item[2] if len(item) > 2 else None
+            if offsets is None:
+                offsets = values.shape[1] * arange(values.shape[0] + 1)
+            offsets = asarray(offsets, dtype=int64)
+            values = values.ravel()
+            ptype = _type(values)
+            sizes = offsets[1:] - offsets[:-1]
+            ctype = 'uchar' if not sizes.shape[0] or sizes.max() < 256 else 'uint'
+            properties.append((pname, ptype, ctype, values, offsets))
+        counts = set(len(values) if offsets is None else len(offsets) - 1 for _, _, _, values, offsets in properties)
+        if len(counts) > 1:
+            raise BRGInputError('The properties of element {0} have different lengths.'.format(name))
+        element = PLYElement(name, counts.pop() if counts else 0)
+        element.properties = [(pname, ptype, ctype) for pname, ptype, ctype, _, _ in properties]
+        self.elements.append((element, properties))
+        return element
+
+    def write(self):
+        """Write the header and all elements."""
+        if hasattr(self.filepath, 'write'):
+            self._write(self.filepath)
+            return
+        with open(self.filepath, 'wb') as fh:
+            self._write(fh)
+
+    def _write(self, fh):
+        fh.write(self._header().encode('latin-1'))
+        for element, properties in self.elements:
+            for start in range(0, element.count, self.chunksize):
+                end = min(start + self.chunksize, element.count)
+                if self.binary:
+                    fh.write(self._pack(properties, start, end).tobytes())
+                else:
+                    fh.write(self._format(properties, start, end).encode('latin-1'))
+
+    def _header(self):
+        if self.binary:
+            fmt = 'binary_little_endian' if self.byteorder == '<' else 'binary_big_endian'
+        else:
+            fmt = 'ascii'
+        lines = ['ply', 'format {0} 1.0'.format(fmt)]
+        for comment in self.comments:
+            lines.append('comment {0}'.format(comment))
+        for element, _ in self.elements:
+            lines.append('element {0} {1}'.format(element.name, element.count))
+            for name, ptype, ctype in element.properties:
+                if ctype is None:
+                    lines.append('property {0} {1}'.format(ptype, name))
+                else:
+                    lines.append('property list {0} {1} {2}'.format(ctype, ptype, name))
+        lines.append('end_header')
+        return '\n'.join(lines) + '\n'
+
+    def _layout(self, properties, start, end, itemsize):
+        # the values and positions of the properties of items start to end
+        # with itemsize the size of a value, or None for the size of its type
+        sizes = []
+        record = zeros(end - start, dtype=int64)
+        for _, ptype, ctype, values, offsets in properties:
+            size = itemsize or dtype(_TYPES[ptype]).itemsize
+            if ctype is None:
+                record += size
+                sizes.append(None)
+                continue
+            n = offsets[start + 1:end + 1] - offsets[start:end]
+            record += (itemsize or dtype(_TYPES[ctype]).itemsize) + n * size
+            sizes.append(n)
+        p = zeros(end - start, dtype=int64)
+        cumsum(record[:-1], out=p[1:])
+        layout = []
+        for (_, ptype, ctype, values, offsets), n in zip(properties, sizes):
+            size = itemsize or dtype(_TYPES[ptype]).itemsize
+            if ctype is None:
+                layout.append((p, values[start:end], ptype))
+                p = p + size
+                continue
+            layout.append((p, n, ctype))
+            p = p + (itemsize or dtype(_TYPES[ctype]).itemsize)
+            positions, _ = _list_positions(p, n, size)
+            layout.append((positions, values[offsets[start]:offsets[end]], ptype))
+            p = p + n * size
+        return record.sum(), layout, sizes
+
+    def _pack(self, properties, start, end):
+        total, layout, _ = self._layout(properties, start, end, None)
+        data = empty(total, dtype=uint8)
+        for positions, values, ptype in layout:
+            _scatter(data, positions, asarray(values).astype(self.byteorder + _TYPES[ptype]))
+        return data
+
+    def _format(self, properties, start, end):
+        total, layout, sizes = self._layout(properties, start, end, 1)
+        values = empty(total, dtype=float64)
+        for positions, column, _ in layout:
+            values[positions] = column
+        f = '%.' + self.precision
+        formats = [(f if _TYPES[ptype][0] == 'f' else '%d', ctype is not None) for _, ptype, ctype, _, _ in properties]
+        if all(n is None for n in sizes):
+            template = ' '.join(fmt for fmt, _ in formats) + '\n'
+            return (template * (end - start)) % tuple(values.tolist())
+        # a template per combination of list lengths
+        templates = {}
+        rows = []
+        for key in zip(*[n.tolist() for n in sizes if n is not None]):
+            if key not in templates:
+                parts = []
+                lengths = iter(key)
+                for fmt, islist in formats:
+                    if islist:
+                        n = next(lengths)
+                        parts.append(' '.join(['%d'] + [fmt] * n))
+                    else:
+                        parts.append(fmt)
+                templates[key] = ' '.join(parts) + '\n'
+            rows.append(templates[key])
+        return ''.join(rows) % tuple(values.tolist())
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
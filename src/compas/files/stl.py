@@ -0,0 +1,468 @@
+from __future__ import print_function
+
+import os
+import struct
+
+from numpy import arange
+from numpy import ascontiguousarray
+from numpy import column_stack
+from numpy import cross
+from numpy import cumsum
+from numpy import dtype
+from numpy import errstate
+from numpy import float32
+from numpy import float64
+from numpy import int64
+from numpy import isfinite
+from numpy import memmap
+from numpy import repeat
+from numpy import zeros
+from numpy.linalg import norm
+
+from compas.exceptions import BRGInputError
+
+from compas.files.obj import _ArrayBuffer
+from compas.files.obj import _fromstring
+
+from compas.utilities import weld_points
+
+
+__author__     = 'Tom Van Mele'
+__copyright__  = 'Copyright 2016, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'vanmelet@ethz.ch'
+
+
+__all__ = [
+    'STL_DTYPE',
+    'STL',
+    'STLReader',
+    'STLParser',
+    'STLWriter',
+]
+
+
+#: The record of a facet of a binary *stl* file:
+#: a normal, three vertices and a two byte attribute, 50 bytes in total.
+STL_DTYPE = dtype([
+    ('normal', '<f4', (3, )),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+
+_HEADER = 80
+
+
+def _is_binary(filepath):
+    # a binary file has exactly as many bytes as announced by its facet count
+    # an ascii file starts with "solid", but some binary files do too
+    size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as fh:
+        head = fh.read(_HEADER + 4)
+    if len(head) == _HEADER + 4:
+        count, = struct.unpack('<I', head[_HEADER:])
+        if size == _HEADER + 4 + count * STL_DTYPE.itemsize:
+            return True
+    if head.lstrip().startswith(b'solid'):
+        return False
+    raise BRGInputError('Not a valid STL file: {0}'.format(filepath))
+
+
+class STL(object):
+    """Read and parse an *stl* file.
+
+    Parameters:
+        filepath (str): Path to the file.
+        precision (str): Optional. The precision used to merge vertices.
+            Default is ``'3f'``.
+        weld (bool): Optional. Merge vertices. Default is ``True``.
+
+    Note:
+        Requires NumPy.
+
+    """
+    def __init__(self, filepath, precision=None, weld=True):
+        self.reader = STLReader(filepath)
+        self.parser = STLParser(self.reader, precision=precision, weld=weld)
+
+
+class STLReader(object):
+    """Read the triangle soup of a binary or ascii *stl* file.
+
+    A binary file is memory-mapped through :data:`STL_DTYPE`.
+    The facets, normals and vertices are views of the map, and are only read
+    from disk when they are accessed.
+    An ascii file is read in chunks of lines, and the numbers of every chunk
+    are parsed in one go.
+
+    Parameters:
+        filepath (str): Path to the file.
+        binary (bool): Optional. Is the file binary? Default is ``None``, in
+            which case the type of the file is detected from its contents.
+        chunksize (int): Optional. The approximate number of bytes per chunk
+            of an ascii file. Default is ``1048576``.
+
+    Attributes:
+        filepath (str): Path to the file.
+        binary (bool): Is the file binary.
+        header (bytes): The 80 byte header of a binary file.
+        name (str): The name of the (first) solid of an ascii file,
+            or the header of a binary file without trailing padding.
+        facets (array): The facets, as records of :data:`STL_DTYPE`. Shape ``(t, )``.
+        normals (array): The facet normals. Shape ``(t, 3)``.
+        vertices (array): The vertices of the facets. Shape ``(t, 3, 3)``.
+
+    Note:
+        The map of a binary file is read-only. The file stays open for as long
+        as any of the views exists.
+
+    References:
+        http://www.fabbers.com/tech/STL_Format
+
+    """
+    def __init__(self, filepath, binary=None, chunksize=2 ** 20):
+        self.filepath  = filepath
+        self.binary    = binary
+        self.chunksize = chunksize
+        self.header    = None
+        self.name      = None
+        self.facets    = None
+        self.normals   = None
+        self.vertices  = None
+        self.open()
+        self.read()
+
+    def open(self):
+        if self.binary is None:
+            self.binary = _is_binary(self.filepath)
+
+    def read(self):
+        if self.binary:
+            self._read_binary()
+        else:
+            self._read_ascii()
+        self.normals = self.facets['normal']
+        self.vertices = self.facets['vertices']
+
+    def _read_binary(self):
+        with open(self.filepath, 'rb') as fh:
+            head = fh.read(_HEADER + 4)
+        if len(head) < _HEADER + 4:
+            raise BRGInputError('Incomplete STL header: {0}'.format(self.filepath))
+        self.header = head[:_HEADER]
+        self.name = self.header.rstrip(b'\x00 ').decode('latin-1')
+        count, = struct.unpack('<I', head[_HEADER:])
+        if not count:
+            self.facets = zeros(0, dtype=STL_DTYPE)
+            return
+        self.facets = memmap(self.filepath, dtype=STL_DTYPE, mode='r', offset=_HEADER + 4, shape=(count, ))
+
+    def _chunks(self):
+        with open(self.filepath, 'r') as fh:
+            while True:
+                lines = fh.readlines(self.chunksize)
+                if not lines:
+                    break
+                yield lines
+
+    def _read_ascii(self):
+        normals = _ArrayBuffer(float32, 3)
+        vertices = _ArrayBuffer(float32, 3)
+        start = 0
+        for lines in self._chunks():
+            n = []
+            v = []
+            for number, line in enumerate(lines, start + 1):
+                parts = line.split(None, 1)
+                if not parts:
+                    continue
+                head = parts[0]
+                if head == 'vertex':
+                    v.append(parts[1] if len(parts) > 1 else '')
+                elif head == 'facet':
+                    # facet normal nx ny nz
+                    if len(parts) > 1:
+                        tail = parts[1].split(None, 1)
+                        if len(tail) < 2:
+                            raise BRGInputError('Invalid facet on line {0}: {1}'.format(number, self.filepath))
+                        n.append(tail[1])
+                    else:
+                        n.append('0 0 0')
+                elif head == 'solid' and self.name is None:
+                    self.name = parts[1].strip() if len(parts) > 1 else ''
+            if not self._extend(normals, n) or not self._extend(vertices, v):
+                number = _invalid_line(lines, start)
+                raise BRGInputError('Every vertex and normal should have three coordinates, line {0}: {1}'.format(number, self.filepath))
+            start += len(lines)
+        if 3 * len(normals) != len(vertices):
+            raise BRGInputError('Every facet should have three vertices: {0}'.format(self.filepath))
+        self.facets = zeros(len(normals), dtype=STL_DTYPE)
+        self.facets['normal'] = normals.array()
+        self.facets['vertices'] = vertices.array().reshape((-1, 3, 3))
+
+    def _extend(self, buffer, tails):
+        if not tails:
+            return True
+        values = _fromstring(' '.join(tails), float32)
+        if values.shape[0] != 3 * len(tails):
+            return False
+        buffer.extend(values.reshape((-1, 3)))
+        return True
+
+
+class STLParser(object):
+    """Parse the triangle soup of an :class:`STLReader` into vertices and faces.
+
+    The coordinates are quantized to integers at the given precision.
+    Vertices with the same integer coordinates are merged, by hashing the
+    integers into a single key per vertex. Collisions of the hash are detected,
+    and resolved by comparing the integer coordinates themselves.
+    The merged vertices are listed in the order of their first occurrence.
+    Faces that collapse to an edge or a point are removed.
+
+    Parameters:
+        reader (STLReader): The reader.
+        precision (str): Optional. The precision of the merge, as a number of
+            digits (``'3f'``), or ``'d'``. Default is ``'3f'``.
+        weld (bool): Optional. Merge vertices. Default is ``True``.
+
+    Attributes:
+        vertices (array): The vertex coordinates. Shape ``(n, 3)``.
+        faces (array): The vertex indices of the triangles. Shape ``(t, 3)``.
+        normals (array): The normals of the triangles, as stored in the file.
+            Shape ``(t, 3)``.
+
+    """
+    def __init__(self, reader, precision=None, weld=True):
+        self.precision = precision if precision is not None else '3f'
+        self.weld      = weld
+        self.reader    = reader
+        self.vertices  = None
+        self.faces     = None
+        self.normals   = None
+        self.parse()
+
+    def parse(self):
+        xyz = self.reader.vertices.astype(float64).reshape((-1, 3))
+        normals = self.reader.normals.astype(float64)
+
+        if not self.weld:
+            self.vertices = xyz
+            self.faces = arange(xyz.shape[0], dtype=int64).reshape((-1, 3))
+            self.normals = normals
+            return
+
+        index_index, first = self._weld(xyz)
+        faces = index_index.reshape((-1, 3))
+        valid = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+        faces = faces[valid]
+        # vertices of removed faces only
+        used = zeros(first.shape[0], dtype=bool)
+        used[faces.ravel()] = True
+        if not used.all():
+            first = first[used]
+            index = cumsum(used) - 1
+            faces = index[faces]
+
+        self.vertices = xyz[first]
+        self.faces = faces
+        self.normals = normals[valid]
+
+    def _weld(self, xyz):
+        try:
+            return weld_points(xyz, self.precision)
+        except ValueError:
+            raise BRGInputError('Unsupported precision: {0}'.format(self.precision))
+
+
+class STLWriter(object):
+    """Write triangles to a binary or ascii *stl* file.
+
+    The facets of a binary file are assembled as records of :data:`STL_DTYPE`
+    and written as raw bytes. The facets of an ascii file are formatted with
+    a single string operation per chunk.
+
+    Parameters:
+        filepath (str, file): Path to the file, or an open file object.
+            A binary file object should be seekable.
+        binary (bool): Optional. Write a binary file. Default is ``True``.
+        name (str): Optional. The name of the solid. Default is ``'compas'``.
+        precision (str): Optional. The precision of the coordinates of an ascii
+            file. Default is ``'6e'``.
+        chunksize (int): Optional. The number of facets per chunk. Default is ``10000``.
+
+    Attributes:
+        facet_count (int): The number of facets written so far.
+
+    Note:
+        The number of facets of a binary file is written to the header
+        when the writer is closed. A file object is not closed by the writer.
+
+    Examples:
+
+        .. code-block:: python
+
+            with STLWriter('mesh.stl') as writer:
+                writer.write_faces(xyz, faces)
+
+    """
+    def __init__(self, filepath, binary=True, name=None, precision=None, chunksize=10000):
+        self.filepath    = filepath
+        self.binary      = binary
+        self.name        = name if name is not None else 'compas'
+        self.precision   = precision if precision is not None else '6e'
+        self.chunksize   = chunksize
+        self.facet_count = 0
+        self.fh          = None
+        self._close      = False
+        self._start      = 0
+        self.open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        if hasattr(self.filepath, 'write'):
+            self.fh = self.filepath
+            self._close = False
+        else:
+            self.fh = open(self.filepath, 'wb' if self.binary else 'w')
+            self._close = True
+        if self.binary:
+            self._start = self.fh.tell()
+            header = self.name.encode('latin-1')[:_HEADER]
+            self.fh.write(header + b'\x00' * (_HEADER - len(header)))
+            self.fh.write(struct.pack('<I', 0))
+        else:
+            self.fh.write('solid {0}\n'.format(self.name))
+
+    def close(self):
+        if self.fh is None:
+            return
+        if self.binary:
+            end = self.fh.tell()
+            self.fh.seek(self._start + _HEADER)
+            self.fh.write(struct.pack('<I', self.facet_count))
+            self.fh.seek(end)
+        else:
+            self.fh.write('endsolid {0}\n'.format(self.name))
+        if self._close:
+            self.fh.close()
+        self.fh = None
+
+    def write_triangles(self, triangles, normals=None):
+        """Write triangles.
+
+        Parameters:
+            triangles (array): The vertex coordinates of the triangles.
+                Shape ``(t, 3, 3)``.
+            normals (array): Optional. The normals of the triangles.
+                Shape ``(t, 3)``. Default is ``None``, in which case the normals
+                are computed from the vertices.
+        """
+        triangles = ascontiguousarray(triangles, dtype=float64).reshape((-1, 3, 3))
+        if normals is None:
+            normals = _triangle_normals(triangles)
+        else:
+            normals = ascontiguousarray(normals, dtype=float64).reshape((-1, 3))
+        if self.binary:
+            self._write_binary(triangles, normals)
+        else:
+            self._write_ascii(triangles, normals)
+        self.facet_count += triangles.shape[0]
+
+    def write_faces(self, vertices, faces, offsets=None):
+        """Write faces, as triangles.
+
+        Parameters:
+            vertices (array): The vertex coordinates. Shape ``(n, 3)``.
+            faces (array, list): The faces. An integer array of shape ``(f, k)``,
+                a list of vertex index lists, or, if ``offsets`` is provided,
+                a flat array with the vertex indices of all faces.
+            offsets (array): Optional. The offsets of the faces in the flat
+                array of vertex indices. Default is ``None``.
+
+        Note:
+            Faces with more than three vertices are triangulated as a fan
+            around their first vertex. This is only correct for convex faces.
+        """
+        from compas.datastructures.mesh.arrays import _face_arrays
+        vertices = ascontiguousarray(vertices, dtype=float64).reshape((-1, 3))
+        sizes, faces = _face_arrays(faces, offsets)
+        self.write_triangles(vertices[_triangulate(faces, sizes)])
+
+    def _write_binary(self, triangles, normals):
+        for start in range(0, triangles.shape[0], self.chunksize):
+            block = zeros(min(self.chunksize, triangles.shape[0] - start), dtype=STL_DTYPE)
+            block['normal'] = normals[start:start + block.shape[0]]
+            block['vertices'] = triangles[start:start + block.shape[0]]
+            self.fh.write(block.tobytes())
+
+    def _write_ascii(self, triangles, normals):
+        f = '%.' + self.precision
+        template = ''.join([
+            '  facet normal {0} {0} {0}\n'.format(f),
+            '    outer loop\n',
+            '      vertex {0} {0} {0}\n'.format(f) * 3,
+            '    endloop\n',
+            '  endfacet\n',
+        ])
+        values = column_stack((normals, triangles.reshape((-1, 9))))
+        for start in range(0, values.shape[0], self.chunksize):
+            block = values[start:start + self.chunksize]
+            self.fh.write((template * block.shape[0]) % tuple(block.ravel().tolist()))
+
+
+def _invalid_line(lines, start):
+    # the number of the first vertex or facet line without three coordinates
+    for number, line in enumerate(lines, start + 1):
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == 'vertex':
+            values = parts[1:]
+        elif parts[0] == 'facet' and len(parts) > 1:
+            values = parts[2:]
+        else:
+            continue
+        if len(values) != 3:
+            return number
+        try:
+            [float(value) for value in values]
+        except ValueError:
+            return number
+    return start + len(lines)
+
+
+def _triangle_normals(triangles):
+    normals = cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    with errstate(divide='ignore', invalid='ignore'):
+        normals /= norm(normals, axis=1).reshape((-1, 1))
+    # degenerate triangles have no normal
+    normals[~isfinite(normals)] = 0.0
+    return normals
+
+
+def _triangulate(faces, sizes):
+    # fan triangulation of all faces
+    # the triangles of face i are (v0, vj, vj+1) for j in 1..k-2
+    offsets = zeros(sizes.shape[0] + 1, dtype=int64)
+    cumsum(sizes, out=offsets[1:])
+    counts = sizes - 2
+    counts[counts < 0] = 0
+    total = int(counts.sum())
+    face = repeat(arange(counts.shape[0]), counts)
+    j = arange(total) - repeat(cumsum(counts) - counts, counts) + 1
+    first = offsets[:-1][face]
+    return column_stack((faces[first], faces[first + j], faces[first + j + 1]))
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+    pass
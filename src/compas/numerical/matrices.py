@@ -1,9 +1,12 @@
 from __future__ import print_function
 
 from numpy import abs
+from numpy import arange
 from numpy import array
 from numpy import asarray
+from numpy import concatenate
 from numpy import float32
+from numpy import ones
 from numpy import tile
 
 from scipy.sparse import coo_matrix
@@ -80,7 +83,8 @@ def connectivity_matrix(edges, rtype='array'):
         in numerical calculations as a sparse matrix.
 
     Parameters:
-        edges (list of list): List of lists [[node_i, node_j], [node_k, node_l]].
+        edges (list of list, array): List of lists [[node_i, node_j], [node_k, node_l]],
+            or an integer array of shape ``(m, 2)``.
         rtype (str): Format of the result, 'array', 'csc', 'csr', 'coo'.
 
     Returns:
@@ -95,11 +99,12 @@ def connectivity_matrix(edges, rtype='array'):
          [-1  0  0  1]]
 
     """
-    m    = len(edges)
-    data = array([-1] * m + [1] * m)
-    rows = array(list(range(m)) + list(range(m)))
-    cols = array([edge[0] for edge in edges] + [edge[1] for edge in edges])
-    C    = coo_matrix((data, (rows, cols))).asfptype()
+    edges = asarray(edges, dtype=int).reshape((-1, 2))
+    m     = edges.shape[0]
+    data  = concatenate((-ones(m), ones(m)))
+    rows  = concatenate((arange(m), arange(m)))
+    cols  = concatenate((edges[:, 0], edges[:, 1]))
+    C     = coo_matrix((data, (rows, cols)))
     return _return_matrix(C, rtype)
 
 
@@ -145,6 +145,13 @@ def dr(vertices, edges, fixed, loads, qpre, fpre, lpre, linit, E, radius, ufunc=
     ca    = coeff.a
     cb    = coeff.b
     # --------------------------------------------------------------------------
+    # array snapshots of a mesh provide their own coordinates and edges
+    # --------------------------------------------------------------------------
+    if hasattr(vertices, 'xyz'):
+        if edges is None:
+            edges = vertices.edges
+        vertices = vertices.xyz
+    # --------------------------------------------------------------------------
     # attribute lists
     # --------------------------------------------------------------------------
     num_v = len(vertices)
@@ -1,3 +1,4 @@
+from numpy import array
 from numpy import asarray
 
 from scipy.sparse import diags
@@ -14,9 +15,30 @@ __email__      = 'vanmelet@ethz.ch'
 
 
 def fd(vertices, edges, fixed, q, loads, rtype='list'):
+    """Compute the equilibrium coordinates of a system of vertices and edges
+    with the force density method.
+
+    Parameters:
+        vertices (list, MeshArrays) : The vertex coordinates,
+            or an array snapshot of a mesh.
+        edges (list) : The vertex index pairs of the edges.
+            If ``None``, the edges of the snapshot are used.
+        fixed (list) : The indices of the fixed vertices.
+        q (list) : The force densities of the edges.
+        loads (list) : The loads on the vertices.
+        rtype (str) : Optional. The return type. Default is ``'list'``.
+
+    Returns:
+        tuple : The coordinates, force densities, forces, lengths and residuals.
+
+    """
+    if hasattr(vertices, 'xyz'):
+        if edges is None:
+            edges = vertices.edges
+        vertices = vertices.xyz
     num_v     = len(vertices)
     free      = list(set(range(num_v)) - set(fixed))
-    xyz       = asarray(vertices, dtype=float).reshape((-1, 3))
+    xyz       = array(vertices, dtype=float).reshape((-1, 3))
     q         = asarray(q, dtype=float).reshape((-1, 1))
     p         = asarray(loads, dtype=float).reshape((-1, 3))
     C         = connectivity_matrix(edges, 'csr')
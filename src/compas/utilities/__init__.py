@@ -34,6 +34,19 @@ animation
     gif_from_images
 
 
+attributes
+==========
+
+.. currentmodule:: compas.utilities.attributes
+
+:mod:`compas.utilities.attributes`
+
+.. autosummary::
+    :toctree: generated/
+
+    copy_attributes
+
+
 colors
 ======
 
@@ -67,6 +80,7 @@ maps
 
     geometric_key
     geometric_key2
+    weld_points
 
 
 mixing
@@ -138,6 +152,7 @@ xfuncio
 """
 
 from ._datetime import *
+from .attributes import *
 from .colors import *
 from .maps import *
 from .mixing import *
@@ -0,0 +1,54 @@
+from __future__ import print_function
+
+from copy import deepcopy
+
+
+__author__    = ['Tom Van Mele', ]
+__copyright__ = 'Copyright 2016 - Block Research Group, ETH Zurich'
+__license__   = 'MIT License'
+__email__     = 'vanmelet@ethz.ch'
+
+
+__all__ = [
+    'copy_attributes',
+]
+
+
+_CONTAINERS = (list, dict, set)
+
+
+def copy_attributes(attr):
+    """Copy a dict of attributes, without deep-copying immutable values.
+
+    Parameters:
+        attr (dict): The attributes of a vertex, edge or face.
+
+    Returns:
+        dict: The copy. Lists, dicts and sets are deep-copied,
+        all other values are shared with the original.
+
+    Example:
+
+        .. code-block:: python
+
+            from compas.utilities import copy_attributes
+
+            attr = copy_attributes({'x': 0.0, 'y': 0.0, 'z': 0.0, 'tags': ['a']})
+
+    """
+    attr = dict(attr)
+    for name, value in attr.items():
+        if isinstance(value, _CONTAINERS):
+            attr[name] = deepcopy(value)
+    return attr
+
+
+# ==============================================================================
+# Debugging
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    attr = {'x': 0.0, 'tags': ['a']}
+    copy = copy_attributes(attr)
+    print(copy['tags'] is attr['tags'])
@@ -1,5 +1,7 @@
 from __future__ import print_function
 
+import re
+
 
 __author__    = ['Tom Van Mele', ]
 __copyright__ = 'Copyright 2016 - Block Research Group, ETH Zurich'
@@ -8,10 +10,13 @@ __email__     = 'vanmelet@ethz.ch'
 
 
 __all__ = [
-    'geometric_key', 'geometric_key2'
+    'geometric_key', 'geometric_key2', 'weld_points'
 ]
 
 
+_PRECISION = re.compile(r'^(?:(\d+)f|d)$')
+
+
 def geometric_key(xyz, precision='3f', tolerance=1e-9, sanitize=True):
     """Convert XYZ coordinates to a string that can be used as a dict key.
 
@@ -73,6 +78,306 @@ def geometric_key2(xy, precision='3f', tolerance=1e-9, sanitize=True):
     return '{0:.{2}},{1:.{2}}'.format(x, y, precision)
 
 
+def weld_points(points, precision='3f', tolerance=None):
+    """Merge points with the same geometric key, without formatting strings.
+
+    The coordinates are quantized to integers at the given precision, which
+    gives the same groups as :func:`geometric_key`. Coordinates that are (almost)
+    halfway between two keys are rounded by formatting them, like
+    :func:`geometric_key` does, and negative values that are rounded to zero
+    are kept apart from positive ones. The integer keys are hashed and grouped
+    with NumPy, and compared in full if two hashes collide.
+    With a tolerance, points that are rounded to neighbouring keys but are
+    closer than the tolerance are merged as well.
+
+    Parameters:
+        points (array): The XYZ coordinates of the points. Shape ``(n, 3)``.
+        precision (str): Optional. The precision of the keys.
+            Supported values are any float precision (``'3f'``),
+            or decimal integer (``'d'``). Default is ``'3f'``.
+        tolerance (float): Optional. Also merge points with keys that differ
+            by at most one in every coordinate, if all their coordinates differ
+            by less than this value. The tolerance should not be larger than the
+            step of the precision. Default is ``None``.
+
+    Returns:
+        tuple: The index of the merged point of every point, and the index
+        of the first point of every merged point. The merged points are
+        numbered in the order of their first point.
+
+    Raises:
+        ValueError: If the precision is not supported or the tolerance
+            is too large.
+
+    Note:
+        Requires NumPy.
+        Merging with a tolerance is transitive: a chain of close points
+        becomes a single point. With a tolerance, negative and positive values
+        that are rounded to zero are not kept apart.
+
+    Example:
+
+        .. code-block:: python
+
+            from compas.utilities import weld_points
+
+            points = [[0, 0, 0], [1, 0, 0], [0.0004, 0, 0], [1.0006, 0, 0]]
+            index, first = weld_points(points, '3f', tolerance=1e-3)
+
+            # index: [0, 1, 0, 1]
+            # first: [0, 1]
+
+    """
+    from numpy import asarray
+    from numpy import float64
+
+    match = _PRECISION.match(precision)
+    if not match:
+        raise ValueError('Unsupported precision: {0}'.format(precision))
+    xyz = asarray(points, dtype=float64).reshape((-1, 3))
+    digits = int(match.group(1) or 0)
+    scale = 10.0 ** digits
+    truncate = precision == 'd'
+    keys = _quantize(xyz, digits, truncate)
+    if tolerance is None:
+        return _group_rows(_signed_keys(xyz, keys, truncate))
+    if tolerance * scale > 1.0:
+        raise ValueError('The tolerance should not be larger than the step of the precision.')
+    index, first = _group_rows(keys)
+    if not xyz.shape[0]:
+        return index, first
+    return _merge_neighbours(xyz, keys, index, first, tolerance, digits, truncate)
+
+
+def _weld_lines(lines, precision='3f', tolerance=None, arrays=False):
+    # the vertices and edges of lines,
+    # with the end points merged with weld_points if possible,
+    # and by geometric key otherwise
+    # every vertex gets the coordinates of the last of its points
+    # with arrays, the vertices and edges of weld_points are returned as arrays
+    if tolerance is not None or _PRECISION.match(precision):
+        try:
+            from numpy import asarray
+        except ImportError:
+            if tolerance is not None:
+                raise
+        else:
+            xyz = _line_points(lines)
+            index, first = weld_points(xyz, precision, tolerance)
+            last = _last_points(index, first.shape[0])
+            if arrays:
+                return xyz[last], index.reshape((-1, 2))
+            return xyz[last].tolist(), index.reshape((-1, 2)).tolist()
+    key_index = {}
+    vertices = []
+    edges = []
+    for line in lines:
+        edge = []
+        for xyz in line[:2]:
+            key = geometric_key(xyz, precision)
+            if key not in key_index:
+                key_index[key] = len(vertices)
+                vertices.append(xyz)
+            else:
+                vertices[key_index[key]] = xyz
+            edge.append(key_index[key])
+        edges.append(edge)
+    return vertices, edges
+
+
+def _last_points(index, count):
+    # the index of the last point of every merged point
+    from numpy import arange
+    from numpy import full
+    from numpy import int64
+    from numpy import maximum
+    last = full(count, -1, dtype=int64)
+    maximum.at(last, index, arange(index.shape[0]))
+    return last
+
+
+def _line_points(lines):
+    # the start and end points of lines, as an array of shape (2 * m, 3)
+    from itertools import chain
+    from numpy import asarray
+    from numpy import fromiter
+    from numpy import ndarray
+    if isinstance(lines, ndarray):
+        return lines[:, :2].reshape((-1, 3)).astype(float)
+    lines = list(lines)
+    try:
+        # much faster than converting the nested lists with asarray
+        xyz = fromiter(chain.from_iterable(chain.from_iterable(lines)), dtype=float)
+    except (TypeError, ValueError):
+        xyz = None
+    if xyz is None or xyz.shape[0] != 6 * len(lines):
+        xyz = asarray([line[:2] for line in lines], dtype=float)
+    return xyz.reshape((-1, 3))
+
+
+def _quantize(xyz, digits, truncate, offset=0.0):
+    # the integers of geometric_key
+    # the scaled coordinates are rounded half to even,
+    # but the formatting of geometric_key rounds the exact (binary) value
+    # therefore the coordinates close to a tie are rounded by formatting them
+    from numpy import abs as npabs
+    from numpy import floor
+    from numpy import int64
+    from numpy import rint
+    values = xyz * 10.0 ** digits + offset
+    if truncate:
+        return values.astype(int64)
+    keys = rint(values).astype(int64)
+    ties = (npabs(values - floor(values) - 0.5) < 1e-9 * (1.0 + npabs(values))).nonzero()
+    if ties[0].shape[0]:
+        offset = offset / 10.0 ** digits
+        keys[ties] = [int(('{0:.{1}f}'.format(x + offset, digits)).replace('.', '')) for x in xyz[ties].tolist()]
+    return keys
+
+
+def _signed_keys(xyz, keys, truncate):
+    # geometric_key formats small negative values as -0.000
+    # unless they are considered zero
+    # a fourth column of flags keeps them apart from positive zeros
+    from numpy import column_stack
+    from numpy import dot
+    from numpy import int64
+    if truncate:
+        return keys
+    negative = (keys == 0) & (xyz < 0) & (xyz ** 2 >= 1e-18)
+    if not negative.any():
+        return keys
+    return column_stack((keys, dot(negative, [1, 2, 4]).astype(int64)))
+
+
+def _hash(keys):
+    from numpy import errstate
+    # the products wrap around, which is fine for a hash
+    primes = (73856093, 19349663, 83492791, 50331653)
+    with errstate(over='ignore'):
+        hashes = keys[:, 0] * primes[0]
+        for i in range(1, keys.shape[1]):
+            hashes ^= keys[:, i] * primes[i]
+        return hashes
+
+
+def _group_rows(keys):
+    # group identical rows of integers, by hash
+    # the groups are numbered in the order of their first row
+    from numpy import arange
+    from numpy import argsort
+    from numpy import ascontiguousarray
+    from numpy import dtype
+    from numpy import empty
+    from numpy import int64
+    from numpy import unique
+    from numpy import void
+    keys = ascontiguousarray(keys, dtype=int64)
+    hashes, first, inverse = unique(_hash(keys), return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    if not (keys[first][inverse] == keys).all():
+        # a collision, compare the full keys instead
+        rows = keys.view(dtype((void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+        rows, first, inverse = unique(rows, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+    order = argsort(first)
+    rank = empty(order.shape[0], dtype=int64)
+    rank[order] = arange(order.shape[0])
+    return rank[inverse], first[order]
+
+
+def _merge_neighbours(xyz, keys, index, first, tolerance, digits, truncate):
+    from itertools import product
+    from numpy import arange
+    from numpy import argsort
+    from numpy import asarray
+    from numpy import concatenate
+    from numpy import int64
+    from numpy import minimum
+    from numpy import ones
+    from numpy import unique
+
+    # only points within the tolerance of the boundary of their cell
+    # can be close to the first point of a neighbouring cell
+    scale = 10.0 ** digits
+    below = _quantize(xyz, digits, truncate, -tolerance * scale) != keys
+    above = _quantize(xyz, digits, truncate, tolerance * scale) != keys
+
+    # the cells, sorted by hash for lookup
+    cells = keys[first]
+    hashes = _hash(cells)
+    order = argsort(hashes)
+    hashes = hashes[order]
+    cells = cells[order]
+
+    a = []
+    b = []
+    for offset in product((-1, 0, 1), repeat=3):
+        if offset == (0, 0, 0):
+            continue
+        select = ones(xyz.shape[0], dtype=bool)
+        for axis, step in enumerate(offset):
+            if step < 0:
+                select &= below[:, axis]
+            elif step > 0:
+                select &= above[:, axis]
+        points = select.nonzero()[0]
+        if not points.shape[0]:
+            continue
+        query = keys[points] + asarray(offset, dtype=int64)
+        found = _find_rows(hashes, cells, query)
+        hit = found >= 0
+        points = points[hit]
+        other = order[found[hit]]
+        close = (abs(xyz[points] - xyz[first[other]]) < tolerance).all(axis=1)
+        a.append(index[points[close]])
+        b.append(other[close])
+    if not a:
+        return index, first
+    a = concatenate(a)
+    b = concatenate(b)
+
+    # the connected components of the merged cells
+    # every cell gets the smallest cell number of its component,
+    # which is the number of the cell with the first point
+    labels = arange(first.shape[0])
+    while True:
+        low = minimum(labels[a], labels[b])
+        update = labels.copy()
+        minimum.at(update, a, low)
+        minimum.at(update, b, low)
+        update = update[update]
+        if (update == labels).all():
+            break
+        labels = update
+    roots, inverse = unique(labels, return_inverse=True)
+    return inverse.ravel()[index], first[roots]
+
+
+def _find_rows(hashes, rows, query):
+    # the position of every query row in rows sorted by hash, or -1
+    # rows with the same hash are tried one after the other
+    from numpy import arange
+    from numpy import full
+    from numpy import int64
+    from numpy import searchsorted
+    found = full(query.shape[0], -1, dtype=int64)
+    qhashes = _hash(query)
+    position = searchsorted(hashes, qhashes)
+    todo = arange(query.shape[0])
+    while todo.shape[0]:
+        p = position[todo]
+        valid = p < hashes.shape[0]
+        todo, p = todo[valid], p[valid]
+        valid = hashes[p] == qhashes[todo]
+        todo, p = todo[valid], p[valid]
+        match = (rows[p] == query[todo]).all(axis=1)
+        found[todo[match]] = p[match]
+        todo = todo[~match]
+        position[todo] += 1
+    return found
+
+
 # ==============================================================================
 # Debugging
 # ==============================================================================